@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark: walk-forward backtest throughput
+
+Backtests SYMBOLS synthetic symbols of BARS daily bars each and reports
+origins per second, with the online ML backend (per-bar updates) and with
+a per-origin RandomForest refit for comparison (one symbol, every 10th
+origin, since each origin costs a full fit).
+
+Usage:
+    python benchmarks/bench_backtest.py [symbols] [bars]
+"""
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to Python path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.business_logic import WalkForwardBacktest
+
+SYMBOLS = 20
+BARS = 750  # ~3 years of daily bars
+
+
+def make_bars(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, n)))
+    return pd.DataFrame({
+        'date': pd.bdate_range('2021-01-04', periods=n),
+        'close': close,
+        'high': close * (1 + rng.uniform(0, 0.015, n)),
+        'low': close * (1 - rng.uniform(0, 0.015, n)),
+        'volume': rng.uniform(1e5, 1e6, n),
+    })
+
+
+def main():
+    symbols = int(sys.argv[1]) if len(sys.argv) > 1 else SYMBOLS
+    bars = int(sys.argv[2]) if len(sys.argv) > 2 else BARS
+    universe = {f"{i:06d}": make_bars(bars, seed=i) for i in range(symbols)}
+    workers = os.cpu_count() or 1
+    print(f"{symbols} symbols x {bars} bars, {workers} workers")
+
+    runs = (('online', universe, 1), ('random_forest', dict(list(universe.items())[:1]), 10))
+    for backend, subset, step in runs:
+        result = WalkForwardBacktest(ml_backend=backend, step=step, max_workers=workers).run(subset)
+        report = result['report']
+        ensemble = result['overall']['ensemble']
+        print(f"{backend:>14}: {report['origins']:>7} origins in {report['elapsed_seconds']:>8.2f}s "
+              f"({report['origins_per_second']:>7.1f}/s)  ensemble MAPE {ensemble['mape']:.2f}% "
+              f"hit rate {ensemble['hit_rate']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
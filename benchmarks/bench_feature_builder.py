@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ML training features, per-window pandas loop vs vectorized builder,
+and recursive forecast windows, DataFrame append vs preallocated buffer
+
+Usage:
+    python benchmarks/bench_feature_builder.py
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to Python path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.data_processing.features import RecursiveWindow, build_training_set, build_window_features
+
+BAR_COUNTS = [30, 250, 2500]
+HORIZONS = [6, 60, 600]
+WINDOW_SIZE = 10  # '1day' timeframe
+
+
+def make_bars(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        'close': close,
+        'high': close * (1 + rng.uniform(0, 0.02, n)),
+        'low': close * (1 - rng.uniform(0, 0.02, n)),
+        'volume': rng.uniform(1e5, 1e6, n),
+    })
+
+
+def legacy_features(data, window_size):
+    """Previous implementation: one pandas slice and four reductions per window"""
+    features = []
+    targets = []
+    for i in range(window_size, len(data)):
+        window_data = data.iloc[i-window_size:i]
+        features.append([
+            window_data['close'].mean(),
+            window_data['close'].std(),
+            window_data['high'].max(),
+            window_data['low'].min(),
+            window_data['volume'].mean(),
+            (window_data['close'].iloc[-1] - window_data['close'].iloc[0]) / window_data['close'].iloc[0]
+        ])
+        targets.append(data['close'].iloc[i])
+    return np.array(features), np.array(targets)
+
+
+def vectorized_features(data, window_size):
+    X, y, _ = build_training_set(data['close'].values, data['high'].values,
+                                 data['low'].values, data['volume'].values, window_size)
+    return X, y
+
+
+def legacy_recursive(data, window_size, steps):
+    """Previous forecaster: copy the last row and concat the whole frame per step"""
+    current = data.copy()
+    for _ in range(steps):
+        window = current.iloc[-window_size:]
+        row = build_window_features(window['close'].values, window['high'].values,
+                                    window['low'].values, window['volume'].values, window_size)[-1]
+        new_row = current.iloc[-1:].copy()
+        new_row['close'] = row[0]
+        current = pd.concat([current, new_row], ignore_index=True)
+
+
+def buffered_recursive(data, window_size, steps):
+    window = RecursiveWindow(data['close'].values, data['high'].values, data['low'].values,
+                             data['volume'].values, window_size, steps)
+    for _ in range(steps):
+        window.push(window.features()[0])
+
+
+def best_of(fn, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    print(f"Window size: {WINDOW_SIZE}")
+    print(f"{'bars':>6} {'loop (ms)':>12} {'vectorized (ms)':>16} {'speedup':>9} {'max |diff|':>11}")
+    for n in BAR_COUNTS:
+        data = make_bars(n, seed=n)
+        repeats = 3 if n > 1000 else 10
+        t_loop = best_of(lambda: legacy_features(data, WINDOW_SIZE), repeats)
+        t_vec = best_of(lambda: vectorized_features(data, WINDOW_SIZE), repeats * 10)
+        X_ref, _ = legacy_features(data, WINDOW_SIZE)
+        X_vec, _ = vectorized_features(data, WINDOW_SIZE)
+        diff = np.abs(X_ref - X_vec).max()
+        print(f"{n:>6} {t_loop * 1000:>12.2f} {t_vec * 1000:>16.3f} {t_loop / t_vec:>8.0f}x {diff:>11.1e}")
+
+    data = make_bars(BAR_COUNTS[-1], seed=1)
+    print(f"\nRecursive forecast windows ({len(data)} bars, excluding model inference)")
+    print(f"{'steps':>6} {'concat (ms)':>12} {'buffer (ms)':>12} {'speedup':>9}")
+    for steps in HORIZONS:
+        t_concat = best_of(lambda: legacy_recursive(data, WINDOW_SIZE, steps), 3)
+        t_buffer = best_of(lambda: buffered_recursive(data, WINDOW_SIZE, steps), 10)
+        print(f"{steps:>6} {t_concat * 1000:>12.2f} {t_buffer * 1000:>12.3f} {t_concat / t_buffer:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
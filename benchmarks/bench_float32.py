@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: float64 vs float32 for universe-scale indicators and features
+
+Builds a (symbols × bars) universe and runs the vectorized indicator
+snapshot and the window feature builder over it in both dtypes, reporting
+wall time, the peak of memory allocated during the run (tracemalloc, which
+NumPy reports its buffers to), the size of the bars and feature matrix, and
+the largest deviation of the float32 results from float64.
+
+Usage:
+    python benchmarks/bench_float32.py [symbols] [bars]
+"""
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to Python path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.data_processing.features import build_window_features
+from src.data_processing.indicators import technical_snapshot
+
+SYMBOLS = 5000
+BARS = 250
+WINDOW_SIZE = 60  # '30min' timeframe
+REPEATS = 3
+
+
+def make_universe(symbols, n, dtype, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, (symbols, n)), axis=1))
+    bars = (close, close * 1.01, close * 0.99, rng.uniform(1e5, 1e6, (symbols, n)))
+    return tuple(a.astype(dtype) for a in bars)
+
+
+def run(bars):
+    indicators = technical_snapshot(*bars)
+    features = build_window_features(*bars, WINDOW_SIZE)
+    return indicators, features
+
+
+def measure(bars):
+    """(best seconds, peak MB allocated, results) of run(bars)"""
+    best = float('inf')
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        run(bars)
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    results = run(bars)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak / 2 ** 20, results
+
+
+def main():
+    symbols = int(sys.argv[1]) if len(sys.argv) > 1 else SYMBOLS
+    n_bars = int(sys.argv[2]) if len(sys.argv) > 2 else BARS
+    print(f"{symbols} symbols × {n_bars} bars, window {WINDOW_SIZE}")
+    print(f"{'dtype':>8} {'time (s)':>9} {'peak (MB)':>10} {'bars (MB)':>10} {'features (MB)':>14}")
+
+    outcomes = {}
+    for dtype in (np.float64, np.float32):
+        bars = make_universe(symbols, n_bars, dtype)
+        seconds, peak_mb, results = measure(bars)
+        outcomes[np.dtype(dtype).name] = (seconds, peak_mb, results)
+        bars_mb = sum(a.nbytes for a in bars) / 2 ** 20
+        print(f"{np.dtype(dtype).name:>8} {seconds:>9.3f} {peak_mb:>10.1f} {bars_mb:>10.1f} "
+              f"{results[1].nbytes / 2 ** 20:>14.1f}")
+
+    (t64, m64, (ind64, feat64)), (t32, m32, (ind32, feat32)) = outcomes['float64'], outcomes['float32']
+    print(f"\nfloat32: {t64 / t32:.2f}x faster, {m64 / m32:.2f}x less peak memory")
+    price_error = max(np.nanmax(np.abs(ind32[k] - ind64[k]) / np.abs(ind64[k]))
+                      for k in ('close', 'Bollinger_Upper', 'Bollinger_Lower'))
+    oscillator_error = max(np.nanmax(np.abs(ind32[k] - ind64[k])) for k in ('RSI', 'KDJ_K', 'KDJ_D', 'KDJ_J'))
+    feature_error = np.nanmax(np.abs(feat32[..., :5] - feat64[..., :5]) / np.abs(feat64[..., :5]))
+    print(f"max relative error: price levels {price_error:.1e}, features {feature_error:.1e}; "
+          f"max absolute error of oscillators (0-100): {oscillator_error:.1e}")
+
+
+if __name__ == "__main__":
+    main()
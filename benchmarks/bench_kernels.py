@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark: recursive indicator kernels, NumPy vs Numba
+
+Computes the recursive indicators (MACD's EMA chain, Wilder RSI, KDJ's
+K/D smoothing and ATR) with each available kernel backend, for a
+(symbols × bars) universe and for a single series of the same length, and
+reports wall time and whether the backends agree. The Numba kernel is
+compiled (or loaded from its cache) on a small warm-up input first, so the
+timings exclude compilation.
+
+Usage:
+    python benchmarks/bench_kernels.py [symbols] [bars]
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to Python path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.data_processing.indicators import compute_indicators
+from src.data_processing.kernels import available_kernels
+
+SYMBOLS = 5000
+BARS = 1000
+RECURSIVE = ('macd', 'rsi', 'kdj', 'atr')
+REPEATS = 3
+
+
+def make_universe(symbols, n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, (symbols, n)), axis=1))
+    return close, close * 1.01, close * 0.99
+
+
+def measure(bars, backend, repeats):
+    """(best seconds, results) of the recursive indicators on one backend"""
+    compute_indicators(*(a[..., -50:] for a in bars), names=RECURSIVE, backend=backend)  # compile / warm up
+    best = float('inf')
+    for _ in range(repeats):
+        started = time.perf_counter()
+        results = compute_indicators(*bars, names=RECURSIVE, backend=backend)
+        best = min(best, time.perf_counter() - started)
+    return best, results
+
+
+def main():
+    symbols = int(sys.argv[1]) if len(sys.argv) > 1 else SYMBOLS
+    n_bars = int(sys.argv[2]) if len(sys.argv) > 2 else BARS
+    bars = make_universe(symbols, n_bars)
+    print(f"{symbols} symbols × {n_bars} bars: {', '.join(RECURSIVE)}")
+    if 'numba' not in available_kernels():
+        print("numba is not installed; only the NumPy kernel is timed (pip install numba)")
+
+    for label, universe, repeats in (('universe', bars, REPEATS), ('one symbol', tuple(a[0] for a in bars), 20)):
+        outcomes = {backend: measure(universe, backend, repeats) for backend in available_kernels()}
+        timings = ', '.join(f"{backend} {seconds * 1000:9.1f} ms" for backend, (seconds, _) in outcomes.items())
+        line = f"{label:>12}: {timings}"
+        if 'numba' in outcomes:
+            (t_numpy, expected), (t_numba, actual) = outcomes['numpy'], outcomes['numba']
+            identical = all(np.array_equal(actual[key], values, equal_nan=True) for key, values in expected.items())
+            line += f"  -> numba {t_numpy / t_numba:.1f}x faster, results {'identical' if identical else 'DIFFER'}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ML backends, fit/predict latency and forecast accuracy
+
+Every backend is evaluated the way the predictor uses it: at each of
+ORIGINS rolling forecast origins it is fitted on all windows so far and
+then forecasts HORIZON bars recursively. Accuracy is measured against the
+realized closes on the same synthetic series for all backends.
+
+Usage:
+    python benchmarks/bench_ml_backends.py
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to Python path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.data_processing.features import build_training_set
+from src.prediction_models import MultiModelPredictor
+from src.prediction_models.ml_backends import available_backends, get_backend
+
+BARS = 750
+WINDOW_SIZE = 10  # '1day' timeframe
+HORIZON = 6
+ORIGINS = 20
+
+
+def make_bars(n, seed=0):
+    """Random walk with a weak weekly cycle so the seasonal baseline has something to find"""
+    rng = np.random.default_rng(seed)
+    cycle = 0.004 * np.sin(2 * np.pi * np.arange(n) / 5)
+    close = 20 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, n)) + cycle)
+    return pd.DataFrame({
+        'close': close,
+        'high': close * (1 + rng.uniform(0, 0.015, n)),
+        'low': close * (1 - rng.uniform(0, 0.015, n)),
+        'volume': rng.uniform(1e5, 1e6, n),
+    })
+
+
+def evaluate(name, data):
+    backend = get_backend(name)
+    fit_times, predict_times, errors, actuals = [], [], [], []
+    origins = np.linspace(BARS // 2, BARS - HORIZON, ORIGINS).astype(int)
+    for origin in origins:
+        history = data.iloc[:origin]
+        X, y, _ = build_training_set(history['close'].values, history['high'].values,
+                                     history['low'].values, history['volume'].values, WINDOW_SIZE)
+        started = time.perf_counter()
+        model = backend.fit(X, y)
+        fit_times.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        forecast = MultiModelPredictor._recursive_forecast(
+            [model], history['close'].values[None, :], history['high'].values[None, :],
+            history['low'].values[None, :], history['volume'].values[None, :], HORIZON, WINDOW_SIZE
+        )[0]
+        predict_times.append(time.perf_counter() - started)
+
+        actual = data['close'].values[origin:origin + HORIZON]
+        errors.append(forecast - actual)
+        actuals.append(actual)
+
+    errors = np.concatenate(errors)
+    actuals = np.concatenate(actuals)
+    return {
+        'fit_ms': np.median(fit_times) * 1000,
+        'predict_ms': np.median(predict_times) * 1000,
+        'mae': np.abs(errors).mean(),
+        'rmse': np.sqrt((errors ** 2).mean()),
+        'mape': np.abs(errors / actuals).mean() * 100,
+    }
+
+
+def main():
+    data = make_bars(BARS, seed=7)
+    print(f"{BARS} bars, window {WINDOW_SIZE}, {HORIZON}-step recursive forecasts from {ORIGINS} origins")
+    print(f"{'backend':>24} {'fit (ms)':>10} {'predict (ms)':>13} {'MAE':>8} {'RMSE':>8} {'MAPE %':>8}")
+    for name in available_backends():
+        r = evaluate(name, data)
+        print(f"{name:>24} {r['fit_ms']:>10.2f} {r['predict_ms']:>13.3f} "
+              f"{r['mae']:>8.4f} {r['rmse']:>8.4f} {r['mape']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-worker memory of cached models, with and without mmap
+
+Fits MODELS random forests, persists them, then starts WORKERS fresh
+processes that each load every model and predict with it (touching all
+nodes). While all workers hold their models, each reports how much its
+RSS and PSS grew. PSS splits shared pages between the processes mapping
+them, so it shows the real per-worker cost. Three layouts are compared:
+
+    sklearn pickle   the previous format (scaler + RandomForestRegressor)
+    flat, no mmap    FlatForestModel read into private memory
+    flat, mmap       FlatForestModel arrays memory-mapped (ModelCache default)
+
+Linux only (reads /proc/self/smaps_rollup).
+
+Usage:
+    python benchmarks/bench_model_memory.py [models] [workers]
+"""
+import multiprocessing as mp
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to Python path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.data_processing.features import build_training_set
+from src.prediction_models.ml_backends import RANDOM_FOREST_PARAMS
+from src.prediction_models.model_cache import ModelCache
+
+MODELS = 8
+WORKERS = 4
+BARS = 2500
+WINDOW_SIZE = 10
+
+
+def memory_kb():
+    """(RSS, PSS) of this process in kB"""
+    values = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            name, _, rest = line.partition(':')
+            if name in ('Rss', 'Pss'):
+                values[name] = int(rest.split()[0])
+    return values['Rss'], values['Pss']
+
+
+def training_set(seed):
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.015, BARS)))
+    X, y, _ = build_training_set(close, close * 1.01, close * 0.99, rng.uniform(1e5, 1e6, BARS), WINDOW_SIZE)
+    return X, y
+
+
+def worker(layout, cache_dir, keys, X, barrier, results):
+    # Measure once every worker has started, so shared library pages are
+    # split between the same processes before and after loading
+    barrier.wait()
+    before = memory_kb()
+    if layout == 'sklearn pickle':
+        models = []
+        for key in keys:
+            with open(Path(cache_dir) / f"{key}.pkl", 'rb') as f:
+                scaler, forest = pickle.load(f)
+            forest.predict(scaler.transform(X))
+            models.append((scaler, forest))
+    else:
+        cache = ModelCache(cache_dir=cache_dir, mmap=(layout == 'flat, mmap'))
+        models = [cache.get(key) for key in keys]
+        for model in models:
+            model.predict(X)
+    barrier.wait()
+    after = memory_kb()
+    barrier.wait()
+    results.put((after[0] - before[0], after[1] - before[1]))
+
+
+def main():
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.preprocessing import StandardScaler
+    from src.prediction_models.flat_forest import FlatForestModel
+
+    n_models = int(sys.argv[1]) if len(sys.argv) > 1 else MODELS
+    n_workers = int(sys.argv[2]) if len(sys.argv) > 2 else WORKERS
+    context = mp.get_context('spawn')
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ModelCache(cache_dir=cache_dir)
+        keys = []
+        for i in range(n_models):
+            X, y = training_set(i)
+            scaler = StandardScaler()
+            forest = RandomForestRegressor(**RANDOM_FOREST_PARAMS).fit(scaler.fit_transform(X), y)
+            key = f"bench{i}"
+            cache.put(key, FlatForestModel.from_sklearn(scaler, forest))
+            with open(Path(cache_dir) / f"{key}.pkl", 'wb') as f:
+                pickle.dump((scaler, forest), f, protocol=pickle.HIGHEST_PROTOCOL)
+            keys.append(key)
+        file_mb = sum(p.stat().st_size for p in Path(cache_dir).glob('*.joblib')) / 2 ** 20
+        X = training_set(0)[0]
+
+        print(f"{n_models} random forests ({file_mb:.1f} MB on disk as flat arrays), {n_workers} workers")
+        print(f"{'layout':>16} {'RSS/worker (MB)':>16} {'PSS/worker (MB)':>16} {'PSS total (MB)':>15}")
+        for layout in ('sklearn pickle', 'flat, no mmap', 'flat, mmap'):
+            barrier = context.Barrier(n_workers)
+            results = context.Queue()
+            processes = [context.Process(target=worker, args=(layout, cache_dir, keys, X, barrier, results))
+                         for _ in range(n_workers)]
+            for process in processes:
+                process.start()
+            deltas = [results.get() for _ in processes]
+            for process in processes:
+                process.join()
+            rss = np.mean([d[0] for d in deltas]) / 1024
+            pss = np.mean([d[1] for d in deltas]) / 1024
+            print(f"{layout:>16} {rss:>16.1f} {pss:>16.1f} {pss * n_workers:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
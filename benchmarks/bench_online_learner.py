@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-bar online update vs full refit
+
+Replays the last BARS bars of a synthetic series one at a time. The
+online store folds each new bar into the symbol's RLS state; the refit
+baseline trains the default backend on the whole history again.
+
+Usage:
+    python benchmarks/bench_online_learner.py
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to Python path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.data_processing.features import build_training_set
+from src.prediction_models.ml_backends import get_backend
+from src.prediction_models.online_learner import OnlineLearnerStore
+
+HISTORY = 750
+BARS = 50
+WINDOW_SIZE = 10  # '1day' timeframe
+
+
+def make_bars(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, n)))
+    return close, close * 1.01, close * 0.99, rng.uniform(1e5, 1e6, n)
+
+
+def replay(update, bars):
+    times = []
+    for end in range(HISTORY, HISTORY + BARS):
+        started = time.perf_counter()
+        update(*(column[:end + 1] for column in bars))
+        times.append(time.perf_counter() - started)
+    return np.median(times) * 1e6
+
+
+def main():
+    bars = make_bars(HISTORY + BARS, seed=7)
+    print(f"{HISTORY} bars of history, {BARS} new bars replayed one at a time, window {WINDOW_SIZE}")
+
+    for label, root_dir in (('online (memory)', None), ('online (persisted)', tempfile.mkdtemp())):
+        store = OnlineLearnerStore(root_dir)
+        store.update('BENCH', *(column[:HISTORY] for column in bars), WINDOW_SIZE)
+        micros = replay(lambda *b: store.update('BENCH', *b, WINDOW_SIZE), bars)
+        print(f"{label:>24}: {micros:10.1f} µs per bar")
+
+    backend = get_backend('random_forest')
+
+    def refit(close, high, low, volume):
+        X, y, _ = build_training_set(close, high, low, volume, WINDOW_SIZE)
+        backend.fit(X, y)
+
+    micros = replay(refit, bars)
+    print(f"{'random_forest refit':>24}: {micros:10.1f} µs per bar")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: full-universe technical screener
+
+Writes a synthetic bar store of SYMBOLS daily-bar CSV files, then times the
+screener's cold load of every symbol's tail, the first screen (folding a
+market snapshot in and scoring the whole cross-section) and a repeated
+screen with filters, which reuses the scores.
+
+Usage:
+    python benchmarks/bench_screener.py [symbols] [bars]
+"""
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to Python path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.business_logic.screener import Screener
+from src.data_acquisition.bar_store import BAR_COLUMNS, BarStore
+
+SYMBOLS = 5000
+BARS = 250
+# A weekday during the session, after the last stored bar
+NOW = datetime(2024, 6, 5, 10, 30)
+
+
+def write_store(root, symbols, n, seed=0):
+    """Synthetic store; returns the codes and last closes"""
+    rng = np.random.default_rng(seed)
+    store = BarStore(root)
+    dates = pd.bdate_range(end='2024-06-04', periods=n).strftime('%Y-%m-%d')
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, (symbols, n)), axis=1))
+    volume = rng.uniform(1e5, 1e6, (symbols, n))
+    codes = [f"{i:06d}" for i in range(symbols)]
+    for i, code in enumerate(codes):
+        lines = [
+            f"{d},{c!r},{c * 1.01!r},{c * 0.99!r},{c!r},{v!r},"
+            for d, c, v in zip(dates, close[i].tolist(), volume[i].tolist())
+        ]
+        store.path_for(code).write_text(','.join(BAR_COLUMNS) + '\n' + '\n'.join(lines) + '\n')
+    return store, codes, close[:, -1]
+
+
+def main():
+    symbols = int(sys.argv[1]) if len(sys.argv) > 1 else SYMBOLS
+    n_bars = int(sys.argv[2]) if len(sys.argv) > 2 else BARS
+
+    with tempfile.TemporaryDirectory() as root:
+        store, codes, last_close = write_store(root, symbols, n_bars)
+        rng = np.random.default_rng(1)
+        price = last_close * (1 + rng.normal(0, 0.02, symbols))
+        snapshot = pd.DataFrame({
+            'code': codes, 'name': codes, 'price': price, 'change_pct': (price / last_close - 1) * 100,
+            'open': last_close, 'high': np.maximum(price, last_close) * 1.005,
+            'low': np.minimum(price, last_close) * 0.995, 'volume': rng.uniform(1e5, 1e6, symbols),
+        })
+        screener = Screener(store, snapshot_fn=lambda: snapshot)
+
+        print(f"{symbols} symbols × {n_bars} stored bars, lookback {screener.lookback}, dtype {screener.dtype}")
+        started = time.perf_counter()
+        screener.refresh(force=True)
+        print(f"{'cold load of every tail':>28}: {time.perf_counter() - started:8.3f} s")
+
+        started = time.perf_counter()
+        first = screener.screen(limit=50, now=NOW)
+        print(f"{'first screen (scoring)':>28}: {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+        timings = []
+        for _ in range(20):
+            started = time.perf_counter()
+            screened = screener.screen({'min_score': 0.1, 'max_rsi': 70}, sort_by='volume_trend', limit=50, now=NOW)
+            timings.append(time.perf_counter() - started)
+        print(f"{'filtered screen (cached)':>28}: {np.median(timings) * 1000:8.1f} ms median")
+        print(f"\nscored {first['universe']} symbols; {screened['matched']} pass min_score 0.1 and max_rsi 70")
+
+
+if __name__ == "__main__":
+    main()
@@ -45,6 +45,16 @@ DEBUG = os.getenv("DEBUG", "True").lower() == "true"
 AKSHARE_ENABLED = os.getenv("AKSHARE_ENABLED", "True").lower() == "true"
 TUSHARE_ENABLED = os.getenv("TUSHARE_ENABLED", "False").lower() == "true"
 TUSHARE_TOKEN = os.getenv("TUSHARE_TOKEN", "")
+# Maximum TuShare Pro API calls per second (daily endpoint allows ~500/min)
+TUSHARE_RATE_LIMIT = float(os.getenv("TUSHARE_RATE_LIMIT", "3"))
+
+# Historical backfill settings
+# Maximum requests per second sent to each data source by the backfill job
+BACKFILL_RATE_LIMITS = {
+    "akshare": float(os.getenv("AKSHARE_RATE_LIMIT", "3")),
+    "yahoo": float(os.getenv("YAHOO_RATE_LIMIT", "1")),
+}
+BACKFILL_START_DATE = os.getenv("BACKFILL_START_DATE", "2015-01-01")
 
 # Database settings
 DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{DATA_DIR}/siaps.db")
@@ -56,8 +66,50 @@ WINDOW_HEIGHT = int(os.getenv("WINDOW_HEIGHT", "800"))
 
 # Model settings
 MODEL_CACHE_DIR = MODELS_DIR / "saved"
+# In-memory budget for trained prediction models (LRU, spills to MODEL_CACHE_DIR)
+MODEL_CACHE_MAX_BYTES = int(os.getenv("MODEL_CACHE_MAX_MB", "256")) * 1024 * 1024
+# Disk budget for persisted models in MODEL_CACHE_DIR (least recently used files deleted)
+MODEL_CACHE_DISK_MAX_BYTES = int(os.getenv("MODEL_CACHE_DISK_MAX_MB", "2048")) * 1024 * 1024
+# Memory-map persisted models so worker processes share their pages
+MODEL_CACHE_MMAP = os.getenv("MODEL_CACHE_MMAP", "True").lower() == "true"
+# Memoized prediction results per predictor (LRU entries, 0 disables)
+PREDICTION_RESULT_CACHE_SIZE = int(os.getenv("PREDICTION_RESULT_CACHE_SIZE", "512"))
+# Default ML backend: random_forest, hist_gradient_boosting, ridge, seasonal_naive or online
+ML_BACKEND = os.getenv("ML_BACKEND", "random_forest")
+# Dtype of bars, indicators and ML features inside the predictor: float64 or float32 (half the memory)
+NUMERIC_DTYPE = os.getenv("NUMERIC_DTYPE", "float64")
+# Recursive indicator kernels: auto (Numba when installed), numba or numpy
+INDICATOR_KERNELS = os.getenv("INDICATOR_KERNELS", "auto")
+# Return per-stage durations with every prediction and record them in histograms
+PREDICTION_TIMINGS = os.getenv("PREDICTION_TIMINGS", "False").lower() == "true"
+# Default latency budget of a web prediction in ms; the ML stage is shed when it would overrun (0 = no budget)
+PREDICTION_DEADLINE_MS = float(os.getenv("PREDICTION_DEADLINE_MS", "0"))
+# Per-symbol online (recursive least squares) model states
+ONLINE_MODEL_DIR = MODEL_CACHE_DIR / "online"
+# Weight kept by past bars at each online update (1.0 = never forget)
+ONLINE_FORGETTING_FACTOR = float(os.getenv("ONLINE_FORGETTING_FACTOR", "1.0"))
+# Web prediction results kept until their timeframe's next bar (LRU entries, 0 disables)
+WEB_PREDICTION_CACHE_SIZE = int(os.getenv("WEB_PREDICTION_CACHE_SIZE", "1024"))
+# Live price move (percent) that starts a new cached web prediction
+PREDICTION_PRICE_BUCKET_PCT = float(os.getenv("PREDICTION_PRICE_BUCKET_PCT", "0.5"))
+# Timezone of the exchange's session times and bar closes
+EXCHANGE_TIMEZONE = os.getenv("EXCHANGE_TIMEZONE", "Asia/Shanghai")
 DATA_CACHE_DIR = DATA_DIR / "cache"
 
+# Local bar store (one CSV file of daily bars per symbol)
+BAR_STORE_DIR = DATA_DIR / "bars"
+
+# Technical screener: bars kept per symbol, minimum bars to score a symbol
+# (at least 2, the day's change needs the previous close), seconds a market
+# snapshot is reused and seconds between bar store checks
+SCREENER_LOOKBACK = int(os.getenv("SCREENER_LOOKBACK", "120"))
+SCREENER_MIN_BARS = max(2, int(os.getenv("SCREENER_MIN_BARS", "30")))
+SCREENER_SNAPSHOT_TTL = float(os.getenv("SCREENER_SNAPSHOT_TTL", "30"))
+SCREENER_REFRESH_SECONDS = float(os.getenv("SCREENER_REFRESH_SECONDS", "60"))
+
+# Materialized ML window features (per symbol and window size)
+FEATURE_STORE_DIR = DATA_DIR / "features"
+
 # Logging settings
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FILE = LOGS_DIR / "siaps.log"
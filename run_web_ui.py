@@ -3,14 +3,17 @@
 SIAPS Web UI - Minimal Flask Backend
 A lightweight web interface for the Stock Intelligent Analysis & Prediction System
 """
+import os
 import sys
 import argparse
 import socket
+import time
 from pathlib import Path
 from flask import Flask, render_template, jsonify, request
 from flask_cors import CORS
 import webbrowser
 import threading
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 
@@ -34,6 +37,9 @@ except ImportError:
     # Fallback inline implementation will be defined below if import fails
     calculate_indicator_signals = None
 
+# Shared indicator library (same computation as the predictor and screener)
+from src.data_processing.indicators import technical_snapshot
+
 # Initialize data fetcher
 try:
     from src.data_acquisition.multi_source_fetcher import MultiSourceDataFetcher
@@ -55,12 +61,34 @@ except Exception as e:
 # Initialize predictor (optional, not critical for basic functionality)
 try:
     from src.prediction_models import MultiModelPredictor
+    from src.prediction_models.ml_backends import available_backends
+    from config.settings import PREDICTION_DEADLINE_MS
     multi_predictor = MultiModelPredictor()
     logger.info("✓ Multi-model predictor initialized successfully")
 except Exception as e:
     logger.warning(f"Multi-model predictor not available: {str(e)}")
     multi_predictor = None
 
+# Prediction results reused until the timeframe's next bar is due
+try:
+    from src.business_logic.prediction_cache import PredictionCache, last_bar_timestamp
+    prediction_cache = PredictionCache()
+except Exception as e:
+    logger.warning(f"Prediction cache not available: {str(e)}")
+    prediction_cache = None
+
+# Technical screener over the local bar store, with live bars from the market snapshot
+def _market_snapshot():
+    return data_fetcher.fetch_market_snapshot() if data_fetcher else None
+
+
+try:
+    from src.business_logic.screener import FILTERS as SCREENER_FILTERS, SCORE_COLUMNS, Screener
+    screener = Screener(snapshot_fn=_market_snapshot)
+except Exception as e:
+    logger.warning(f"Screener not available: {str(e)}")
+    screener = None
+
 # Initialize Flask app
 app = Flask(__name__, 
             template_folder='web_ui/templates',
@@ -72,6 +100,13 @@ app.config['SECRET_KEY'] = 'siaps-secret-key-change-in-production'
 app.config['JSON_AS_ASCII'] = False  # Support Chinese characters in JSON
 
 
+@app.before_request
+def warm_up_screener():
+    """Load the screener's bars in the background on a process's first request"""
+    if screener is not None:
+        screener.warm_up()
+
+
 # ===== Helper Functions =====
 def generate_demo_price_history(base_price: float, days: int = 30) -> dict:
     """
@@ -112,8 +147,6 @@ def generate_fallback_historical_data(stock_code: str, base_price: float = None,
     Returns:
         DataFrame with columns: close, high, low, open, volume
     """
-    import numpy as np
-    
     # 如果没有提供基准价格，根据股票代码生成一个合理的价格
     if base_price is None:
         # 使用股票代码的哈希值生成稳定的价格
@@ -162,6 +195,67 @@ def generate_fallback_historical_data(stock_code: str, base_price: float = None,
     return df
 
 
+# Bar columns of each data source format used by the indicator summary
+_INDICATOR_COLUMNS = {
+    '收盘': 'close', '最高': 'high', '最低': 'low', '成交量': 'volume',
+    'Close': 'close', 'High': 'high', 'Low': 'low', 'Volume': 'volume',
+}
+
+
+def bar_indicators(bars: pd.DataFrame) -> dict:
+    """
+    Latest indicators of bars, as MultiModelPredictor reports them in its technical result
+    
+    Args:
+        bars: Bars in date order with a close column (AKShare, Yahoo or normalized
+              names); high/low default to close, and without volume OBV is omitted
+    
+    Returns:
+        dict: technical_snapshot(display=True) values as floats
+    """
+    bars = bars.rename(columns=_INDICATOR_COLUMNS)
+    
+    def column(name, default):
+        if name not in bars.columns:
+            return default
+        return pd.to_numeric(bars[name], errors='coerce').to_numpy(dtype=float)
+    
+    close = column('close', None)
+    snapshot = technical_snapshot(close, column('high', close), column('low', close), column('volume', None),
+                                  display=True)
+    return {key: float(value) for key, value in snapshot.items()}
+
+
+def technical_indicator_summary(indicators: dict) -> dict:
+    """
+    Technical indicators for display
+    
+    Args:
+        indicators: Latest values keyed like technical_snapshot(display=True): the
+                    predictor's result['technical']['indicators'] or bar_indicators()
+    
+    Returns:
+        dict: RSI (the technical model's 14-bar RSI), MACD, KDJ (K), MA5, MA20,
+        BOLL ('lower-upper'), ATR and OBV; indicators that are missing or lack
+        enough bars are None
+    """
+    def number(key, digits):
+        value = indicators.get(key)
+        return None if value is None or pd.isna(value) else round(float(value), digits)
+    
+    lower, upper = number('Bollinger_Lower', 2), number('Bollinger_Upper', 2)
+    return {
+        'RSI': number('RSI', 1),
+        'MACD': number('MACD', 3),
+        'KDJ': number('KDJ_K', 1),
+        'MA5': number('MA5', 2),
+        'MA20': number('MA20', 2),
+        'BOLL': f"{lower}-{upper}" if lower is not None and upper is not None else None,
+        'ATR': number('ATR', 3),
+        'OBV': number('OBV', 0),
+    }
+
+
 # Fallback implementation if import fails
 if calculate_indicator_signals is None:
     def calculate_indicator_signals(current_price, indicators):
@@ -305,6 +399,17 @@ def predict_stock(stock_code):
                         ]
                         has_real_historical_data = True
                         logger.info(f"✓ Processed Yahoo format: {len(price_history['data'])} price points")
+                    elif 'date' in historical_df.columns and 'close' in historical_df.columns:
+                        # Normalized bar format (bar store / Yahoo adapter)
+                        historical_df = historical_df.sort_values('date')
+                        price_history['labels'] = [
+                            d.strftime('%m/%d') for d in pd.to_datetime(historical_df['date'])
+                        ]
+                        price_history['data'] = [
+                            float(p) for p in historical_df['close']
+                        ]
+                        has_real_historical_data = True
+                        logger.info(f"✓ Processed normalized format: {len(price_history['data'])} price points")
                     else:
                         logger.warning(f"Unknown data format. Available columns: {historical_df.columns.tolist()}")
                 else:
@@ -346,16 +451,16 @@ def predict_stock(stock_code):
         # Confidence based on data quality
         confidence = 0.75 if len(recent_prices) >= 5 else 0.60
         
-        # Prepare result
-        technical_indicators = {
-            'RSI': round(30 + (hash(stock_code + 'rsi') % 40), 1),
-            'MACD': round((hash(stock_code + 'macd') % 100 - 50) / 100, 3),
-            'KDJ': round(40 + (hash(stock_code + 'kdj') % 40), 1),
-            'MA5': round(current_price * (1 + (hash(stock_code + 'ma5') % 10 - 5) / 100), 2),
-            'MA20': round(current_price * (1 + (hash(stock_code + 'ma20') % 20 - 10) / 100), 2),
-            'BOLL': f"{round(current_price * 0.95, 2)}-{round(current_price * 1.05, 2)}"
-        }
+        # Technical indicators of the fetched bars; unavailable (None) when the chart is demo data
+        technical_indicators = None
+        indicator_signals = {}
+        if has_real_historical_data:
+            technical_indicators = technical_indicator_summary(bar_indicators(historical_df))
+            indicator_signals = calculate_indicator_signals(
+                current_price, {k: v for k, v in technical_indicators.items() if v is not None}
+            )
         
+        # Prepare result
         result = {
             'success': True,
             'stockCode': stock_code,
@@ -375,7 +480,7 @@ def predict_stock(stock_code):
                 'advice': advice
             },
             'technicalIndicators': technical_indicators,
-            'indicatorSignals': calculate_indicator_signals(current_price, technical_indicators),
+            'indicatorSignals': indicator_signals,
             'priceHistory': price_history,
             'message': 'Prediction completed successfully'
         }
@@ -424,9 +529,18 @@ def predict_stock_multi_timeframe(stock_code):
     API endpoint for multi-timeframe stock prediction
     Query parameters:
         - timeframe: '1hour', '3day', '30day' (default: '3day')
+        - bands: 'true' to add Monte Carlo percentile bands (default: 'false')
+        - ml_backend: machine learning backend (default: config ML_BACKEND)
+        - timings: 'true' to add per-stage durations in ms (default: 'false')
+        - deadline_ms: latency budget in ms; the ML stage is shed when it would overrun
+          (default: config PREDICTION_DEADLINE_MS, 0 = no budget)
     """
     try:
         timeframe = request.args.get('timeframe', '3day')
+        include_bands = request.args.get('bands', 'false').lower() in ('1', 'true', 'yes')
+        include_timings = request.args.get('timings', 'false').lower() in ('1', 'true', 'yes')
+        ml_backend = request.args.get('ml_backend') or None
+        deadline_ms = request.args.get('deadline_ms', type=float)
         logger.info(f"Multi-timeframe prediction requested for stock: {stock_code}, timeframe: {timeframe}")
         
         # Validate timeframe
@@ -437,6 +551,22 @@ def predict_stock_multi_timeframe(stock_code):
                 'message': 'Invalid timeframe parameter'
             }), 400
         
+        if ml_backend is not None and multi_predictor and ml_backend not in available_backends():
+            return jsonify({
+                'success': False,
+                'error': f"Invalid ml_backend. Must be one of: {', '.join(available_backends())}",
+                'message': 'Invalid ml_backend parameter'
+            }), 400
+        
+        if deadline_ms is None and multi_predictor:
+            deadline_ms = PREDICTION_DEADLINE_MS
+        if deadline_ms is not None and deadline_ms < 0:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid deadline_ms. Must be a non-negative number of milliseconds',
+                'message': 'Invalid deadline_ms parameter'
+            }), 400
+        
         # Fetch real-time data
         real_data = None
         current_price = None
@@ -506,23 +636,52 @@ def predict_stock_multi_timeframe(stock_code):
         
         # Generate predictions using multi-model predictor
         prediction_result = None
-        
-        if multi_predictor:
+        cache_info = None
+        
+        # Same bars, timeframe and price bucket: reuse the result until the next bar is due
+        # (fallback data is regenerated on every request and never cached)
+        cache_key = None
+        if prediction_cache is not None and multi_predictor and not use_fallback_data:
+            last_bar = last_bar_timestamp(historical_df)
+            if last_bar is not None:
+                cache_key = prediction_cache.make_key(
+                    stock_code, timeframe, last_bar, current_price,
+                    bands=include_bands, ml_backend=ml_backend or multi_predictor.ml_backend
+                )
+                cached = prediction_cache.get(cache_key)
+                if cached is not None:
+                    prediction_result, age_seconds, expires_at = cached
+                    cache_info = {'hit': True, 'ageSeconds': round(age_seconds, 1),
+                                  'expiresAt': expires_at.isoformat()}
+                    logger.info(f"Prediction cache hit for {stock_code} ({timeframe}), age {age_seconds:.1f}s")
+        
+        if multi_predictor and prediction_result is None:
             try:
                 logger.info(f"Running multi-model prediction with {len(historical_df)} data points")
                 prediction_result = multi_predictor.predict_multi_timeframe(
                     historical_df, 
                     timeframe=timeframe,
-                    current_price=current_price  # Pass real-time price for accurate percentage calculation
+                    current_price=current_price,  # Pass real-time price for accurate percentage calculation
+                    stock_code=stock_code,  # Lets the predictor reuse models trained on identical bars
+                    monte_carlo=include_bands,
+                    ml_backend=ml_backend,
+                    timings=include_timings or None,
+                    deadline_ms=deadline_ms or None
                 )
                 
-                if current_price is None and 'close' in historical_df.columns:
-                    current_price = float(historical_df['close'].iloc[-1])
+                # A result missing shed stages is only good for this request
+                if cache_key is not None and 'error' not in prediction_result and \
+                        not prediction_result.get('shed_stages'):
+                    expires_at = prediction_cache.put(cache_key, prediction_result)
+                    cache_info = {'hit': False, 'ageSeconds': 0.0, 'expiresAt': expires_at.isoformat()}
                     
             except Exception as e:
                 logger.error(f"Multi-model prediction failed: {str(e)}", exc_info=True)
                 prediction_result = None
         
+        if current_price is None and 'close' in historical_df.columns:
+            current_price = float(historical_df['close'].iloc[-1])
+        
         # Check if prediction succeeded
         if prediction_result is None or 'error' in prediction_result:
             logger.warning(f"Prediction failed for {stock_code}")
@@ -575,21 +734,35 @@ def predict_stock_multi_timeframe(stock_code):
                 'expectedChange': round(price_changes[-1], 2) if price_changes else 0
             },
             'dataSource': 'fallback' if use_fallback_data else 'real',  # 添加数据来源标记
+            'cache': cache_info or {'hit': False, 'ageSeconds': 0.0, 'expiresAt': None},
             'message': 'Multi-timeframe prediction completed successfully'
         }
         
-        # Add technical indicators if available
-        if prediction_result and 'technical' in prediction_result:
-            tech_indicators = prediction_result['technical'].get('indicators', {})
-            result['technicalIndicators'] = {
-                'RSI': round(tech_indicators.get('RSI', 50), 1),
-                'MACD': round(tech_indicators.get('MACD', 0), 3),
-                'MA5': round(tech_indicators.get('MA5', current_price), 2),
-                'MA20': round(tech_indicators.get('MA20', current_price), 2)
+        # Monte Carlo percentile bands (p5/p25/p50/p75/p95 per predicted point)
+        monte_carlo = prediction_result.get('monte_carlo')
+        if monte_carlo:
+            result['prediction']['bands'] = {
+                name: [round(p, 2) for p in prices] for name, prices in monte_carlo['bands'].items()
             }
         
-        # Save to database
-        if db_manager:
+        # Per-stage durations of this request's prediction (absent on web cache hits)
+        if include_timings and 'timings' in prediction_result and not (cache_info and cache_info['hit']):
+            result['timings'] = prediction_result['timings']
+        
+        # Stages dropped to meet the latency budget (their ensemble weight was redistributed)
+        if prediction_result.get('shed_stages'):
+            result['shedStages'] = prediction_result['shed_stages']
+        
+        # Technical indicators as the prediction's technical model computed them
+        # (computed here only when the technical model fell back without them)
+        try:
+            indicators = prediction_result.get('technical', {}).get('indicators') or bar_indicators(historical_df)
+            result['technicalIndicators'] = technical_indicator_summary(indicators)
+        except Exception as e:
+            logger.error(f"Error computing technical indicators: {str(e)}")
+        
+        # Save to database (a cached result was already recorded when it was computed)
+        if db_manager and not (cache_info and cache_info['hit']):
             try:
                 db_manager.add_prediction(
                     stock_code=stock_code,
@@ -1258,6 +1431,96 @@ def clear_history():
         }), 500
 
 
+@app.route('/api/screener', methods=['GET'])
+def screen_stocks():
+    """
+    Technical screener over every symbol in the local bar store
+    Query parameters:
+        - limit: rows returned (default: 50, max: 500)
+        - sort: score, price, change_pct, rsi, kdj_j, macd_hist, volume_trend or
+          a signal (macd_signal, rsi_signal, bollinger_signal, kdj_signal, volume_signal)
+          (default: score)
+        - order: 'desc' or 'asc' (default: 'desc')
+        - live: 'false' to score stored bars only, without today's snapshot (default: 'true')
+        - min_/max_ score, price, change_pct, rsi, kdj_j, volume_trend: inclusive bounds
+    """
+    if screener is None:
+        return jsonify({'success': False, 'error': 'Screener not available'}), 503
+    
+    try:
+        limit = min(max(request.args.get('limit', 50, type=int), 0), 500)
+        sort_by = request.args.get('sort', 'score')
+        descending = request.args.get('order', 'desc').lower() != 'asc'
+        live = request.args.get('live', 'true').lower() not in ('0', 'false', 'no')
+        filters = {}
+        for name in SCREENER_FILTERS:
+            if name in request.args:
+                value = request.args.get(name, type=float)
+                if value is None:
+                    return jsonify({'success': False, 'error': f"Invalid {name}: must be a number"}), 400
+                filters[name] = value
+        if sort_by not in SCORE_COLUMNS:
+            return jsonify({
+                'success': False,
+                'error': f"Invalid sort. Must be one of: {', '.join(SCORE_COLUMNS)}"
+            }), 400
+        
+        started = time.perf_counter()
+        screened = screener.screen(filters, sort_by=sort_by, descending=descending, limit=limit, live=live)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        
+        def number(value, digits):
+            return None if pd.isna(value) else round(float(value), digits)
+        
+        results = [
+            {
+                'code': row.code,
+                'name': row.name,
+                'price': number(row.price, 2),
+                'changePct': number(row.change_pct, 2),
+                'score': number(row.score, 4),
+                'signals': {
+                    'macd': number(row.macd_signal, 4),
+                    'rsi': number(row.rsi_signal, 4),
+                    'bollinger': number(row.bollinger_signal, 4),
+                    'kdj': number(row.kdj_signal, 4),
+                    'volume': number(row.volume_signal, 4),
+                },
+                'indicators': {
+                    'MACD_Hist': number(row.macd_hist, 4),
+                    'RSI': number(row.rsi, 1),
+                    'KDJ_J': number(row.kdj_j, 1),
+                    'Volume_Trend': number(row.volume_trend, 2),
+                },
+            }
+            for row in screened['results'].itertuples(index=False)
+        ]
+        return jsonify({
+            'success': True,
+            'tradeDate': screened['trade_date'].strftime('%Y-%m-%d'),
+            'universe': screened['universe'],
+            'matched': screened['matched'],
+            'sort': sort_by,
+            'order': 'desc' if descending else 'asc',
+            'elapsedMs': round(elapsed_ms, 1),
+            'results': results
+        })
+    except Exception as e:
+        logger.error(f"Screener failed: {str(e)}", exc_info=True)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/api/metrics/timings', methods=['GET'])
+def get_timing_metrics():
+    """Process-wide latency histograms of the prediction stages (ms)"""
+    from src.utils.timing import timing_snapshot
+    return jsonify({
+        'success': True,
+        'pid': os.getpid(),
+        'stages': timing_snapshot()
+    })
+
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -1,7 +1,11 @@
 """
 SIAPS Business Logic Package
 """
-# Placeholder for business logic
-# Will be implemented in Phase 2
+from .backtest import WalkForwardBacktest, walk_forward
+from .screener import Screener
 
-__all__ = []
+__all__ = [
+    'Screener',
+    'WalkForwardBacktest',
+    'walk_forward',
+]
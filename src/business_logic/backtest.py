@@ -0,0 +1,312 @@
+"""
+SIAPS - Walk-Forward Backtest
+Replays history bar by bar and scores MultiModelPredictor against what happened
+
+At every origin the predictor only sees bars up to that origin (at most
+`lookback` of them) and its predicted path is compared with the closes that
+followed. The expensive parts are shared across origins: technical
+indicators of every origin's window are computed up front in a few
+vectorized passes (see window_snapshots), window features come from an
+in-memory FeatureStore that appends one row per origin, and the default
+'online' ML backend folds each new bar into a per-symbol RLS state instead
+of refitting. Symbols fan out over a process pool, with bars published once
+in shared memory.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+ROOT_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.data_processing.feature_store import FeatureStore
+from src.data_processing.indicators import TECHNICAL_MODEL_INDICATORS, compute_indicators, technical_snapshot
+from src.prediction_models.model_cache import ResultCache
+from src.prediction_models.multi_model_predictor import MultiModelPredictor
+from src.prediction_models.online_learner import OnlineLearnerStore
+from src.prediction_models.parallel import SharedBars, attach_shared, frame_from_shared
+from src.utils import setup_logger
+
+logger = setup_logger(__name__)
+
+
+# Models scored, as keys of a predict_multi_timeframe result
+SCORED_MODELS = ('ensemble', 'technical', 'machine_learning', 'support_resistance')
+
+# Bars required before the first origin
+DEFAULT_WARMUP = 60
+
+# Most recent bars the predictor sees at each origin
+DEFAULT_LOOKBACK = 250
+
+# ML backend used by default: per-bar updates instead of per-origin refits
+DEFAULT_BACKTEST_BACKEND = 'online'
+
+# Full-length windows whose indicators are computed in one (origins × lookback) pass
+SNAPSHOT_CHUNK = 1024
+
+
+def _empty_totals() -> Dict[str, float]:
+    return {'points': 0, 'abs_error': 0.0, 'sq_error': 0.0, 'abs_pct_error': 0.0,
+            'directions': 0, 'hits': 0}
+
+
+def _accumulate(totals: dict, predicted, actual, base_price: float):
+    """Add one origin's errors and direction call to running totals"""
+    predicted = np.asarray(predicted, dtype=float)[:len(actual)]
+    errors = predicted - actual
+    totals['points'] += len(errors)
+    totals['abs_error'] += float(np.abs(errors).sum())
+    totals['sq_error'] += float((errors ** 2).sum())
+    totals['abs_pct_error'] += float(np.abs(errors / actual).sum())
+    # Direction of the whole horizon; flat outcomes are not scored
+    actual_move = np.sign(actual[-1] - base_price)
+    if actual_move != 0:
+        totals['directions'] += 1
+        totals['hits'] += int(np.sign(predicted[-1] - base_price) == actual_move)
+
+
+def merge_totals(totals_list: List[dict]) -> dict:
+    """Sum running totals of several symbols"""
+    merged = _empty_totals()
+    for totals in totals_list:
+        for key in merged:
+            merged[key] += totals[key]
+    return merged
+
+
+def summarize(totals: dict) -> dict:
+    """
+    Error and hit-rate metrics from running totals
+
+    Returns:
+        dict: 'mae', 'rmse', 'mape' (percent), 'hit_rate' (share of correct
+        up/down calls), 'points' and 'directions'; metrics are None when
+        nothing was scored
+    """
+    points, directions = totals['points'], totals['directions']
+    return {
+        'mae': totals['abs_error'] / points if points else None,
+        'rmse': float(np.sqrt(totals['sq_error'] / points)) if points else None,
+        'mape': totals['abs_pct_error'] / points * 100 if points else None,
+        'hit_rate': totals['hits'] / directions if directions else None,
+        'points': points,
+        'directions': directions,
+    }
+
+
+def make_backtest_predictor(ml_backend: str = DEFAULT_BACKTEST_BACKEND, seed: int = 0) -> MultiModelPredictor:
+    """
+    Predictor configured for replay
+
+    Every origin sees new data, so result and model caches would only grow.
+    Online states and window features stay in memory, extended by one bar
+    per origin, so a backtest never touches live files.
+    """
+    return MultiModelPredictor(
+        enable_model_cache=False, seed=seed, result_cache=ResultCache(max_entries=0),
+        ml_backend=ml_backend, online_store=OnlineLearnerStore(root_dir=None),
+        feature_store=FeatureStore(root_dir=None),
+    )
+
+
+def window_snapshots(close, high, low, volume, origins, lookback: int) -> Dict[str, np.ndarray]:
+    """
+    Technical indicators of the bars the predictor sees at each origin
+
+    The predictor at origin o sees bars max(0, o + 1 - lookback)..o, and its
+    indicators start from the first of them. Windows that still start at
+    bar 0 read bar o of one full-series computation (an indicator's value at
+    a bar depends only on the bars up to it); full-length windows are
+    stacked as rows of a (windows × lookback) matrix and computed together.
+    Either way the values are those of technical_snapshot on the window.
+
+    Args:
+        close, high, low, volume: 1-D bar arrays
+        origins: increasing origin bar indices
+        lookback: Most recent bars passed to the predictor
+
+    Returns:
+        dict: technical_snapshot keys, each an array with one value per origin
+    """
+    origins = np.asarray(origins, dtype=int)
+    bars = (close, high, low, volume)
+    growing = origins[origins + 1 < lookback]
+    parts = []
+    if len(growing):
+        end = growing[-1] + 1
+        series = compute_indicators(*(a[:end] for a in bars), names=TECHNICAL_MODEL_INDICATORS)
+        parts.append({
+            'close': close[growing],
+            'MACD': series['MACD'][growing],
+            'MACD_Signal': series['MACD_Signal'][growing],
+            'MACD_Hist': series['MACD_Hist'][growing],
+            'RSI': series['RSI_SMA'][growing],
+            'Bollinger_Upper': series['Bollinger_Upper'][growing],
+            'Bollinger_Lower': series['Bollinger_Lower'][growing],
+            'KDJ_K': series['KDJ_K'][growing],
+            'KDJ_D': series['KDJ_D'][growing],
+            'KDJ_J': series['KDJ_J'][growing],
+            'Volume_Trend': series['Volume_Trend'][growing],
+        })
+    full = origins[origins + 1 >= lookback]
+    for i in range(0, len(full), SNAPSHOT_CHUNK):
+        chunk = full[i:i + SNAPSHOT_CHUNK]
+        rows = chunk[:, None] + np.arange(1 - lookback, 1)
+        parts.append(technical_snapshot(*(a[rows] for a in bars)))
+    if not parts:
+        return {}
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+def walk_forward(stock_code: str, bars: pd.DataFrame, timeframe: str = '1day',
+                 predictor: Optional[MultiModelPredictor] = None, warmup: int = DEFAULT_WARMUP,
+                 lookback: int = DEFAULT_LOOKBACK, step: int = 1) -> dict:
+    """
+    Backtest one symbol
+
+    Args:
+        stock_code: Stock code (keys the online ML state)
+        bars: DataFrame with close, high, low and optionally volume, oldest first
+        timeframe: Prediction timeframe; its prediction points set the horizon
+        predictor: MultiModelPredictor (default: make_backtest_predictor())
+        warmup: Bars before the first origin
+        lookback: Most recent bars passed to the predictor at each origin
+        step: Bars between origins
+
+    Returns:
+        dict: 'origins' (count) and 'totals' {model: running totals}, see
+        summarize() for the metrics
+    """
+    if predictor is None:
+        predictor = make_backtest_predictor()
+    pred_points, _ = MultiModelPredictor._timeframe_params(timeframe)
+    close = bars['close'].to_numpy(dtype=float)
+    high = bars['high'].to_numpy(dtype=float)
+    low = bars['low'].to_numpy(dtype=float)
+    volume = bars['volume'].to_numpy(dtype=float) if 'volume' in bars.columns else np.zeros(len(close))
+
+    totals = {name: _empty_totals() for name in SCORED_MODELS}
+    origins = np.arange(max(warmup, 1) - 1, len(close) - pred_points, step)
+    snapshots = window_snapshots(close, high, low, volume, origins, lookback)
+    for i, origin in enumerate(origins):
+        history = bars.iloc[max(0, origin + 1 - lookback):origin + 1]
+        result = predictor.predict_multi_timeframe(
+            history, timeframe=timeframe, stock_code=stock_code,
+            indicators={key: float(values[i]) for key, values in snapshots.items()}
+        )
+        actual = close[origin + 1:origin + 1 + pred_points]
+        for name in SCORED_MODELS:
+            if name in result:
+                _accumulate(totals[name], result[name]['prices'], actual, close[origin])
+    return {'origins': len(origins), 'totals': totals}
+
+
+# Per-process worker state, set by _init_worker
+_worker = {}
+
+
+def _init_worker(spec: dict, ml_backend: str, seed: int):
+    shm, values, dates = attach_shared(spec)
+    _worker.update(shm=shm, values=values, dates=dates, layout=spec['layout'], ml_backend=ml_backend, seed=seed)
+
+
+def _backtest_symbol(code: str, timeframe: str, warmup: int, lookback: int, step: int) -> dict:
+    """Process-pool entry: backtest one symbol from shared bars"""
+    offset, length = _worker['layout'][code]
+    bars = frame_from_shared(_worker['values'], _worker['dates'], offset, length)
+    started = time.perf_counter()
+    outcome = walk_forward(code, bars, timeframe, make_backtest_predictor(_worker['ml_backend'], _worker['seed']),
+                           warmup, lookback, step)
+    outcome.update(code=code, pid=os.getpid(), seconds=time.perf_counter() - started)
+    return outcome
+
+
+class WalkForwardBacktest:
+    """Walk-forward evaluation of MultiModelPredictor over many symbols"""
+
+    def __init__(self, timeframe: str = '1day', warmup: int = DEFAULT_WARMUP, lookback: int = DEFAULT_LOOKBACK,
+                 step: int = 1, ml_backend: str = DEFAULT_BACKTEST_BACKEND, seed: int = 0,
+                 max_workers: Optional[int] = None):
+        """
+        Initialize backtest
+
+        Args:
+            timeframe: Prediction timeframe
+            warmup: Bars before each symbol's first origin
+            lookback: Most recent bars the predictor sees per origin
+            step: Bars between origins
+            ml_backend: ML backend name ('online' avoids a refit per origin)
+            seed: Predictor seed
+            max_workers: Worker processes (default: CPU count; 1 runs in-process)
+        """
+        self.timeframe = timeframe
+        self.warmup = warmup
+        self.lookback = lookback
+        self.step = max(1, step)
+        self.ml_backend = ml_backend
+        self.seed = seed
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def run(self, bars_by_code: Dict[str, pd.DataFrame]) -> dict:
+        """
+        Backtest every symbol
+
+        Args:
+            bars_by_code: {stock_code: bars DataFrame}, oldest bar first
+
+        Returns:
+            dict: 'symbols' {code: metrics by model}, 'overall' (metrics by
+            model over all symbols) and 'report' (origins, elapsed seconds,
+            throughput and workers)
+        """
+        codes = list(bars_by_code)
+        outcomes = {}
+        started = time.perf_counter()
+        if self.max_workers == 1 or len(codes) <= 1:
+            for code in codes:
+                outcomes[code] = walk_forward(
+                    code, bars_by_code[code], self.timeframe, make_backtest_predictor(self.ml_backend, self.seed),
+                    self.warmup, self.lookback, self.step
+                )
+                outcomes[code]['pid'] = os.getpid()
+        else:
+            with SharedBars(bars_by_code) as shared:
+                with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                         initargs=(shared.spec(), self.ml_backend, self.seed)) as executor:
+                    futures = [
+                        executor.submit(_backtest_symbol, code, self.timeframe, self.warmup, self.lookback, self.step)
+                        for code in codes
+                    ]
+                    for future in as_completed(futures):
+                        outcome = future.result()
+                        outcomes[outcome['code']] = outcome
+        elapsed = time.perf_counter() - started
+
+        origins = sum(outcome['origins'] for outcome in outcomes.values())
+        report = {
+            'symbols': len(codes),
+            'origins': origins,
+            'workers': len({outcome['pid'] for outcome in outcomes.values()}),
+            'elapsed_seconds': round(elapsed, 3),
+            'origins_per_second': round(origins / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+        logger.info(f"Walk-forward backtest: {len(codes)} symbols, {origins} origins, "
+                    f"{report['origins_per_second']} origins/s on {report['workers']} workers")
+        return {
+            'symbols': {
+                code: {name: summarize(outcomes[code]['totals'][name]) for name in SCORED_MODELS}
+                for code in codes
+            },
+            'overall': {
+                name: summarize(merge_totals([outcomes[code]['totals'][name] for code in codes]))
+                for name in SCORED_MODELS
+            },
+            'report': report,
+        }
@@ -0,0 +1,210 @@
+"""
+SIAPS - Bar-Aligned Prediction Cache
+Memoizes web predictions until the next bar of their timeframe is due
+
+A prediction only changes when a new bar arrives or the live price moves
+meaningfully, so entries are keyed by (code, timeframe, last bar timestamp,
+price bucket, options) and expire when the timeframe's next bar closes:
+the next 30- or 60-minute boundary of the A-share session for '30min' and
+'1hour', the next weekday's 15:00 close for '1day'. Bar closes are exchange
+times (config EXCHANGE_TIMEZONE), whatever the host's timezone. Price
+buckets are logarithmic, so a bucket spans the same relative move at every
+price level.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Optional, Tuple
+from zoneinfo import ZoneInfo
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+ROOT_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from config.settings import EXCHANGE_TIMEZONE, WEB_PREDICTION_CACHE_SIZE, PREDICTION_PRICE_BUCKET_PCT
+
+
+EXCHANGE_TZ = ZoneInfo(EXCHANGE_TIMEZONE)
+
+# Closing times of each timeframe's bars in the A-share session (exchange local time)
+BAR_ENDS = {
+    '30min': ('10:00', '10:30', '11:00', '11:30', '13:30', '14:00', '14:30', '15:00'),
+    '1hour': ('10:30', '11:30', '14:00', '15:00'),
+    '1day': ('15:00',),
+}
+
+
+def exchange_time(now: Optional[datetime] = None) -> datetime:
+    """
+    A moment (default: now) as a timezone-aware exchange-local time
+
+    Naive datetimes are taken to be exchange-local already.
+    """
+    if now is None:
+        return datetime.now(EXCHANGE_TZ)
+    if now.tzinfo is None:
+        return now.replace(tzinfo=EXCHANGE_TZ)
+    return now.astimezone(EXCHANGE_TZ)
+
+
+def _at(day: datetime, hhmm: str) -> datetime:
+    hour, minute = map(int, hhmm.split(':'))
+    return day.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+
+def _next_weekday(day: datetime) -> datetime:
+    day = day + timedelta(days=1)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return day
+
+
+def next_bar_due(timeframe: str, now: datetime) -> datetime:
+    """
+    When the next bar of a timeframe closes
+
+    Weekends are skipped; exchange holidays are not known here, so an entry
+    may expire early on a holiday, which only costs a recomputation.
+
+    Args:
+        timeframe: '30min', '1hour' or '1day'
+        now: current time; aware datetimes are converted to exchange time,
+            naive ones are taken to be exchange-local
+
+    Returns:
+        datetime: close of the next bar strictly after now, in exchange time
+        (naive when now is naive)
+
+    Raises:
+        ValueError: if the timeframe has no known bar schedule
+    """
+    if timeframe not in BAR_ENDS:
+        raise ValueError(f"No bar schedule for timeframe '{timeframe}', "
+                         f"known: {', '.join(BAR_ENDS)}")
+    ends = BAR_ENDS[timeframe]
+    local = exchange_time(now)
+    due = _at(_next_weekday(local), ends[0])
+    if local.weekday() < 5:
+        for hhmm in ends:
+            if _at(local, hhmm) > local:
+                due = _at(local, hhmm)
+                break
+    return due if now.tzinfo is not None else due.replace(tzinfo=None)
+
+
+def last_bar_timestamp(bars: pd.DataFrame) -> Optional[str]:
+    """
+    Timestamp of the last bar as text, or None when the bars carry no dates
+
+    Looks at 'date', '日期' and 'Date' columns, then a DatetimeIndex.
+    """
+    if bars is None or bars.empty:
+        return None
+    for column in ('date', '日期', 'Date'):
+        if column in bars.columns:
+            return str(pd.Timestamp(bars[column].iloc[-1]))
+    if isinstance(bars.index, pd.DatetimeIndex):
+        return str(bars.index[-1])
+    return None
+
+
+def price_bucket(price: Optional[float], bucket_pct: float = PREDICTION_PRICE_BUCKET_PCT) -> Optional[int]:
+    """
+    Logarithmic price bucket: prices within one bucket differ by less than bucket_pct percent
+
+    Returns:
+        int or None (for a missing or non-positive price)
+    """
+    if price is None or not price > 0:
+        return None
+    return math.floor(math.log(price) / math.log1p(bucket_pct / 100))
+
+
+class PredictionCache:
+    """Thread-safe LRU of web prediction results that expire at the next bar"""
+
+    def __init__(self, max_entries: int = WEB_PREDICTION_CACHE_SIZE,
+                 bucket_pct: float = PREDICTION_PRICE_BUCKET_PCT):
+        """
+        Initialize cache
+
+        Args:
+            max_entries: Results kept (0 disables caching)
+            bucket_pct: Relative width of a price bucket, in percent
+        """
+        self.max_entries = max_entries
+        self.bucket_pct = bucket_pct
+        # key -> (result, created wall time, expires at)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def make_key(self, stock_code: str, timeframe: str, last_bar: Optional[str],
+                 current_price: Optional[float], **options) -> Tuple:
+        """Cache key; options are any further request parameters that change the result"""
+        return (stock_code, timeframe, last_bar, price_bucket(current_price, self.bucket_pct),
+                tuple(sorted(options.items())))
+
+    def get(self, key: Tuple, now: Optional[datetime] = None) -> Optional[Tuple[Any, float, datetime]]:
+        """
+        Look up a live entry
+
+        Args:
+            key: Key from make_key
+            now: Current time (default: now; naive times are exchange-local)
+
+        Returns:
+            tuple: (result, age in seconds, expires at), or None on a miss or
+            when the entry's next bar is already due
+        """
+        now = exchange_time(now)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        result, created, expires_at = entry
+        return result, time.time() - created, expires_at
+
+    def put(self, key: Tuple, result: Any, now: Optional[datetime] = None) -> datetime:
+        """
+        Store a result until the next bar of its timeframe (key[1]) is due
+
+        Returns:
+            datetime: expiry time (timezone-aware exchange time)
+
+        Raises:
+            ValueError: if the key's timeframe has no known bar schedule
+        """
+        expires_at = next_bar_due(key[1], exchange_time(now))
+        if self.max_entries <= 0:
+            return expires_at
+        with self._lock:
+            self._entries[key] = (result, time.time(), expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return expires_at
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Entry count and hit/miss counters"""
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
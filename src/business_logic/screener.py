@@ -0,0 +1,396 @@
+"""
+SIAPS - Technical Screener
+Scores the whole A-share universe on the technical model's signals
+
+Every symbol is scored on the five signals of MultiModelPredictor's
+technical model (MACD histogram, RSI, Bollinger position, KDJ J and volume
+trend), combined with the timeframe's signal weights exactly as the model
+combines them before its first price step. The last `lookback` bars of
+every symbol in the BarStore are kept in memory as (symbols × time)
+matrices, one per bar count; a refresh re-reads only files that changed,
+and only their tail. The latest market snapshot is folded in as today's
+provisional bar, and the whole cross-section is scored with the 2-D
+indicator functions in a few array passes. Scores are reused until the
+bars or the snapshot change, so filtering and sorting a request is cheap.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+ROOT_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from config.settings import (
+    NUMERIC_DTYPE, SCREENER_LOOKBACK, SCREENER_MIN_BARS, SCREENER_REFRESH_SECONDS, SCREENER_SNAPSHOT_TTL
+)
+from src.business_logic.prediction_cache import exchange_time
+from src.data_acquisition.bar_store import BarStore
+from src.data_processing.indicators import technical_snapshot
+from src.prediction_models.multi_model_predictor import (
+    DEFAULT_TECHNICAL_PROFILE, TECHNICAL_PROFILES, MultiModelPredictor
+)
+from src.utils import setup_logger
+
+logger = setup_logger(__name__)
+
+
+# Scored columns, in output order after code and name
+SCORE_COLUMNS = [
+    'price', 'change_pct', 'score',
+    'macd_signal', 'rsi_signal', 'bollinger_signal', 'kdj_signal', 'volume_signal',
+    'macd_hist', 'rsi', 'kdj_j', 'volume_trend',
+]
+
+# Filter name -> (column, comparison)
+FILTERS = {
+    'min_score': ('score', '>='),
+    'max_score': ('score', '<='),
+    'min_price': ('price', '>='),
+    'max_price': ('price', '<='),
+    'min_change_pct': ('change_pct', '>='),
+    'max_change_pct': ('change_pct', '<='),
+    'min_rsi': ('rsi', '>='),
+    'max_rsi': ('rsi', '<='),
+    'min_kdj_j': ('kdj_j', '>='),
+    'max_kdj_j': ('kdj_j', '<='),
+    'min_volume_trend': ('volume_trend', '>='),
+    'max_volume_trend': ('volume_trend', '<='),
+}
+
+# A-share session open; snapshots taken earlier still show the previous day
+SESSION_OPEN = '09:30'
+
+
+def snapshot_trade_date(now: Optional[datetime] = None) -> pd.Timestamp:
+    """
+    Trading day a market snapshot taken at `now` describes
+
+    Weekdays from the session open on are their own trading day; earlier
+    hours and weekends show the previous weekday. Exchange holidays are not
+    known here. `now` defaults to the current exchange time; naive times are
+    taken to be exchange-local.
+    """
+    now = exchange_time(now)
+    hour, minute = map(int, SESSION_OPEN.split(':'))
+    day = now.date()
+    if (now.hour, now.minute) < (hour, minute):
+        day -= timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return pd.Timestamp(day)
+
+
+class Screener:
+    """Vectorized technical scores for every symbol of a BarStore"""
+
+    def __init__(self, store: Optional[BarStore] = None, snapshot_fn: Optional[Callable[[], pd.DataFrame]] = None,
+                 timeframe: str = '1day', lookback: int = SCREENER_LOOKBACK, min_bars: int = SCREENER_MIN_BARS,
+                 snapshot_ttl: float = SCREENER_SNAPSHOT_TTL, refresh_seconds: float = SCREENER_REFRESH_SECONDS,
+                 dtype=NUMERIC_DTYPE):
+        """
+        Initialize screener
+
+        Args:
+            store: BarStore with the cached daily bars (default: BAR_STORE_DIR)
+            snapshot_fn: Callable returning the market snapshot (columns code,
+                name, price, change_pct, high, low, volume), e.g.
+                MultiSourceDataFetcher.fetch_market_snapshot; None disables
+                live bars
+            timeframe: Timeframe whose signal weights combine the signals
+            lookback: Most recent bars kept per symbol
+            min_bars: Symbols with fewer stored bars are not scored (at least 2)
+            snapshot_ttl: Seconds a fetched snapshot is reused
+            refresh_seconds: Seconds between checks of the store for changed files
+            dtype: Dtype of the bar matrices (float32 halves their memory)
+        """
+        self.store = store if store is not None else BarStore()
+        self.snapshot_fn = snapshot_fn
+        self.timeframe = timeframe
+        self.lookback = lookback
+        self.min_bars = max(2, min_bars)
+        self.snapshot_ttl = snapshot_ttl
+        self.refresh_seconds = refresh_seconds
+        self.dtype = np.dtype(dtype)
+        self.weights = TECHNICAL_PROFILES.get(timeframe, DEFAULT_TECHNICAL_PROFILE)['signal_weights']
+
+        # code -> (file stat key, last date, (4, n) close/high/low/volume or None when too short)
+        self._bars: Dict[str, tuple] = {}
+        self._groups = None
+        self._version = 0
+        self._checked_at = None
+        self._snapshot = None
+        self._snapshot_at = None
+        self._scores = None
+        self._scores_key = None
+        self._lock = threading.Lock()
+        self._warm_up_started = False
+
+    # ------------------------------------------------------------------
+    # Bars
+    # ------------------------------------------------------------------
+
+    def warm_up(self) -> bool:
+        """
+        Load the store's bars in a background thread, once per screener
+
+        Called on a server's first request so the first screen is fast under
+        any entry point (run_web_ui.py, app.py or a WSGI server's workers).
+
+        Returns:
+            bool: True if this call started the thread
+        """
+        with self._lock:
+            if self._warm_up_started:
+                return False
+            self._warm_up_started = True
+        threading.Thread(target=self._warm_up, name='screener-warm-up', daemon=True).start()
+        return True
+
+    def _warm_up(self):
+        try:
+            self.refresh(force=True)
+        except Exception as e:
+            logger.warning(f"Screener warm-up failed: {str(e)}")
+
+    def refresh(self, force: bool = False) -> int:
+        """
+        Re-read the tail of every store file changed since the last refresh
+
+        Args:
+            force: Check the store even if refresh_seconds have not passed
+
+        Returns:
+            int: Number of symbols re-read
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._checked_at is not None and now - self._checked_at < self.refresh_seconds:
+                return 0
+            self._checked_at = now
+
+            stats = {}
+            with os.scandir(self.store.root_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.csv'):
+                        stat = entry.stat()
+                        stats[entry.name[:-4]] = (stat.st_mtime_ns, stat.st_size)
+
+            changed = [code for code, key in stats.items() if code not in self._bars or self._bars[code][0] != key]
+            removed = [code for code in self._bars if code not in stats]
+            for code in removed:
+                del self._bars[code]
+            for code in changed:
+                self._bars[code] = (stats[code],) + self._load(code)
+
+            if changed or removed:
+                self._groups = None
+                self._version += 1
+                logger.info(f"Screener bars refreshed: {len(changed)} changed, {len(removed)} removed, "
+                            f"{len(self._bars)} symbols")
+            return len(changed)
+
+    def _load(self, stock_code):
+        """(last date, (4, n) bar matrix or None) of a symbol's stored tail"""
+        try:
+            dates, values = self.store.tail_values(stock_code, self.lookback)
+        except Exception as e:
+            logger.warning(f"Screener could not read bars of {stock_code}: {str(e)}")
+            return None, None
+        # Columns after 'date': open, high, low, close, volume, amount
+        keep = ~np.isnan(values[:, 3])
+        dates, values = dates[keep], values[keep]
+        if len(values) < self.min_bars:
+            return None, None
+        close = values[:, 3]
+        bars = np.empty((4, len(values)), dtype=self.dtype)
+        bars[0] = close
+        bars[1] = np.where(np.isnan(values[:, 1]), close, values[:, 1])
+        bars[2] = np.where(np.isnan(values[:, 2]), close, values[:, 2])
+        bars[3] = np.nan_to_num(values[:, 4])
+        return dates[-1], bars
+
+    def _bar_groups(self):
+        """[(codes, last dates, (4, symbols, n) bars)] for every bar count n"""
+        if self._groups is None:
+            by_length = {}
+            for code, (_, last_date, values) in sorted(self._bars.items()):
+                if values is not None:
+                    by_length.setdefault(values.shape[1], []).append((code, last_date, values))
+            self._groups = [
+                (np.array([c for c, _, _ in members]), np.array([d for _, d, _ in members]),
+                 np.stack([v for _, _, v in members], axis=1))
+                for members in by_length.values()
+            ]
+        return self._groups
+
+    # ------------------------------------------------------------------
+    # Snapshot
+    # ------------------------------------------------------------------
+
+    def _market_snapshot(self) -> Optional[pd.DataFrame]:
+        """Latest snapshot indexed by code, fetched at most every snapshot_ttl seconds"""
+        if self.snapshot_fn is None:
+            return None
+        now = time.monotonic()
+        if self._snapshot is None or now - self._snapshot_at >= self.snapshot_ttl:
+            try:
+                snapshot = self.snapshot_fn()
+            except Exception as e:
+                logger.warning(f"Screener snapshot unavailable: {str(e)}")
+                snapshot = None
+            if snapshot is not None and not snapshot.empty:
+                snapshot = snapshot.drop_duplicates(subset='code', keep='last').set_index('code')
+                self._snapshot = snapshot
+                self._snapshot_at = now
+            elif self._snapshot is None:
+                return None
+        return self._snapshot
+
+    def _fold_snapshot(self, codes, last_dates, bars, snapshot, trade_date):
+        """
+        Bars with the snapshot as the last bar: appended (dropping the oldest)
+        when the stored bars end before the trade date, otherwise replacing
+        the last bar
+        """
+        positions = snapshot.index.get_indexer(codes)
+        rows = np.flatnonzero(positions >= 0)
+        if rows.size == 0:
+            return bars, rows
+        live = snapshot.iloc[positions[rows]]
+        price = live['price'].to_numpy(dtype=float)
+        values = np.vstack([
+            price,
+            live['high'].fillna(live['price']).to_numpy(dtype=float),
+            live['low'].fillna(live['price']).to_numpy(dtype=float),
+            live['volume'].fillna(0.0).to_numpy(dtype=float),
+        ])
+
+        bars = bars.copy()
+        shift = rows[last_dates[rows] < np.datetime64(trade_date, 'D')]
+        bars[:, shift, :-1] = bars[:, shift, 1:]
+        bars[:, rows, -1] = values
+        return bars, rows
+
+    # ------------------------------------------------------------------
+    # Scores
+    # ------------------------------------------------------------------
+
+    def scores(self, live: bool = True, now: Optional[datetime] = None) -> pd.DataFrame:
+        """
+        Technical scores of every symbol with enough bars
+
+        Args:
+            live: Fold the latest market snapshot in as today's bar
+            now: Time used to date the snapshot (default: now)
+
+        Returns:
+            pd.DataFrame: columns code, name and SCORE_COLUMNS, one row per symbol
+        """
+        self.refresh()
+        snapshot = self._market_snapshot() if live else None
+        trade_date = snapshot_trade_date(now)
+        key = (self._version, id(snapshot), self._snapshot_at if snapshot is not None else None, trade_date)
+        with self._lock:
+            if self._scores is not None and self._scores_key == key:
+                return self._scores
+            groups = self._bar_groups()
+
+        frames = []
+        for codes, last_dates, bars in groups:
+            live_rows = np.empty(0, dtype=int)
+            if snapshot is not None:
+                bars, live_rows = self._fold_snapshot(codes, last_dates, bars, snapshot, trade_date)
+            frames.append(self._score_group(codes, bars, snapshot, live_rows))
+        if frames:
+            scores = pd.concat(frames, ignore_index=True)
+        else:
+            scores = pd.DataFrame(columns=['code', 'name'] + SCORE_COLUMNS)
+
+        with self._lock:
+            self._scores = scores
+            self._scores_key = key
+        return scores
+
+    def _score_group(self, codes, bars, snapshot, live_rows) -> pd.DataFrame:
+        """Scores of one (4, symbols, n) bar matrix"""
+        close, high, low, volume = bars
+        indicators = technical_snapshot(close, high, low, volume)
+        signals = MultiModelPredictor._technical_signals(indicators)
+        score = sum(signals[name] * weight for name, weight in self.weights.items())
+
+        price = close[:, -1].astype(float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change_pct = (price / close[:, -2] - 1) * 100
+        names = np.full(len(codes), '', dtype=object)
+        if snapshot is not None and live_rows.size:
+            live = snapshot.loc[codes[live_rows]]
+            names[live_rows] = live['name'].fillna('').to_numpy()
+            # The snapshot's change is against the exchange's previous close
+            quoted = live['change_pct'].to_numpy(dtype=float)
+            change_pct[live_rows] = np.where(np.isnan(quoted), change_pct[live_rows], quoted)
+
+        frame = pd.DataFrame({
+            'code': codes,
+            'name': names,
+            'price': price,
+            'change_pct': change_pct,
+            'score': score,
+            'macd_signal': signals['macd'],
+            'rsi_signal': signals['rsi'],
+            'bollinger_signal': signals['bollinger'],
+            'kdj_signal': signals['kdj'],
+            'volume_signal': signals['volume'],
+            'macd_hist': indicators['MACD_Hist'].astype(float),
+            'rsi': indicators['RSI'].astype(float),
+            'kdj_j': indicators['KDJ_J'].astype(float),
+            'volume_trend': indicators['Volume_Trend'].astype(float),
+        })
+        return frame[price > 0]
+
+    def screen(self, filters: Optional[Dict[str, float]] = None, sort_by: str = 'score', descending: bool = True,
+               limit: int = 50, live: bool = True, now: Optional[datetime] = None) -> dict:
+        """
+        Filter and rank the universe
+
+        Args:
+            filters: {name: bound} with names from FILTERS, e.g. {'min_score': 0.2, 'max_rsi': 70}
+            sort_by: Column of SCORE_COLUMNS to rank by
+            descending: Largest first
+            limit: Rows returned
+            live: Fold the latest market snapshot in as today's bar
+            now: Time used to date the snapshot (default: now)
+
+        Returns:
+            dict: 'results' (DataFrame of the top `limit` rows), 'matched'
+            (rows passing the filters), 'universe' (symbols scored) and
+            'trade_date'
+        """
+        filters = filters or {}
+        unknown = [name for name in filters if name not in FILTERS]
+        if unknown:
+            raise ValueError(f"Unknown filters: {', '.join(unknown)}")
+        if sort_by not in SCORE_COLUMNS:
+            raise ValueError(f"Unknown sort column: {sort_by}")
+
+        scores = self.scores(live=live, now=now)
+        mask = np.ones(len(scores), dtype=bool)
+        for name, bound in filters.items():
+            column, comparison = FILTERS[name]
+            values = scores[column].to_numpy(dtype=float)
+            mask &= values >= bound if comparison == '>=' else values <= bound
+        matched = scores[mask]
+
+        ranked = matched.sort_values(sort_by, ascending=not descending, na_position='last', kind='stable')
+        return {
+            'results': ranked.head(max(0, limit)).reset_index(drop=True),
+            'matched': int(mask.sum()),
+            'universe': len(scores),
+            'trade_date': snapshot_trade_date(now),
+        }
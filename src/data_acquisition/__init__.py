@@ -2,5 +2,6 @@
 SIAPS Data Acquisition Package
 """
 from .fetcher import DataFetcher, AKShareFetcher, get_data_fetcher
+from .bar_store import BarStore, normalize_bars
 
-__all__ = ['DataFetcher', 'AKShareFetcher', 'get_data_fetcher']
+__all__ = ['DataFetcher', 'AKShareFetcher', 'get_data_fetcher', 'BarStore', 'normalize_bars']
@@ -0,0 +1,375 @@
+"""
+SIAPS - Historical Backfill Job
+Downloads years of daily bars for the whole A-share universe into the local bar store
+
+Usage:
+    python -m src.data_acquisition.backfill --start 2015-01-01 --workers 8
+    python -m src.data_acquisition.backfill --codes 000001,600519 --mode process
+
+The job shards the universe across a thread or process pool, applies a
+requests-per-second limit to every data source and records progress in a
+checkpoint file, so an interrupted run resumes where it left off.
+
+Sources fall back in order for a symbol's first download, and the source
+that answered is recorded in the store. Later runs continue a symbol only
+from that source: sources adjust prices differently, so mixing them within
+one series would leave steps at the joins.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+ROOT_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from config.settings import BACKFILL_RATE_LIMITS, BACKFILL_START_DATE, BAR_STORE_DIR
+from src.data_acquisition.bar_store import BarStore, normalize_bars
+from src.utils import setup_logger
+
+logger = setup_logger(__name__)
+
+
+# Default checkpoint file, kept next to the bars it describes
+DEFAULT_CHECKPOINT = BAR_STORE_DIR / "_backfill_checkpoint.json"
+
+# Symbols handed to one process-pool task (threads take one symbol per task)
+PROCESS_CHUNK_SIZE = 20
+
+# Log progress every N completed symbols
+PROGRESS_INTERVAL = 50
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing calls to one data source evenly in time"""
+
+    def __init__(self, rate: float):
+        """
+        Initialize rate limiter
+
+        Args:
+            rate: Maximum calls per second (<= 0 disables limiting)
+        """
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next_allowed = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until the next call is allowed"""
+        if self.interval == 0.0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_allowed - now
+            self._next_allowed = max(now, self._next_allowed) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+class BackfillCheckpoint:
+    """Persistent record of which symbols a backfill run has finished"""
+
+    def __init__(self, path: Path, start_date: str, end_date: str):
+        """
+        Load or create a checkpoint
+
+        A checkpoint written for a different date range is discarded, since
+        its completed symbols do not cover the requested range.
+
+        Args:
+            path: Checkpoint JSON file
+            start_date: Backfill start date (YYYY-MM-DD)
+            end_date: Backfill end date (YYYY-MM-DD)
+        """
+        self.path = Path(path)
+        self.start_date = start_date
+        self.end_date = end_date
+        self.completed = set()
+        self.failed = {}
+        self._lock = threading.Lock()
+
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('start_date') == start_date and data.get('end_date') == end_date:
+                    self.completed = set(data.get('completed', []))
+                    self.failed = dict(data.get('failed', {}))
+                    logger.info(f"Resuming backfill: {len(self.completed)} symbols already done")
+                else:
+                    logger.info("Checkpoint is for a different date range, starting fresh")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable checkpoint {self.path}: {e}")
+
+    def pending(self, codes: Iterable[str]) -> List[str]:
+        """Return the symbols not yet completed, keeping their order"""
+        return [code for code in codes if code not in self.completed]
+
+    def mark_done(self, stock_code: str):
+        with self._lock:
+            self.completed.add(stock_code)
+            self.failed.pop(stock_code, None)
+
+    def mark_failed(self, stock_code: str, error: str):
+        with self._lock:
+            self.failed[stock_code] = error
+
+    def save(self):
+        """Write the checkpoint atomically"""
+        with self._lock:
+            data = {
+                'start_date': self.start_date,
+                'end_date': self.end_date,
+                'completed': sorted(self.completed),
+                'failed': self.failed,
+                'updated_at': datetime.now().isoformat(),
+            }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def _default_fetch_fn():
+    """Build a fetch function backed by MultiSourceDataFetcher"""
+    from src.data_acquisition.multi_source_fetcher import MultiSourceDataFetcher
+    fetcher = MultiSourceDataFetcher()
+    return fetcher.fetch_historical_from
+
+
+def _backfill_symbol(stock_code: str, start_date: str, end_date: str, store: BarStore,
+                     fetch_fn: Callable, limiters: Dict[str, RateLimiter],
+                     sources: List[str]) -> Dict:
+    """
+    Backfill one symbol, trying each source in order
+
+    Only the range after the last stored bar is requested, so re-running a
+    finished symbol costs no network calls. A stored symbol is continued
+    only from the source recorded for it (history stored before sources
+    were recorded is taken to come from the first source).
+
+    Returns:
+        dict: {'code', 'ok', 'rows', 'source', 'error'}
+    """
+    last = store.last_date(stock_code)
+    fetch_start = start_date
+    if last is not None:
+        if last >= pd.Timestamp(end_date):
+            return {'code': stock_code, 'ok': True, 'rows': 0, 'source': 'store', 'error': None}
+        fetch_start = max(pd.Timestamp(start_date), last + timedelta(days=1)).strftime('%Y-%m-%d')
+        recorded = store.source(stock_code) or sources[0]
+        if recorded not in sources:
+            return {'code': stock_code, 'ok': False, 'rows': 0, 'source': None,
+                    'error': f"history was written from {recorded}, not mixing sources"}
+        sources = [recorded]
+
+    errors = []
+    for source in sources:
+        limiter = limiters.get(source)
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            df = fetch_fn(source, stock_code, fetch_start, end_date)
+        except Exception as e:
+            errors.append(f"{source}: {e}")
+            continue
+        if df is None or df.empty:
+            errors.append(f"{source}: no data")
+            continue
+        bars = normalize_bars(df)
+        rows = store.append(stock_code, bars)
+        if last is None:
+            store.set_source(stock_code, source)
+        return {'code': stock_code, 'ok': True, 'rows': rows, 'source': source, 'error': None}
+
+    # A symbol already in the store with nothing new (e.g. suspended) is fine
+    if last is not None:
+        return {'code': stock_code, 'ok': True, 'rows': 0, 'source': 'store', 'error': None}
+    return {'code': stock_code, 'ok': False, 'rows': 0, 'source': None, 'error': '; '.join(errors)}
+
+
+def _backfill_chunk(codes: List[str], start_date: str, end_date: str, store_dir: str,
+                    rate_limits: Dict[str, float], sources: List[str],
+                    fetch_fn: Optional[Callable] = None) -> List[Dict]:
+    """Process-pool entry point: backfill a chunk of symbols in a worker process"""
+    store = BarStore(Path(store_dir))
+    fetch_fn = fetch_fn or _default_fetch_fn()
+    limiters = {name: RateLimiter(rate) for name, rate in rate_limits.items()}
+    return [
+        _backfill_symbol(code, start_date, end_date, store, fetch_fn, limiters, sources)
+        for code in codes
+    ]
+
+
+class HistoricalBackfill:
+    """Resumable parallel backfill of daily bars into the local bar store"""
+
+    def __init__(self, store: Optional[BarStore] = None, fetch_fn: Optional[Callable] = None,
+                 checkpoint_path: Path = DEFAULT_CHECKPOINT, max_workers: int = 4,
+                 mode: str = 'thread', rate_limits: Optional[Dict[str, float]] = None,
+                 sources: Optional[List[str]] = None):
+        """
+        Initialize backfill job
+
+        Args:
+            store: Target bar store (default: BarStore at BAR_STORE_DIR)
+            fetch_fn: Callable(source, code, start, end) -> DataFrame
+                (default: MultiSourceDataFetcher.fetch_historical_from).
+                Must be picklable in 'process' mode.
+            checkpoint_path: Checkpoint JSON file
+            max_workers: Pool size
+            mode: 'thread' or 'process'
+            rate_limits: Max requests per second per source, shared by all
+                workers (default: BACKFILL_RATE_LIMITS)
+            sources: Sources to try in order (default: keys of rate_limits)
+        """
+        if mode not in ('thread', 'process'):
+            raise ValueError(f"Unsupported backfill mode: {mode}")
+        self.store = store or BarStore()
+        self.fetch_fn = fetch_fn
+        self.checkpoint_path = Path(checkpoint_path)
+        self.max_workers = max(1, max_workers)
+        self.mode = mode
+        self.rate_limits = dict(rate_limits if rate_limits is not None else BACKFILL_RATE_LIMITS)
+        self.sources = list(sources or self.rate_limits.keys())
+
+    def run(self, codes: List[str], start_date: str = BACKFILL_START_DATE,
+            end_date: Optional[str] = None, resume: bool = True) -> Dict:
+        """
+        Backfill daily bars for the given symbols
+
+        Args:
+            codes: Stock codes to backfill
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD, default: today)
+            resume: Skip symbols completed by a previous run of the same range
+
+        Returns:
+            dict: Run report with counts, failures and throughput (symbols/min)
+        """
+        end_date = end_date or datetime.now().strftime('%Y-%m-%d')
+        if not resume and self.checkpoint_path.exists():
+            self.checkpoint_path.unlink()
+        checkpoint = BackfillCheckpoint(self.checkpoint_path, start_date, end_date)
+        pending = checkpoint.pending(codes)
+
+        report = {
+            'total': len(codes),
+            'skipped': len(codes) - len(pending),
+            'completed': 0,
+            'failed': {},
+            'rows': 0,
+            'by_source': {},
+        }
+        logger.info(f"Backfill {start_date} → {end_date}: {len(pending)} pending of "
+                    f"{len(codes)} symbols ({self.mode} pool, {self.max_workers} workers)")
+
+        started = time.monotonic()
+        try:
+            for result in self._execute(pending, start_date, end_date):
+                if result['ok']:
+                    checkpoint.mark_done(result['code'])
+                    report['completed'] += 1
+                    report['rows'] += result['rows']
+                    report['by_source'][result['source']] = report['by_source'].get(result['source'], 0) + 1
+                else:
+                    checkpoint.mark_failed(result['code'], result['error'])
+                    report['failed'][result['code']] = result['error']
+
+                done = report['completed'] + len(report['failed'])
+                if done % PROGRESS_INTERVAL == 0:
+                    checkpoint.save()
+                    elapsed = time.monotonic() - started
+                    logger.info(f"Backfill progress: {done}/{len(pending)} symbols, "
+                                f"{done / elapsed * 60:.1f} symbols/min, "
+                                f"{len(report['failed'])} failed")
+        finally:
+            checkpoint.save()
+
+        elapsed = time.monotonic() - started
+        processed = report['completed'] + len(report['failed'])
+        report['elapsed_seconds'] = round(elapsed, 2)
+        report['symbols_per_minute'] = round(processed / elapsed * 60, 1) if elapsed > 0 else 0.0
+        logger.info(f"Backfill finished: {report['completed']} ok, {len(report['failed'])} failed, "
+                    f"{report['skipped']} skipped, {report['symbols_per_minute']} symbols/min")
+        return report
+
+    def _execute(self, pending: List[str], start_date: str, end_date: str):
+        """Yield per-symbol results as workers finish them"""
+        if not pending:
+            return
+
+        if self.mode == 'thread':
+            fetch_fn = self.fetch_fn or _default_fetch_fn()
+            limiters = {name: RateLimiter(rate) for name, rate in self.rate_limits.items()}
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [
+                    executor.submit(_backfill_symbol, code, start_date, end_date,
+                                    self.store, fetch_fn, limiters, self.sources)
+                    for code in pending
+                ]
+                for future in as_completed(futures):
+                    yield future.result()
+        else:
+            # Worker processes cannot share a limiter, so each gets an equal slice
+            worker_limits = {
+                name: rate / self.max_workers if rate and rate > 0 else 0
+                for name, rate in self.rate_limits.items()
+            }
+            chunks = [pending[i:i + PROCESS_CHUNK_SIZE] for i in range(0, len(pending), PROCESS_CHUNK_SIZE)]
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [
+                    executor.submit(_backfill_chunk, chunk, start_date, end_date,
+                                    str(self.store.root_dir), worker_limits, self.sources,
+                                    self.fetch_fn)
+                    for chunk in chunks
+                ]
+                for future in as_completed(futures):
+                    for result in future.result():
+                        yield result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='Backfill daily bars for the A-share universe')
+    parser.add_argument('--start', default=BACKFILL_START_DATE, help='Start date YYYY-MM-DD')
+    parser.add_argument('--end', default=None, help='End date YYYY-MM-DD (default: today)')
+    parser.add_argument('--codes', default=None,
+                        help='Comma-separated stock codes (default: whole A-share universe)')
+    parser.add_argument('--workers', type=int, default=4, help='Pool size')
+    parser.add_argument('--mode', choices=['thread', 'process'], default='thread')
+    parser.add_argument('--no-resume', action='store_true', help='Ignore any existing checkpoint')
+    args = parser.parse_args(argv)
+
+    if args.codes:
+        codes = [code.strip() for code in args.codes.split(',') if code.strip()]
+    else:
+        from src.data_acquisition.multi_source_fetcher import MultiSourceDataFetcher
+        codes = MultiSourceDataFetcher().fetch_stock_universe()
+    if not codes:
+        logger.error("No symbols to backfill")
+        return 1
+
+    job = HistoricalBackfill(max_workers=args.workers, mode=args.mode)
+    report = job.run(codes, start_date=args.start, end_date=args.end, resume=not args.no_resume)
+
+    print(f"Completed: {report['completed']}  Skipped: {report['skipped']}  "
+          f"Failed: {len(report['failed'])}  Rows: {report['rows']}")
+    print(f"Throughput: {report['symbols_per_minute']} symbols/min "
+          f"({report['elapsed_seconds']}s)")
+    for code, error in sorted(report['failed'].items()):
+        print(f"  ✗ {code}: {error}")
+    return 0 if not report['failed'] else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
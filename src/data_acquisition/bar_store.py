@@ -0,0 +1,387 @@
+"""
+SIAPS - Local Bar Store
+Stores daily bars on disk, one CSV file per symbol
+
+Every writer stores the same units, so a symbol's series stays continuous
+whichever source wrote each bar: prices forward-adjusted (qfq, the latest
+bar at its traded price and earlier bars scaled to it, as AKShare's
+adjust="qfq"), volume in lots of SHARES_PER_LOT shares and amount in yuan.
+"""
+import os
+import threading
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Tuple
+from pathlib import Path
+import sys
+
+# Add project root to Python path
+ROOT_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from config.settings import BAR_STORE_DIR
+from src.utils import setup_logger
+
+logger = setup_logger(__name__)
+
+
+# Normalized bar columns used by every store consumer
+BAR_COLUMNS = ['date', 'open', 'high', 'low', 'close', 'volume', 'amount']
+
+# Columns rescaled when a symbol's forward adjustment changes
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+
+# Stored volume unit (one lot, 手)
+SHARES_PER_LOT = 100
+
+# Source column names mapped to normalized names
+_COLUMN_ALIASES = {
+    # AKShare
+    '日期': 'date',
+    '开盘': 'open',
+    '最高': 'high',
+    '最低': 'low',
+    '收盘': 'close',
+    '成交量': 'volume',
+    '成交额': 'amount',
+    # Yahoo Finance
+    'Date': 'date',
+    'Open': 'open',
+    'High': 'high',
+    'Low': 'low',
+    'Close': 'close',
+    'Volume': 'volume',
+}
+
+
+def normalize_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert source-specific daily bars to the normalized store format
+
+    Accepts AKShare (Chinese column names), Yahoo Finance (capitalized columns
+    with a DatetimeIndex) or already-normalized frames.
+
+    Args:
+        df: Daily bars as returned by a data source
+
+    Returns:
+        pd.DataFrame: Bars with BAR_COLUMNS, sorted by date, one row per date
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=BAR_COLUMNS)
+
+    df = df.rename(columns=_COLUMN_ALIASES)
+    if 'date' not in df.columns:
+        # Yahoo Finance keeps the date in the index
+        df = df.reset_index().rename(columns={df.index.name or 'index': 'date'})
+        df = df.rename(columns=_COLUMN_ALIASES)
+
+    if 'amount' not in df.columns:
+        df['amount'] = float('nan')
+    if 'volume' not in df.columns:
+        df['volume'] = 0.0
+
+    missing = [col for col in BAR_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Bars missing required columns: {missing}")
+
+    df = df[BAR_COLUMNS].copy()
+    dates = pd.to_datetime(df['date'])
+    if getattr(dates.dt, 'tz', None) is not None:
+        dates = dates.dt.tz_localize(None)
+    df['date'] = dates.dt.normalize()
+    for col in BAR_COLUMNS[1:]:
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype(float)
+
+    df = df.dropna(subset=['close'])
+    df = df.drop_duplicates(subset='date', keep='last').sort_values('date')
+    return df.reset_index(drop=True)
+
+
+class BarStore:
+    """Local store of normalized daily bars, one CSV file per symbol"""
+
+    def __init__(self, root_dir: Path = BAR_STORE_DIR):
+        """
+        Initialize bar store
+
+        Args:
+            root_dir: Directory holding the per-symbol CSV files
+        """
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        # Writes to different symbols are independent; one lock per symbol
+        # keeps concurrent writers of the same symbol from interleaving
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock_for(self, stock_code: str) -> threading.Lock:
+        with self._locks_guard:
+            if stock_code not in self._locks:
+                self._locks[stock_code] = threading.Lock()
+            return self._locks[stock_code]
+
+    def path_for(self, stock_code: str) -> Path:
+        """Return the CSV path for a symbol"""
+        return self.root_dir / f"{stock_code}.csv"
+
+    def has(self, stock_code: str) -> bool:
+        """Check whether the store holds bars for a symbol"""
+        return self.path_for(stock_code).exists()
+
+    def symbols(self) -> List[str]:
+        """List all symbols held in the store"""
+        return sorted(p.stem for p in self.root_dir.glob('*.csv'))
+
+    def source(self, stock_code: str) -> Optional[str]:
+        """
+        Get the data source that wrote a symbol's history
+
+        Returns:
+            str or None when no source was recorded
+        """
+        path = self.root_dir / f"{stock_code}.source"
+        if not path.exists():
+            return None
+        return path.read_text(encoding='utf-8').strip() or None
+
+    def set_source(self, stock_code: str, source: str):
+        """Record the data source that wrote a symbol's history (one small file per symbol)"""
+        path = self.root_dir / f"{stock_code}.source"
+        tmp_path = path.with_suffix('.source.tmp')
+        tmp_path.write_text(source, encoding='utf-8')
+        os.replace(tmp_path, path)
+
+    def last_date(self, stock_code: str) -> Optional[pd.Timestamp]:
+        """
+        Get the date of the last stored bar without reading the whole file
+
+        Args:
+            stock_code: Stock code
+
+        Returns:
+            pd.Timestamp or None if the symbol has no bars
+        """
+        path = self.path_for(stock_code)
+        if not path.exists():
+            return None
+
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - 512))
+            lines = f.read().decode('utf-8').strip().splitlines()
+
+        if not lines:
+            return None
+        last_field = lines[-1].split(',')[0]
+        if last_field == 'date':
+            return None
+        return pd.Timestamp(last_field)
+
+    def read(self, stock_code: str, start_date: Optional[str] = None,
+             end_date: Optional[str] = None) -> pd.DataFrame:
+        """
+        Read stored bars for a symbol
+
+        Args:
+            stock_code: Stock code
+            start_date: Optional inclusive start date (YYYY-MM-DD)
+            end_date: Optional inclusive end date (YYYY-MM-DD)
+
+        Returns:
+            pd.DataFrame: Bars with BAR_COLUMNS, empty if the symbol is unknown
+        """
+        path = self.path_for(stock_code)
+        if not path.exists():
+            return pd.DataFrame(columns=BAR_COLUMNS)
+
+        df = pd.read_csv(path, parse_dates=['date'])
+        if start_date is not None:
+            df = df[df['date'] >= pd.Timestamp(start_date)]
+        if end_date is not None:
+            df = df[df['date'] <= pd.Timestamp(end_date)]
+        return df.reset_index(drop=True)
+
+    def tail(self, stock_code: str, n: int) -> pd.DataFrame:
+        """
+        Read the last n stored bars without parsing the whole file
+
+        Args:
+            stock_code: Stock code
+            n: Number of bars
+
+        Returns:
+            pd.DataFrame: Up to n bars with BAR_COLUMNS, empty if the symbol is unknown
+        """
+        dates, values = self.tail_values(stock_code, n)
+        df = pd.DataFrame(values, columns=BAR_COLUMNS[1:])
+        df.insert(0, 'date', pd.to_datetime(dates))
+        return df
+
+    def tail_values(self, stock_code: str, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Last n stored bars as arrays, for bulk readers of many symbols
+
+        Reads backwards from the end of the file in blocks until n complete
+        lines are available and parses them without building a DataFrame.
+
+        Args:
+            stock_code: Stock code
+            n: Number of bars
+
+        Returns:
+            tuple: (dates, values) where dates is a datetime64[D] array of up
+            to n dates and values a float array with one row per date and the
+            columns of BAR_COLUMNS after 'date' (NaN where empty)
+        """
+        empty = (np.empty(0, dtype='datetime64[D]'), np.empty((0, len(BAR_COLUMNS) - 1)))
+        path = self.path_for(stock_code)
+        if not path.exists() or n <= 0:
+            return empty
+
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            block = max(4096, 96 * (n + 1))
+            start = end
+            data = b''
+            # n lines after the first (possibly partial) one, or the whole file
+            while start > 0 and data.count(b'\n') <= n + 1:
+                start = max(0, start - block)
+                f.seek(start)
+                data = f.read(end - start)
+
+        lines = data.decode('utf-8').splitlines()
+        if start > 0:
+            lines = lines[1:]
+        lines = [line for line in lines if line and not line.startswith('date,')][-n:]
+        if not lines:
+            return empty
+        fields = np.array(','.join(lines).split(','), dtype=object).reshape(len(lines), len(BAR_COLUMNS))
+        numbers = fields[:, 1:]
+        numbers[numbers == ''] = 'nan'
+        return fields[:, 0].astype('datetime64[D]'), numbers.astype(float)
+
+    def write(self, stock_code: str, df: pd.DataFrame):
+        """
+        Replace all stored bars for a symbol
+
+        Args:
+            stock_code: Stock code
+            df: Bars in any format accepted by normalize_bars
+        """
+        bars = normalize_bars(df)
+        with self._lock_for(stock_code):
+            self._write_atomic(stock_code, bars)
+
+    def append(self, stock_code: str, df: pd.DataFrame) -> int:
+        """
+        Add bars for a symbol, keeping one row per date
+
+        Bars newer than the last stored date are appended in place without
+        reading the existing file. Overlapping bars trigger a merge in which
+        the new values win.
+
+        Args:
+            stock_code: Stock code
+            df: Bars in any format accepted by normalize_bars
+
+        Returns:
+            int: Number of rows written
+        """
+        bars = normalize_bars(df)
+        if bars.empty:
+            return 0
+
+        with self._lock_for(stock_code):
+            last = self.last_date(stock_code)
+            if last is None:
+                self._write_atomic(stock_code, bars)
+                return len(bars)
+
+            if bars['date'].iloc[0] > last:
+                bars.to_csv(self.path_for(stock_code), mode='a', header=False,
+                            index=False, date_format='%Y-%m-%d')
+                return len(bars)
+
+            existing = self.read(stock_code)
+            merged = pd.concat([existing, bars], ignore_index=True)
+            merged = merged.drop_duplicates(subset='date', keep='last').sort_values('date')
+            self._write_atomic(stock_code, merged)
+            return len(bars)
+
+    def append_cross_section(self, df: pd.DataFrame) -> int:
+        """
+        Add one trading day's bars for many symbols
+
+        The common case (the day is newer than every stored bar) writes one
+        line per symbol in append mode, so keeping the whole universe current
+        costs no file reads.
+
+        Args:
+            df: Bars with a 'code' column plus BAR_COLUMNS, one row per symbol
+
+        Returns:
+            int: Number of symbols written
+        """
+        if df is None or df.empty:
+            return 0
+
+        df = df.copy()
+        df['date'] = pd.to_datetime(df['date']).dt.normalize()
+        if 'amount' not in df.columns:
+            df['amount'] = float('nan')
+
+        written = 0
+        for row in df[['code'] + BAR_COLUMNS].itertuples(index=False):
+            stock_code = row[0]
+            bar_date = row[1]
+            with self._lock_for(stock_code):
+                last = self.last_date(stock_code)
+                path = self.path_for(stock_code)
+                if last is None or bar_date > last:
+                    line = ','.join(
+                        [bar_date.strftime('%Y-%m-%d')] +
+                        ['' if pd.isna(v) else repr(float(v)) for v in row[2:]]
+                    )
+                    with open(path, 'a', encoding='utf-8') as f:
+                        if last is None and f.tell() == 0:
+                            f.write(','.join(BAR_COLUMNS) + '\n')
+                        f.write(line + '\n')
+                    written += 1
+                    continue
+
+            # Revised bar for a date already stored: fall back to a merge
+            bars = pd.DataFrame([row[1:]], columns=BAR_COLUMNS)
+            written += 1 if self.append(stock_code, bars) else 0
+        return written
+
+    def rescale_prices(self, stock_code: str, factor: float, before: Optional[pd.Timestamp] = None) -> int:
+        """
+        Multiply stored prices by a factor, e.g. to keep forward-adjusted
+        history continuous after an ex-dividend date
+
+        Args:
+            stock_code: Stock code
+            factor: Multiplier for PRICE_COLUMNS
+            before: Only rescale bars dated before this (default: all bars)
+
+        Returns:
+            int: Number of bars rescaled
+        """
+        with self._lock_for(stock_code):
+            bars = self.read(stock_code)
+            rows = bars['date'] < pd.Timestamp(before) if before is not None else slice(None)
+            count = len(bars) if before is None else int(rows.sum())
+            if count:
+                bars.loc[rows, PRICE_COLUMNS] *= factor
+                self._write_atomic(stock_code, bars)
+            return count
+
+    def _write_atomic(self, stock_code: str, bars: pd.DataFrame):
+        """Write through a temporary file so readers never see a partial CSV"""
+        path = self.path_for(stock_code)
+        tmp_path = path.with_suffix('.csv.tmp')
+        bars.to_csv(tmp_path, index=False, date_format='%Y-%m-%d')
+        os.replace(tmp_path, path)
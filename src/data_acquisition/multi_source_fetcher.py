@@ -13,6 +13,7 @@ from pathlib import Path
 ROOT_DIR = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(ROOT_DIR))
 
+from src.data_acquisition.yahoo_adapter import YahooAdapter
 from src.utils import setup_logger
 
 logger = setup_logger(__name__)
@@ -23,6 +24,9 @@ MIN_AI_SECTORS_HEATMAP = 5  # Minimum AI sectors for heatmap view (limit >= HEAT
 MIN_AI_SECTORS_SMALL = 2    # Minimum AI sectors for small lists (limit < HEATMAP_THRESHOLD)
 HEATMAP_THRESHOLD = 50      # Threshold to determine if it's a heatmap view
 
+# Historical data sources in fallback order
+HISTORICAL_SOURCES = ['akshare', 'yahoo']
+
 # AI-related keywords for sector detection (expanded list for comprehensive coverage)
 AI_KEYWORDS = [
     'AI', '人工智能', 'AI应用', '机器人', 'ChatGPT', 'AIGC', '算力',
@@ -56,6 +60,7 @@ class MultiSourceDataFetcher:
             'sina': self._init_sina()
         }
         self.available_sources = {k: v for k, v in self.sources.items() if v is not None}
+        self.yahoo_adapter = YahooAdapter(self.sources['yahoo']) if self.sources['yahoo'] else None
         logger.info(f"Initialized with sources: {list(self.available_sources.keys())}")
     
     def _init_akshare(self):
@@ -72,13 +77,37 @@ class MultiSourceDataFetcher:
         """Initialize TuShare"""
         try:
             import tushare as ts
-            # TuShare requires token, using default for testing
+            from config.settings import TUSHARE_TOKEN
+            # Pro API calls (see get_tushare_pro) require a token
+            if TUSHARE_TOKEN:
+                ts.set_token(TUSHARE_TOKEN)
             logger.info("✓ TuShare initialized")
             return ts
         except ImportError:
             logger.warning("✗ TuShare not available")
             return None
     
+    def get_tushare_pro(self):
+        """
+        Get a TuShare Pro API client
+        
+        Returns:
+            TuShare Pro client, or None if TuShare or its token is unavailable
+        """
+        if 'tushare' not in self.available_sources:
+            return None
+        
+        from config.settings import TUSHARE_TOKEN
+        if not TUSHARE_TOKEN:
+            logger.warning("TUSHARE_TOKEN not set, TuShare Pro API unavailable")
+            return None
+        
+        try:
+            return self.available_sources['tushare'].pro_api(TUSHARE_TOKEN)
+        except Exception as e:
+            logger.error(f"TuShare Pro initialization error: {str(e)}")
+            return None
+    
     def _init_yahoo(self):
         """Initialize Yahoo Finance"""
         try:
@@ -211,36 +240,53 @@ class MultiSourceDataFetcher:
     
     def fetch_from_yahoo(self, stock_code: str) -> Optional[Dict[str, Any]]:
         """Fetch real-time data from Yahoo Finance"""
-        if 'yahoo' not in self.available_sources:
+        if self.yahoo_adapter is None:
             return None
         
         try:
-            yf = self.available_sources['yahoo']
-            
-            # Convert to Yahoo symbol format
-            if stock_code.startswith('6'):
-                yahoo_symbol = f'{stock_code}.SS'  # Shanghai
-            else:
-                yahoo_symbol = f'{stock_code}.SZ'  # Shenzhen
-            
-            ticker = yf.Ticker(yahoo_symbol)
-            info = ticker.info
-            
-            if info and 'currentPrice' in info:
-                return {
-                    'source': 'yahoo',
-                    'code': stock_code,
-                    'name': info.get('longName', ''),
-                    'price': float(info.get('currentPrice', 0)),
-                    'change_pct': float(info.get('regularMarketChangePercent', 0)),
-                    'volume': float(info.get('volume', 0)),
-                    'timestamp': datetime.now().isoformat()
-                }
+            return self.yahoo_adapter.fetch_quotes([stock_code]).get(stock_code)
         except Exception as e:
             logger.error(f"Yahoo Finance fetch error for {stock_code}: {str(e)}")
         
         return None
     
+    def fetch_yahoo_quotes(self, stock_codes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch real-time data for many stocks from Yahoo Finance in one pass
+        
+        Args:
+            stock_codes: List of stock codes
+            
+        Returns:
+            dict: {code: real-time record}, missing codes had no quote
+        """
+        if self.yahoo_adapter is None:
+            return {}
+        
+        try:
+            return self.yahoo_adapter.fetch_quotes(stock_codes)
+        except Exception as e:
+            logger.error(f"Yahoo Finance bulk quote error: {str(e)}")
+            return {}
+    
+    def fetch_yahoo_history(self, stock_codes: List[str], start_date: str,
+                            end_date: str) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch historical data for many stocks from Yahoo Finance with bulk downloads
+        
+        Args:
+            stock_codes: List of stock codes
+            start_date: Start date (YYYYMMDD or YYYY-MM-DD)
+            end_date: End date (YYYYMMDD or YYYY-MM-DD)
+            
+        Returns:
+            dict: {code: normalized bars DataFrame, forward-adjusted with volume in lots}
+        """
+        if self.yahoo_adapter is None:
+            return {}
+        
+        return self.yahoo_adapter.fetch_history(stock_codes, start_date, end_date)
+    
     def fetch_from_eastmoney(self, stock_code: str) -> Optional[Dict[str, Any]]:
         """Fetch real-time data from EastMoney"""
         if 'eastmoney' not in self.available_sources:
@@ -670,22 +716,47 @@ class MultiSourceDataFetcher:
         Returns:
             DataFrame with historical data
         """
-        # Try AKShare first (most reliable for Chinese stocks)
-        if 'akshare' in self.available_sources:
+        # Try AKShare first (most reliable for Chinese stocks), then Yahoo Finance
+        for source_name in HISTORICAL_SOURCES:
+            df = self.fetch_historical_from(source_name, stock_code, start_date, end_date)
+            if df is not None and not df.empty:
+                return df
+        
+        logger.error(f"Failed to fetch historical data for {stock_code}")
+        return pd.DataFrame()
+    
+    def fetch_historical_from(self, source: str, stock_code: str,
+                              start_date: str, end_date: str) -> pd.DataFrame:
+        """
+        Fetch historical data from one specific source (no fallback)
+        
+        Used by callers that manage sources themselves, e.g. the backfill job
+        which applies a separate rate limit to every source.
+        
+        Args:
+            source: Source name ('akshare' or 'yahoo')
+            stock_code: Stock code
+            start_date: Start date (YYYYMMDD or YYYY-MM-DD)
+            end_date: End date (YYYYMMDD or YYYY-MM-DD)
+            
+        Returns:
+            DataFrame in AKShare's native format or normalized bars
+            (see bar_store.BAR_COLUMNS) for Yahoo, empty if unavailable
+        """
+        if source not in self.available_sources:
+            return pd.DataFrame()
+        
+        if source == 'akshare':
             try:
                 ak = self.available_sources['akshare']
                 
-                if stock_code.startswith('6'):
-                    symbol = f'sh{stock_code}'
-                else:
-                    symbol = f'sz{stock_code}'
-                
                 # Format dates
                 start_date_fmt = start_date.replace('-', '')
                 end_date_fmt = end_date.replace('-', '')
                 
+                # stock_zh_a_hist expects the bare 6-digit code (no sh/sz prefix)
                 df = ak.stock_zh_a_hist(
-                    symbol=symbol,
+                    symbol=stock_code,
                     period="daily",
                     start_date=start_date_fmt,
                     end_date=end_date_fmt,
@@ -698,27 +769,75 @@ class MultiSourceDataFetcher:
             except Exception as e:
                 logger.error(f"AKShare historical fetch error: {str(e)}")
         
-        # Fallback to Yahoo Finance
-        if 'yahoo' in self.available_sources:
+        elif source == 'yahoo':
             try:
-                yf = self.available_sources['yahoo']
-                
-                if stock_code.startswith('6'):
-                    yahoo_symbol = f'{stock_code}.SS'
-                else:
-                    yahoo_symbol = f'{stock_code}.SZ'
+                df = self.fetch_yahoo_history([stock_code], start_date, end_date).get(stock_code)
                 
-                ticker = yf.Ticker(yahoo_symbol)
-                df = ticker.history(start=start_date, end=end_date)
-                
-                if not df.empty:
+                if df is not None and not df.empty:
                     logger.info(f"Fetched {len(df)} historical records from Yahoo Finance for {stock_code}")
                     return df
             except Exception as e:
                 logger.error(f"Yahoo Finance historical fetch error: {str(e)}")
         
-        logger.error(f"Failed to fetch historical data for {stock_code}")
+        else:
+            logger.error(f"Unsupported historical data source: {source}")
+        
         return pd.DataFrame()
+    
+    def fetch_market_snapshot(self) -> pd.DataFrame:
+        """
+        Fetch the latest quote of every A-share in one request
+        
+        Returns:
+            pd.DataFrame: One row per symbol with columns code, name, price,
+            change_pct, open, high, low and volume; empty if unavailable
+        """
+        columns = ['code', 'name', 'price', 'change_pct', 'open', 'high', 'low', 'volume']
+        if 'akshare' not in self.available_sources:
+            return pd.DataFrame(columns=columns)
+        
+        try:
+            ak = self.available_sources['akshare']
+            df = ak.stock_zh_a_spot_em()
+            if df is not None and not df.empty:
+                snapshot = df.rename(columns={
+                    '代码': 'code', '名称': 'name', '最新价': 'price', '涨跌幅': 'change_pct',
+                    '今开': 'open', '最高': 'high', '最低': 'low', '成交量': 'volume',
+                }).reindex(columns=columns)
+                snapshot['code'] = snapshot['code'].astype(str).str.zfill(6)
+                for col in columns[2:]:
+                    snapshot[col] = pd.to_numeric(snapshot[col], errors='coerce')
+                # Suspended symbols have no latest price
+                snapshot = snapshot.dropna(subset=['price'])
+                snapshot = snapshot[snapshot['price'] > 0].reset_index(drop=True)
+                logger.info(f"Fetched market snapshot: {len(snapshot)} symbols")
+                return snapshot
+        except Exception as e:
+            logger.error(f"Market snapshot fetch error: {str(e)}")
+        
+        return pd.DataFrame(columns=columns)
+    
+    def fetch_stock_universe(self) -> List[str]:
+        """
+        Fetch the list of all A-share stock codes
+        
+        Returns:
+            List of 6-digit stock codes, empty if unavailable
+        """
+        if 'akshare' not in self.available_sources:
+            return []
+        
+        try:
+            ak = self.available_sources['akshare']
+            df = ak.stock_info_a_code_name()
+            if df is not None and not df.empty:
+                codes = [str(code).zfill(6) for code in df['code']]
+                logger.info(f"Fetched stock universe: {len(codes)} symbols")
+                return codes
+        except Exception as e:
+            logger.error(f"Stock universe fetch error: {str(e)}")
+        
+        return []
 
 
 def test_data_sources(num_stocks: int = 20):
@@ -0,0 +1,325 @@
+"""
+SIAPS - TuShare Cross-Sectional Updater
+Keeps the local bar store current with one TuShare call per trading day
+
+TuShare Pro's `daily` endpoint returns every A-share for one `trade_date`
+in a single response, which is far cheaper than per-symbol history once
+the store has been backfilled (see src.data_acquisition.backfill).
+
+`daily` prices are unadjusted while the store keeps forward-adjusted (qfq)
+prices, so each day's `adj_factor` cross-section (one more call) is
+compared with the factors of the last applied day. A new day's unadjusted
+bar is already its own qfq price; when a symbol's factor changed (an
+ex-dividend or split date) its stored history is rescaled by
+old factor / new factor, which is how qfq prices move on that date.
+
+Usage:
+    python -m src.data_acquisition.tushare_updater
+    python -m src.data_acquisition.tushare_updater --start 2024-01-02 --end 2024-01-31
+"""
+import argparse
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+ROOT_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from config.settings import TUSHARE_ENABLED, TUSHARE_RATE_LIMIT
+from src.data_acquisition.bar_store import BarStore, BAR_COLUMNS
+from src.data_acquisition.backfill import RateLimiter
+from src.utils import setup_logger
+
+logger = setup_logger(__name__)
+
+
+# File in the bar store recording the last trade date applied
+STATE_FILE = "_tushare_state.json"
+
+# Fields requested from the daily endpoint
+DAILY_FIELDS = 'ts_code,trade_date,open,high,low,close,vol,amount'
+
+# Fields requested from the adj_factor endpoint
+ADJ_FACTOR_FIELDS = 'ts_code,trade_date,adj_factor'
+
+# Factors closer than this are the same (TuShare rounds them)
+FACTOR_TOLERANCE = 1e-9
+
+# TuShare reports amount in thousands of yuan; the store keeps yuan like AKShare
+AMOUNT_SCALE = 1000.0
+
+
+def _codes(ts_codes: pd.Series) -> pd.Series:
+    """'000001.SZ' -> '000001'"""
+    return ts_codes.str.split('.').str[0]
+
+
+def tushare_adj_factors(df: pd.DataFrame) -> pd.Series:
+    """
+    Convert a TuShare `adj_factor` response to {code: factor}
+
+    Args:
+        df: DataFrame with ts_code and adj_factor
+
+    Returns:
+        pd.Series: Adjustment factor indexed by 6-digit code
+    """
+    if df is None or df.empty:
+        return pd.Series(dtype=float)
+    factors = pd.Series(df['adj_factor'].astype(float).to_numpy(), index=_codes(df['ts_code']))
+    return factors[~factors.index.duplicated(keep='last')].dropna()
+
+
+def tushare_daily_to_bars(df: pd.DataFrame, price_scale: Optional[pd.Series] = None) -> pd.DataFrame:
+    """
+    Convert a TuShare `daily` response to store bars
+
+    Args:
+        df: DataFrame with ts_code, trade_date, open, high, low, close, vol, amount
+        price_scale: Optional {code: multiplier} turning the unadjusted prices
+            into the store's forward-adjusted ones (missing codes: 1)
+
+    Returns:
+        pd.DataFrame: 'code' column plus BAR_COLUMNS, one row per symbol
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=['code'] + BAR_COLUMNS)
+
+    codes = _codes(df['ts_code'])
+    scale = 1.0
+    if price_scale is not None:
+        scale = codes.map(price_scale).fillna(1.0).to_numpy()
+    bars = pd.DataFrame({
+        'code': codes,
+        'date': pd.to_datetime(df['trade_date'].astype(str), format='%Y%m%d'),
+        'open': df['open'].astype(float) * scale,
+        'high': df['high'].astype(float) * scale,
+        'low': df['low'].astype(float) * scale,
+        'close': df['close'].astype(float) * scale,
+        # TuShare reports vol in lots, the store's unit
+        'volume': df['vol'].astype(float),
+        'amount': df['amount'].astype(float) * AMOUNT_SCALE,
+    })
+    bars = bars.dropna(subset=['close'])
+    return bars.drop_duplicates(subset='code', keep='last').reset_index(drop=True)
+
+
+class TuShareDailyUpdater:
+    """Appends whole-market daily bars to the bar store, one call per trade date"""
+
+    def __init__(self, pro=None, store: Optional[BarStore] = None,
+                 rate_limit: float = TUSHARE_RATE_LIMIT):
+        """
+        Initialize updater
+
+        Args:
+            pro: TuShare Pro client, or any object with the same `daily`,
+                `adj_factor` and `trade_cal` methods
+                (default: MultiSourceDataFetcher.get_tushare_pro())
+            store: Target bar store (default: BarStore at BAR_STORE_DIR)
+            rate_limit: Maximum API calls per second
+        """
+        if pro is None:
+            from src.data_acquisition.multi_source_fetcher import MultiSourceDataFetcher
+            pro = MultiSourceDataFetcher().get_tushare_pro()
+        self.pro = pro
+        self.store = store or BarStore()
+        self.limiter = RateLimiter(rate_limit)
+        self.state_path = self.store.root_dir / STATE_FILE
+        # trade_date -> adjustment factors, kept for the next day's comparison
+        self._factors: Dict[str, pd.Series] = {}
+
+    @property
+    def available(self) -> bool:
+        return self.pro is not None
+
+    def last_trade_date(self) -> Optional[str]:
+        """Return the last trade date applied (YYYYMMDD), or None"""
+        if not self.state_path.exists():
+            return None
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('last_trade_date')
+        except (OSError, ValueError):
+            return None
+
+    def _save_state(self, trade_date: str, symbols: int):
+        tmp_path = self.state_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'last_trade_date': trade_date,
+                'symbols': symbols,
+                'updated_at': datetime.now().isoformat(),
+            }, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def trade_dates(self, start_date: str, end_date: str) -> List[str]:
+        """
+        Get open trading days in a range from the exchange calendar
+
+        Args:
+            start_date: Start date (YYYYMMDD or YYYY-MM-DD)
+            end_date: End date (YYYYMMDD or YYYY-MM-DD)
+
+        Returns:
+            List of trade dates (YYYYMMDD), ascending
+        """
+        self.limiter.acquire()
+        cal = self.pro.trade_cal(
+            exchange='SSE',
+            start_date=start_date.replace('-', ''),
+            end_date=end_date.replace('-', ''),
+            is_open='1'
+        )
+        if cal is None or cal.empty:
+            return []
+        if 'is_open' in cal.columns:
+            cal = cal[cal['is_open'].astype(int) == 1]
+        return sorted(str(d) for d in cal['cal_date'])
+
+    def adj_factors(self, trade_date: str) -> pd.Series:
+        """
+        Get every symbol's adjustment factor on one trade date (one call, then cached)
+
+        Args:
+            trade_date: Trade date (YYYYMMDD)
+
+        Returns:
+            pd.Series: Factor indexed by 6-digit code
+        """
+        if trade_date not in self._factors:
+            self.limiter.acquire()
+            factors = tushare_adj_factors(self.pro.adj_factor(trade_date=trade_date, fields=ADJ_FACTOR_FIELDS))
+            # Only consecutive days are compared; keep the latest two
+            latest = max(self._factors, default=None)
+            self._factors = {d: f for d, f in self._factors.items() if d == latest}
+            self._factors[trade_date] = factors
+        return self._factors[trade_date]
+
+    def previous_trade_date(self, trade_date: str) -> Optional[str]:
+        """Open trading day before trade_date (YYYYMMDD), or None"""
+        start = (datetime.strptime(trade_date, '%Y%m%d') - timedelta(days=30)).strftime('%Y%m%d')
+        earlier = [d for d in self.trade_dates(start, trade_date) if d < trade_date]
+        return earlier[-1] if earlier else None
+
+    def _readjust_history(self, previous: pd.Series, current: pd.Series, trade_date: str) -> int:
+        """
+        Rescale the stored history of every symbol whose factor changed
+
+        Returns:
+            int: Number of symbols rescaled
+        """
+        ratio = (previous / current.reindex(previous.index)).dropna()
+        ratio = ratio[(ratio - 1.0).abs() > FACTOR_TOLERANCE]
+        before = pd.Timestamp(trade_date)
+        rescaled = 0
+        for code, factor in ratio.items():
+            if self.store.has(code) and self.store.rescale_prices(code, float(factor), before=before):
+                rescaled += 1
+        if rescaled:
+            logger.info(f"TuShare {trade_date}: forward adjustment changed, {rescaled} symbols' history rescaled")
+        return rescaled
+
+    def update_trade_date(self, trade_date: str) -> int:
+        """
+        Append one trading day for every symbol
+
+        A day after the last applied one first rescales the history of
+        symbols whose adjustment factor changed; re-applying an earlier day
+        scales its bars to the stored (later) adjustment instead.
+
+        Args:
+            trade_date: Trade date (YYYYMMDD or YYYY-MM-DD)
+
+        Returns:
+            int: Number of symbols written
+        """
+        trade_date = trade_date.replace('-', '')
+        self.limiter.acquire()
+        df = self.pro.daily(trade_date=trade_date, fields=DAILY_FIELDS)
+        if df is None or df.empty:
+            logger.warning(f"TuShare returned no bars for {trade_date}")
+            return 0
+
+        last = self.last_trade_date()
+        factors = self.adj_factors(trade_date)
+        price_scale = None
+        if last is None or trade_date > last:
+            # The store's history is adjusted to the last applied day (or, right
+            # after a backfill, to the day before this one)
+            previous_date = last or self.previous_trade_date(trade_date)
+            if previous_date is not None:
+                self._readjust_history(self.adj_factors(previous_date), factors, trade_date)
+        else:
+            price_scale = factors / self.adj_factors(last).reindex(factors.index)
+
+        bars = tushare_daily_to_bars(df, price_scale)
+        written = self.store.append_cross_section(bars)
+        if last is None or trade_date > last:
+            self._save_state(trade_date, written)
+        logger.info(f"✓ TuShare {trade_date}: {written} symbols updated")
+        return written
+
+    def update_range(self, start_date: Optional[str] = None,
+                     end_date: Optional[str] = None) -> Dict[str, int]:
+        """
+        Apply every trading day in a range
+
+        Args:
+            start_date: Start date (default: day after the last applied trade date)
+            end_date: End date (default: today)
+
+        Returns:
+            dict: {trade_date: symbols written}
+        """
+        if not self.available:
+            logger.error("TuShare Pro unavailable (install tushare and set TUSHARE_TOKEN)")
+            return {}
+
+        end_date = (end_date or datetime.now().strftime('%Y%m%d')).replace('-', '')
+        if start_date is None:
+            last = self.last_trade_date()
+            if last is None:
+                logger.error("No previous TuShare update recorded, a start date is required")
+                return {}
+            start_date = (datetime.strptime(last, '%Y%m%d') + timedelta(days=1)).strftime('%Y%m%d')
+        start_date = start_date.replace('-', '')
+        if start_date > end_date:
+            return {}
+
+        results = {}
+        for trade_date in self.trade_dates(start_date, end_date):
+            try:
+                results[trade_date] = self.update_trade_date(trade_date)
+            except Exception as e:
+                # Stop at the first failure so the recorded state stays contiguous
+                logger.error(f"TuShare update failed for {trade_date}: {str(e)}")
+                break
+        return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='Append whole-market daily bars from TuShare')
+    parser.add_argument('--start', default=None,
+                        help='Start date YYYY-MM-DD (default: day after last update)')
+    parser.add_argument('--end', default=None, help='End date YYYY-MM-DD (default: today)')
+    args = parser.parse_args(argv)
+
+    if not TUSHARE_ENABLED:
+        logger.warning("TUSHARE_ENABLED is false; running anyway because updater was invoked directly")
+
+    updater = TuShareDailyUpdater()
+    results = updater.update_range(args.start, args.end)
+    for trade_date, count in results.items():
+        print(f"{trade_date}: {count} symbols")
+    return 0 if updater.available else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+"""
+SIAPS - Yahoo Finance Adapter
+Multi-ticker Yahoo Finance access using lightweight quote fields and bulk downloads
+
+`Ticker.info` scrapes several endpoints per symbol just to read a price, and
+`Ticker.history` fetches one symbol per request. This adapter reads realtime
+quotes from `fast_info` and history from one `yf.download` call for many
+symbols, and normalizes both into the record types used by the other sources.
+History is converted to the bar store's units (forward-adjusted prices,
+volume in lots), the same as AKShare's adjust="qfq" history.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Any
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+ROOT_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.data_acquisition.bar_store import PRICE_COLUMNS, SHARES_PER_LOT, normalize_bars
+from src.utils import setup_logger
+
+logger = setup_logger(__name__)
+
+
+# Symbols per bulk download request
+DOWNLOAD_BATCH_SIZE = 200
+
+
+def to_yahoo_symbol(stock_code: str) -> str:
+    """Convert a 6-digit A-share code to a Yahoo symbol ('600000' -> '600000.SS')"""
+    if stock_code.startswith('6'):
+        return f'{stock_code}.SS'  # Shanghai
+    return f'{stock_code}.SZ'  # Shenzhen
+
+
+def from_yahoo_symbol(yahoo_symbol: str) -> str:
+    """Convert a Yahoo symbol back to a 6-digit code ('600000.SS' -> '600000')"""
+    return yahoo_symbol.split('.')[0]
+
+
+def _quote_field(fast_info, name: str) -> float:
+    """Read one fast_info field, treating missing or NaN values as 0"""
+    try:
+        value = getattr(fast_info, name)
+    except Exception:
+        return 0.0
+    if value is None or pd.isna(value):
+        return 0.0
+    return float(value)
+
+
+class YahooAdapter:
+    """Bulk Yahoo Finance quotes and history normalized to SIAPS record types"""
+
+    def __init__(self, yf):
+        """
+        Initialize adapter
+
+        Args:
+            yf: The yfinance module (or a stand-in with `Tickers` and `download`)
+        """
+        self.yf = yf
+
+    def fetch_quotes(self, stock_codes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch realtime quotes for many symbols from `fast_info`
+
+        Args:
+            stock_codes: 6-digit stock codes
+
+        Returns:
+            dict: {code: realtime record} for symbols with a valid price, in
+            the same shape as the other sources' realtime records
+        """
+        if not stock_codes:
+            return {}
+
+        symbols = [to_yahoo_symbol(code) for code in stock_codes]
+        tickers = self.yf.Tickers(' '.join(symbols))
+
+        results = {}
+        for symbol in symbols:
+            code = from_yahoo_symbol(symbol)
+            try:
+                ticker = tickers.tickers[symbol]
+                fast_info = ticker.fast_info
+                price = _quote_field(fast_info, 'last_price')
+                if price <= 0:
+                    continue
+                yesterday_close = _quote_field(fast_info, 'previous_close')
+                change_pct = 0
+                if yesterday_close > 0:
+                    change_pct = round((price - yesterday_close) / yesterday_close * 100, 2)
+
+                results[code] = {
+                    'source': 'yahoo',
+                    'code': code,
+                    'name': '',  # Not part of the lightweight quote fields
+                    'price': price,
+                    'change_pct': change_pct,
+                    'volume': _quote_field(fast_info, 'last_volume'),
+                    'high': _quote_field(fast_info, 'day_high'),
+                    'low': _quote_field(fast_info, 'day_low'),
+                    'open': _quote_field(fast_info, 'open'),
+                    'yesterday_close': yesterday_close,
+                    'timestamp': datetime.now().isoformat()
+                }
+            except Exception as e:
+                logger.warning(f"Yahoo quote unavailable for {code}: {str(e)}")
+
+        return results
+
+    def fetch_history(self, stock_codes: List[str], start_date: str,
+                      end_date: str) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch daily history for many symbols with bulk downloads
+
+        Args:
+            stock_codes: 6-digit stock codes
+            start_date: Start date (YYYYMMDD or YYYY-MM-DD)
+            end_date: Inclusive end date (YYYYMMDD or YYYY-MM-DD)
+
+        Returns:
+            dict: {code: normalized bars (see bar_store.BAR_COLUMNS), prices
+            forward-adjusted with Adj Close / Close and volume in lots} for
+            symbols that returned data
+        """
+        start = pd.Timestamp(start_date).strftime('%Y-%m-%d')
+        # yf.download treats `end` as exclusive
+        end = (pd.Timestamp(end_date) + timedelta(days=1)).strftime('%Y-%m-%d')
+
+        results = {}
+        for i in range(0, len(stock_codes), DOWNLOAD_BATCH_SIZE):
+            batch = stock_codes[i:i + DOWNLOAD_BATCH_SIZE]
+            symbols = [to_yahoo_symbol(code) for code in batch]
+            try:
+                df = self.yf.download(
+                    symbols,
+                    start=start,
+                    end=end,
+                    group_by='ticker',
+                    auto_adjust=False,
+                    threads=True,
+                    progress=False
+                )
+            except Exception as e:
+                logger.error(f"Yahoo bulk download error: {str(e)}")
+                continue
+
+            for symbol in symbols:
+                bars = self._extract_symbol(df, symbol, len(symbols))
+                if not bars.empty:
+                    results[from_yahoo_symbol(symbol)] = bars
+
+        logger.info(f"Fetched Yahoo history for {len(results)}/{len(stock_codes)} symbols")
+        return results
+
+    @staticmethod
+    def _extract_symbol(df: Optional[pd.DataFrame], symbol: str, batch_size: int) -> pd.DataFrame:
+        """Pull one symbol's bars out of a (possibly multi-ticker) download"""
+        if df is None or df.empty:
+            return normalize_bars(None)
+
+        if isinstance(df.columns, pd.MultiIndex):
+            if symbol not in df.columns.get_level_values(0):
+                return normalize_bars(None)
+            sub = df[symbol]
+        elif batch_size == 1:
+            sub = df
+        else:
+            return normalize_bars(None)
+
+        sub = sub.dropna(how='all')
+        if sub.empty or 'Close' not in sub.columns:
+            return normalize_bars(None)
+        if sub.index.name is None:
+            sub = sub.rename_axis('Date')
+        bars = normalize_bars(sub)
+        return _to_store_units(bars, sub)
+
+
+def _to_store_units(bars: pd.DataFrame, sub: pd.DataFrame) -> pd.DataFrame:
+    """
+    Forward-adjust Yahoo's raw prices and convert shares to lots
+
+    Yahoo's Adj Close is the close adjusted for splits and dividends relative
+    to the latest bar (the qfq convention), so Adj Close / Close scales every
+    price of a bar. Without Adj Close the prices are taken as already adjusted.
+    """
+    if 'Adj Close' in sub.columns:
+        dates = pd.DatetimeIndex(sub.index)
+        if dates.tz is not None:
+            dates = dates.tz_localize(None)
+        factor = pd.Series((sub['Adj Close'] / sub['Close']).to_numpy(dtype=float), index=dates.normalize())
+        factor = bars['date'].map(factor[~factor.index.duplicated(keep='last')]).to_numpy(dtype=float)
+        factor = np.where(factor > 0, factor, 1.0)
+        bars[PRICE_COLUMNS] = bars[PRICE_COLUMNS].to_numpy() * factor[:, None]
+    bars['volume'] = bars['volume'] / SHARES_PER_LOT
+    return bars
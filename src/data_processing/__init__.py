@@ -1,7 +1,26 @@
 """
 SIAPS Data Processing Package
 """
-# Placeholder for data processing modules
-# Will be implemented in Phase 2
+from .features import FEATURE_NAMES, FEATURE_VERSION, RecursiveWindow, build_window_features, build_training_set
+from .feature_store import FeatureStore
+from .indicators import INDICATORS, IndicatorSet, compute_indicators, technical_snapshot
+from .support_resistance import cluster_levels, find_pivots, support_resistance_zones
+from .incremental_indicators import IncrementalIndicators, IncrementalIndicatorEngine
 
-__all__ = []
+__all__ = [
+    'FEATURE_NAMES',
+    'FEATURE_VERSION',
+    'FeatureStore',
+    'build_window_features',
+    'build_training_set',
+    'RecursiveWindow',
+    'INDICATORS',
+    'IndicatorSet',
+    'compute_indicators',
+    'technical_snapshot',
+    'find_pivots',
+    'cluster_levels',
+    'support_resistance_zones',
+    'IncrementalIndicators',
+    'IncrementalIndicatorEngine',
+]
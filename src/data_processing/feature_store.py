@@ -0,0 +1,198 @@
+"""
+SIAPS - Feature Store
+Per-symbol window feature matrices, materialized once and extended as bars arrive
+
+The store keeps, for every (symbol, window size), the feature matrix built
+by build_window_features together with the raw bars it was built from. When
+a symbol's bars are requested again they are aligned with the stored bars
+(by the stored last window, or by the requested first window when the tail
+itself was revised), the whole overlap is compared, and rows are recomputed
+from the first bar that differs: appended bars add one row each, and a
+revised bar mid-history invalidates only the windows containing it and
+later ones. Rows are identical to a full rebuild because every row depends
+on its own window only. Stored matrices carry FEATURE_VERSION and
+FEATURE_NAMES; a mismatch (a changed definition) triggers a rebuild, as does
+history that cannot be aligned. A store computes in one dtype (float64 or
+float32), which is part of its file names, so stores of different dtypes
+sharing a directory keep separate files.
+"""
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import numpy as np
+import sys
+
+# Add project root to Python path
+ROOT_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from config.settings import FEATURE_STORE_DIR
+from src.data_processing.features import FEATURE_NAMES, FEATURE_VERSION, build_window_features
+
+
+def _first_difference(a: np.ndarray, b: np.ndarray) -> int:
+    """Index of the first row where two equally long bar arrays differ (NaN equals NaN), or their length"""
+    same = (a == b) | (np.isnan(a) & np.isnan(b))
+    differs = np.flatnonzero(~same.all(axis=1))
+    return int(differs[0]) if len(differs) else len(a)
+
+
+def _stack_bars(close, high, low, volume, dtype=np.float64) -> np.ndarray:
+    """(n, 4) array of close, high, low and volume (0 when missing)"""
+    bars = np.empty((len(close), 4), dtype=dtype)
+    bars[:, 0] = close
+    bars[:, 1] = high
+    bars[:, 2] = low
+    bars[:, 3] = 0.0 if volume is None else volume
+    return bars
+
+
+class FeatureStore:
+    """Incrementally maintained window features per symbol, persisted as .npz files"""
+
+    def __init__(self, root_dir: Optional[Path] = FEATURE_STORE_DIR, dtype=np.float64):
+        """
+        Initialize feature store
+
+        Args:
+            root_dir: Directory for the per-symbol files (None: memory only)
+            dtype: Dtype of bars and features (float64 or float32)
+        """
+        self.dtype = np.dtype(dtype)
+        self.root_dir = Path(root_dir) if root_dir is not None else None
+        if self.root_dir is not None:
+            self.root_dir.mkdir(parents=True, exist_ok=True)
+        # (code, window) -> (features, bars they were built from)
+        self._states: Dict[Tuple[str, int], Tuple[np.ndarray, np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self._symbol_locks: Dict[Tuple[str, int], threading.Lock] = {}
+        self.rows_built = 0
+        self.rebuilds = 0
+
+    def path_for(self, stock_code: str, window_size: int) -> Optional[Path]:
+        if self.root_dir is None:
+            return None
+        return self.root_dir / f"{stock_code}_w{window_size}_{self.dtype.name}.npz"
+
+    def _symbol_lock(self, key) -> threading.Lock:
+        with self._lock:
+            return self._symbol_locks.setdefault(key, threading.Lock())
+
+    def features(self, stock_code: str, close, high, low, volume, window_size: int) -> np.ndarray:
+        """
+        Window features of the given bars, computing only rows not stored yet
+
+        Args:
+            stock_code: Stock code
+            close, high, low: arrays of bars, oldest first
+            volume: array or None
+            window_size: int, bars per window
+
+        Returns:
+            np.ndarray: read-only array equal to
+            build_window_features(close, high, low, volume, window_size)
+            computed in the store's dtype
+        """
+        bars = _stack_bars(close, high, low, volume, self.dtype)
+        n_rows = len(bars) - window_size + 1
+        if n_rows < 1:
+            raise ValueError(f"Need at least {window_size} bars, got {len(bars)}")
+        key = (stock_code, window_size)
+
+        with self._symbol_lock(key):
+            state = self._states.get(key) or self._load(stock_code, window_size)
+            merged = self._merge(state, bars, window_size) if state is not None else None
+            if merged is None:
+                merged = (self._build(bars, window_size), bars)
+                self.rebuilds += 1
+
+            if state is None or merged[0] is not state[0]:
+                stored, history = merged
+                stored.flags.writeable = False
+                self._states[key] = merged
+                self._save(stock_code, window_size, stored, history)
+            return merged[0][-n_rows:]
+
+    def _merge(self, state, bars, window_size) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Stored features and bars updated with the requested bars, or None if they cannot be aligned
+
+        Rows whose windows end before the first bar that differs from the
+        stored history are kept; later ones are recomputed.
+        """
+        stored, history = state
+        start = self._align(history, bars, window_size)
+        if start is None:
+            return None
+        overlap = len(history) - start
+        if overlap > len(bars):
+            # The requested bars end before the stored ones
+            return None
+        first = start + _first_difference(history[start:], bars[:overlap])
+        if first == len(history) == start + len(bars):
+            return state
+        merged = np.concatenate([history[:start], bars])
+        keep = max(0, first - window_size + 1)
+        features = np.concatenate([stored[:keep], self._build(merged[keep:], window_size)])
+        return features, merged
+
+    @staticmethod
+    def _align(history, bars, window_size) -> Optional[int]:
+        """Index in the stored history of the first requested bar, or None"""
+        # The requested bars continue the stored last window ...
+        tail = history[-window_size:]
+        for end in np.flatnonzero(bars[:, 0] == tail[-1, 0])[::-1]:
+            start = len(history) - 1 - int(end)
+            if end + 1 >= window_size and start >= 0 \
+                    and np.array_equal(bars[end + 1 - window_size:end + 1], tail, equal_nan=True):
+                return start
+        # ... or a bar inside it was revised: find the requested first window instead
+        head = bars[:window_size]
+        for start in np.flatnonzero(history[:, 0] == head[0, 0])[::-1]:
+            if np.array_equal(history[start:start + window_size], head, equal_nan=True):
+                return int(start)
+        return None
+
+    def _build(self, bars, window_size) -> np.ndarray:
+        features = build_window_features(bars[:, 0], bars[:, 1], bars[:, 2], bars[:, 3], window_size)
+        self.rows_built += len(features)
+        return features
+
+    def _save(self, stock_code, window_size, features, history):
+        path = self.path_for(stock_code, window_size)
+        if path is None:
+            return
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp.npz")
+        np.savez(tmp_path, version=FEATURE_VERSION, names=np.array(FEATURE_NAMES),
+                 features=features, bars=history)
+        os.replace(tmp_path, path)
+
+    def _load(self, stock_code, window_size):
+        path = self.path_for(stock_code, window_size)
+        if path is None or not path.exists():
+            return None
+        try:
+            with np.load(path) as saved:
+                if int(saved['version']) != FEATURE_VERSION or list(saved['names']) != FEATURE_NAMES:
+                    return None
+                features = saved['features']
+                history = saved['bars']
+        except Exception:
+            return None
+        if features.ndim != 2 or features.shape[1] != len(FEATURE_NAMES) \
+                or history.shape != (len(features) + window_size - 1, 4) \
+                or features.dtype != self.dtype or history.dtype != self.dtype:
+            return None
+        features.flags.writeable = False
+        state = (features, history)
+        self._states[(stock_code, window_size)] = state
+        return state
+
+    def clear(self, disk: bool = False):
+        """Drop all in-memory matrices, and persisted files when disk=True"""
+        with self._lock:
+            self._states.clear()
+        if disk and self.root_dir is not None:
+            for path in self.root_dir.glob('*.npz'):
+                path.unlink()
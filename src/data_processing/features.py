@@ -0,0 +1,194 @@
+"""
+SIAPS - Window Feature Builder
+Vectorized sliding-window features for the machine learning model
+
+Every row of the feature matrix describes one window of `window_size` bars:
+the mean and sample std of close, the highest high, the lowest low, the mean
+volume and the close-to-close return across the window. The whole matrix is
+built from strided views in a few NumPy passes instead of one pandas slice
+per window.
+
+The feature dtype follows the close prices: float32 bars give float32
+features (see indicators.as_float_array), anything else float64.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.data_processing.indicators import as_float_array
+
+
+# Version of the feature definitions; bump when FEATURE_NAMES or any
+# formula in build_window_features changes so stored features are rebuilt
+FEATURE_VERSION = 1
+
+# Column order of the feature matrix
+FEATURE_NAMES = [
+    'close_mean',
+    'close_std',
+    'high_max',
+    'low_min',
+    'volume_mean',
+    'window_return',
+]
+
+
+def build_window_features(close, high, low, volume, window_size):
+    """
+    Build features for every window of `window_size` consecutive bars
+
+    Row j covers bars [j, j + window_size). With n bars there are
+    n - window_size + 1 rows: rows 0 .. n - window_size - 1 pair with the
+    next bar's close as a training target, and the last row describes the
+    most recent window for prediction.
+
+    Inputs may also be 2-D (symbols × time) arrays of equal shape, in which
+    case windows run along the last axis and the result has shape
+    (symbols, n - window_size + 1, len(FEATURE_NAMES)).
+
+    Args:
+        close: array-like, close prices
+        high: array-like, high prices
+        low: array-like, low prices
+        volume: array-like or None, volumes (features use 0 when None)
+        window_size: int, bars per window
+
+    Returns:
+        np.ndarray: feature matrix, columns ordered as FEATURE_NAMES, in the
+        dtype of close
+    """
+    close = as_float_array(close)
+    high = as_float_array(high, close.dtype)
+    low = as_float_array(low, close.dtype)
+    if close.shape[-1] < window_size:
+        raise ValueError(f"Need at least {window_size} bars, got {close.shape[-1]}")
+
+    close_win = sliding_window_view(close, window_size, axis=-1)
+    n_windows = close_win.shape[-2]
+
+    features = np.empty(close_win.shape[:-1] + (len(FEATURE_NAMES),), dtype=close.dtype)
+    features[..., 0] = close_win.mean(axis=-1)
+    features[..., 1] = close_win.std(axis=-1, ddof=1)
+    features[..., 2] = sliding_window_view(high, window_size, axis=-1).max(axis=-1)
+    features[..., 3] = sliding_window_view(low, window_size, axis=-1).min(axis=-1)
+    if volume is None:
+        features[..., 4] = 0
+    else:
+        volume = as_float_array(volume, close.dtype)
+        features[..., 4] = sliding_window_view(volume, window_size, axis=-1).mean(axis=-1)
+
+    first = close[..., :n_windows]
+    last = close[..., window_size - 1:]
+    features[..., 5] = (last - first) / first
+    return features
+
+
+def build_training_set(close, high, low, volume, window_size):
+    """
+    Build the training matrix, targets and latest feature row
+
+    Args:
+        close, high, low, volume: array-like bar columns (volume may be None)
+        window_size: int, bars per window
+
+    Returns:
+        tuple: (X, y, x_last) where X has one row per window followed by a
+        known next close y, and x_last is the feature row of the most recent
+        window
+    """
+    features = build_window_features(close, high, low, volume, window_size)
+    close = as_float_array(close)
+    return features[..., :-1, :], close[..., window_size:], features[..., -1, :]
+
+
+class RecursiveWindow:
+    """
+    Feature state of the latest window for recursive multi-step forecasting
+
+    Each step appends a predicted close while high, low and volume repeat
+    the last known bar, exactly as if the bar were copied onto the end of
+    the series. Closes and volumes live in a buffer preallocated for the
+    whole horizon; sums and the squared-deviation total are updated as one
+    value enters and one leaves, and the repeated highs/lows make the
+    window extremes suffix maxima/minima computed once. Each step is O(1)
+    per symbol with no allocation beyond the feature row.
+
+    Works on 1-D series or 2-D (symbols × time) arrays like
+    build_window_features, and keeps float32 closes in float32.
+    """
+
+    def __init__(self, close, high, low, volume, window_size, steps):
+        """
+        Args:
+            close, high, low, volume: array-like bar columns (volume may be None)
+            window_size: int, bars per window
+            steps: int, number of values that will be pushed
+        """
+        close = as_float_array(close)
+        if close.shape[-1] < window_size:
+            raise ValueError(f"Need at least {window_size} bars, got {close.shape[-1]}")
+        self.window_size = window_size
+        self.step = 0
+        self.dtype = close.dtype
+        shape = close.shape[:-1] + (window_size + steps,)
+
+        self.close = np.empty(shape, dtype=self.dtype)
+        self.close[..., :window_size] = close[..., -window_size:]
+        self.volume = np.empty(shape, dtype=self.dtype)
+        if volume is None:
+            self.volume[...] = 0.0
+        else:
+            self.volume[..., :window_size] = np.asarray(volume)[..., -window_size:]
+            self.volume[..., window_size:] = self.volume[..., window_size - 1:window_size]
+
+        # Windows only gain copies of the last high/low, so the extreme of
+        # the window starting at step t is the suffix extreme from t
+        high = as_float_array(high, self.dtype)[..., -window_size:]
+        low = as_float_array(low, self.dtype)[..., -window_size:]
+        self.high_max = np.maximum.accumulate(high[..., ::-1], axis=-1)[..., ::-1]
+        self.low_min = np.minimum.accumulate(low[..., ::-1], axis=-1)[..., ::-1]
+
+        # Same two-pass formulas as build_window_features for the first window
+        first = self.close[..., :window_size]
+        self.mean = first.mean(axis=-1)
+        self.m2 = ((first - self.mean[..., None]) ** 2).sum(axis=-1)
+        self.volume_mean = self.volume[..., :window_size].mean(axis=-1)
+
+    def features(self):
+        """
+        Feature row of the current window
+
+        Returns:
+            np.ndarray: shape (..., len(FEATURE_NAMES))
+        """
+        w = self.window_size
+        t = self.step
+        row = np.empty(self.mean.shape + (len(FEATURE_NAMES),), dtype=self.dtype)
+        row[..., 0] = self.mean
+        row[..., 1] = np.sqrt(np.maximum(self.m2, 0.0) / (w - 1))
+        row[..., 2] = self.high_max[..., min(t, w - 1)]
+        row[..., 3] = self.low_min[..., min(t, w - 1)]
+        row[..., 4] = self.volume_mean
+        first = self.close[..., t]
+        row[..., 5] = (self.close[..., t + w - 1] - first) / first
+        return row
+
+    def push(self, close):
+        """
+        Slide the window one bar forward with a new close
+
+        Args:
+            close: float or array (...,) of predicted closes
+        """
+        w = self.window_size
+        t = self.step
+        old = self.close[..., t]
+        self.close[..., t + w] = close
+        new = self.close[..., t + w]
+
+        # Replace the oldest value in one step (same update as the
+        # incremental indicators' rolling mean)
+        old_mean = self.mean
+        self.mean = old_mean + (new - old) / w
+        self.m2 = self.m2 + (new - old) * (new - self.mean + old - old_mean)
+        self.volume_mean = self.volume_mean + (self.volume[..., t + w] - self.volume[..., t]) / w
+        self.step = t + 1
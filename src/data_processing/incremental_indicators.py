@@ -0,0 +1,342 @@
+"""
+SIAPS - Incremental Technical Indicators
+O(1)-per-bar updates of the indicators used by MultiModelPredictor
+
+Each symbol keeps a compact state (EMA values, rolling sums, monotonic
+deques) instead of its full history. Feeding a new bar, or revising the
+current bar with a tick, updates MACD, RSI, Bollinger Bands, KDJ and the
+volume trend in constant time. A revisable bar keeps only what it changed
+(the scalars it overwrote and the deque elements it evicted), so revising
+it undoes that change instead of restoring a copy of the whole state. The resulting snapshot has the same keys and
+values as MultiModelPredictor._compute_technical_indicators and can be
+passed to predict_multi_timeframe(indicators=...).
+"""
+import math
+from collections import deque
+from typing import Dict, Optional
+import numpy as np
+
+
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGNAL = 9
+RSI_PERIOD = 14
+BOLL_PERIOD = 20
+BOLL_WIDTH = 2
+KDJ_PERIOD = 14
+KDJ_COM = 2
+VOLUME_PERIOD = 5
+
+NAN = float('nan')
+
+
+class _EMA:
+    """Exponential moving average matching pandas ewm(adjust=False)"""
+
+    __slots__ = ('alpha', 'value')
+
+    def __init__(self, alpha):
+        self.alpha = alpha
+        self.value = None
+
+    def update(self, x):
+        if self.value is None:
+            self.value = x
+        else:
+            # Same operation order as pandas' online ewm kernel
+            old_wt = 1.0 - self.alpha
+            self.value = (old_wt * self.value + self.alpha * x) / (old_wt + self.alpha)
+        return self.value
+
+
+class _RollingMean:
+    """Rolling mean and sample variance over a fixed window"""
+
+    __slots__ = ('window', 'values', 'mean', 'm2')
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, x):
+        """Fold in x; returns what undo() needs to take it out again"""
+        change = (self.mean, self.m2, None)
+        self.values.append(x)
+        n = len(self.values)
+        if n <= self.window:
+            # Welford add
+            delta = x - self.mean
+            self.mean += delta / n
+            self.m2 += delta * (x - self.mean)
+        else:
+            # Replace the oldest value in one step
+            old = self.values.popleft()
+            old_mean = self.mean
+            self.mean += (x - old) / self.window
+            self.m2 += (x - old) * (x - self.mean + old - old_mean)
+            change = (change[0], change[1], old)
+        return change
+
+    def undo(self, change):
+        """Revert the update that returned change (the most recent one)"""
+        self.mean, self.m2, evicted = change
+        self.values.pop()
+        if evicted is not None:
+            self.values.appendleft(evicted)
+
+    @property
+    def full(self):
+        return len(self.values) >= self.window
+
+    def value(self):
+        return self.mean if self.full else NAN
+
+    def std(self):
+        if not self.full:
+            return NAN
+        return math.sqrt(max(self.m2, 0.0) / (self.window - 1))
+
+
+class _RollingExtreme:
+    """Rolling max (or min) with a monotonic deque, amortized O(1) per update"""
+
+    __slots__ = ('window', 'is_max', 'index', 'candidates')
+
+    def __init__(self, window, is_max):
+        self.window = window
+        self.is_max = is_max
+        self.index = -1
+        self.candidates = deque()  # (index, value), values monotonic
+
+    def update(self, x):
+        """Fold in x; returns the candidates it dropped, for undo()"""
+        self.index += 1
+        dropped = []
+        if self.is_max:
+            while self.candidates and self.candidates[-1][1] <= x:
+                dropped.append(self.candidates.pop())
+        else:
+            while self.candidates and self.candidates[-1][1] >= x:
+                dropped.append(self.candidates.pop())
+        self.candidates.append((self.index, x))
+        expired = None
+        if self.candidates[0][0] <= self.index - self.window:
+            expired = self.candidates.popleft()
+        return dropped, expired
+
+    def undo(self, change):
+        """Revert the update that returned change (the most recent one)"""
+        dropped, expired = change
+        if expired is not None:
+            self.candidates.appendleft(expired)
+        self.candidates.pop()
+        self.candidates.extend(reversed(dropped))
+        self.index -= 1
+
+    def value(self):
+        if self.index + 1 < self.window:
+            return NAN
+        return self.candidates[0][1]
+
+
+class IncrementalIndicators:
+    """Per-symbol indicator state updated one bar (or tick) at a time"""
+
+    # State a bar overwrites: plain scalars, EMA values, and windows that undo their own update
+    _SCALARS = ('bars', 'close', 'volume', 'prev_close', 'macd', 'rsv')
+    _EMAS = ('ema_fast', 'ema_slow', 'ema_signal', 'k', 'd')
+    _WINDOWS = ('gain', 'loss', 'boll', 'high_max', 'low_min', 'volume_ma')
+
+    def __init__(self):
+        self.bars = 0
+        self.close = NAN
+        self.volume = NAN
+        self.prev_close = None
+        self.ema_fast = _EMA(2.0 / (MACD_FAST + 1))
+        self.ema_slow = _EMA(2.0 / (MACD_SLOW + 1))
+        self.ema_signal = _EMA(2.0 / (MACD_SIGNAL + 1))
+        self.gain = _RollingMean(RSI_PERIOD)
+        self.loss = _RollingMean(RSI_PERIOD)
+        self.boll = _RollingMean(BOLL_PERIOD)
+        self.high_max = _RollingExtreme(KDJ_PERIOD, is_max=True)
+        self.low_min = _RollingExtreme(KDJ_PERIOD, is_max=False)
+        self.k = _EMA(1.0 / (1 + KDJ_COM))
+        self.d = _EMA(1.0 / (1 + KDJ_COM))
+        self.volume_ma = _RollingMean(VOLUME_PERIOD)
+        self.macd = NAN
+        self.rsv = NAN
+        # Undo record of the current bar, kept so a tick can revise that bar
+        self._undo = None
+
+    def _checkpoint(self):
+        """Scalars and EMA values before a bar"""
+        return (tuple(getattr(self, name) for name in self._SCALARS),
+                tuple(getattr(self, name).value for name in self._EMAS))
+
+    def update(self, close, high, low, volume=0.0, revisable=True):
+        """
+        Fold in a new completed bar
+
+        Args:
+            close, high, low: float prices of the bar
+            volume: float volume of the bar
+            revisable: keep the previous state so revise() can replace this
+                bar (skipped during bulk warm-up)
+        """
+        checkpoint = self._checkpoint() if revisable else None
+        changes = self._apply(float(close), float(high), float(low), float(volume))
+        self._undo = (checkpoint, changes) if revisable else None
+
+    def revise(self, close, high, low, volume=0.0):
+        """
+        Replace the most recent bar, e.g. with an intraday tick
+
+        Args:
+            close, high, low: float prices of the bar so far
+            volume: float volume of the bar so far
+        """
+        if self._undo is None:
+            self.update(close, high, low, volume)
+            return
+        (scalars, ema_values), changes = self._undo
+        for name, value in zip(self._SCALARS, scalars):
+            setattr(self, name, value)
+        for name, value in zip(self._EMAS, ema_values):
+            getattr(self, name).value = value
+        for name, change in zip(self._WINDOWS, changes):
+            getattr(self, name).undo(change)
+        changes = self._apply(float(close), float(high), float(low), float(volume))
+        self._undo = ((scalars, ema_values), changes)
+
+    def _apply(self, close, high, low, volume):
+        """Fold in a bar; returns the windows' undo records, in _WINDOWS order"""
+        # MACD
+        fast = self.ema_fast.update(close)
+        slow = self.ema_slow.update(close)
+        self.macd = fast - slow
+        self.ema_signal.update(self.macd)
+
+        # RSI: the first bar has no change and counts as zero gain and loss
+        delta = 0.0 if self.prev_close is None else close - self.prev_close
+        gain_change = self.gain.update(delta if delta > 0 else 0.0)
+        loss_change = self.loss.update(-delta if delta < 0 else 0.0)
+
+        # Bollinger
+        boll_change = self.boll.update(close)
+
+        # KDJ: neutral RSV until the window fills or when the range is flat
+        high_change = self.high_max.update(high)
+        low_change = self.low_min.update(low)
+        highest = self.high_max.value()
+        lowest = self.low_min.value()
+        price_range = highest - lowest
+        if math.isnan(price_range) or price_range == 0:
+            self.rsv = 50.0
+        else:
+            self.rsv = (close - lowest) / price_range * 100
+        self.d.update(self.k.update(self.rsv))
+
+        volume_change = self.volume_ma.update(volume)
+
+        self.prev_close = close
+        self.close = close
+        self.volume = volume
+        self.bars += 1
+        return gain_change, loss_change, boll_change, high_change, low_change, volume_change
+
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Current indicator values
+
+        Returns:
+            dict: same keys as MultiModelPredictor._compute_technical_indicators
+        """
+        if self.bars == 0:
+            raise ValueError("No bars folded in yet")
+
+        gain = self.gain.value()
+        loss = self.loss.value()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = np.float64(gain) / np.float64(loss)
+            rsi = float(100 - (100 / (1 + rs)))
+
+        ma20 = self.boll.value()
+        std20 = self.boll.std()
+        k = self.k.value
+        d = self.d.value
+
+        volume_ma5 = self.volume_ma.value()
+        volume_trend = 1.0
+        if not math.isnan(volume_ma5) and volume_ma5 > 0:
+            volume_trend = self.volume / volume_ma5
+
+        return {
+            'close': self.close,
+            'MACD': self.macd,
+            'MACD_Signal': self.ema_signal.value,
+            'MACD_Hist': self.macd - self.ema_signal.value,
+            'RSI': rsi,
+            'Bollinger_Upper': ma20 + std20 * BOLL_WIDTH,
+            'Bollinger_Lower': ma20 - std20 * BOLL_WIDTH,
+            'KDJ_K': k,
+            'KDJ_D': d,
+            'KDJ_J': 3 * k - 2 * d,
+            'Volume_Trend': float(volume_trend),
+        }
+
+
+class IncrementalIndicatorEngine:
+    """Incremental indicators for many symbols"""
+
+    def __init__(self):
+        self.states: Dict[str, IncrementalIndicators] = {}
+
+    def __contains__(self, stock_code):
+        return stock_code in self.states
+
+    def __len__(self):
+        return len(self.states)
+
+    def warm_up(self, stock_code: str, bars) -> Dict[str, float]:
+        """
+        (Re)build a symbol's state from historical bars
+
+        Args:
+            stock_code: Stock code
+            bars: DataFrame with close, high, low and optionally volume columns
+
+        Returns:
+            dict: indicator snapshot after the last bar
+        """
+        state = IncrementalIndicators()
+        close = bars['close'].to_numpy(dtype=float)
+        high = bars['high'].to_numpy(dtype=float)
+        low = bars['low'].to_numpy(dtype=float)
+        if 'volume' in bars.columns:
+            volume = bars['volume'].to_numpy(dtype=float)
+        else:
+            volume = np.zeros(len(close))
+        last = len(close) - 1
+        for i in range(len(close)):
+            state.update(close[i], high[i], low[i], volume[i], revisable=(i == last))
+        self.states[stock_code] = state
+        return state.snapshot()
+
+    def update(self, stock_code: str, close, high, low, volume=0.0) -> Dict[str, float]:
+        """Fold a new bar into a symbol's state and return its snapshot"""
+        state = self.states.setdefault(stock_code, IncrementalIndicators())
+        state.update(close, high, low, volume)
+        return state.snapshot()
+
+    def revise(self, stock_code: str, close, high, low, volume=0.0) -> Dict[str, float]:
+        """Revise a symbol's current bar with a tick and return its snapshot"""
+        state = self.states.setdefault(stock_code, IncrementalIndicators())
+        state.revise(close, high, low, volume)
+        return state.snapshot()
+
+    def snapshot(self, stock_code: str) -> Optional[Dict[str, float]]:
+        """Latest indicators for a symbol, or None if unknown"""
+        state = self.states.get(stock_code)
+        return state.snapshot() if state is not None else None
@@ -0,0 +1,487 @@
+"""
+SIAPS - Vectorized Technical Indicators
+NumPy indicator math over 1-D (time) or 2-D (symbols × time) arrays
+
+All functions operate along the last axis, so a whole watchlist stacked into
+a (symbols × time) matrix is processed in the same few array passes as a
+single series. Values match the pandas formulas used by MultiModelPredictor.
+
+compute_indicators is the shared entry point: it computes any set of MA,
+EMA, MACD, Wilder RSI, Bollinger, KDJ, ATR and OBV in one call, sharing the
+rolling windows between indicators and advancing every recursive (EMA-style)
+indicator in a single pass over time.
+
+Float32 inputs are computed and returned in float32, halving the memory of
+universe-scale matrices; any other input is computed in float64.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.data_processing.kernels import ewm_stack
+
+
+# Floating dtypes kept as given; everything else is converted to float64
+FLOAT_DTYPES = (np.float32, np.float64)
+
+
+def as_float_array(x, dtype=None):
+    """
+    Array of x in a floating dtype, without copying when none is needed
+
+    Args:
+        x: array-like
+        dtype: target dtype (default: keep float32/float64, else float64)
+
+    Returns:
+        np.ndarray
+    """
+    x = np.asarray(x)
+    if dtype is None:
+        dtype = x.dtype if x.dtype in FLOAT_DTYPES else np.float64
+    return x.astype(dtype, copy=False)
+
+
+def _pad_front(values, window, n):
+    """Left-pad a rolling result with NaN so it aligns with the input"""
+    out = np.full(values.shape[:-1] + (n,), np.nan, dtype=values.dtype)
+    out[..., window - 1:] = values
+    return out
+
+
+def ema(x, alpha, backend=None):
+    """
+    Exponential moving average, pandas ewm(alpha=alpha, adjust=False)
+
+    Args:
+        x: array (..., time) without NaN
+        alpha: float smoothing factor
+        backend: recursion kernel, 'numba' or 'numpy' (default: config INDICATOR_KERNELS)
+
+    Returns:
+        np.ndarray: same shape as x
+    """
+    x = as_float_array(x)
+    return _smooth([(x, alpha, None)], [], x.shape[-1], x.dtype, backend)[0][0]
+
+
+def ema_span(x, span):
+    """EMA with pandas' span parameterization (alpha = 2 / (span + 1))"""
+    return ema(x, 2.0 / (span + 1))
+
+
+def rolling_mean(x, window):
+    """Rolling mean, NaN until `window` values are available"""
+    x = as_float_array(x)
+    if x.shape[-1] < window:
+        return np.full(x.shape, np.nan, dtype=x.dtype)
+    return _pad_front(sliding_window_view(x, window, axis=-1).mean(axis=-1), window, x.shape[-1])
+
+
+def rolling_std(x, window, ddof=1):
+    """Rolling standard deviation, NaN until `window` values are available"""
+    x = as_float_array(x)
+    if x.shape[-1] < window:
+        return np.full(x.shape, np.nan, dtype=x.dtype)
+    return _pad_front(sliding_window_view(x, window, axis=-1).std(axis=-1, ddof=ddof), window, x.shape[-1])
+
+
+def rolling_max(x, window):
+    """Rolling maximum, NaN until `window` values are available"""
+    x = as_float_array(x)
+    if x.shape[-1] < window:
+        return np.full(x.shape, np.nan, dtype=x.dtype)
+    return _pad_front(sliding_window_view(x, window, axis=-1).max(axis=-1), window, x.shape[-1])
+
+
+def rolling_min(x, window):
+    """Rolling minimum, NaN until `window` values are available"""
+    x = as_float_array(x)
+    if x.shape[-1] < window:
+        return np.full(x.shape, np.nan, dtype=x.dtype)
+    return _pad_front(sliding_window_view(x, window, axis=-1).min(axis=-1), window, x.shape[-1])
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """
+    MACD line, signal line and histogram
+
+    Returns:
+        tuple: (macd, signal, histogram) arrays shaped like close
+    """
+    line = ema_span(close, fast) - ema_span(close, slow)
+    signal_line = ema_span(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def rsi_sma(close, period=14):
+    """
+    RSI from simple rolling means of gains and losses
+
+    The first bar counts as zero gain and loss, as in the pandas formula
+    `delta.where(delta > 0, 0).rolling(period).mean()`.
+    """
+    close = as_float_array(close)
+    delta = np.zeros_like(close)
+    delta[..., 1:] = np.diff(close, axis=-1)
+    gain = rolling_mean(np.where(delta > 0, delta, 0.0), period)
+    loss = rolling_mean(np.where(delta < 0, -delta, 0.0), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = gain / loss
+        return 100 - (100 / (1 + rs))
+
+
+def bollinger(close, period=20, width=2):
+    """
+    Bollinger Bands
+
+    Returns:
+        tuple: (middle, upper, lower) arrays shaped like close
+    """
+    middle = rolling_mean(close, period)
+    std = rolling_std(close, period)
+    return middle, middle + std * width, middle - std * width
+
+
+def kdj(close, high, low, period=14, com=2):
+    """
+    KDJ stochastic oscillator
+
+    RSV is neutral (50) until the window fills and whenever the high-low
+    range is zero.
+
+    Returns:
+        tuple: (k, d, j) arrays shaped like close
+    """
+    close = as_float_array(close)
+    highest = rolling_max(high, period)
+    lowest = rolling_min(low, period)
+    price_range = highest - lowest
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsv = (close - lowest) / price_range * 100
+    rsv = np.where(np.isnan(price_range) | (price_range == 0), 50.0, rsv)
+    alpha = 1.0 / (1 + com)
+    k = ema(rsv, alpha)
+    d = ema(k, alpha)
+    return k, d, 3 * k - 2 * d
+
+
+def obv(close, volume):
+    """
+    On-balance volume: running sum of volume signed by the close-to-close move
+
+    Starts at zero on the first bar; a NaN volume propagates forward.
+
+    Returns:
+        np.ndarray: shaped like close
+    """
+    close = as_float_array(close)
+    delta = np.zeros_like(close)
+    delta[..., 1:] = np.diff(close, axis=-1)
+    return np.cumsum(np.sign(delta) * as_float_array(volume, close.dtype), axis=-1)
+
+
+def rsi_wilder(close, period=14):
+    """
+    RSI with Wilder's smoothing of gains and losses
+
+    The averages are seeded with the simple mean of the first `period`
+    changes, so the first value is at index `period`.
+    """
+    return compute_indicators(close, names=('rsi',), params={'rsi': period})['RSI']
+
+
+def atr(high, low, close, period=14):
+    """
+    Average true range with Wilder's smoothing
+
+    The first bar has no previous close, so the average is seeded with the
+    mean true range of bars 1..period and the first value is at index
+    `period`.
+    """
+    return compute_indicators(close, high, low, names=('atr',), params={'atr': period})['ATR']
+
+
+def volume_trend(volume, period=5):
+    """
+    Latest volume relative to its rolling mean (1.0 when unavailable)
+
+    Returns:
+        np.ndarray: shape of volume without the time axis
+    """
+    volume = as_float_array(volume)
+    if volume.shape[-1] < period:
+        return np.ones(volume.shape[:-1], dtype=volume.dtype)
+    ma = volume[..., -period:].mean(axis=-1)
+    valid = ~np.isnan(ma) & (ma > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(valid, volume[..., -1] / ma, 1.0)
+
+
+# Indicators compute_indicators knows
+INDICATORS = ('ma', 'ema', 'macd', 'rsi', 'rsi_sma', 'bollinger', 'kdj', 'atr', 'obv', 'volume_trend')
+
+# Default parameters, overridden per indicator by compute_indicators(params=...)
+DEFAULT_PARAMS = {
+    'ma': (5, 10, 20),      # windows
+    'ema': (12, 26),        # spans
+    'macd': (12, 26, 9),    # fast span, slow span, signal span
+    'rsi': 14,              # Wilder period
+    'rsi_sma': 14,          # rolling-mean period
+    'bollinger': (20, 2),   # period, width in standard deviations
+    'kdj': (14, 2),         # window, smoothing com
+    'atr': 14,              # Wilder period
+    'volume_trend': 5,      # rolling-mean period
+}
+
+# Inputs besides close each indicator needs
+_NEEDS_RANGE = ('kdj', 'atr')
+_NEEDS_VOLUME = ('obv', 'volume_trend')
+
+# The indicators the technical model scores
+TECHNICAL_MODEL_INDICATORS = ('macd', 'rsi_sma', 'bollinger', 'kdj', 'volume_trend')
+
+# Indicators reported next to the technical model's, and their snapshot keys
+# (technical_snapshot(display=True); OBV only with volume)
+DISPLAY_INDICATORS = ('ma', 'atr', 'obv')
+DISPLAY_KEYS = tuple(f'MA{window}' for window in DEFAULT_PARAMS['ma']) + ('ATR', 'OBV')
+
+
+class IndicatorSet(dict):
+    """
+    Indicator series keyed by name, each shaped like the input close
+
+    Keys: MA{window}, EMA{span}, MACD, MACD_Signal, MACD_Hist, RSI (Wilder),
+    RSI_SMA, Bollinger_Middle, Bollinger_Upper, Bollinger_Lower, KDJ_K,
+    KDJ_D, KDJ_J, ATR, OBV and Volume_Trend, for the indicators requested.
+    """
+
+    def latest(self):
+        """Latest value of every indicator (arrays with the time axis removed)"""
+        return {key: values[..., -1] for key, values in self.items()}
+
+
+def _smooth(rows, dependents, n, dtype, backend=None):
+    """
+    Advance every recursive indicator in one pass over time
+
+    Each row follows pandas' ewm(alpha, adjust=False) recursion. Rows are
+    stacked time-major, so each step updates all indicators (and all
+    symbols) on one contiguous block; the time loop itself runs in the
+    kernels module (compiled with Numba when installed).
+
+    Args:
+        rows: list of (x, alpha, seed) with x (..., n); seed None starts at
+            x[0], an int p starts at the mean of x[1:p+1] on bar p (Wilder)
+        dependents: list of (a, b, alpha) smoothing y[a] - y[b] of the rows
+            (b None for y[a] alone), updated in the same step
+        n: number of bars
+        dtype: computation dtype
+        backend: kernel backend (default: kernels.default_kernel())
+
+    Returns:
+        tuple: (row outputs, dependent outputs), each a list of (..., n) arrays
+    """
+    lead = rows[0][0].shape[:-1]
+    # A constant zero row lets single-row dependents use the same difference
+    zero = len(rows)
+    x = np.empty((n, zero + 1, int(np.prod(lead, dtype=np.int64))), dtype=dtype)
+    for i, (values, _, _) in enumerate(rows):
+        x[:, i] = np.moveaxis(values, -1, 0).reshape(n, -1)
+    x[:, zero] = 0
+
+    seed_at = [-1 if seed is None else seed for _, _, seed in rows] + [-1]
+    seed_values = np.zeros(x.shape[1:], dtype=dtype)
+    for i, (_, _, seed) in enumerate(rows):
+        if seed is not None and seed < n:
+            seed_values[i] = x[1:seed + 1, i].mean(axis=0)
+
+    y, z = ewm_stack(
+        x, [alpha for _, alpha, _ in rows] + [0.0], seed_at, seed_values,
+        [a for a, _, _ in dependents], [zero if b is None else b for _, b, _ in dependents],
+        [alpha for _, _, alpha in dependents], backend=backend
+    )
+
+    def series(stack, i):
+        return np.moveaxis(stack[:, i].reshape((n,) + lead), 0, -1)
+
+    return ([series(y, i) for i in range(len(rows))],
+            [series(z, i) for i in range(len(dependents))])
+
+
+def compute_indicators(close, high=None, low=None, volume=None, names=INDICATORS, params=None, backend=None):
+    """
+    Compute a set of indicators in one pass
+
+    Rolling means are shared (MA20 is the Bollinger middle band, the SMA RSI
+    and volume trend reuse the same windows) and every recursive indicator
+    (EMAs, MACD signal, Wilder RSI averages, ATR, KDJ K and D) is advanced
+    together by _smooth, so requesting more indicators adds no extra passes.
+
+    Args:
+        close: array (..., time) without NaN
+        high, low: arrays like close, required for 'kdj' and 'atr'
+        volume: array like close, required for 'obv' and 'volume_trend'
+        names: indicators to compute, any of INDICATORS
+        params: dict overriding DEFAULT_PARAMS per indicator
+        backend: recursion kernel, 'numba' or 'numpy' (default: config INDICATOR_KERNELS)
+
+    Returns:
+        IndicatorSet: full series in close's dtype (float32 or float64)
+
+    Raises:
+        ValueError: unknown indicator or kernel, or an input the indicators need is missing
+    """
+    names = tuple(names)
+    unknown = [name for name in names if name not in INDICATORS]
+    if unknown:
+        raise ValueError(f"Unknown indicators: {unknown}. Must be among: {', '.join(INDICATORS)}")
+    if (high is None or low is None) and any(name in names for name in _NEEDS_RANGE):
+        raise ValueError(f"{', '.join(n for n in names if n in _NEEDS_RANGE)} need high and low")
+    if volume is None and any(name in names for name in _NEEDS_VOLUME):
+        raise ValueError(f"{', '.join(n for n in names if n in _NEEDS_VOLUME)} need volume")
+    params = {**DEFAULT_PARAMS, **(params or {})}
+
+    close = as_float_array(close)
+    dtype = close.dtype
+    n = close.shape[-1]
+    high = None if high is None else as_float_array(high, dtype)
+    low = None if low is None else as_float_array(low, dtype)
+    volume = None if volume is None else as_float_array(volume, dtype)
+
+    means = {}
+
+    def mean(key, x, window):
+        if (key, window) not in means:
+            means[key, window] = rolling_mean(x, window)
+        return means[key, window]
+
+    result = IndicatorSet()
+    if 'ma' in names:
+        for window in params['ma']:
+            result[f'MA{window}'] = mean('close', close, window)
+
+    delta = np.zeros_like(close)
+    delta[..., 1:] = np.diff(close, axis=-1)
+    if 'rsi' in names or 'rsi_sma' in names:
+        gain = np.where(delta > 0, delta, 0.0).astype(dtype, copy=False)
+        loss = np.where(delta < 0, -delta, 0.0).astype(dtype, copy=False)
+
+    # === Recursive indicators: collected here, advanced together below ===
+    rows, keys, dependents, dependent_keys = [], {}, [], []
+
+    def row(key, x, alpha, seed=None):
+        if key not in keys:
+            keys[key] = len(rows)
+            rows.append((x, alpha, seed))
+        return keys[key]
+
+    spans = list(params['ema']) if 'ema' in names else []
+    if 'macd' in names:
+        fast, slow, signal = params['macd']
+        dependents.append((row(f'EMA{fast}', close, 2.0 / (fast + 1)), row(f'EMA{slow}', close, 2.0 / (slow + 1)),
+                           2.0 / (signal + 1)))
+        dependent_keys.append('MACD_Signal')
+    for span in spans:
+        row(f'EMA{span}', close, 2.0 / (span + 1))
+    if 'rsi' in names:
+        period = params['rsi']
+        row('_gain', gain, 1.0 / period, period)
+        row('_loss', loss, 1.0 / period, period)
+    if 'atr' in names:
+        period = params['atr']
+        true_range = high - low
+        previous = close[..., :-1]
+        true_range[..., 1:] = np.maximum(
+            true_range[..., 1:], np.maximum(np.abs(high[..., 1:] - previous), np.abs(low[..., 1:] - previous))
+        )
+        row('_atr', true_range, 1.0 / period, period)
+    if 'kdj' in names:
+        window, com = params['kdj']
+        highest = rolling_max(high, window)
+        lowest = rolling_min(low, window)
+        price_range = highest - lowest
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsv = (close - lowest) / price_range * 100
+        # RSV is neutral (50) until the window fills and whenever the range is zero
+        rsv = np.where(np.isnan(price_range) | (price_range == 0), 50.0, rsv).astype(dtype, copy=False)
+        dependents.append((row('KDJ_K', rsv, 1.0 / (1 + com)), None, 1.0 / (1 + com)))
+        dependent_keys.append('KDJ_D')
+
+    if rows:
+        smoothed, dependent_values = _smooth(rows, dependents, n, dtype, backend)
+        smoothed = dict(zip(keys, smoothed))
+        smoothed.update(zip(dependent_keys, dependent_values))
+
+    for span in spans:
+        result[f'EMA{span}'] = smoothed[f'EMA{span}']
+    if 'macd' in names:
+        fast, slow, _ = params['macd']
+        line = smoothed[f'EMA{fast}'] - smoothed[f'EMA{slow}']
+        result['MACD'] = line
+        result['MACD_Signal'] = smoothed['MACD_Signal']
+        result['MACD_Hist'] = line - smoothed['MACD_Signal']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if 'rsi' in names:
+            result['RSI'] = 100 - (100 / (1 + smoothed['_gain'] / smoothed['_loss']))
+        if 'rsi_sma' in names:
+            period = params['rsi_sma']
+            result['RSI_SMA'] = 100 - (100 / (1 + mean('gain', gain, period) / mean('loss', loss, period)))
+    if 'bollinger' in names:
+        period, width = params['bollinger']
+        middle = mean('close', close, period)
+        std = rolling_std(close, period)
+        result['Bollinger_Middle'] = middle
+        result['Bollinger_Upper'] = middle + std * width
+        result['Bollinger_Lower'] = middle - std * width
+    if 'kdj' in names:
+        k, d = smoothed['KDJ_K'], smoothed['KDJ_D']
+        result['KDJ_K'] = k
+        result['KDJ_D'] = d
+        result['KDJ_J'] = 3 * k - 2 * d
+    if 'atr' in names:
+        result['ATR'] = smoothed['_atr']
+    if 'obv' in names:
+        result['OBV'] = obv(close, volume)
+    if 'volume_trend' in names:
+        average = mean('volume', volume, params['volume_trend'])
+        valid = ~np.isnan(average) & (average > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result['Volume_Trend'] = np.where(valid, volume / average, 1.0).astype(dtype, copy=False)
+    return result
+
+
+def technical_snapshot(close, high, low, volume, display=False):
+    """
+    Latest values of every indicator the technical model uses
+
+    Args:
+        close, high, low: arrays (..., time)
+        volume: array like close, or None (neutral volume trend)
+        display: Also return the DISPLAY_INDICATORS (MA5, MA10, MA20, ATR and,
+            with volume, OBV) from the same pass
+
+    Returns:
+        dict: same keys as MultiModelPredictor._compute_technical_indicators
+        (plus the display keys), each an array with the time axis removed
+    """
+    close = as_float_array(close)
+    names = TECHNICAL_MODEL_INDICATORS if volume is not None else TECHNICAL_MODEL_INDICATORS[:-1]
+    if display:
+        names += DISPLAY_INDICATORS if volume is not None else DISPLAY_INDICATORS[:-1]
+    latest = compute_indicators(close, high, low, volume, names=names).latest()
+    snapshot = {
+        'close': close[..., -1],
+        'MACD': latest['MACD'],
+        'MACD_Signal': latest['MACD_Signal'],
+        'MACD_Hist': latest['MACD_Hist'],
+        'RSI': latest['RSI_SMA'],
+        'Bollinger_Upper': latest['Bollinger_Upper'],
+        'Bollinger_Lower': latest['Bollinger_Lower'],
+        'KDJ_K': latest['KDJ_K'],
+        'KDJ_D': latest['KDJ_D'],
+        'KDJ_J': latest['KDJ_J'],
+        'Volume_Trend': latest.get('Volume_Trend', np.ones(close.shape[:-1], dtype=close.dtype)),
+    }
+    if display:
+        snapshot.update({key: latest[key] for key in DISPLAY_KEYS if key in latest})
+    return snapshot
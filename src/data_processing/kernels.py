@@ -0,0 +1,136 @@
+"""
+SIAPS - Recursive Indicator Kernels
+Compiled loops for the EMA-style recursions behind MACD, KDJ, Wilder RSI and ATR
+
+Each bar of a recursive indicator depends on the previous one, so NumPy can
+only vectorize across symbols and indicators and still steps through time in
+Python. When Numba is installed the same recursion runs as a compiled loop;
+otherwise the NumPy implementation is used. Both evaluate the identical
+expression in the input dtype, so they return the same values.
+
+Backends:
+    numpy   time loop in Python, vectorized over indicators and symbols
+    numba   compiled loop (requires the optional numba package,
+            pip install -r requirements-jit.txt)
+"""
+from typing import List
+import numpy as np
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+ROOT_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from config.settings import INDICATOR_KERNELS
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def _ewm_stack_numpy(x, alpha, old_wt, denom, seed_at, seed_values, left, right, alpha2, old_wt2, denom2, y, z):
+    """Fill y[1:] and z[1:] stepping through time, all rows and symbols per step"""
+    n = x.shape[0]
+    alpha, old_wt, denom = alpha[:, None], old_wt[:, None], denom[:, None]
+    alpha2, old_wt2, denom2 = alpha2[:, None], old_wt2[:, None], denom2[:, None]
+    seeded = {}
+    for i, t in enumerate(seed_at):
+        if 0 < t < n:
+            seeded.setdefault(int(t), []).append(i)
+    for t in range(1, n):
+        y[t] = (old_wt * y[t - 1] + alpha * x[t]) / denom
+        for i in seeded.get(t, ()):
+            y[t, i] = seed_values[i]
+        if len(left):
+            z[t] = (old_wt2 * z[t - 1] + alpha2 * (y[t, left] - y[t, right])) / denom2
+
+
+def _ewm_stack_loop(x, alpha, old_wt, denom, seed_at, seed_values, left, right, alpha2, old_wt2, denom2, y, z):
+    """Same recursion as _ewm_stack_numpy, element by element (compiled by Numba)"""
+    n, rows, m = x.shape
+    for t in range(1, n):
+        for i in range(rows):
+            if seed_at[i] == t:
+                for j in range(m):
+                    y[t, i, j] = seed_values[i, j]
+            else:
+                for j in range(m):
+                    y[t, i, j] = (old_wt[i] * y[t - 1, i, j] + alpha[i] * x[t, i, j]) / denom[i]
+        for r in range(left.shape[0]):
+            for j in range(m):
+                z[t, r, j] = (old_wt2[r] * z[t - 1, r, j] +
+                              alpha2[r] * (y[t, left[r], j] - y[t, right[r], j])) / denom2[r]
+
+
+KERNELS = {'numpy': _ewm_stack_numpy}
+if numba is not None:
+    KERNELS['numba'] = numba.njit(cache=True, nogil=True)(_ewm_stack_loop)
+
+
+def available_kernels() -> List[str]:
+    """Names of the kernel backends usable in this environment"""
+    return list(KERNELS)
+
+
+def default_kernel() -> str:
+    """Backend from config INDICATOR_KERNELS ('auto' prefers numba when installed)"""
+    if INDICATOR_KERNELS == 'auto':
+        return 'numba' if 'numba' in KERNELS else 'numpy'
+    return INDICATOR_KERNELS
+
+
+def ewm_stack(x, alpha, seed_at, seed_values, left, right, alpha2, backend=None):
+    """
+    Advance a stack of EMA-style recursions and their dependents through time
+
+    Every row follows pandas' ewm(alpha, adjust=False) recursion
+    y[t] = ((1 - alpha) * y[t-1] + alpha * x[t]) / ((1 - alpha) + alpha);
+    a row with seed_at[i] = p instead holds seed_values[i] from bar p on
+    (Wilder's smoothing). Dependent rows r follow the same recursion over
+    y[:, left[r]] - y[:, right[r]].
+
+    Args:
+        x: (time, rows, symbols) contiguous inputs
+        alpha: (rows,) smoothing factors
+        seed_at: (rows,) int bar of the seed, -1 for rows starting at x[0]
+        seed_values: (rows, symbols) seeds (ignored where seed_at is -1)
+        left, right: (dependents,) int row indices
+        alpha2: (dependents,) smoothing factors
+        backend: 'numba' or 'numpy' (default: default_kernel())
+
+    Returns:
+        tuple: (y, z) arrays (time, rows, symbols) and (time, dependents,
+        symbols) in x's dtype; rows with a seed are NaN before it
+
+    Raises:
+        ValueError: if the backend is unknown or not installed
+    """
+    backend = backend or default_kernel()
+    if backend not in KERNELS:
+        raise ValueError(f"Unknown or unavailable indicator kernel '{backend}', "
+                         f"available: {', '.join(available_kernels())}")
+    dtype = x.dtype
+
+    def weights(alphas):
+        # Same rounding as pandas: weights formed in float64, applied in the input dtype
+        alphas = np.asarray(alphas, dtype=np.float64)
+        old_wt = 1.0 - alphas
+        return alphas.astype(dtype), old_wt.astype(dtype), (old_wt + alphas).astype(dtype)
+
+    alpha, old_wt, denom = weights(alpha)
+    alpha2, old_wt2, denom2 = weights(alpha2)
+    seed_at = np.asarray(seed_at, dtype=np.int64)
+    left = np.asarray(left, dtype=np.int64)
+    right = np.asarray(right, dtype=np.int64)
+
+    y = np.empty_like(x)
+    y[0] = x[0]
+    y[0, seed_at >= 0] = np.nan
+    z = np.empty((x.shape[0], len(left), x.shape[2]), dtype=dtype)
+    if len(left):
+        z[0] = y[0, left] - y[0, right]
+    KERNELS[backend](x, alpha, old_wt, denom, seed_at, np.asarray(seed_values, dtype=dtype),
+                     left, right, alpha2, old_wt2, denom2, y, z)
+    return y, z
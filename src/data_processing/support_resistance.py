@@ -0,0 +1,140 @@
+"""
+SIAPS - Support and Resistance Levels
+Vectorized pivot detection and clustering of nearby pivots into zones
+
+A bar is a resistance pivot when its high is the highest of the centered
+window of 2 * radius + 1 bars, and a support pivot when its low is the
+lowest. Pivots within a relative tolerance of each other are merged into
+one zone whose level is the weighted mean of its pivots, so a price that
+was tested several times counts as one stronger level instead of many
+nearly identical ones.
+"""
+from typing import Dict, Optional, Tuple
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# Bars on each side of a pivot
+PIVOT_RADIUS = 2
+
+# Pivots within this relative distance of a zone's lowest price join the zone
+LEVEL_TOLERANCE = 0.005
+
+
+def find_pivots(high, low, radius: int = PIVOT_RADIUS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Locate local highs and lows
+
+    Args:
+        high: array-like, high prices
+        low: array-like, low prices
+        radius: int, bars on each side of the center
+
+    Returns:
+        tuple: (resistance_mask, support_mask) boolean arrays; the first and
+        last `radius` bars are never pivots
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    n = len(high)
+    width = 2 * radius + 1
+    resistance = np.zeros(n, dtype=bool)
+    support = np.zeros(n, dtype=bool)
+    if n >= width:
+        center = slice(radius, n - radius)
+        resistance[center] = high[center] == sliding_window_view(high, width).max(axis=-1)
+        support[center] = low[center] == sliding_window_view(low, width).min(axis=-1)
+    return resistance, support
+
+
+def cluster_levels(prices, tolerance: float = LEVEL_TOLERANCE,
+                   weights: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Merge nearby pivot prices into weighted zones
+
+    Zones are built greedily from the lowest price upward: a zone takes
+    every pivot up to (1 + tolerance) times its lowest price, so no zone is
+    wider than the tolerance. The loop runs once per zone, not per pivot.
+
+    Args:
+        prices: array-like, pivot prices
+        tolerance: float, relative zone width
+        weights: array-like or None, weight per pivot (default: 1 per touch)
+
+    Returns:
+        dict: arrays sorted by price -- 'level' (weighted mean), 'low',
+        'high', 'weight' (summed) and 'touches' (pivot count)
+    """
+    prices = np.asarray(prices, dtype=float)
+    weights = np.ones(len(prices)) if weights is None else np.asarray(weights, dtype=float)
+    valid = ~np.isnan(prices)
+    prices, weights = prices[valid], weights[valid]
+    if prices.size == 0:
+        empty = np.empty(0)
+        return {'level': empty, 'low': empty, 'high': empty, 'weight': empty,
+                'touches': np.empty(0, dtype=int)}
+
+    order = np.argsort(prices, kind='stable')
+    sorted_prices = prices[order]
+    sorted_weights = weights[order]
+
+    starts = []
+    start = 0
+    while start < len(sorted_prices):
+        starts.append(start)
+        start = int(np.searchsorted(sorted_prices, sorted_prices[start] * (1 + tolerance), side='right'))
+    starts = np.asarray(starts)
+    ends = np.append(starts[1:], len(sorted_prices))
+
+    total_weight = np.add.reduceat(sorted_weights, starts)
+    return {
+        'level': np.add.reduceat(sorted_prices * sorted_weights, starts) / total_weight,
+        'low': sorted_prices[starts],
+        'high': sorted_prices[ends - 1],
+        'weight': total_weight,
+        'touches': ends - starts,
+    }
+
+
+def nearest_levels(resistance_levels, support_levels, price: float) -> Tuple[float, float]:
+    """
+    Closest resistance above and support below a price
+
+    Falls back to the highest resistance / lowest support when no level lies
+    on the required side.
+
+    Args:
+        resistance_levels: non-empty array of resistance prices
+        support_levels: non-empty array of support prices
+        price: float, current price
+
+    Returns:
+        tuple: (next_resistance, next_support)
+    """
+    resistance_levels = np.asarray(resistance_levels, dtype=float)
+    support_levels = np.asarray(support_levels, dtype=float)
+    above = resistance_levels[resistance_levels > price]
+    below = support_levels[support_levels < price]
+    next_resistance = above.min() if above.size else resistance_levels.max()
+    next_support = below.max() if below.size else support_levels.min()
+    return float(next_resistance), float(next_support)
+
+
+def support_resistance_zones(high, low, radius: int = PIVOT_RADIUS,
+                             tolerance: float = LEVEL_TOLERANCE) -> Tuple[dict, dict]:
+    """
+    Resistance and support zones of a price history
+
+    Args:
+        high: array-like, high prices
+        low: array-like, low prices
+        radius: int, pivot half-window
+        tolerance: float, relative zone width
+
+    Returns:
+        tuple: (resistance_zones, support_zones) as returned by cluster_levels
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    resistance, support = find_pivots(high, low, radius)
+    return cluster_levels(high[resistance], tolerance), cluster_levels(low[support], tolerance)
@@ -2,5 +2,20 @@
 SIAPS Prediction Models Package
 """
 from .multi_model_predictor import MultiModelPredictor
+from .model_cache import ModelCache
+from .parallel import ParallelPredictor, SharedBars
+from .ml_backends import ML_BACKENDS, MLBackend, get_backend, register_backend
+from .online_learner import OnlineLearnerStore, RLSModel
 
-__all__ = ['MultiModelPredictor']
+__all__ = [
+    'MultiModelPredictor',
+    'ModelCache',
+    'ParallelPredictor',
+    'SharedBars',
+    'ML_BACKENDS',
+    'MLBackend',
+    'get_backend',
+    'register_backend',
+    'OnlineLearnerStore',
+    'RLSModel',
+]
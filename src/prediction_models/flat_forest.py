@@ -0,0 +1,101 @@
+"""
+SIAPS - Flattened Random Forest
+A fitted RandomForestRegressor stored as plain NumPy arrays
+
+sklearn's Tree objects copy their node arrays into private memory when
+unpickled, so every worker process that loads a forest holds its own copy.
+FlatForestModel keeps the nodes of all trees in a handful of flat arrays
+instead; loaded with joblib's mmap_mode='r', those arrays are read-only
+views of the file and all processes share the same page-cache pages.
+
+Prediction walks every tree for every row at once, one vectorized step per
+tree level, and reproduces RandomForestRegressor.predict (float32 splits,
+trees summed in order, then averaged).
+"""
+import numpy as np
+
+
+# Child index marking a leaf (sklearn's TREE_LEAF)
+LEAF = -1
+
+
+class FlatForestModel:
+    """StandardScaler + RandomForestRegressor as flat node arrays"""
+
+    def __init__(self, mean, scale, left, right, feature, threshold, value, roots, depth):
+        """
+        Args:
+            mean, scale: arrays (features,), the fitted scaler
+            left, right: arrays (nodes,), global child indices (LEAF for leaves)
+            feature: array (nodes,), split feature per node
+            threshold: array (nodes,), split threshold per node
+            value: array (nodes,), prediction of each node
+            roots: array (trees,), index of each tree's root node
+            depth: int, deepest tree's depth
+        """
+        self.mean = mean
+        self.scale = scale
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.roots = roots
+        self.depth = int(depth)
+
+    @classmethod
+    def from_sklearn(cls, scaler, forest) -> 'FlatForestModel':
+        """
+        Flatten a fitted StandardScaler and single-output RandomForestRegressor
+
+        Returns:
+            FlatForestModel: predicts the same values as
+            forest.predict(scaler.transform(X))
+        """
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        sizes = np.array([tree.node_count for tree in trees])
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+        def children(attribute):
+            parts = []
+            for tree, offset in zip(trees, offsets):
+                child = getattr(tree, attribute).astype(np.int64)
+                parts.append(np.where(child == LEAF, LEAF, child + offset))
+            return np.concatenate(parts)
+
+        return cls(
+            mean=np.asarray(scaler.mean_, dtype=np.float64),
+            scale=np.asarray(scaler.scale_, dtype=np.float64),
+            left=children('children_left'),
+            right=children('children_right'),
+            feature=np.concatenate([tree.feature for tree in trees]).astype(np.int64),
+            threshold=np.concatenate([tree.threshold for tree in trees]).astype(np.float64),
+            value=np.concatenate([tree.value[:, 0, 0] for tree in trees]).astype(np.float64),
+            roots=offsets.astype(np.int64),
+            depth=max(tree.max_depth for tree in trees),
+        )
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the node arrays"""
+        return sum(a.nbytes for a in (self.mean, self.scale, self.left, self.right,
+                                      self.feature, self.threshold, self.value, self.roots))
+
+    def predict(self, X):
+        X = (np.asarray(X, dtype=np.float64) - self.mean) / self.scale
+        # sklearn trees split on float32 features
+        X = X.astype(np.float32)
+        rows = np.arange(len(X))
+        nodes = np.repeat(self.roots[:, None], len(X), axis=1)
+        for _ in range(self.depth):
+            left = self.left[nodes]
+            internal = left != LEAF
+            if not internal.any():
+                break
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(internal, np.where(go_left, left, self.right[nodes]), nodes)
+        return self.value[nodes].sum(axis=0) / self.n_trees
@@ -0,0 +1,198 @@
+"""
+SIAPS - Machine Learning Backends
+Registry of interchangeable regressors for the predictor's ML stage
+
+Every backend turns a feature matrix (columns ordered as FEATURE_NAMES) and
+next-close targets into a fitted model exposing predict(X). Fitted models
+are picklable so ModelCache can keep them in memory and on disk, and keep
+their bulk in NumPy arrays so the disk copy can be memory-mapped. Models
+that forecast without features (the seasonal baseline) also expose
+forecast(steps), which the predictor uses instead of recursive calls.
+
+Backends:
+    random_forest            StandardScaler + RandomForestRegressor (default),
+                             flattened into node arrays (see flat_forest)
+    hist_gradient_boosting   sklearn HistGradientBoostingRegressor
+    ridge                    closed-form ridge regression on standardized features
+    seasonal_naive           repeats the last season of closes
+    online                   recursive least squares, advanced bar by bar per
+                             symbol by the predictor (see online_learner)
+"""
+from typing import Dict, List
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+ROOT_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.prediction_models.flat_forest import FlatForestModel
+from src.prediction_models.online_learner import RLSModel, RLS_DELTA
+from config.settings import ONLINE_FORGETTING_FACTOR
+
+
+# Random forest hyperparameters (also part of the model cache key)
+RANDOM_FOREST_PARAMS = {'n_estimators': 50, 'max_depth': 10, 'random_state': 42}
+
+# Small leaves so short histories still produce more than one split
+HIST_GRADIENT_BOOSTING_PARAMS = {
+    'max_iter': 100, 'learning_rate': 0.1, 'max_leaf_nodes': 15,
+    'min_samples_leaf': 5, 'random_state': 42,
+}
+
+RIDGE_PARAMS = {'alpha': 1.0}
+
+SEASONAL_NAIVE_PARAMS = {'season': 5}
+
+ONLINE_PARAMS = {'forgetting': ONLINE_FORGETTING_FACTOR, 'delta': RLS_DELTA}
+
+
+class RidgeModel:
+    """Linear model fitted in closed form on standardized features"""
+
+    def __init__(self, mean, scale, coef, intercept):
+        self.mean = mean
+        self.scale = scale
+        self.coef = coef
+        self.intercept = intercept
+
+    def predict(self, X):
+        return ((np.asarray(X, dtype=float) - self.mean) / self.scale) @ self.coef + self.intercept
+
+
+class SeasonalNaiveModel:
+    """Repeats the last `season` observed closes; features are ignored"""
+
+    def __init__(self, history):
+        self.history = np.asarray(history, dtype=float)
+
+    def forecast(self, steps: int) -> np.ndarray:
+        """Next `steps` values, cycling through the stored season"""
+        return np.resize(self.history, steps) if steps else np.empty(0)
+
+    def predict(self, X):
+        """One-step forecast from the end of training for every row"""
+        return np.full(len(X), self.history[0])
+
+
+class MLBackend:
+    """Fit interface shared by all backends"""
+
+    # Registry key, label reported in prediction results and hyperparameters
+    name = ''
+    display_name = ''
+    params: Dict = {}
+    # Stateful backends keep a per-symbol model that is updated with new bars
+    # instead of being refitted (and are not stored in ModelCache)
+    stateful = False
+
+    def fit(self, X, y):
+        """
+        Fit a model
+
+        Args:
+            X: array (samples, features)
+            y: array (samples,), next close after each window
+
+        Returns:
+            Fitted model with predict(X)
+        """
+        raise NotImplementedError
+
+    def cache_params(self) -> dict:
+        """Identity of the backend for model cache keys"""
+        return {'backend': self.name, **self.params}
+
+
+class RandomForestBackend(MLBackend):
+    name = 'random_forest'
+    display_name = 'RandomForest'
+    params = RANDOM_FOREST_PARAMS
+
+    def fit(self, X, y):
+        scaler = StandardScaler()
+        estimator = RandomForestRegressor(**self.params)
+        estimator.fit(scaler.fit_transform(X), y)
+        return FlatForestModel.from_sklearn(scaler, estimator)
+
+
+class HistGradientBoostingBackend(MLBackend):
+    name = 'hist_gradient_boosting'
+    display_name = 'HistGradientBoosting'
+    params = HIST_GRADIENT_BOOSTING_PARAMS
+
+    def fit(self, X, y):
+        estimator = HistGradientBoostingRegressor(**self.params)
+        estimator.fit(X, y)
+        return estimator
+
+
+class RidgeBackend(MLBackend):
+    name = 'ridge'
+    display_name = 'Ridge'
+    params = RIDGE_PARAMS
+
+    def fit(self, X, y):
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y, dtype=float)
+        mean = X.mean(axis=0)
+        scale = X.std(axis=0)
+        scale[scale == 0] = 1.0
+        Z = (X - mean) / scale
+        intercept = y.mean()
+        # (ZᵀZ + αI) w = Zᵀ(y - ȳ)
+        gram = Z.T @ Z + self.params['alpha'] * np.eye(Z.shape[1])
+        coef = np.linalg.solve(gram, Z.T @ (y - intercept))
+        return RidgeModel(mean, scale, coef, intercept)
+
+
+class SeasonalNaiveBackend(MLBackend):
+    name = 'seasonal_naive'
+    display_name = 'SeasonalNaive'
+    params = SEASONAL_NAIVE_PARAMS
+
+    def fit(self, X, y):
+        return SeasonalNaiveModel(np.asarray(y, dtype=float)[-self.params['season']:])
+
+
+class OnlineBackend(MLBackend):
+    name = 'online'
+    display_name = 'OnlineRLS'
+    params = ONLINE_PARAMS
+    stateful = True
+
+    def fit(self, X, y):
+        return RLSModel(**self.params).fit(X, y)
+
+
+ML_BACKENDS: Dict[str, MLBackend] = {}
+
+
+def register_backend(backend: MLBackend):
+    """Add (or replace) a backend in the registry"""
+    ML_BACKENDS[backend.name] = backend
+
+
+def get_backend(name: str) -> MLBackend:
+    """
+    Look up a backend by name
+
+    Raises:
+        ValueError: if no backend has that name
+    """
+    try:
+        return ML_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown ML backend '{name}', available: {', '.join(available_backends())}")
+
+
+def available_backends() -> List[str]:
+    return list(ML_BACKENDS)
+
+
+for _backend in (RandomForestBackend(), HistGradientBoostingBackend(), RidgeBackend(), SeasonalNaiveBackend(),
+                 OnlineBackend()):
+    register_backend(_backend)
@@ -0,0 +1,305 @@
+"""
+SIAPS - Trained Model Cache
+In-memory LRU of fitted models with a byte budget, backed by MODEL_CACHE_DIR
+
+Models are keyed by (stock code, last bar date, window size, hyperparameters,
+training data fingerprint), so a repeat prediction on unchanged bars reuses
+the fitted model instead of training a new one. ResultCache memoizes whole
+predictions, which are deterministic for identical inputs.
+
+Models are persisted with joblib, which writes NumPy arrays raw and aligned
+inside the file. Loading with mmap_mode='r' turns those arrays into
+read-only memory maps, so every process (Gunicorn worker, pool worker) that
+loads the same model shares its pages instead of holding a private copy.
+
+Every new bar gives a symbol a new key, so the directory is kept within a
+byte budget of its own: after each write the least recently used files
+(by modification time, refreshed on every disk hit) are deleted.
+"""
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+import joblib
+import numpy as np
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+ROOT_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from config.settings import (
+    MODEL_CACHE_DIR, MODEL_CACHE_DISK_MAX_BYTES, MODEL_CACHE_MAX_BYTES, MODEL_CACHE_MMAP,
+    PREDICTION_RESULT_CACHE_SIZE
+)
+
+# Persisted model file suffix
+MODEL_SUFFIX = '.joblib'
+
+
+def data_fingerprint(*arrays) -> str:
+    """
+    Stable digest of numeric arrays
+
+    Args:
+        *arrays: array-likes (converted to contiguous float64)
+
+    Returns:
+        str: hex digest, identical across processes and runs
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = np.ascontiguousarray(array, dtype=np.float64)
+        digest.update(str(array.shape).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def make_model_key(stock_code, last_bar, window_size, params, fingerprint) -> str:
+    """
+    Build a cache key for a fitted model
+
+    Args:
+        stock_code: str or None
+        last_bar: label of the last training bar (date) or None
+        window_size: int, feature window
+        params: dict, model hyperparameters
+        fingerprint: str, digest of the training data
+
+    Returns:
+        str: filesystem-safe key
+    """
+    raw = json.dumps({
+        'code': stock_code or '',
+        'last_bar': str(last_bar) if last_bar is not None else '',
+        'window': window_size,
+        'params': params,
+        'data': fingerprint,
+    }, sort_keys=True, default=str)
+    code_part = stock_code or 'anon'
+    return f"{code_part}_{hashlib.sha1(raw.encode()).hexdigest()}"
+
+
+class ModelCache:
+    """Thread-safe LRU cache of fitted models with a memory budget and disk backing"""
+
+    def __init__(self, max_bytes: int = MODEL_CACHE_MAX_BYTES,
+                 cache_dir: Optional[Path] = MODEL_CACHE_DIR, mmap: bool = MODEL_CACHE_MMAP,
+                 max_disk_bytes: int = MODEL_CACHE_DISK_MAX_BYTES):
+        """
+        Initialize model cache
+
+        Args:
+            max_bytes: Memory budget; least recently used entries are evicted
+                from memory (not from disk) when exceeded
+            cache_dir: Directory for persisted models (None: memory only)
+            mmap: Memory-map model arrays loaded from disk (shared across
+                processes) instead of reading them into private memory
+            max_disk_bytes: Budget for the model files in cache_dir; least
+                recently used files are deleted when a write exceeds it
+        """
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.mmap = mmap
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._entries = OrderedDict()  # key -> (obj, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Per-key locks so concurrent misses on one key train the model once
+        self._key_locks = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def bytes_used(self) -> int:
+        return self._bytes
+
+    def _path_for(self, key: str) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{key}{MODEL_SUFFIX}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a model in memory, then on disk
+
+        Returns:
+            The cached object, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        path = self._path_for(key)
+        if path is not None and path.exists():
+            try:
+                obj = joblib.load(path, mmap_mode='r' if self.mmap else None)
+                size = path.stat().st_size
+                # Recently used files are the last to be pruned
+                os.utime(path)
+            except Exception:
+                obj = None
+            if obj is not None:
+                self._remember(key, obj, size)
+                with self._lock:
+                    self.disk_hits += 1
+                return obj
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def get_or_create(self, key: str, factory: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Return the cached object for key, building it with factory on a miss
+
+        Concurrent callers missing the same key wait for the first one's
+        result instead of each running the factory.
+
+        Args:
+            key: Cache key
+            factory: Zero-argument callable producing the object
+
+        Returns:
+            tuple: (object, created) where created is False on a cache hit
+        """
+        obj = self.get(key)
+        if obj is not None:
+            return obj, False
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                # Another thread may have built it while we waited
+                obj = self.get(key)
+                if obj is not None:
+                    return obj, False
+                obj = factory()
+                self.put(key, obj)
+                return obj, True
+        finally:
+            with self._lock:
+                if self._key_locks.get(key) is key_lock and not key_lock.locked():
+                    del self._key_locks[key]
+
+    def put(self, key: str, obj: Any):
+        """Store a model in memory and on disk"""
+        path = self._path_for(key)
+        if path is None:
+            self._remember(key, obj, len(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)))
+            return
+
+        # Uncompressed, so the arrays can be memory-mapped when loaded
+        tmp_path = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        joblib.dump(obj, tmp_path, compress=0)
+        size = tmp_path.stat().st_size
+        os.replace(tmp_path, path)
+        self._remember(key, obj, size)
+        self._prune_disk(keep=path)
+
+    def _prune_disk(self, keep: Path):
+        """Delete the least recently used model files until cache_dir fits max_disk_bytes"""
+        files = []
+        for path in self.cache_dir.glob(f'*{MODEL_SUFFIX}'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue  # Removed by another process
+            files.append((stat.st_mtime_ns, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            with self._lock:
+                self.disk_evictions += 1
+
+    def _remember(self, key: str, obj: Any, size: int):
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (obj, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def clear(self, disk: bool = False):
+        """Drop all in-memory entries, and persisted files when disk=True"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if disk and self.cache_dir is not None:
+            for pattern in (f'*{MODEL_SUFFIX}', '*.pkl'):
+                for path in self.cache_dir.glob(pattern):
+                    path.unlink()
+
+
+class ResultCache:
+    """Thread-safe LRU of prediction results keyed by an input digest"""
+
+    def __init__(self, max_entries: int = PREDICTION_RESULT_CACHE_SIZE):
+        """
+        Initialize result cache
+
+        Args:
+            max_entries: Results kept in memory (0 disables caching)
+        """
+        self.max_entries = max_entries
+        # Results are stored pickled so every hit returns an independent copy
+        self._entries = OrderedDict()  # key -> pickled result
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a copy of the cached result, or None on a miss"""
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return pickle.loads(payload)
+
+    def put(self, key: str, result: Any):
+        """Store a copy of a result"""
+        if self.max_entries <= 0:
+            return
+        payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,138 @@
+"""
+SIAPS - Monte Carlo Prediction Bands
+Vectorized geometric Brownian motion simulation around a model's price path
+
+All paths are drawn as one (paths × steps) matrix of normal shocks; the
+cumulative sum of log returns along the step axis turns them into prices,
+and percentiles across paths give the prediction bands. No Python loop runs
+per path or per step.
+"""
+from typing import Dict, Iterable, Optional
+import numpy as np
+
+
+# Percentiles reported as bands
+MC_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Paths simulated per symbol by default
+DEFAULT_PATHS = 10000
+
+# Bars of log returns used to measure volatility
+VOLATILITY_LOOKBACK = 60
+
+
+def realized_volatility(close, lookback: int = VOLATILITY_LOOKBACK) -> float:
+    """
+    Per-bar volatility: sample std of the latest log returns
+
+    Args:
+        close: array-like, close prices
+        lookback: int, number of returns used
+
+    Returns:
+        float: volatility, NaN when fewer than two returns are available
+    """
+    close = np.asarray(close, dtype=float)[-(lookback + 1):]
+    if len(close) < 3:
+        return float('nan')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.diff(np.log(close))
+    returns = returns[np.isfinite(returns)]
+    if len(returns) < 2:
+        return float('nan')
+    return float(returns.std(ddof=1))
+
+
+def path_drift(start_price: float, path) -> np.ndarray:
+    """
+    Per-step log returns of a predicted price path
+
+    Args:
+        start_price: float, price before the first step
+        path: array-like, predicted prices per step
+
+    Returns:
+        np.ndarray: log drift per step
+    """
+    prices = np.concatenate([[start_price], np.asarray(path, dtype=float)])
+    return np.diff(np.log(prices))
+
+
+def simulate_paths(start_price: float, drift, volatility: float, n_paths: int,
+                   rng: np.random.Generator, dtype=np.float64) -> np.ndarray:
+    """
+    Simulate price paths with per-step drift and constant volatility
+
+    The drift is the expected log return per step, so the median path
+    follows the model's path; volatility is per-step.
+
+    Args:
+        start_price: float, price at step 0
+        drift: array-like (steps,), expected log return per step
+        volatility: float, per-step std of log returns
+        n_paths: int, number of paths
+        rng: numpy Generator providing the shocks
+        dtype: float dtype of the simulation
+
+    Returns:
+        np.ndarray: prices, shape (n_paths, steps)
+    """
+    drift = np.asarray(drift, dtype=dtype)
+    log_returns = rng.standard_normal((n_paths, len(drift)), dtype=dtype)
+    log_returns *= volatility
+    log_returns += drift
+    np.cumsum(log_returns, axis=1, out=log_returns)
+    np.exp(log_returns, out=log_returns)
+    log_returns *= start_price
+    return log_returns
+
+
+def prediction_bands(paths: np.ndarray, percentiles: Iterable[float] = MC_PERCENTILES) -> Dict[str, list]:
+    """
+    Percentile bands across simulated paths
+
+    Args:
+        paths: array (n_paths, steps)
+        percentiles: percentiles to report
+
+    Returns:
+        dict: {'p5': [price per step], 'p25': [...], ...}
+    """
+    percentiles = list(percentiles)
+    values = np.percentile(paths, percentiles, axis=0)
+    return {f"p{q:g}": values[i].astype(float).tolist() for i, q in enumerate(percentiles)}
+
+
+def monte_carlo_bands(start_price: float, drift, close, n_paths: int = DEFAULT_PATHS,
+                      rng: Optional[np.random.Generator] = None,
+                      fallback_volatility: float = 0.0,
+                      percentiles: Iterable[float] = MC_PERCENTILES) -> dict:
+    """
+    Prediction bands around a model's expected returns
+
+    Args:
+        start_price: float, price the paths start from
+        drift: array-like (steps,), expected log return per step (see path_drift)
+        close: array-like, historical closes for the volatility estimate
+        n_paths: int, number of simulated paths
+        rng: numpy Generator (default: seeded with 0)
+        fallback_volatility: float, used when history gives no estimate
+        percentiles: percentiles to report
+
+    Returns:
+        dict: 'bands' (see prediction_bands), 'n_paths', 'volatility' and
+        'drift' (per step)
+    """
+    if rng is None:
+        rng = np.random.default_rng(0)
+    volatility = realized_volatility(close)
+    if not np.isfinite(volatility) or volatility <= 0:
+        volatility = fallback_volatility
+    drift = np.asarray(drift, dtype=float)
+    paths = simulate_paths(start_price, drift, volatility, n_paths, rng)
+    return {
+        'bands': prediction_bands(paths, percentiles),
+        'n_paths': int(n_paths),
+        'volatility': float(volatility),
+        'drift': drift.tolist(),
+    }
@@ -20,82 +20,219 @@
 
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import StandardScaler
+import hashlib
+import json
+import threading
+import time
 import warnings
+import sys
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from pathlib import Path
+
+# Add project root to Python path
+ROOT_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.data_processing.features import RecursiveWindow, build_window_features, build_training_set
+from src.data_processing.feature_store import FeatureStore
+from src.data_processing.indicators import DISPLAY_KEYS, technical_snapshot
+from src.data_processing.support_resistance import support_resistance_zones, nearest_levels
+from src.prediction_models.model_cache import ModelCache, ResultCache, make_model_key, data_fingerprint
+from src.prediction_models.monte_carlo import DEFAULT_PATHS, monte_carlo_bands, path_drift
+from src.prediction_models.ml_backends import get_backend
+from src.prediction_models.online_learner import OnlineLearnerStore
+from src.utils.timing import StageTimer
+from config.settings import ML_BACKEND, NUMERIC_DTYPE, PREDICTION_TIMINGS
+
 warnings.filterwarnings('ignore')
 
 
+# 各时间框架的技术信号权重、基础波动率和动量放大系数
+TECHNICAL_PROFILES = {
+    # 30分钟：高频交易，注重短期动量
+    '30min': {
+        'signal_weights': {'macd': 0.15, 'rsi': 0.25, 'bollinger': 0.30, 'kdj': 0.20, 'volume': 0.10},
+        'base_volatility': 0.003,  # 0.3% 基础波动
+        'momentum_factor': 1.5,    # 动量放大系数
+    },
+    # 1天：日内交易，平衡趋势和动量
+    '1day': {
+        'signal_weights': {'macd': 0.30, 'rsi': 0.20, 'bollinger': 0.20, 'kdj': 0.20, 'volume': 0.10},
+        'base_volatility': 0.015,  # 1.5% 基础波动
+        'momentum_factor': 1.2,
+    },
+    '1hour': {
+        'signal_weights': {'macd': 0.20, 'rsi': 0.25, 'bollinger': 0.25, 'kdj': 0.20, 'volume': 0.10},
+        'base_volatility': 0.005,
+        'momentum_factor': 1.3,
+    },
+    '3day': {
+        'signal_weights': {'macd': 0.30, 'rsi': 0.20, 'bollinger': 0.20, 'kdj': 0.20, 'volume': 0.10},
+        'base_volatility': 0.02,
+        'momentum_factor': 1.0,
+    },
+}
+
+# 默认设置 (30day)
+DEFAULT_TECHNICAL_PROFILE = {
+    'signal_weights': {'macd': 0.35, 'rsi': 0.20, 'bollinger': 0.20, 'kdj': 0.15, 'volume': 0.10},
+    'base_volatility': 0.03,
+    'momentum_factor': 1.0,
+}
+
+# 市场噪音缩放因子：代表基础波动率的20%，用于模拟市场不确定性
+NOISE_SCALE_FACTOR = 0.2
+
+# 各阶段耗时直方图的名称前缀（见 src.utils.timing.timing_snapshot）
+TIMING_PREFIX = 'predict.'
+
+# 支持的数值精度（float32 内存减半，结果与 float64 在容差内一致）
+NUMERIC_DTYPES = ('float64', 'float32')
+
+# 有时限预测时运行机器学习阶段的后台线程数（超时的阶段在后台跑完，结果写入模型缓存）
+# 同时在途的阶段不超过线程数，线程全忙时新请求的机器学习阶段立即舍弃，不排队
+DEADLINE_WORKERS = 4
+
+
 class MultiModelPredictor:
-    """多模型集成预测器"""
+    """
+    多模型集成预测器
     
-    def __init__(self, weights=None):
+    可重入、线程安全: 每次预测使用各自的局部对象（标准化器、模型、数据副本），
+    实例上只保存只读配置和自带锁的模型缓存，因此同一实例可被多个线程并发调用。
+    """
+    
+    def __init__(self, weights=None, model_cache=None, enable_model_cache=True, seed=0, result_cache=None,
+                 ml_backend=ML_BACKEND, online_store=None, feature_store=None, timings=PREDICTION_TIMINGS,
+                 dtype=NUMERIC_DTYPE):
         """
         初始化预测器
         weights: dict, 各模型权重 {'technical': 0.3, 'ml': 0.4, 'support_resistance': 0.3}
+        model_cache: ModelCache, 已训练模型缓存（默认: 内存LRU + MODEL_CACHE_DIR）
+        enable_model_cache: bool, 为False时每次都重新训练
+        seed: int, 随机种子；与输入数据摘要一起决定噪声，相同输入总是得到相同结果
+        result_cache: ResultCache, 预测结果缓存（默认: 内存LRU，大小为0时不缓存）
+        ml_backend: str, 默认机器学习后端（见 ml_backends.ML_BACKENDS，默认取配置 ML_BACKEND）
+        online_store: OnlineLearnerStore, 在线学习后端的逐股票模型状态
+                      （默认: 保存到 ONLINE_MODEL_DIR；enable_model_cache为False时只在内存中）
+        feature_store: FeatureStore, 逐股票物化的窗口特征，新K线到来时只计算新增行
+                       （默认: 保存到 FEATURE_STORE_DIR；enable_model_cache为False时不使用）
+        timings: bool, 默认是否记录各阶段耗时（结果中的 'timings'，并计入进程级直方图）
+        dtype: str, K线、技术指标和机器学习特征矩阵的数值精度（'float64' 或 'float32'，默认取配置 NUMERIC_DTYPE）；
+               技术指标与机器学习特征均按此精度计算
         """
-        self.weights = weights or {'technical': 0.3, 'ml': 0.4, 'support_resistance': 0.3}
-        self.scaler = StandardScaler()
+        if np.dtype(dtype).name not in NUMERIC_DTYPES:
+            raise ValueError(f"Unsupported dtype: {dtype}. Must be one of: {', '.join(NUMERIC_DTYPES)}")
+        self.dtype = np.dtype(dtype)
+        self.weights = dict(weights or {'technical': 0.3, 'ml': 0.4, 'support_resistance': 0.3})
+        if enable_model_cache:
+            self.model_cache = model_cache if model_cache is not None else ModelCache()
+        else:
+            self.model_cache = None
+        self.seed = seed
+        self.result_cache = result_cache if result_cache is not None else ResultCache()
+        self.ml_backend = get_backend(ml_backend).name
+        if online_store is None:
+            online_store = OnlineLearnerStore() if enable_model_cache else OnlineLearnerStore(root_dir=None)
+        self.online_store = online_store
+        if feature_store is None and enable_model_cache:
+            feature_store = FeatureStore(dtype=self.dtype)
+        self.feature_store = feature_store
+        self.timings = timings
+        self._deadline_executor = None
+        self._deadline_lock = threading.Lock()
+        self._stage_slots = threading.BoundedSemaphore(DEADLINE_WORKERS)
         
-    def predict_multi_timeframe(self, stock_data, timeframe='3day', current_price=None):
+    def predict_multi_timeframe(self, stock_data, timeframe='3day', current_price=None, stock_code=None,
+                                indicators=None, monte_carlo=False, n_paths=DEFAULT_PATHS, ml_backend=None,
+                                timings=None, deadline_ms=None):
         """
         多时间框架预测主函数
         stock_data: DataFrame, 股票历史数据，需包含 'close', 'high', 'low', 'volume' 列
         timeframe: str, 时间框架 ('1hour', '3day', '30day')
         current_price: float, 当前实时价格，如果提供则用于计算变化百分比，否则使用历史数据最后收盘价
+        stock_code: str, 股票代码（用于模型缓存键）
+        indicators: dict, 预先计算的最新技术指标（如 IncrementalIndicators.snapshot()），
+                    提供时技术指标模型不再重算全部历史
+        monte_carlo: bool, 为True时附加蒙特卡洛预测区间（结果中的 'monte_carlo'）
+        n_paths: int, 蒙特卡洛模拟路径数
+        ml_backend: str, 本次请求使用的机器学习后端（默认使用预测器的 ml_backend）
+        timings: bool, 为True时结果附加各阶段耗时 'timings'（毫秒），默认使用预测器的 timings；
+                 关闭时计时器为空操作
+        deadline_ms: float, 延迟预算（毫秒）。机器学习阶段在后台线程中与其他阶段并行运行，
+                     预算用完仍未完成（或后台线程全忙）时舍弃该阶段，集成权重在已完成的模型间重新归一化，
+                     结果中的 'shed_stages' 列出被舍弃的阶段（被舍弃的结果不写入结果缓存）
         返回: dict, 包含各模型预测结果和集成结果
         """
-        # 根据时间框架确定预测点数
-        if timeframe == '30min':
-            pred_points = 6   # 30分钟，假设5分钟一个点
-            window_size = 60  # 使用5小时历史数据
-        elif timeframe == '1day':
-            pred_points = 1   # 1天
-            window_size = 10  # 使用10天历史数据
-        else:
-            # 默认1天预测
-            pred_points = 1
-            window_size = 10
-            
-        results = {}
+        deadline = time.perf_counter() + deadline_ms / 1000 if deadline_ms else None
+        pred_points, window_size = self._timeframe_params(timeframe)
+        backend = get_backend(ml_backend or self.ml_backend)
+        timer = StageTimer(self.timings if timings is None else timings, TIMING_PREFIX)
         
         try:
             # 确保有足够的数据
             if len(stock_data) < window_size:
                 return self._fallback_prediction(stock_data, pred_points, timeframe, current_price)
             
-            # 方法1: 技术指标预测
-            tech_pred = self._technical_indicator_prediction(stock_data, pred_points, timeframe)
-            results['technical'] = tech_pred
+            # 相同输入直接返回缓存结果
+            input_key = self._input_key(
+                stock_data, timeframe, current_price, indicators, self._prediction_options(backend, monte_carlo, n_paths)
+            )
+            with timer.stage('result_cache'):
+                cached = self.result_cache.get(input_key)
+            if cached is not None:
+                if deadline is not None:
+                    cached['shed_stages'] = []
+                if timer.enabled:
+                    cached['timings'] = timer.finish()
+                return cached
+            rngs = self._stage_rngs(input_key)
             
-            # 方法2: 机器学习预测
-            ml_pred = self._machine_learning_prediction(stock_data, pred_points, window_size)
-            results['machine_learning'] = ml_pred
+            # 有时限: 机器学习阶段先在后台启动，与技术指标、支撑阻力位并行
+            ml_args = (stock_data, pred_points, window_size, stock_code, backend.name)
+            ml_future = self._submit_stage(self._machine_learning_prediction, *ml_args) if deadline else None
             
-            # 方法3: 支撑阻力位预测
-            sr_pred = self._support_resistance_prediction(stock_data, pred_points)
-            results['support_resistance'] = sr_pred
+            # 方法1: 技术指标预测
+            with timer.stage('technical'):
+                tech_pred = self._technical_indicator_prediction(
+                    stock_data, pred_points, timeframe, indicators, rngs['technical']
+                )
             
-            # 集成预测
-            ensemble_pred = self._ensemble_prediction(tech_pred, ml_pred, sr_pred)
-            results['ensemble'] = ensemble_pred
+            # 方法3: 支撑阻力位预测
+            with timer.stage('support_resistance'):
+                sr_pred = self._support_resistance_prediction(stock_data, pred_points, rngs['support_resistance'])
             
-            # 计算预测信心度
-            confidence = self._calculate_confidence(tech_pred, ml_pred, sr_pred)
-            results['confidence'] = confidence
+            # 方法2: 机器学习预测（有时限时最多等到截止时间）
+            shed_stages = []
+            if deadline is None:
+                with timer.stage('machine_learning'):
+                    ml_pred = self._machine_learning_prediction(*ml_args)
+            elif ml_future is None:
+                # 后台线程全忙，不排队等待
+                ml_pred = None
+                shed_stages.append('machine_learning')
+            else:
+                ml_pred = self._await_stage(ml_future, deadline, timer, 'machine_learning')
+                if ml_pred is None:
+                    shed_stages.append('machine_learning')
             
-            # 计算变化百分比
             # 使用实时价格（如果提供）或历史数据最后收盘价
             base_price = current_price if current_price is not None else stock_data['close'].iloc[-1]
-            predicted_prices = ensemble_pred['prices']
-            price_changes = [(p - base_price) / base_price * 100 for p in predicted_prices]
-            results['price_change_pcts'] = price_changes
-            
-            # 生成交易建议
-            results['trading_signal'] = self._generate_trading_signal(
-                base_price, predicted_prices, confidence
-            )
-            
+            with timer.stage('ensemble'):
+                results = self._combine_predictions(tech_pred, ml_pred, sr_pred, base_price)
+            if monte_carlo:
+                with timer.stage('monte_carlo'):
+                    results['monte_carlo'] = self._monte_carlo_prediction(
+                        stock_data['close'].values, tech_pred, base_price, timeframe, n_paths, rngs['monte_carlo']
+                    )
+            if not shed_stages:
+                # 舍弃了阶段的结果不缓存，之后的请求仍可得到完整预测
+                self.result_cache.put(input_key, results)
+            if deadline is not None:
+                results['shed_stages'] = shed_stages
+            if timer.enabled:
+                # 耗时不写入缓存，缓存命中时返回当次的耗时
+                results['timings'] = timer.finish()
             return results
             
         except Exception as e:
@@ -104,302 +241,502 @@ class MultiModelPredictor:
             traceback.print_exc()
             return self._fallback_prediction(stock_data, pred_points, timeframe, current_price)
     
-    def _technical_indicator_prediction(self, data, pred_points, timeframe):
-        """方法1: 基于技术指标的预测 - 增强量化算法"""
+    def _submit_stage(self, fn, *args):
+        """
+        在后台线程中运行一个预测阶段，返回 Future，结果为 (阶段结果, 耗时毫秒)
+        在途阶段已达 DEADLINE_WORKERS 时不提交，返回 None，执行器队列不会随突发请求增长
+        """
+        if not self._stage_slots.acquire(blocking=False):
+            return None
+        with self._deadline_lock:
+            if self._deadline_executor is None:
+                self._deadline_executor = ThreadPoolExecutor(
+                    max_workers=DEADLINE_WORKERS, thread_name_prefix='predict-stage'
+                )
+        
+        def timed():
+            started = time.perf_counter()
+            result = fn(*args)
+            return result, (time.perf_counter() - started) * 1000
+        
+        future = self._deadline_executor.submit(timed)
+        # 完成或被取消时归还名额
+        future.add_done_callback(lambda _: self._stage_slots.release())
+        return future
+    
+    @staticmethod
+    def _await_stage(future, deadline, timer, name):
+        """
+        等待后台阶段直到截止时间，超时返回None（阶段被舍弃）
+        已开始的阶段被舍弃后继续在后台运行，训练好的模型写入模型缓存，下一次请求即可直接使用；
+        尚未开始的阶段直接取消
+        """
+        try:
+            result, ms = future.result(timeout=max(0.0, deadline - time.perf_counter()))
+        except FutureTimeout:
+            future.cancel()
+            return None
+        timer.add(name, ms)
+        return result
+    
+    @staticmethod
+    def _timeframe_params(timeframe):
+        """根据时间框架确定预测点数和历史窗口，返回 (pred_points, window_size)"""
+        if timeframe == '30min':
+            return 6, 60   # 30分钟，假设5分钟一个点；使用5小时历史数据
+        # 1天及默认: 预测1个点，使用10天历史数据
+        return 1, 10
+    
+    def _input_key(self, stock_data, timeframe, current_price=None, indicators=None, options=None):
+        """
+        输入摘要: K线数据、时间框架、实时价格、预计算指标、预测选项、权重和种子的稳定哈希
+        （跨进程、跨运行一致，用作结果缓存键和随机数种子）
+        """
+        volume = stock_data['volume'].values if 'volume' in stock_data.columns else np.zeros(len(stock_data))
+        bars_digest = data_fingerprint(
+            stock_data['close'].values, stock_data['high'].values, stock_data['low'].values, volume
+        )
+        raw = json.dumps({
+            'bars': bars_digest,
+            'timeframe': timeframe,
+            'current_price': None if current_price is None else float(current_price),
+            'indicators': None if indicators is None else {k: float(v) for k, v in indicators.items()},
+            'options': options,
+            'weights': self.weights,
+            'seed': self.seed,
+        }, sort_keys=True)
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+    
+    @staticmethod
+    def _stage_rngs(input_key):
+        """由输入摘要为各随机环节派生互相独立的随机数生成器"""
+        stages = ('technical', 'support_resistance', 'monte_carlo')
+        seeds = np.random.SeedSequence(int(input_key, 16)).spawn(len(stages))
+        return {stage: np.random.default_rng(seed) for stage, seed in zip(stages, seeds)}
+    
+    @staticmethod
+    def _prediction_options(backend, monte_carlo, n_paths):
+        """
+        影响结果的预测选项（计入结果缓存键）
+        dtype 不计入: 它是预测器的固定配置，且 float32/float64 使用相同的随机噪声，结果只差舍入误差
+        """
+        return {
+            'ml_backend': backend.cache_params(),
+            'monte_carlo': int(n_paths) if monte_carlo else None,
+        }
+    
+    def _bar_arrays(self, data):
+        """K线的 (close, high, low, volume) 数组，精度为预测器的 dtype（无成交量列时volume为None，不复制已是该精度的列）"""
+        volume = data['volume'].to_numpy(dtype=self.dtype) if 'volume' in data.columns else None
+        return (data['close'].to_numpy(dtype=self.dtype), data['high'].to_numpy(dtype=self.dtype),
+                data['low'].to_numpy(dtype=self.dtype), volume)
+    
+    def _monte_carlo_prediction(self, close, tech_pred, base_price, timeframe, n_paths, rng):
+        """
+        蒙特卡洛预测区间: 以技术指标模型的逐步收益为漂移、历史对数收益波动率为波动率，
+        一次性模拟 路径数×步数 矩阵，返回 5/25/50/75/95 分位价格带
+        """
+        try:
+            drift = path_drift(close[-1], tech_pred['prices'])
+            profile = TECHNICAL_PROFILES.get(timeframe, DEFAULT_TECHNICAL_PROFILE)
+            return monte_carlo_bands(
+                base_price, drift, close, n_paths=n_paths, rng=rng,
+                fallback_volatility=profile['base_volatility']
+            )
+        except Exception as e:
+            print(f"蒙特卡洛模拟失败: {str(e)}")
+            return None
+    
+    def _combine_predictions(self, tech_pred, ml_pred, sr_pred, base_price):
+        """
+        汇总三个模型的预测：集成价格、信心度、变化百分比和交易建议
+        ml_pred 为None（阶段被舍弃）时只汇总已完成的模型，结果中不含 'machine_learning'
+        """
+        results = {'technical': tech_pred}
+        if ml_pred is not None:
+            results['machine_learning'] = ml_pred
+        results['support_resistance'] = sr_pred
+        
+        # 集成预测
+        ensemble_pred = self._ensemble_prediction(tech_pred, ml_pred, sr_pred)
+        results['ensemble'] = ensemble_pred
+        
+        # 计算预测信心度
+        confidence = self._calculate_confidence(tech_pred, ml_pred, sr_pred)
+        results['confidence'] = confidence
+        
+        # 计算变化百分比
+        predicted_prices = ensemble_pred['prices']
+        results['price_change_pcts'] = [(p - base_price) / base_price * 100 for p in predicted_prices]
+        
+        # 生成交易建议
+        results['trading_signal'] = self._generate_trading_signal(
+            base_price, predicted_prices, confidence
+        )
+        
+        return results
+    
+    def predict_many(self, bars_by_code, timeframe='1day', current_prices=None, monte_carlo=False,
+                     n_paths=DEFAULT_PATHS, ml_backend=None):
+        """
+        批量预测多只股票
+        
+        K线数量相同的股票堆叠成 股票×时间 矩阵，技术指标、信号、价格路径和
+        窗口特征都按整个矩阵一次计算；每只股票仍使用各自训练（或缓存）的模型。
+        bars_by_code: dict, {股票代码: DataFrame}，列要求同 predict_multi_timeframe
+        timeframe: str, 时间框架
+        current_prices: dict, {股票代码: 实时价格}，可选
+        monte_carlo, n_paths, ml_backend: 同 predict_multi_timeframe
+        返回: dict, {股票代码: 与 predict_multi_timeframe 结构相同的结果}
+        """
+        current_prices = current_prices or {}
+        pred_points, window_size = self._timeframe_params(timeframe)
+        backend = get_backend(ml_backend or self.ml_backend)
+        options = self._prediction_options(backend, monte_carlo, n_paths)
+        
+        results = {}
+        input_keys = {}
+        groups = {}
+        for code, bars in bars_by_code.items():
+            if bars is None or len(bars) < window_size:
+                results[code] = self._fallback_prediction(bars, pred_points, timeframe, current_prices.get(code))
+                continue
+            # 相同输入直接返回缓存结果，只有未命中的股票参与批量计算
+            input_keys[code] = self._input_key(bars, timeframe, current_prices.get(code), options=options)
+            cached = self.result_cache.get(input_keys[code])
+            if cached is not None:
+                results[code] = cached
+            else:
+                groups.setdefault(len(bars), []).append(code)
+        
+        for codes in groups.values():
+            try:
+                results.update(self._predict_group(
+                    codes, bars_by_code, timeframe, pred_points, window_size, current_prices, input_keys, options
+                ))
+            except Exception as e:
+                print(f"批量预测失败，逐只预测: {str(e)}")
+                for code in codes:
+                    results[code] = self.predict_multi_timeframe(
+                        bars_by_code[code], timeframe, current_prices.get(code), stock_code=code,
+                        monte_carlo=monte_carlo, n_paths=n_paths, ml_backend=backend.name
+                    )
+        
+        # 保持输入顺序
+        return {code: results[code] for code in bars_by_code}
+    
+    def _predict_group(self, codes, bars_by_code, timeframe, pred_points, window_size, current_prices, input_keys,
+                       options):
+        """批量预测K线数量相同的一组股票"""
+        frames = [bars_by_code[code] for code in codes]
+        # 每只股票使用由各自输入摘要派生的随机数，结果与单只预测一致
+        rngs = [self._stage_rngs(input_keys[code]) for code in codes]
+        close = np.vstack([f['close'].to_numpy(dtype=self.dtype) for f in frames])
+        high = np.vstack([f['high'].to_numpy(dtype=self.dtype) for f in frames])
+        low = np.vstack([f['low'].to_numpy(dtype=self.dtype) for f in frames])
+        volume = np.vstack([
+            f['volume'].to_numpy(dtype=self.dtype) if 'volume' in f.columns else np.zeros(len(f), dtype=self.dtype)
+            for f in frames
+        ])
+        
+        # 方法1: 技术指标（所有股票一次计算，含展示用的均线、ATR、OBV）
+        indicators = technical_snapshot(close, high, low, volume, display=True)
+        valid_price = indicators['close'] > 0
+        signals = self._technical_signals(indicators)
+        noise = np.vstack([stage_rngs['technical'].standard_normal((1, pred_points)) for stage_rngs in rngs])
+        tech_paths, total_signal = self._technical_price_paths(
+            indicators['close'], signals, pred_points, timeframe, noise
+        )
+        
+        # 方法2: 机器学习（批量构建特征，逐只训练/读取模型，逐步批量递推）
+        ml_preds = self._batched_ml_prediction(
+            codes, frames, close, high, low, volume, pred_points, window_size, options['ml_backend']['backend']
+        )
+        
+        results = {}
+        for i, code in enumerate(codes):
+            data = frames[i]
+            try:
+                if valid_price[i]:
+                    snapshot = {key: value[i] for key, value in indicators.items()}
+                    tech_pred = self._technical_result(snapshot, list(tech_paths[i]), total_signal[i])
+                else:
+                    tech_pred = self._simple_trend_prediction(data, pred_points)
+                
+                # 方法3: 支撑阻力位
+                sr_pred = self._support_resistance_prediction(data, pred_points, rngs[i]['support_resistance'])
+                
+                current_price = current_prices.get(code)
+                base_price = current_price if current_price is not None else float(close[i, -1])
+                results[code] = self._combine_predictions(tech_pred, ml_preds[i], sr_pred, base_price)
+                if options['monte_carlo'] is not None:
+                    results[code]['monte_carlo'] = self._monte_carlo_prediction(
+                        close[i], tech_pred, base_price, timeframe, options['monte_carlo'], rngs[i]['monte_carlo']
+                    )
+                self.result_cache.put(input_keys[code], results[code])
+            except Exception as e:
+                print(f"{code} 预测失败: {str(e)}")
+                results[code] = self._fallback_prediction(data, pred_points, timeframe, current_prices.get(code))
+        return results
+    
+    def _batched_ml_prediction(self, codes, frames, close, high, low, volume, pred_points, window_size,
+                               ml_backend=None):
+        """
+        批量机器学习预测
+        close/high/low/volume: 股票×时间 矩阵
+        返回: list, 每只股票的预测结果（结构同 _machine_learning_prediction）
+        """
+        if self.feature_store is not None:
+            features = np.stack([
+                self.feature_store.features(
+                    code, close[i], high[i], low[i], volume[i] if volume is not None else None, window_size
+                )
+                for i, code in enumerate(codes)
+            ])
+        else:
+            features = build_window_features(close, high, low, volume, window_size)
+        X_all = features[:, :-1, :]
+        y_all = close[:, window_size:]
+        
+        if X_all.shape[1] < 5:
+            # 数据不足，使用简单预测
+            return [self._simple_trend_prediction(f, pred_points) for f in frames]
+        
+        backend = get_backend(ml_backend or self.ml_backend)
+        models = [
+            self._fit_model(
+                X_all[i], y_all[i], window_size, code, self._last_bar_label(frames[i]), backend,
+                (close[i], high[i], low[i], volume[i] if volume is not None else None)
+            )
+            for i, code in enumerate(codes)
+        ]
+        
+        predictions = self._recursive_forecast(
+            [model for model, _ in models], close, high, low, volume, pred_points, window_size
+        )
+        
+        return [
+            {
+                'prices': list(predictions[i]),
+                'method': 'machine_learning',
+                'model': backend.display_name,
+                'model_cached': not trained
+            }
+            for i, (_, trained) in enumerate(models)
+        ]
+    
+    def _compute_technical_indicators(self, data, display=False):
+        """
+        计算技术指标的最新值（共用 src.data_processing.indicators 指标库，与批量预测、筛选器相同）
+        display: bool, 为True时同一次计算中一并返回展示用指标（DISPLAY_KEYS: 均线、ATR、OBV）
+        返回: dict, 与 IncrementalIndicators.snapshot() 结构相同（display为True时另含 DISPLAY_KEYS）
+        """
+        close, high, low, volume = self._bar_arrays(data)
+        snapshot = technical_snapshot(close, high, low, volume, display=display)
+        return {key: float(value) for key, value in snapshot.items()}
+    
+    def _technical_indicator_prediction(self, data, pred_points, timeframe, indicators=None, rng=None):
+        """
+        方法1: 基于技术指标的预测 - 增强量化算法
+        indicators: dict, 预先计算的指标（如增量指标引擎的 snapshot()），为None时从data计算
+        rng: numpy.random.Generator, 市场噪音的随机数来源（默认按预测器种子创建）
+        """
         try:
-            data = data.copy()
-            
             # === 计算核心技术指标 ===
-            
-            # MACD (趋势指标)
-            exp1 = data['close'].ewm(span=12, adjust=False).mean()
-            exp2 = data['close'].ewm(span=26, adjust=False).mean()
-            macd = exp1 - exp2
-            signal = macd.ewm(span=9, adjust=False).mean()
-            macd_histogram = macd - signal
-            
-            # RSI (超买超卖指标)
-            delta = data['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            
-            # 布林带 (波动率指标)
-            ma20 = data['close'].rolling(window=20).mean()
-            std20 = data['close'].rolling(window=20).std()
-            upper_band = ma20 + (std20 * 2)
-            lower_band = ma20 - (std20 * 2)
-            
-            # KDJ (随机指标)
-            low_14 = data['low'].rolling(window=14).min()
-            high_14 = data['high'].rolling(window=14).max()
-            # Avoid division by zero when price range is zero
-            price_range = high_14 - low_14
-            # When price is flat (range=0), set RSV to neutral (50)
-            rsv = pd.Series(index=data.index, dtype=float)
-            rsv = rsv.where(price_range == 0, (data['close'] - low_14) / price_range * 100)
-            rsv = rsv.fillna(50)  # Neutral value for flat markets
-            k = rsv.ewm(com=2, adjust=False).mean()
-            d = k.ewm(com=2, adjust=False).mean()
-            j = 3 * k - 2 * d
-            
-            # 成交量趋势
-            volume_ma5 = data['volume'].rolling(window=5).mean()
-            volume_trend = 1.0
-            if pd.notna(volume_ma5.iloc[-1]) and volume_ma5.iloc[-1] > 0:
-                volume_trend = data['volume'].iloc[-1] / volume_ma5.iloc[-1]
+            if indicators is None:
+                indicators = self._compute_technical_indicators(data, display=True)
             
             # === 生成交易信号 ===
-            current_price = data['close'].iloc[-1]
+            current_price = indicators['close']
             
             # Validate current price is positive
             if current_price <= 0:
                 raise ValueError(f"Invalid current price: {current_price}")
             
+            # 与批量预测共用同一套向量化信号计算（单只股票即长度为1的数组）
+            if rng is None:
+                rng = np.random.default_rng(self.seed)
+            signals = self._technical_signals({key: np.atleast_1d(value) for key, value in indicators.items()})
+            paths, total_signal = self._technical_price_paths(
+                np.atleast_1d(np.float64(current_price)), signals, pred_points, timeframe,
+                rng.standard_normal((1, pred_points))
+            )
+            
+            return self._technical_result(indicators, list(paths[0]), total_signal[0])
+            
+        except Exception as e:
+            print(f"技术指标预测失败: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return self._simple_trend_prediction(data, pred_points)
+    
+    @staticmethod
+    def _technical_result(indicators, prices, total_signal):
+        """组装技术指标模型的返回结构（indicators 含展示用指标时一并返回，供界面直接展示）"""
+        result = {
+            'prices': prices,
+            'method': 'technical_indicators_enhanced',
+            'indicators': {
+                'MACD': float(indicators['MACD']),
+                'MACD_Signal': float(indicators['MACD_Signal']),
+                'RSI': float(indicators['RSI']),
+                'Bollinger_Upper': float(indicators['Bollinger_Upper']),
+                'Bollinger_Lower': float(indicators['Bollinger_Lower']),
+                'KDJ_K': float(indicators['KDJ_K']),
+                'KDJ_D': float(indicators['KDJ_D']),
+                'KDJ_J': float(indicators['KDJ_J']),
+                'Volume_Trend': float(indicators['Volume_Trend']),
+                '综合信号': float(total_signal)
+            }
+        }
+        result['indicators'].update({key: float(indicators[key]) for key in DISPLAY_KEYS if key in indicators})
+        return result
+    
+    @staticmethod
+    def _technical_signals(indicators):
+        """
+        由最新指标计算各项交易信号（向量化，每个值为长度S的数组）
+        indicators: dict, 键同 _compute_technical_indicators，值为数组
+        返回: dict, macd/rsi/bollinger/kdj/volume 信号数组，指标缺失时为0（中性）
+        """
+        current_price = np.asarray(indicators['close'], dtype=float)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
             # 1. MACD信号 (-1到1)
-            macd_hist_value = macd_histogram.iloc[-1]
-            if pd.notna(macd_hist_value):
-                macd_signal = np.tanh(macd_hist_value / current_price * 100)
-            else:
-                macd_signal = 0  # Neutral when MACD unavailable
-            
-            # 2. RSI信号 (-1到1)
-            rsi_value = rsi.iloc[-1]
-            if pd.notna(rsi_value):
-                if rsi_value > 70:
-                    rsi_signal = -0.5  # 超买，看跌
-                elif rsi_value < 30:
-                    rsi_signal = 0.5   # 超卖，看涨
-                else:
-                    rsi_signal = (rsi_value - 50) / 50 * 0.3
-            else:
-                rsi_signal = 0  # Neutral when RSI unavailable
-            
-            # 3. 布林带信号 (-1到1)
-            upper_val = upper_band.iloc[-1]
-            lower_val = lower_band.iloc[-1]
-            if pd.notna(upper_val) and pd.notna(lower_val):
-                bb_width = upper_val - lower_val
-                if bb_width > 0:
-                    bb_position = (current_price - lower_val) / bb_width
-                    bb_signal = (bb_position - 0.5) * 2  # 转换为-1到1
-                else:
-                    # Zero volatility scenario - neutral signal
-                    bb_signal = 0
-            else:
-                bb_signal = 0  # Neutral when bands unavailable
+            macd_hist = np.asarray(indicators['MACD_Hist'], dtype=float)
+            macd_signal = np.where(np.isnan(macd_hist), 0.0, np.tanh(macd_hist / current_price * 100))
+            
+            # 2. RSI信号: 超买(>70)看跌，超卖(<30)看涨
+            rsi = np.asarray(indicators['RSI'], dtype=float)
+            rsi_signal = np.select(
+                [np.isnan(rsi), rsi > 70, rsi < 30],
+                [0.0, -0.5, 0.5],
+                (rsi - 50) / 50 * 0.3
+            )
+            
+            # 3. 布林带信号 (-1到1)，零波动时为中性
+            upper = np.asarray(indicators['Bollinger_Upper'], dtype=float)
+            lower = np.asarray(indicators['Bollinger_Lower'], dtype=float)
+            bb_width = upper - lower
+            bb_valid = ~np.isnan(upper) & ~np.isnan(lower) & (bb_width > 0)
+            bb_signal = np.where(bb_valid, ((current_price - lower) / bb_width - 0.5) * 2, 0.0)
             
             # 4. KDJ信号 (-1到1)
-            j_value = j.iloc[-1]
-            if pd.notna(j_value):
-                kdj_signal = (j_value - 50) / 50
-                kdj_signal = max(min(kdj_signal, 1), -1)
-            else:
-                kdj_signal = 0  # Neutral when KDJ unavailable
+            j_value = np.asarray(indicators['KDJ_J'], dtype=float)
+            kdj_signal = np.where(np.isnan(j_value), 0.0, np.clip((j_value - 50) / 50, -1, 1))
             
             # 5. 成交量信号
-            volume_signal = (volume_trend - 1) * 0.5
-            volume_signal = max(min(volume_signal, 0.5), -0.5)
-            
-            # === 根据时间框架调整权重和波动率 ===
-            if timeframe == '30min':
-                # 30分钟：高频交易，注重短期动量
-                signal_weights = {
-                    'macd': 0.15,
-                    'rsi': 0.25,
-                    'bollinger': 0.30,
-                    'kdj': 0.20,
-                    'volume': 0.10
-                }
-                base_volatility = 0.003  # 0.3% 基础波动
-                momentum_factor = 1.5    # 动量放大系数
-                
-            elif timeframe == '1day':
-                # 1天：日内交易，平衡趋势和动量
-                signal_weights = {
-                    'macd': 0.30,
-                    'rsi': 0.20,
-                    'bollinger': 0.20,
-                    'kdj': 0.20,
-                    'volume': 0.10
-                }
-                base_volatility = 0.015  # 1.5% 基础波动
-                momentum_factor = 1.2
-            
-            elif timeframe == '1hour':
-                # 1小时
-                signal_weights = {
-                    'macd': 0.20,
-                    'rsi': 0.25,
-                    'bollinger': 0.25,
-                    'kdj': 0.20,
-                    'volume': 0.10
-                }
-                base_volatility = 0.005
-                momentum_factor = 1.3
-            
-            elif timeframe == '3day':
-                # 3天
-                signal_weights = {
-                    'macd': 0.30,
-                    'rsi': 0.20,
-                    'bollinger': 0.20,
-                    'kdj': 0.20,
-                    'volume': 0.10
-                }
-                base_volatility = 0.02
-                momentum_factor = 1.0
-                
-            else:
-                # 默认设置 (30day)
-                signal_weights = {
-                    'macd': 0.35,
-                    'rsi': 0.20,
-                    'bollinger': 0.20,
-                    'kdj': 0.15,
-                    'volume': 0.10
-                }
-                base_volatility = 0.03
-                momentum_factor = 1.0
+            volume_trend = np.asarray(indicators['Volume_Trend'], dtype=float)
+            volume_signal = np.clip((volume_trend - 1) * 0.5, -0.5, 0.5)
+        
+        return {
+            'macd': macd_signal,
+            'rsi': rsi_signal,
+            'bollinger': bb_signal,
+            'kdj': kdj_signal,
+            'volume': volume_signal,
+        }
+    
+    @staticmethod
+    def _technical_price_paths(current_price, signals, pred_points, timeframe, noise):
+        """
+        根据信号生成预测价格序列（S只股票同时计算）
+        current_price: 长度S的数组
+        signals: dict, _technical_signals 的返回值
+        noise: S×pred_points 标准正态随机数（市场噪音）
+        返回: (价格数组 S×pred_points, 最后一步的综合信号数组)
+        """
+        # === 根据时间框架调整权重和波动率 ===
+        profile = TECHNICAL_PROFILES.get(timeframe, DEFAULT_TECHNICAL_PROFILE)
+        signal_weights = profile['signal_weights']
+        base_volatility = profile['base_volatility']
+        momentum_factor = profile['momentum_factor']
+        
+        macd_signal = signals['macd'].copy()
+        rsi_signal = signals['rsi'].copy()
+        bb_signal = signals['bollinger'].copy()
+        kdj_signal = signals['kdj'].copy()
+        volume_signal = signals['volume']
+        
+        # === 生成预测价格序列 ===
+        current = np.asarray(current_price, dtype=float).copy()
+        predictions = np.empty((len(current), pred_points))
+        total_signal = np.zeros(len(current))
+        max_change = base_volatility * 2
+        
+        for i in range(pred_points):
+            # 计算综合信号
+            total_signal = (
+                macd_signal * signal_weights['macd'] +
+                rsi_signal * signal_weights['rsi'] +
+                bb_signal * signal_weights['bollinger'] +
+                kdj_signal * signal_weights['kdj'] +
+                volume_signal * signal_weights['volume']
+            )
             
-            # === 生成预测价格序列 ===
-            predictions = []
-            current = current_price
+            # 应用动量和波动率
+            price_change_pct = total_signal * base_volatility * momentum_factor
             
-            # 市场噪音缩放因子：代表基础波动率的20%，用于模拟市场不确定性
-            NOISE_SCALE_FACTOR = 0.2
+            # 添加微小随机波动(模拟市场噪音)
+            price_change_pct = price_change_pct + noise[:, i] * (base_volatility * NOISE_SCALE_FACTOR)
             
-            for i in range(pred_points):
-                # 计算综合信号
-                total_signal = (
-                    macd_signal * signal_weights['macd'] +
-                    rsi_signal * signal_weights['rsi'] +
-                    bb_signal * signal_weights['bollinger'] +
-                    kdj_signal * signal_weights['kdj'] +
-                    volume_signal * signal_weights['volume']
-                )
-                
-                # 应用动量和波动率
-                price_change_pct = total_signal * base_volatility * momentum_factor
-                
-                # 添加微小随机波动(模拟市场噪音)
-                noise = np.random.normal(0, base_volatility * NOISE_SCALE_FACTOR)
-                price_change_pct += noise
-                
-                # 限制单步最大变化
-                max_change = base_volatility * 2
-                price_change_pct = max(min(price_change_pct, max_change), -max_change)
-                
-                # 计算新价格
-                current = current * (1 + price_change_pct)
-                predictions.append(current)
-                
-                # 信号衰减(模拟市场动态调整)
-                # MACD和RSI衰减较快(0.9)因为趋势可能快速反转
-                # 布林带衰减较慢(0.95)因为波动率变化相对缓慢
-                # KDJ衰减较快(0.9)因为它是短期动量指标，变化快速
-                macd_signal *= 0.9
-                rsi_signal *= 0.9
-                bb_signal *= 0.95
-                kdj_signal *= 0.9
+            # 限制单步最大变化
+            price_change_pct = np.clip(price_change_pct, -max_change, max_change)
             
-            return {
-                'prices': predictions,
-                'method': 'technical_indicators_enhanced',
-                'indicators': {
-                    'MACD': float(macd.iloc[-1]),
-                    'MACD_Signal': float(signal.iloc[-1]),
-                    'RSI': float(rsi.iloc[-1]),
-                    'Bollinger_Upper': float(upper_band.iloc[-1]),
-                    'Bollinger_Lower': float(lower_band.iloc[-1]),
-                    'KDJ_K': float(k.iloc[-1]),
-                    'KDJ_D': float(d.iloc[-1]),
-                    'KDJ_J': float(j.iloc[-1]),
-                    'Volume_Trend': float(volume_trend),
-                    '综合信号': float(total_signal)
-                }
-            }
+            # 计算新价格
+            current = current * (1 + price_change_pct)
+            predictions[:, i] = current
             
-        except Exception as e:
-            print(f"技术指标预测失败: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return self._simple_trend_prediction(data, pred_points)
+            # 信号衰减(模拟市场动态调整)
+            # MACD和RSI衰减较快(0.9)因为趋势可能快速反转
+            # 布林带衰减较慢(0.95)因为波动率变化相对缓慢
+            # KDJ衰减较快(0.9)因为它是短期动量指标，变化快速
+            macd_signal *= 0.9
+            rsi_signal *= 0.9
+            bb_signal *= 0.95
+            kdj_signal *= 0.9
+        
+        return predictions, total_signal
     
-    def _machine_learning_prediction(self, data, pred_points, window_size):
-        """方法2: 基于机器学习的预测"""
+    def _machine_learning_prediction(self, data, pred_points, window_size, stock_code=None, ml_backend=None):
+        """
+        方法2: 基于机器学习的预测（相同数据的已训练模型从缓存读取）
+        ml_backend: str, 机器学习后端名称（默认使用预测器的 ml_backend）
+        """
         try:
-            data = data.copy()
-            
-            # 创建特征
-            features = []
-            targets = []
+            backend = get_backend(ml_backend or self.ml_backend)
             
-            # 使用滑动窗口创建训练数据
-            for i in range(window_size, len(data)):
-                # 特征: 过去window_size天的价格、成交量等
-                window_data = data.iloc[i-window_size:i]
-                
-                feature_vector = [
-                    window_data['close'].mean(),
-                    window_data['close'].std(),
-                    window_data['high'].max(),
-                    window_data['low'].min(),
-                    window_data['volume'].mean() if 'volume' in window_data.columns else 0,
-                    (window_data['close'].iloc[-1] - window_data['close'].iloc[0]) / window_data['close'].iloc[0]
-                ]
-                
-                features.append(feature_vector)
-                targets.append(data['close'].iloc[i])
+            # 使用滑动窗口创建训练数据（向量化，一次构建全部窗口特征）
+            # 特征: 过去window_size天的价格、成交量等，目标: 窗口后一天的收盘价
+            # K线只读，直接取列数组（精度为预测器的 dtype），不复制整个DataFrame
+            close, high, low, volume = self._bar_arrays(data)
+            if self.feature_store is not None and stock_code is not None and len(data) >= window_size:
+                # 特征库中已有的窗口直接读取，只计算新K线对应的行
+                features = self.feature_store.features(stock_code, close, high, low, volume, window_size)
+                X, y = features[:-1], close[window_size:]
+            else:
+                X, y, _ = build_training_set(close, high, low, volume, window_size)
             
-            if len(features) < 5:
+            if len(X) < 5:
                 # 数据不足，使用简单预测
                 return self._simple_trend_prediction(data, pred_points)
             
-            # 训练随机森林模型
-            X = np.array(features)
-            y = np.array(targets)
-            
-            # 标准化特征
-            X_scaled = self.scaler.fit_transform(X)
-            
-            # 训练模型
-            model = RandomForestRegressor(n_estimators=50, max_depth=10, random_state=42)
-            model.fit(X_scaled, y)
-            
-            # 预测
-            predictions = []
-            current_data = data.copy()
+            # 数据未变化时直接复用已训练的模型
+            model, trained = self._fit_model(
+                X, y, window_size, stock_code, self._last_bar_label(data), backend, (close, high, low, volume)
+            )
             
-            for i in range(pred_points):
-                # 使用最近的数据作为特征
-                window_data = current_data.iloc[-window_size:]
-                
-                feature_vector = [
-                    window_data['close'].mean(),
-                    window_data['close'].std(),
-                    window_data['high'].max(),
-                    window_data['low'].min(),
-                    window_data['volume'].mean() if 'volume' in window_data.columns else 0,
-                    (window_data['close'].iloc[-1] - window_data['close'].iloc[0]) / window_data['close'].iloc[0]
-                ]
-                
-                X_pred = np.array([feature_vector])
-                X_pred_scaled = self.scaler.transform(X_pred)
-                
-                pred_price = model.predict(X_pred_scaled)[0]
-                predictions.append(pred_price)
-                
-                # 添加预测结果到数据中，用于下一次预测
-                new_row = current_data.iloc[-1:].copy()
-                new_row['close'] = pred_price
-                current_data = pd.concat([current_data, new_row], ignore_index=True)
+            # 递推预测（预分配窗口缓冲区，每步增量更新窗口特征）
+            predictions = self._recursive_forecast(
+                [model], close[None, :], high[None, :], low[None, :],
+                volume[None, :] if volume is not None else None, pred_points, window_size
+            )
             
             return {
-                'prices': predictions,
+                'prices': list(predictions[0]),
                 'method': 'machine_learning',
-                'model': 'RandomForest'
+                'model': backend.display_name,
+                'model_cached': not trained
             }
         except Exception as e:
             print(f"机器学习预测失败: {str(e)}")
@@ -407,39 +744,97 @@ class MultiModelPredictor:
             traceback.print_exc()
             return self._simple_trend_prediction(data, pred_points)
     
-    def _support_resistance_prediction(self, data, pred_points):
-        """方法3: 基于支撑阻力位的预测"""
+    @staticmethod
+    def _recursive_forecast(models, close, high, low, volume, pred_points, window_size):
+        """
+        递推多步预测: 每步把预测价追加到窗口末尾（最高/最低/成交量沿用最后一根K线）
+        models: list, 每只股票已训练的模型（predict(X)；有 forecast(steps) 的模型直接给出多步预测）
+        close/high/low/volume: 股票×时间 矩阵（volume可为None）
+        返回: 预测价格数组 股票数×pred_points
+        """
+        predictions = np.empty((len(models), pred_points))
+        recursive = []
+        for i, model in enumerate(models):
+            if hasattr(model, 'forecast'):
+                predictions[i] = model.forecast(pred_points)
+            else:
+                recursive.append(i)
+        if not recursive:
+            return predictions
+        
+        window = RecursiveWindow(close, high, low, volume, window_size, pred_points)
+        for step in range(pred_points):
+            rows = window.features()
+            for i in recursive:
+                predictions[i, step] = models[i].predict(rows[i:i + 1])[0]
+            window.push(predictions[:, step])
+        return predictions
+    
+    def _fit_model(self, X, y, window_size, stock_code=None, last_bar=None, backend=None, bars=None):
+        """
+        训练（或从缓存读取）机器学习模型
+        backend: MLBackend, 默认使用预测器的 ml_backend
+        bars: tuple, (close, high, low, volume) 原始K线；在线学习后端据此只折入新增K线
+        返回: (model, trained)，trained为False表示命中缓存（在线学习: 沿用已有状态，未从头训练）
+        """
+        if backend is None:
+            backend = get_backend(self.ml_backend)
+        
+        # 在线学习: 逐股票保存模型状态，每根新K线只做一次O(特征²)的递推更新
+        if backend.stateful and stock_code is not None and bars is not None:
+            model, _, refitted = self.online_store.update(stock_code, *bars, window_size)
+            return model, refitted
+        
+        # 每次调用构建独立的模型对象，避免并发请求共享状态
+        def fit_model():
+            return backend.fit(X, y)
+        
+        if self.model_cache is None:
+            return fit_model(), True
+        
+        cache_key = make_model_key(
+            stock_code, last_bar, window_size, backend.cache_params(), data_fingerprint(X, y)
+        )
+        return self.model_cache.get_or_create(cache_key, fit_model)
+    
+    @staticmethod
+    def _last_bar_label(data):
+        """最后一根K线的日期标签（用于缓存键），无日期信息时返回None"""
+        for column in ('date', '日期'):
+            if column in data.columns:
+                return data[column].iloc[-1]
+        if isinstance(data.index, pd.DatetimeIndex):
+            return data.index[-1]
+        return None
+    
+    def _support_resistance_prediction(self, data, pred_points, rng=None):
+        """
+        方法3: 基于支撑阻力位的预测
+        rng: numpy.random.Generator, 横盘波动的随机数来源（默认按预测器种子创建）
+        """
         try:
-            data = data.copy()
+            if rng is None:
+                rng = np.random.default_rng(self.seed)
             
             # 识别支撑位和阻力位
             high_prices = data['high'].values
             low_prices = data['low'].values
             close_prices = data['close'].values
             
-            # 找到局部最高点和最低点
-            resistance_levels = []
-            support_levels = []
-            
-            for i in range(2, len(high_prices) - 2):
-                # 阻力位: 局部最高点
-                if high_prices[i] == max(high_prices[i-2:i+3]):
-                    resistance_levels.append(high_prices[i])
-                
-                # 支撑位: 局部最低点
-                if low_prices[i] == min(low_prices[i-2:i+3]):
-                    support_levels.append(low_prices[i])
+            # 局部高低点（向量化）合并为支撑/阻力区域
+            resistance_zones, support_zones = support_resistance_zones(high_prices, low_prices)
+            resistance_levels = resistance_zones['level']
+            support_levels = support_zones['level']
             
             # 如果没有找到支撑阻力位，使用简单方法
-            if not resistance_levels:
-                resistance_levels = [max(high_prices)]
-            if not support_levels:
-                support_levels = [min(low_prices)]
+            if resistance_levels.size == 0:
+                resistance_levels = np.array([np.max(high_prices)])
+            if support_levels.size == 0:
+                support_levels = np.array([np.min(low_prices)])
             
             # 最近的支撑和阻力位
             current_price = close_prices[-1]
-            next_resistance = min([r for r in resistance_levels if r > current_price], default=max(resistance_levels))
-            next_support = max([s for s in support_levels if s < current_price], default=min(support_levels))
+            next_resistance, next_support = nearest_levels(resistance_levels, support_levels, current_price)
             
             # 计算趋势
             recent_prices = close_prices[-10:]
@@ -459,7 +854,7 @@ class MultiModelPredictor:
                     predicted = current + (next_support - current) * 0.3
                 else:
                     # 横盘，小幅随机波动（-0.5% to +0.5%）
-                    fluctuation = (hash(f"{current}{i}") % 100 - 50) / 10000
+                    fluctuation = (rng.integers(0, 100) - 50) / 10000
                     predicted = current * (1 + fluctuation)
                 
                 predictions.append(predicted)
@@ -478,24 +873,28 @@ class MultiModelPredictor:
             return self._simple_trend_prediction(data, pred_points)
     
     def _ensemble_prediction(self, tech_pred, ml_pred, sr_pred):
-        """集成多个模型的预测结果"""
+        """集成多个模型的预测结果（ml_pred 为None时权重在其余模型间重新归一化）"""
         try:
+            weights = dict(self.weights)
+            if ml_pred is None:
+                del weights['ml']
+                total = sum(weights.values())
+                weights = {name: weight / total for name, weight in weights.items()}
+            
             # 获取各模型的预测价格
             tech_prices = np.array(tech_pred['prices'])
-            ml_prices = np.array(ml_pred['prices'])
             sr_prices = np.array(sr_pred['prices'])
             
             # 加权平均
-            ensemble_prices = (
-                tech_prices * self.weights['technical'] +
-                ml_prices * self.weights['ml'] +
-                sr_prices * self.weights['support_resistance']
-            )
+            ensemble_prices = tech_prices * weights['technical']
+            if ml_pred is not None:
+                ensemble_prices = ensemble_prices + np.array(ml_pred['prices']) * weights['ml']
+            ensemble_prices = ensemble_prices + sr_prices * weights['support_resistance']
             
             return {
                 'prices': ensemble_prices.tolist(),
                 'method': 'ensemble',
-                'weights': self.weights
+                'weights': weights
             }
         except Exception as e:
             print(f"集成预测失败: {str(e)}")
@@ -505,13 +904,12 @@ class MultiModelPredictor:
     def _calculate_confidence(self, tech_pred, ml_pred, sr_pred):
         """计算预测信心度"""
         try:
-            # 计算三个模型预测的一致性
-            tech_prices = np.array(tech_pred['prices'])
-            ml_prices = np.array(ml_pred['prices'])
-            sr_prices = np.array(sr_pred['prices'])
+            # 计算已完成模型（通常为三个）预测的一致性
+            all_predictions = np.array([
+                pred['prices'] for pred in (tech_pred, ml_pred, sr_pred) if pred is not None
+            ])
             
             # 计算标准差，标准差越小说明一致性越高
-            all_predictions = np.array([tech_prices, ml_prices, sr_prices])
             std_dev = np.std(all_predictions, axis=0).mean()
             mean_price = np.mean(all_predictions)
             
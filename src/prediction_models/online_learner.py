@@ -0,0 +1,236 @@
+"""
+SIAPS - Online ML Learner
+Recursive least squares models folded forward one bar at a time
+
+Instead of refitting on the whole history whenever a bar arrives, each
+symbol keeps a recursive-least-squares (RLS) state -- coefficients and the
+inverse covariance matrix -- and folds in only the windows it has not seen.
+One update costs O(d²) with d = 6 inputs, i.e. microseconds. States are
+persisted per symbol as .npz files so they survive restarts.
+
+The model is scale-free: price features are expressed relative to the
+window's mean close, and it predicts the next close's return over that
+mean. With forgetting = 1 the state after n updates equals a ridge
+regression on all n windows (penalty 1 / delta).
+"""
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import numpy as np
+import sys
+
+# Add project root to Python path
+ROOT_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from config.settings import ONLINE_FORGETTING_FACTOR, ONLINE_MODEL_DIR
+from src.data_processing.features import build_window_features
+
+# Bump when the state layout or input transform changes
+STATE_VERSION = 1
+
+# Initial inverse covariance scale (prior ridge penalty is 1 / RLS_DELTA)
+RLS_DELTA = 1.0
+
+# Inputs after the transform, including the bias term
+N_INPUTS = 6
+
+
+def transform_features(X) -> np.ndarray:
+    """
+    Scale-free model inputs from window features (FEATURE_NAMES order)
+
+    Returns:
+        np.ndarray: (rows, N_INPUTS) -- relative std, high and low, log mean
+        volume, window return and a bias column
+    """
+    X = np.atleast_2d(np.asarray(X, dtype=float))
+    mean = X[:, 0]
+    Z = np.empty((len(X), N_INPUTS))
+    Z[:, 0] = X[:, 1] / mean
+    Z[:, 1] = X[:, 2] / mean - 1
+    Z[:, 2] = X[:, 3] / mean - 1
+    Z[:, 3] = np.log1p(np.maximum(X[:, 4], 0.0))
+    Z[:, 4] = X[:, 5]
+    Z[:, 5] = 1.0
+    return Z
+
+
+class RLSModel:
+    """Recursive least squares regressor of the next close"""
+
+    def __init__(self, forgetting: float = ONLINE_FORGETTING_FACTOR, delta: float = RLS_DELTA):
+        """
+        Args:
+            forgetting: float in (0, 1], weight decay of past windows per update
+            delta: float, initial inverse covariance scale
+        """
+        self.forgetting = forgetting
+        self.delta = delta
+        self.theta = np.zeros(N_INPUTS)
+        self.P = np.eye(N_INPUTS) * delta
+        self.n_updates = 0
+
+    def partial_fit(self, X, y):
+        """
+        Fold in windows in order
+
+        Args:
+            X: array (rows, features) of window features
+            y: array (rows,) of next closes
+        """
+        Z = transform_features(X)
+        targets = np.asarray(y, dtype=float) / np.atleast_2d(X)[:, 0] - 1
+        theta, P, lam = self.theta, self.P, self.forgetting
+        for z, target in zip(Z, targets):
+            Pz = P @ z
+            gain = Pz / (lam + z @ Pz)
+            theta = theta + gain * (target - theta @ z)
+            P = (P - np.outer(gain, Pz)) / lam
+        self.theta, self.P = theta, P
+        self.n_updates += len(Z)
+        return self
+
+    def fit(self, X, y):
+        """Fit from scratch"""
+        self.theta = np.zeros(N_INPUTS)
+        self.P = np.eye(N_INPUTS) * self.delta
+        self.n_updates = 0
+        return self.partial_fit(X, y)
+
+    def predict(self, X):
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        return X[:, 0] * (1 + transform_features(X) @ self.theta)
+
+    def copy(self):
+        other = RLSModel(self.forgetting, self.delta)
+        other.theta = self.theta.copy()
+        other.P = self.P.copy()
+        other.n_updates = self.n_updates
+        return other
+
+
+class OnlineLearnerStore:
+    """Per-symbol online models, advanced with new bars and persisted to disk"""
+
+    def __init__(self, root_dir: Optional[Path] = ONLINE_MODEL_DIR,
+                 forgetting: float = ONLINE_FORGETTING_FACTOR):
+        """
+        Initialize store
+
+        Args:
+            root_dir: Directory for .npz states (None: memory only)
+            forgetting: Forgetting factor for new models
+        """
+        self.root_dir = Path(root_dir) if root_dir is not None else None
+        if self.root_dir is not None:
+            self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.forgetting = forgetting
+        # (code, window) -> (model, tail closes of the last folded bar's window)
+        self._states: Dict[Tuple[str, int], Tuple[RLSModel, np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self._symbol_locks: Dict[Tuple[str, int], threading.Lock] = {}
+
+    def _path_for(self, stock_code: str, window_size: int) -> Optional[Path]:
+        if self.root_dir is None:
+            return None
+        return self.root_dir / f"{stock_code}_w{window_size}.npz"
+
+    def _symbol_lock(self, key) -> threading.Lock:
+        with self._lock:
+            return self._symbol_locks.setdefault(key, threading.Lock())
+
+    def update(self, stock_code: str, close, high, low, volume, window_size: int) -> Tuple[RLSModel, int, bool]:
+        """
+        Bring a symbol's model up to date with its bars
+
+        The stored state remembers the closes of the last window it folded
+        in. If that window is found in the given bars only the bars after it
+        are folded in; otherwise the model is refitted on all windows.
+
+        Args:
+            stock_code: Stock code
+            close, high, low: arrays of bars, oldest first
+            volume: array or None
+            window_size: int, feature window
+
+        Returns:
+            tuple: (model, bars folded in, refitted) -- the returned model is
+            a private copy safe to use while other threads update the state
+        """
+        close = np.asarray(close, dtype=float)
+        key = (stock_code, window_size)
+        with self._symbol_lock(key):
+            state = self._states.get(key) or self._load(stock_code, window_size)
+            start = self._resume_index(state, close, window_size) if state is not None else None
+
+            if start is None:
+                model = RLSModel(self.forgetting)
+                start = window_size
+                refitted = True
+            else:
+                model = state[0]
+                refitted = False
+
+            n_new = len(close) - start
+            if n_new > 0:
+                # Windows ending just before each new bar, paired with that bar's close
+                lo = start - window_size
+                volume_part = None if volume is None else np.asarray(volume, dtype=float)[lo:-1]
+                X = build_window_features(close[lo:-1], np.asarray(high, dtype=float)[lo:-1],
+                                          np.asarray(low, dtype=float)[lo:-1], volume_part, window_size)
+                model.partial_fit(X, close[start:])
+
+            if n_new > 0 or state is None:
+                tail = close[-window_size:].copy()
+                self._states[key] = (model, tail)
+                self._save(stock_code, window_size, model, tail)
+            return model.copy(), max(n_new, 0), refitted
+
+    @staticmethod
+    def _resume_index(state, close, window_size) -> Optional[int]:
+        """Index of the first bar not yet folded in, or None if the bars do not continue the state"""
+        _, tail = state
+        if len(tail) != window_size or len(close) < window_size:
+            return None
+        for end in np.flatnonzero(close == tail[-1])[::-1]:
+            if end + 1 >= window_size and np.array_equal(close[end + 1 - window_size:end + 1], tail):
+                return int(end) + 1
+        return None
+
+    def _save(self, stock_code, window_size, model, tail):
+        path = self._path_for(stock_code, window_size)
+        if path is None:
+            return
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp.npz")
+        np.savez(tmp_path, version=STATE_VERSION, theta=model.theta, P=model.P,
+                 n_updates=model.n_updates, forgetting=model.forgetting, delta=model.delta, tail=tail)
+        os.replace(tmp_path, path)
+
+    def _load(self, stock_code, window_size):
+        path = self._path_for(stock_code, window_size)
+        if path is None or not path.exists():
+            return None
+        try:
+            with np.load(path) as saved:
+                if int(saved['version']) != STATE_VERSION:
+                    return None
+                model = RLSModel(float(saved['forgetting']), float(saved['delta']))
+                model.theta = saved['theta']
+                model.P = saved['P']
+                model.n_updates = int(saved['n_updates'])
+                tail = saved['tail']
+        except Exception:
+            return None
+        state = (model, tail)
+        self._states[(stock_code, window_size)] = state
+        return state
+
+    def clear(self, disk: bool = False):
+        """Drop all in-memory states, and persisted files when disk=True"""
+        with self._lock:
+            self._states.clear()
+        if disk and self.root_dir is not None:
+            for path in self.root_dir.glob('*.npz'):
+                path.unlink()
@@ -0,0 +1,253 @@
+"""
+SIAPS - Parallel Prediction Executor
+Scales a universe scan across processes with bars published in shared memory
+
+Prediction is CPU-bound (RandomForest fitting and indicator math), so threads
+do not help. The parent packs every symbol's close/high/low/volume (and bar
+dates) into one multiprocessing.shared_memory block; worker processes attach
+to it once and rebuild each frame as a view, so tasks only carry stock codes
+instead of pickled DataFrames.
+"""
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+ROOT_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.prediction_models.multi_model_predictor import MultiModelPredictor
+from src.utils import setup_logger
+
+logger = setup_logger(__name__)
+
+
+# Numeric columns published to workers, in block column order
+SHARED_COLUMNS = ('close', 'high', 'low', 'volume')
+
+# Symbols handed to one pool task
+DEFAULT_CHUNK_SIZE = 16
+
+NAT = np.iinfo(np.int64).min
+
+
+class SharedBars:
+    """Bars of many symbols packed into one shared-memory block"""
+
+    def __init__(self, bars_by_code: Dict[str, pd.DataFrame]):
+        """
+        Copy bars into shared memory
+
+        Args:
+            bars_by_code: {stock_code: DataFrame with close, high, low and
+                optionally volume and date columns}
+        """
+        self.layout = {}
+        total = 0
+        for code, bars in bars_by_code.items():
+            self.layout[code] = (total, len(bars))
+            total += len(bars)
+        self.rows = total
+
+        # One float64 block for prices/volume followed by int64 dates (ns)
+        width = len(SHARED_COLUMNS) + 1
+        self._shm = shared_memory.SharedMemory(create=True, size=max(total * width * 8, 8))
+        values, dates = _views(self._shm, total)
+
+        for code, bars in bars_by_code.items():
+            offset, length = self.layout[code]
+            block = slice(offset, offset + length)
+            for j, column in enumerate(SHARED_COLUMNS):
+                if column in bars.columns:
+                    values[block, j] = bars[column].to_numpy(dtype=float)
+                else:
+                    values[block, j] = 0.0
+            if 'date' in bars.columns:
+                dates[block] = pd.to_datetime(bars['date']).to_numpy(dtype='datetime64[ns]').view(np.int64)
+            else:
+                dates[block] = NAT
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def nbytes(self) -> int:
+        return self._shm.size
+
+    def spec(self) -> dict:
+        """Small picklable description workers use to attach"""
+        return {'name': self.name, 'rows': self.rows, 'layout': self.layout}
+
+    def close(self):
+        """Release and unlink the block"""
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _views(shm, rows):
+    """(values, dates) arrays over a shared block"""
+    values = np.ndarray((rows, len(SHARED_COLUMNS)), dtype=np.float64, buffer=shm.buf)
+    dates = np.ndarray((rows,), dtype=np.int64, buffer=shm.buf, offset=values.nbytes)
+    return values, dates
+
+
+def attach_shared(spec: dict):
+    """
+    Attach to a block published by SharedBars (in a worker process)
+
+    Returns:
+        tuple: (shm, values, dates) -- keep shm referenced while the views are used
+    """
+    shm = shared_memory.SharedMemory(name=spec['name'])
+    values, dates = _views(shm, spec['rows'])
+    return shm, values, dates
+
+
+def frame_from_shared(values, dates, offset: int, length: int) -> pd.DataFrame:
+    """
+    Rebuild one symbol's bars from shared arrays
+
+    Returns:
+        pd.DataFrame: close/high/low/volume (and date when published)
+    """
+    frame = pd.DataFrame(values[offset:offset + length], columns=list(SHARED_COLUMNS), copy=False)
+    symbol_dates = dates[offset:offset + length]
+    if length and symbol_dates[-1] != NAT:
+        frame['date'] = symbol_dates.view('datetime64[ns]')
+    return frame
+
+
+# Per-process worker state, set by _init_worker
+_worker = {}
+
+
+def _init_worker(spec: dict, predictor_kwargs: dict):
+    shm, values, dates = attach_shared(spec)
+    _worker.update(
+        shm=shm,
+        values=values,
+        dates=dates,
+        layout=spec['layout'],
+        predictor=MultiModelPredictor(**predictor_kwargs),
+    )
+
+
+def _predict_chunk(codes: List[str], timeframe: str, current_prices: Dict[str, float]) -> dict:
+    """Process-pool entry: predict a chunk of symbols from shared bars"""
+    predictor = _worker['predictor']
+    started = time.perf_counter()
+    results = {}
+    for code in codes:
+        offset, length = _worker['layout'][code]
+        bars = frame_from_shared(_worker['values'], _worker['dates'], offset, length)
+        results[code] = predictor.predict_multi_timeframe(
+            bars, timeframe=timeframe, current_price=current_prices.get(code), stock_code=code
+        )
+    return {'pid': os.getpid(), 'busy_seconds': time.perf_counter() - started, 'results': results}
+
+
+class ParallelPredictor:
+    """Runs MultiModelPredictor over many symbols in a process pool"""
+
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 predictor_kwargs: Optional[dict] = None):
+        """
+        Initialize executor
+
+        Args:
+            max_workers: Worker processes (default: CPU count)
+            chunk_size: Symbols per task
+            predictor_kwargs: Keyword arguments for each worker's MultiModelPredictor
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self.predictor_kwargs = dict(predictor_kwargs or {})
+
+    def run(self, bars_by_code: Dict[str, pd.DataFrame], timeframe: str = '1day',
+            current_prices: Optional[Dict[str, float]] = None) -> dict:
+        """
+        Predict every symbol
+
+        Args:
+            bars_by_code: {stock_code: bars DataFrame}
+            timeframe: Prediction timeframe
+            current_prices: Optional {stock_code: realtime price}
+
+        Returns:
+            dict: {'results': {code: prediction}, 'report': throughput and
+            serialization statistics}
+        """
+        current_prices = current_prices or {}
+        codes = list(bars_by_code)
+        chunks = [codes[i:i + self.chunk_size] for i in range(0, len(codes), self.chunk_size)]
+        results = {}
+        workers = {}
+        task_bytes = 0
+
+        started = time.perf_counter()
+        with SharedBars(bars_by_code) as shared:
+            spec = shared.spec()
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                     initargs=(spec, self.predictor_kwargs)) as executor:
+                futures = []
+                for chunk in chunks:
+                    prices = {code: current_prices[code] for code in chunk if code in current_prices}
+                    task_bytes += len(pickle.dumps((chunk, timeframe, prices), protocol=pickle.HIGHEST_PROTOCOL))
+                    futures.append(executor.submit(_predict_chunk, chunk, timeframe, prices))
+
+                for future in as_completed(futures):
+                    outcome = future.result()
+                    results.update(outcome['results'])
+                    stats = workers.setdefault(outcome['pid'], {'symbols': 0, 'busy_seconds': 0.0})
+                    stats['symbols'] += len(outcome['results'])
+                    stats['busy_seconds'] += outcome['busy_seconds']
+            shared_bytes = shared.nbytes
+        elapsed = time.perf_counter() - started
+
+        for stats in workers.values():
+            busy = stats['busy_seconds']
+            stats['busy_seconds'] = round(busy, 3)
+            stats['symbols_per_second'] = round(stats['symbols'] / busy, 2) if busy > 0 else 0.0
+
+        report = {
+            'symbols': len(codes),
+            'workers': workers,
+            'elapsed_seconds': round(elapsed, 3),
+            'symbols_per_second': round(len(codes) / elapsed, 2) if elapsed > 0 else 0.0,
+            'shared_bytes': shared_bytes,
+            'task_bytes': task_bytes,
+        }
+        report.update(self._serialization_avoided(bars_by_code))
+        logger.info(f"Parallel prediction: {len(codes)} symbols on {len(workers)} workers, "
+                    f"{report['symbols_per_second']} symbols/s, "
+                    f"{report['pickle_bytes_avoided']} pickled bytes avoided")
+        return {'results': {code: results[code] for code in codes}, 'report': report}
+
+    @staticmethod
+    def _serialization_avoided(bars_by_code: Dict[str, pd.DataFrame]) -> dict:
+        """
+        Bytes pickling the frames to workers would have cost
+
+        Taken from the frames' array nbytes (what a pickle of them carries,
+        less a small per-frame header) rather than by pickling them.
+        """
+        nbytes = sum(
+            int(bars.memory_usage(index=True, deep=False).sum()) for bars in bars_by_code.values()
+        )
+        return {'pickle_bytes_avoided': nbytes}
@@ -0,0 +1,175 @@
+"""
+SIAPS - Stage Timing
+Per-call stage timers and process-wide latency histograms
+
+A StageTimer measures named stages of one call with time.perf_counter and
+records every duration in a process-wide histogram for that stage, so the
+latency distribution of each stage can be read at any time (for example by
+a metrics endpoint). A disabled timer hands out one shared no-op context
+manager and records nothing, so instrumented code costs a method call per
+stage when timing is off.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import Dict, List, Optional
+
+
+# Histogram bucket upper bounds in milliseconds: 0.01 ms to ~84 s, x√2 apart
+BUCKET_BOUNDS_MS: List[float] = [0.01 * 2 ** (k / 2) for k in range(47)]
+
+_NULL_STAGE = nullcontext()
+
+
+class LatencyHistogram:
+    """Thread-safe histogram of durations with fixed log-spaced buckets"""
+
+    def __init__(self, bounds_ms: Optional[List[float]] = None):
+        """
+        Args:
+            bounds_ms: ascending bucket upper bounds in ms; one overflow bucket
+                is added for larger values
+        """
+        self.bounds_ms = list(bounds_ms or BUCKET_BOUNDS_MS)
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = float('inf')
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, ms: float):
+        index = bisect_left(self.bounds_ms, ms)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_ms += ms
+            self.min_ms = min(self.min_ms, ms)
+            self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Estimated q-th percentile (0-100) in ms
+
+        Returns the upper bound of the bucket holding the percentile, capped
+        at the largest recorded value, so the estimate errs on the slow side.
+        None when nothing was recorded.
+        """
+        with self._lock:
+            if self.count == 0:
+                return None
+            rank = max(1, q / 100 * self.count)
+            cumulative = 0
+            for index, count in enumerate(self.counts):
+                cumulative += count
+                if cumulative >= rank:
+                    bound = self.bounds_ms[index] if index < len(self.bounds_ms) else self.max_ms
+                    return min(bound, self.max_ms)
+            return self.max_ms
+
+    def snapshot(self) -> dict:
+        """Count, mean, min, max and p50/p90/p99 in ms"""
+        with self._lock:
+            count, total, low, high = self.count, self.total_ms, self.min_ms, self.max_ms
+        if count == 0:
+            return {'count': 0}
+        return {
+            'count': count,
+            'mean_ms': total / count,
+            'min_ms': low,
+            'max_ms': high,
+            'p50_ms': self.percentile(50),
+            'p90_ms': self.percentile(90),
+            'p99_ms': self.percentile(99),
+        }
+
+
+# Process-wide histograms by stage name
+_histograms: Dict[str, LatencyHistogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def stage_histogram(stage: str) -> LatencyHistogram:
+    """Histogram of a stage, created on first use"""
+    with _histograms_lock:
+        histogram = _histograms.get(stage)
+        if histogram is None:
+            histogram = _histograms[stage] = LatencyHistogram()
+        return histogram
+
+
+def record_stage(stage: str, ms: float):
+    """Record one duration of a stage"""
+    stage_histogram(stage).record(ms)
+
+
+def timing_snapshot() -> Dict[str, dict]:
+    """Summary of every stage histogram"""
+    with _histograms_lock:
+        histograms = dict(_histograms)
+    return {stage: histogram.snapshot() for stage, histogram in sorted(histograms.items())}
+
+
+def reset_timings():
+    """Drop all stage histograms"""
+    with _histograms_lock:
+        _histograms.clear()
+
+
+class _Stage:
+    """Context manager timing one stage of a StageTimer"""
+
+    __slots__ = ('timer', 'name', 'started')
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.add(self.name, (time.perf_counter() - self.started) * 1000)
+        return False
+
+
+class StageTimer:
+    """Durations of the stages of one call"""
+
+    def __init__(self, enabled: bool = True, prefix: str = ''):
+        """
+        Args:
+            enabled: when False, stage() is a no-op and nothing is recorded
+            prefix: prepended to stage names in the process-wide histograms
+        """
+        self.enabled = enabled
+        self.prefix = prefix
+        self.timings: Dict[str, float] = {}
+        self.started = time.perf_counter() if enabled else 0.0
+
+    def stage(self, name: str):
+        """Context manager timing the enclosed block as stage `name`"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def add(self, name: str, ms: float):
+        """Record a duration measured elsewhere"""
+        if not self.enabled:
+            return
+        self.timings[name] = self.timings.get(name, 0.0) + ms
+        record_stage(self.prefix + name, ms)
+
+    def finish(self, name: str = 'total') -> Dict[str, float]:
+        """
+        Record the time since the timer was created as stage `name`
+
+        Returns:
+            dict: {stage: ms} rounded to microseconds
+        """
+        if not self.enabled:
+            return {}
+        self.add(name, (time.perf_counter() - self.started) * 1000)
+        return {stage: round(ms, 3) for stage, ms in self.timings.items()}
@@ -0,0 +1,182 @@
+"""
+Test local bar store and historical backfill job
+"""
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.data_acquisition.bar_store import BarStore, normalize_bars, BAR_COLUMNS
+from src.data_acquisition.backfill import HistoricalBackfill, RateLimiter
+
+
+def make_akshare_bars(start_date, end_date):
+    """Build daily bars in AKShare's column format"""
+    dates = pd.bdate_range(start_date, end_date)
+    closes = [10 + i * 0.1 for i in range(len(dates))]
+    return pd.DataFrame({
+        '日期': dates.strftime('%Y-%m-%d'),
+        '开盘': closes,
+        '收盘': closes,
+        '最高': [c + 0.2 for c in closes],
+        '最低': [c - 0.2 for c in closes],
+        '成交量': [1000] * len(dates),
+        '成交额': [10000.0] * len(dates),
+    })
+
+
+class FakeFetch:
+    """Stand-in for MultiSourceDataFetcher.fetch_historical_from"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+
+    def __call__(self, source, stock_code, start_date, end_date):
+        self.calls.append((source, stock_code, start_date, end_date))
+        if stock_code in self.failing:
+            raise ConnectionError("source unavailable")
+        return make_akshare_bars(start_date, end_date)
+
+
+def test_normalize_akshare_and_yahoo_formats():
+    """Test both source formats normalize to the store columns"""
+    akshare = normalize_bars(make_akshare_bars('2024-01-01', '2024-01-10'))
+    assert list(akshare.columns) == BAR_COLUMNS
+    assert len(akshare) == 8
+
+    yahoo = pd.DataFrame(
+        {'Open': [1.0, 2.0], 'High': [1.5, 2.5], 'Low': [0.5, 1.5], 'Close': [1.2, 2.2], 'Volume': [10, 20]},
+        index=pd.DatetimeIndex(['2024-01-03', '2024-01-02'], name='Date', tz='Asia/Shanghai')
+    )
+    yahoo = normalize_bars(yahoo)
+    assert list(yahoo.columns) == BAR_COLUMNS
+    assert yahoo['date'].iloc[0] == pd.Timestamp('2024-01-02')
+    assert yahoo['close'].tolist() == [2.2, 1.2]
+
+    print("✓ Bar normalization test passed")
+
+
+def test_bar_store_append_and_merge():
+    """Test appending new bars and merging overlapping ones"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = BarStore(Path(tmp_dir))
+        store.append('000001', make_akshare_bars('2024-01-01', '2024-01-31'))
+        assert store.last_date('000001') == pd.Timestamp('2024-01-31')
+
+        store.append('000001', make_akshare_bars('2024-02-01', '2024-02-09'))
+        store.append('000001', make_akshare_bars('2024-02-05', '2024-02-16'))
+
+        bars = store.read('000001')
+        assert bars['date'].is_unique
+        assert bars['date'].is_monotonic_increasing
+        assert bars['date'].iloc[-1] == pd.Timestamp('2024-02-16')
+        assert store.symbols() == ['000001']
+
+    print("✓ Bar store append test passed")
+
+
+def test_backfill_resumes_from_checkpoint():
+    """Test failed symbols are retried and completed ones skipped on resume"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = BarStore(Path(tmp_dir) / 'bars')
+        checkpoint = Path(tmp_dir) / 'checkpoint.json'
+        codes = ['000001', '000002', '600000']
+
+        fetch = FakeFetch(failing=['000002'])
+        job = HistoricalBackfill(store=store, fetch_fn=fetch, checkpoint_path=checkpoint,
+                                 max_workers=3, rate_limits={'akshare': 0})
+        report = job.run(codes, start_date='2024-01-01', end_date='2024-03-29')
+
+        assert report['completed'] == 2
+        assert list(report['failed']) == ['000002']
+        assert report['symbols_per_minute'] > 0
+        saved = json.loads(checkpoint.read_text(encoding='utf-8'))
+        assert saved['completed'] == ['000001', '600000']
+
+        # Second run only retries the failed symbol
+        fetch = FakeFetch()
+        job.fetch_fn = fetch
+        report = job.run(codes, start_date='2024-01-01', end_date='2024-03-29')
+        assert report['skipped'] == 2
+        assert report['completed'] == 1
+        assert [call[1] for call in fetch.calls] == ['000002']
+        assert store.symbols() == codes
+
+    print("✓ Backfill resume test passed")
+
+
+def test_backfill_fetches_only_missing_range():
+    """Test symbols already in the store only request bars after their last date"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = BarStore(Path(tmp_dir) / 'bars')
+        store.append('000001', make_akshare_bars('2024-01-01', '2024-02-29'))
+
+        fetch = FakeFetch()
+        job = HistoricalBackfill(store=store, fetch_fn=fetch, max_workers=1,
+                                 checkpoint_path=Path(tmp_dir) / 'checkpoint.json',
+                                 rate_limits={'akshare': 0})
+        job.run(['000001'], start_date='2024-01-01', end_date='2024-03-29')
+
+        assert fetch.calls == [('akshare', '000001', '2024-03-01', '2024-03-29')]
+        assert store.last_date('000001') == pd.Timestamp('2024-03-29')
+
+    print("✓ Backfill incremental range test passed")
+
+
+def test_backfill_keeps_one_source_per_symbol():
+    """Test the source of a symbol's first download is recorded and the only one used after"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = BarStore(Path(tmp_dir) / 'bars')
+        # AKShare has nothing for 000001, so its first download comes from Yahoo
+        first_fetch = lambda source, code, start, end: (
+            None if source == 'akshare' and code == '000001' else make_akshare_bars(start, end))
+        job = HistoricalBackfill(store=store, fetch_fn=first_fetch, max_workers=1,
+                                 checkpoint_path=Path(tmp_dir) / 'checkpoint.json',
+                                 rate_limits={'akshare': 0, 'yahoo': 0})
+        job.run(['000001', '600000'], start_date='2024-01-01', end_date='2024-02-29')
+        assert store.source('000001') == 'yahoo' and store.source('600000') == 'akshare'
+
+        # Later runs continue each symbol from its own source only
+        fetch = FakeFetch()
+        job.fetch_fn = fetch
+        report = job.run(['000001', '600000'], start_date='2024-01-01', end_date='2024-03-29')
+        assert report['completed'] == 2
+        assert sorted(call[:2] for call in fetch.calls) == [('akshare', '600000'), ('yahoo', '000001')]
+
+        # A symbol from a source this run does not use is refused
+        job.sources = ['akshare']
+        report = job.run(['000001'], start_date='2024-01-01', end_date='2024-04-30')
+        assert 'not mixing sources' in report['failed']['000001']
+        assert store.last_date('000001') == pd.Timestamp('2024-03-29')
+
+    print("✓ Backfill single source test passed")
+
+
+def test_rate_limiter_spacing():
+    """Test rate limiter spaces calls by 1/rate seconds"""
+    import time
+    limiter = RateLimiter(rate=50)
+    started = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    # First call is immediate, the other five wait 20ms each
+    assert time.monotonic() - started >= 0.09
+
+    print("✓ Rate limiter test passed")
+
+
+if __name__ == "__main__":
+    test_normalize_akshare_and_yahoo_formats()
+    test_bar_store_append_and_merge()
+    test_backfill_resumes_from_checkpoint()
+    test_backfill_fetches_only_missing_range()
+    test_backfill_keeps_one_source_per_symbol()
+    test_rate_limiter_spacing()
+    print("\n✓ All backfill tests passed!")
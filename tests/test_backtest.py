@@ -0,0 +1,123 @@
+"""
+Test the walk-forward backtest engine
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.business_logic.backtest import (
+    SCORED_MODELS, WalkForwardBacktest, _accumulate, _empty_totals, summarize, walk_forward
+)
+from src.data_processing.indicators import technical_snapshot
+
+
+def make_bars(n, seed=0):
+    """Build a random-walk OHLCV frame with dates"""
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.015, n)))
+    return pd.DataFrame({
+        'date': pd.bdate_range('2022-01-03', periods=n),
+        'close': close,
+        'high': close * (1 + rng.uniform(0, 0.015, n)),
+        'low': close * (1 - rng.uniform(0, 0.015, n)),
+        'volume': rng.uniform(1e5, 1e6, n),
+    })
+
+
+class LastCloseRecorder:
+    """Predicts the last seen close and records what each origin saw"""
+
+    def __init__(self):
+        self.seen = []
+        self.windows = []
+
+    def predict_multi_timeframe(self, history, timeframe, stock_code=None, indicators=None):
+        self.seen.append((len(history), history['close'].iloc[-1], indicators['close']))
+        self.windows.append((history, indicators))
+        prices = [history['close'].iloc[-1]]
+        return {name: {'prices': prices} for name in SCORED_MODELS}
+
+
+def test_metrics():
+    """Test error and hit-rate metrics on hand-checked numbers"""
+    totals = _empty_totals()
+    _accumulate(totals, [11.0], np.array([10.0]), 9.0)   # error 1, up called up
+    _accumulate(totals, [9.0], np.array([12.0]), 10.0)   # error -3, down called up
+    _accumulate(totals, [10.0], np.array([10.0]), 10.0)  # flat outcome: not a direction
+    metrics = summarize(totals)
+
+    assert metrics['points'] == 3 and metrics['directions'] == 2
+    assert abs(metrics['mae'] - 4 / 3) < 1e-12
+    assert abs(metrics['rmse'] - np.sqrt(10 / 3)) < 1e-12
+    assert abs(metrics['mape'] - (0.1 + 0.25) / 3 * 100) < 1e-12
+    assert metrics['hit_rate'] == 0.5
+    assert summarize(_empty_totals())['mae'] is None
+
+    print("✓ Backtest metrics test passed")
+
+
+def test_walk_forward_has_no_lookahead():
+    """Test each origin only sees bars up to itself, within the lookback"""
+    bars = make_bars(120)
+    recorder = LastCloseRecorder()
+    outcome = walk_forward('000001', bars, '1day', recorder, warmup=30, lookback=50)
+
+    close = bars['close'].values
+    assert outcome['origins'] == len(close) - 30
+    for origin, (length, last_close, indicator_close) in zip(range(29, len(close) - 1), recorder.seen):
+        assert length == min(origin + 1, 50)
+        assert last_close == close[origin]
+        assert indicator_close == close[origin]
+
+    # Predicting the last close: error is the next bar's change
+    metrics = summarize(outcome['totals']['ensemble'])
+    assert abs(metrics['mae'] - np.abs(np.diff(close[29:])).mean()) < 1e-12
+
+    print("✓ Walk-forward lookahead test passed")
+
+
+def test_indicators_match_the_predicted_window():
+    """Test every origin's indicators are those of the window the predictor sees"""
+    bars = make_bars(160, seed=3)
+    recorder = LastCloseRecorder()
+    walk_forward('000001', bars, '1day', recorder, warmup=20, lookback=40, step=3)
+
+    assert any(len(history) < 40 for history, _ in recorder.windows)
+    assert any(history.index[0] > 0 for history, _ in recorder.windows)
+    for history, indicators in recorder.windows:
+        expected = technical_snapshot(*(history[k].to_numpy() for k in ('close', 'high', 'low', 'volume')))
+        assert set(indicators) == set(expected)
+        for key, value in expected.items():
+            np.testing.assert_allclose(indicators[key], value, rtol=1e-12, atol=1e-12, err_msg=key)
+
+    print("✓ Window indicator test passed")
+
+
+def test_parallel_matches_serial():
+    """Test the process pool produces the same metrics as an in-process run"""
+    bars_by_code = {'000001': make_bars(150, seed=1), '600000': make_bars(130, seed=2)}
+    serial = WalkForwardBacktest(max_workers=1, step=2).run(bars_by_code)
+    parallel = WalkForwardBacktest(max_workers=2, step=2).run(bars_by_code)
+
+    assert serial['symbols'] == parallel['symbols']
+    assert serial['overall'] == parallel['overall']
+    assert parallel['report']['origins'] == 45 + 35
+    for name in SCORED_MODELS:
+        metrics = serial['overall'][name]
+        assert metrics['points'] == 80 and 0 <= metrics['hit_rate'] <= 1
+
+    print("✓ Parallel backtest test passed")
+
+
+if __name__ == "__main__":
+    test_metrics()
+    test_walk_forward_has_no_lookahead()
+    test_indicators_match_the_predicted_window()
+    test_parallel_matches_serial()
+    print("\n✓ All backtest tests passed!")
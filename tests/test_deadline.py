@@ -0,0 +1,177 @@
+"""
+Test deadline-aware prediction with machine learning stage shedding
+"""
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.prediction_models import MultiModelPredictor
+from src.prediction_models.multi_model_predictor import DEADLINE_WORKERS
+from src.business_logic.prediction_cache import PredictionCache
+from src.data_processing import FeatureStore
+from src.prediction_models.model_cache import ModelCache
+from src.prediction_models.online_learner import OnlineLearnerStore
+from tests.test_prediction_cache import StubFetcher
+
+
+def make_bars(n, seed=0):
+    """Build a random-walk OHLCV frame"""
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        'close': close,
+        'high': close * 1.01,
+        'low': close * 0.99,
+        'volume': rng.uniform(1e5, 1e6, n),
+    })
+
+
+def slow_ml(predictor, seconds):
+    """Make the predictor's machine learning stage take at least `seconds`"""
+    original = predictor._machine_learning_prediction
+
+    def slow(*args, **kwargs):
+        time.sleep(seconds)
+        return original(*args, **kwargs)
+
+    predictor._machine_learning_prediction = slow
+
+
+def test_slow_ml_is_shed():
+    """Test an overrunning ML stage is shed and the ensemble renormalized"""
+    bars = make_bars(120)
+    predictor = MultiModelPredictor(enable_model_cache=False, ml_backend='ridge')
+    slow_ml(predictor, 0.5)
+
+    started = time.perf_counter()
+    result = predictor.predict_multi_timeframe(bars, timeframe='30min', deadline_ms=50, timings=True)
+    elapsed = time.perf_counter() - started
+    assert elapsed < 0.4
+    assert result['shed_stages'] == ['machine_learning']
+    assert 'machine_learning' not in result and 'machine_learning' not in result['timings']
+
+    weights = result['ensemble']['weights']
+    assert weights == {'technical': 0.5, 'support_resistance': 0.5}
+    expected = 0.5 * np.array(result['technical']['prices']) + 0.5 * np.array(result['support_resistance']['prices'])
+    np.testing.assert_allclose(result['ensemble']['prices'], expected)
+    assert len(result['price_change_pcts']) == 6
+    assert 0.5 <= result['confidence'] <= 0.95
+
+    # The shed result was not cached: without a budget the full prediction is computed
+    full = predictor.predict_multi_timeframe(bars, timeframe='30min')
+    assert 'machine_learning' in full and 'shed_stages' not in full
+    assert full['ensemble']['weights'] == predictor.weights
+
+    print("✓ ML shedding test passed")
+
+
+def test_generous_deadline_matches_unbounded():
+    """Test a prediction that meets its budget equals one without a budget"""
+    bars = make_bars(120, seed=1)
+    unbounded = MultiModelPredictor(enable_model_cache=False, ml_backend='ridge').predict_multi_timeframe(
+        bars, timeframe='30min'
+    )
+    predictor = MultiModelPredictor(enable_model_cache=False, ml_backend='ridge')
+    bounded = predictor.predict_multi_timeframe(bars, timeframe='30min', deadline_ms=10000)
+    assert bounded['shed_stages'] == []
+    assert bounded['ensemble'] == unbounded['ensemble']
+    assert bounded['machine_learning'] == unbounded['machine_learning']
+    assert bounded['confidence'] == unbounded['confidence']
+
+    # Served from the result cache, still reporting nothing shed
+    again = predictor.predict_multi_timeframe(bars, timeframe='30min', deadline_ms=10000)
+    assert again['shed_stages'] == [] and again['ensemble'] == unbounded['ensemble']
+
+    print("✓ Generous deadline test passed")
+
+
+def test_shed_fit_warms_model_cache():
+    """Test a shed fit keeps running and the next request reuses its model"""
+    bars = make_bars(200, seed=2)
+    predictor = MultiModelPredictor(model_cache=ModelCache(cache_dir=None),
+                                    feature_store=FeatureStore(root_dir=None),
+                                    online_store=OnlineLearnerStore(root_dir=None),
+                                    ml_backend='random_forest')
+    slow_ml(predictor, 0.2)
+
+    first = predictor.predict_multi_timeframe(bars, timeframe='1day', stock_code='000001', deadline_ms=20)
+    assert first['shed_stages'] == ['machine_learning']
+
+    # Wait for the background fit to land in the model cache
+    for _ in range(200):
+        if len(predictor.model_cache):
+            break
+        time.sleep(0.05)
+    assert len(predictor.model_cache) == 1
+
+    second = predictor.predict_multi_timeframe(bars, timeframe='1day', stock_code='000001', deadline_ms=5000)
+    assert second['shed_stages'] == []
+    assert second['machine_learning']['model_cached']
+
+    print("✓ Background fit test passed")
+
+
+def test_burst_does_not_queue_stages():
+    """Test a burst of deadline requests sheds at once instead of queueing ML stages"""
+    predictor = MultiModelPredictor(enable_model_cache=False, ml_backend='ridge')
+    slow_ml(predictor, 0.3)
+    calls = []
+    original = predictor._machine_learning_prediction
+    predictor._machine_learning_prediction = lambda *args: calls.append(1) or original(*args)
+
+    started = time.perf_counter()
+    results = [
+        predictor.predict_multi_timeframe(make_bars(120, seed=10 + i), timeframe='1day', deadline_ms=20)
+        for i in range(3 * DEADLINE_WORKERS)
+    ]
+    assert time.perf_counter() - started < 0.3 * DEADLINE_WORKERS
+    assert all(r['shed_stages'] == ['machine_learning'] for r in results)
+    assert predictor._deadline_executor._work_queue.qsize() == 0
+
+    # Only one stage per worker was started; once they finish every slot is free again
+    predictor._deadline_executor.shutdown(wait=True)
+    assert len(calls) == DEADLINE_WORKERS
+    for _ in range(DEADLINE_WORKERS):
+        assert predictor._stage_slots.acquire(blocking=False)
+
+    print("✓ Deadline burst test passed")
+
+
+def test_endpoint_reports_shed_stages():
+    """Test the multi endpoint reports shed stages and does not cache a shed result"""
+    import run_web_ui
+
+    predictor = MultiModelPredictor(enable_model_cache=False, ml_backend='ridge')
+    slow_ml(predictor, 0.3)
+    with patch.object(run_web_ui, 'data_fetcher', StubFetcher()), \
+            patch.object(run_web_ui, 'db_manager', None), \
+            patch.object(run_web_ui, 'multi_predictor', predictor), \
+            patch.object(run_web_ui, 'prediction_cache', PredictionCache()):
+        client = run_web_ui.app.test_client()
+        shed = client.get('/api/predict/multi/000001?timeframe=1day&deadline_ms=50').get_json()
+        full = client.get('/api/predict/multi/000001?timeframe=1day').get_json()
+        invalid = client.get('/api/predict/multi/000001?timeframe=1day&deadline_ms=-1')
+
+    assert shed['success'] and shed['shedStages'] == ['machine_learning']
+    assert shed['cache']['expiresAt'] is None
+    assert not full['cache']['hit'] and 'shedStages' not in full
+    assert invalid.status_code == 400
+
+    print("✓ Endpoint shed stages test passed")
+
+
+if __name__ == "__main__":
+    test_slow_ml_is_shed()
+    test_generous_deadline_matches_unbounded()
+    test_shed_fit_warms_model_cache()
+    test_burst_does_not_queue_stages()
+    test_endpoint_reports_shed_stages()
+    print("\n✓ All deadline tests passed!")
@@ -0,0 +1,151 @@
+"""
+Test the incremental per-symbol feature store
+"""
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.data_processing import feature_store as feature_store_module
+from src.data_processing.feature_store import FeatureStore
+from src.data_processing.features import build_window_features
+from src.prediction_models import MultiModelPredictor
+
+
+def make_bars(n, seed=0):
+    """Build a random-walk OHLCV frame"""
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        'close': close,
+        'high': close * (1 + rng.uniform(0, 0.02, n)),
+        'low': close * (1 - rng.uniform(0, 0.02, n)),
+        'volume': rng.uniform(1e5, 1e6, n),
+    })
+
+
+def columns(bars):
+    return bars['close'].values, bars['high'].values, bars['low'].values, bars['volume'].values
+
+
+def test_appends_only_new_rows():
+    """Test new bars add one row each and match a full rebuild"""
+    close, high, low, volume = columns(make_bars(200, seed=1))
+    store = FeatureStore(root_dir=None)
+
+    store.features('000001', close[:150], high[:150], low[:150], volume[:150], 10)
+    assert store.rows_built == 141
+    for end in range(151, 201):
+        features = store.features('000001', close[:end], high[:end], low[:end], volume[:end], 10)
+    assert store.rows_built == 141 + 50 and store.rebuilds == 1
+    np.testing.assert_array_equal(features, build_window_features(close, high, low, volume, 10))
+    assert not features.flags.writeable
+
+    # A trailing slice is served from the stored rows
+    trailing = store.features('000001', close[-30:], high[-30:], low[-30:], volume[-30:], 10)
+    np.testing.assert_array_equal(trailing, build_window_features(close[-30:], high[-30:], low[-30:], volume[-30:], 10))
+    assert store.rows_built == 191
+
+    # Revised history is rebuilt
+    revised = close[:180] * 1.1
+    features = store.features('000001', revised, high[:180], low[:180], volume[:180], 10)
+    np.testing.assert_array_equal(features, build_window_features(revised, high[:180], low[:180], volume[:180], 10))
+    assert store.rebuilds == 2
+
+    print("✓ Feature append test passed")
+
+
+def test_persistence_and_version_rebuild():
+    """Test stored features are reused across stores until FEATURE_VERSION changes"""
+    close, high, low, volume = columns(make_bars(120, seed=2))
+    with tempfile.TemporaryDirectory() as tmp:
+        FeatureStore(tmp).features('600000', close[:-1], high[:-1], low[:-1], None, 10)
+        assert (Path(tmp) / '600000_w10_float64.npz').exists()
+
+        reopened = FeatureStore(tmp)
+        features = reopened.features('600000', close, high, low, None, 10)
+        assert reopened.rows_built == 1 and reopened.rebuilds == 0
+        np.testing.assert_array_equal(features, build_window_features(close, high, low, None, 10))
+
+        with patch.object(feature_store_module, 'FEATURE_VERSION', 2):
+            upgraded = FeatureStore(tmp)
+            upgraded.features('600000', close, high, low, None, 10)
+            assert upgraded.rebuilds == 1 and upgraded.rows_built == 111
+
+    print("✓ Feature persistence test passed")
+
+
+def test_revised_bar_recomputes_from_that_bar():
+    """Test a revised bar mid-history invalidates only the windows containing it and later ones"""
+    close, high, low, volume = columns(make_bars(200, seed=4))
+    store = FeatureStore(root_dir=None)
+    store.features('000001', close, high, low, volume, 10)
+
+    revised = close.copy()
+    revised[120] *= 1.05
+    features = store.features('000001', revised, high, low, volume, 10)
+    np.testing.assert_array_equal(features, build_window_features(revised, high, low, volume, 10))
+    assert store.rows_built == 191 + (191 - 111) and store.rebuilds == 1
+
+    # Revised inside the last window, with a trailing slice and a new bar
+    revised = np.append(revised, revised[-1])
+    revised[195] *= 0.95
+    more = [np.append(column, column[-1]) for column in (high, low, volume)]
+    trailing = store.features('000001', revised[-50:], *(column[-50:] for column in more), 10)
+    np.testing.assert_array_equal(trailing, build_window_features(revised[-50:], *(column[-50:] for column in more), 10))
+    assert store.rows_built == 271 + (192 - 186) and store.rebuilds == 1
+
+    print("✓ Feature revision test passed")
+
+
+def test_dtypes_keep_separate_files():
+    """Test float32 and float64 stores sharing a directory do not rebuild each other's files"""
+    close, high, low, volume = columns(make_bars(120, seed=5))
+    with tempfile.TemporaryDirectory() as tmp:
+        FeatureStore(tmp).features('600000', close, high, low, volume, 10)
+        FeatureStore(tmp, dtype=np.float32).features('600000', close, high, low, volume, 10)
+        assert sorted(p.name for p in Path(tmp).glob('*.npz')) == ['600000_w10_float32.npz', '600000_w10_float64.npz']
+
+        for dtype in (np.float64, np.float32):
+            reopened = FeatureStore(tmp, dtype=dtype)
+            features = reopened.features('600000', close, high, low, volume, 10)
+            assert features.dtype == dtype and reopened.rows_built == 0 and reopened.rebuilds == 0
+
+    print("✓ Feature dtype files test passed")
+
+
+def test_predictor_reads_from_store():
+    """Test the ML stage uses stored features and predicts the same as without the store"""
+    bars = make_bars(150, seed=3)
+    store = FeatureStore(root_dir=None)
+    with_store = MultiModelPredictor(enable_model_cache=False, feature_store=store, ml_backend='ridge')
+    without = MultiModelPredictor(enable_model_cache=False, ml_backend='ridge')
+    assert without.feature_store is None
+
+    with_store._machine_learning_prediction(bars.iloc[:-1], 1, 10, stock_code='000002')
+    built = store.rows_built
+    stored = with_store._machine_learning_prediction(bars, 1, 10, stock_code='000002')
+    assert store.rows_built == built + 1
+    assert stored['prices'] == without._machine_learning_prediction(bars, 1, 10, stock_code='000002')['prices']
+
+    batch = with_store.predict_many({'000002': bars}, timeframe='1day')
+    assert store.rows_built == built + 1
+    assert batch['000002']['machine_learning']['prices'] == stored['prices']
+
+    print("✓ Predictor feature store test passed")
+
+
+if __name__ == "__main__":
+    test_appends_only_new_rows()
+    test_persistence_and_version_rebuild()
+    test_revised_bar_recomputes_from_that_bar()
+    test_dtypes_keep_separate_files()
+    test_predictor_reads_from_store()
+    print("\n✓ All feature store tests passed!")
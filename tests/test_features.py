@@ -0,0 +1,147 @@
+"""
+Test vectorized window feature builder
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.data_processing.features import RecursiveWindow, build_window_features, build_training_set
+
+
+def make_bars(n, seed=0):
+    """Build a random-walk OHLCV frame"""
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        'close': close,
+        'high': close * (1 + rng.uniform(0, 0.02, n)),
+        'low': close * (1 - rng.uniform(0, 0.02, n)),
+        'volume': rng.uniform(1e5, 1e6, n),
+    })
+
+
+def legacy_training_features(data, window_size):
+    """The per-window pandas loop the feature builder replaced"""
+    features = []
+    targets = []
+    for i in range(window_size, len(data)):
+        window_data = data.iloc[i-window_size:i]
+        features.append([
+            window_data['close'].mean(),
+            window_data['close'].std(),
+            window_data['high'].max(),
+            window_data['low'].min(),
+            window_data['volume'].mean() if 'volume' in window_data.columns else 0,
+            (window_data['close'].iloc[-1] - window_data['close'].iloc[0]) / window_data['close'].iloc[0]
+        ])
+        targets.append(data['close'].iloc[i])
+    return np.array(features), np.array(targets)
+
+
+def test_matches_legacy_loop():
+    """Test features equal the old pandas loop for several window sizes"""
+    for n, window_size in [(30, 10), (250, 10), (250, 60)]:
+        data = make_bars(n, seed=n)
+        X, y, x_last = build_training_set(
+            data['close'], data['high'], data['low'], data['volume'], window_size
+        )
+        X_ref, y_ref = legacy_training_features(data, window_size)
+
+        np.testing.assert_allclose(X, X_ref, rtol=1e-12, atol=0)
+        np.testing.assert_array_equal(y, y_ref)
+
+        # Latest window used for prediction
+        last = data.iloc[-window_size:]
+        assert np.isclose(x_last[0], last['close'].mean(), rtol=1e-12)
+        assert np.isclose(x_last[1], last['close'].std(), rtol=1e-12)
+
+    print("✓ Feature builder legacy parity test passed")
+
+
+def test_missing_volume_uses_zero():
+    """Test volume features are zero when volume is unavailable"""
+    data = make_bars(40)
+    features = build_window_features(data['close'], data['high'], data['low'], None, 10)
+    assert features.shape == (31, 6)
+    assert (features[:, 4] == 0).all()
+
+    print("✓ Missing volume test passed")
+
+
+def test_two_dimensional_input():
+    """Test symbols × time input gives per-symbol feature matrices"""
+    bars = [make_bars(50, seed=s) for s in range(3)]
+    stacked = {col: np.vstack([b[col].values for b in bars]) for col in ['close', 'high', 'low', 'volume']}
+    features = build_window_features(stacked['close'], stacked['high'], stacked['low'], stacked['volume'], 10)
+
+    assert features.shape == (3, 41, 6)
+    for s, b in enumerate(bars):
+        single = build_window_features(b['close'], b['high'], b['low'], b['volume'], 10)
+        np.testing.assert_allclose(features[s], single, rtol=1e-12)
+
+    print("✓ 2-D feature builder test passed")
+
+
+def legacy_recursive_features(data, window_size, closes):
+    """Previous forecaster: copy the last row, set its close and concat per step"""
+    rows = []
+    current = data.copy()
+    for close in closes:
+        window = current.iloc[-window_size:]
+        rows.append(build_window_features(window['close'].values, window['high'].values,
+                                          window['low'].values, window['volume'].values,
+                                          window_size)[-1])
+        new_row = current.iloc[-1:].copy()
+        new_row['close'] = close
+        current = pd.concat([current, new_row], ignore_index=True)
+    return np.array(rows)
+
+
+def test_recursive_window_matches_concat_loop():
+    """Test incremental window features equal the DataFrame-append loop"""
+    data = make_bars(80, seed=4)
+    steps = 30
+    closes = data['close'].iloc[-1] * np.exp(np.cumsum(np.random.default_rng(1).normal(0, 0.01, steps)))
+
+    window = RecursiveWindow(data['close'], data['high'], data['low'], data['volume'], 10, steps)
+    rows = []
+    for close in closes:
+        rows.append(window.features())
+        window.push(close)
+
+    np.testing.assert_allclose(np.array(rows), legacy_recursive_features(data, 10, closes), rtol=1e-9)
+
+    print("✓ Recursive window parity test passed")
+
+
+def test_recursive_window_two_dimensional():
+    """Test a symbols × time window advances every symbol per push"""
+    bars = [make_bars(40, seed=s) for s in range(3)]
+    stacked = {col: np.vstack([b[col].values for b in bars]) for col in ['close', 'high', 'low', 'volume']}
+    window = RecursiveWindow(stacked['close'], stacked['high'], stacked['low'], None, 10, 3)
+    for step in range(3):
+        window.push(stacked['close'][:, -1] * (1 + 0.01 * step))
+
+    for s, b in enumerate(bars):
+        single = RecursiveWindow(b['close'], b['high'], b['low'], None, 10, 3)
+        for step in range(3):
+            single.push(b['close'].iloc[-1] * (1 + 0.01 * step))
+        np.testing.assert_allclose(window.features()[s], single.features(), rtol=1e-12)
+    assert (window.features()[:, 4] == 0).all()
+
+    print("✓ 2-D recursive window test passed")
+
+
+if __name__ == "__main__":
+    test_matches_legacy_loop()
+    test_missing_volume_uses_zero()
+    test_two_dimensional_input()
+    test_recursive_window_matches_concat_loop()
+    test_recursive_window_two_dimensional()
+    print("\n✓ All feature builder tests passed!")
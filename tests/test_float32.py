@@ -0,0 +1,148 @@
+"""
+Test the float32 numeric path against float64 results
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.data_processing import FeatureStore, RecursiveWindow, build_window_features, technical_snapshot
+from src.data_processing.indicators import as_float_array
+from src.prediction_models import MultiModelPredictor
+
+
+def make_matrix(symbols, n, seed=0):
+    """Random-walk (symbols × time) close, high, low and volume in float64"""
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, (symbols, n)), axis=1))
+    return close, close * 1.01, close * 0.99, rng.uniform(1e5, 1e6, (symbols, n))
+
+
+def to_float32(arrays):
+    return [a.astype(np.float32) for a in arrays]
+
+
+def test_as_float_array():
+    """Test float32 is kept, other dtypes become float64, and no copy is made when not needed"""
+    x32 = np.arange(5, dtype=np.float32)
+    assert as_float_array(x32) is x32
+    assert as_float_array(np.arange(5)).dtype == np.float64
+    assert as_float_array([1, 2]).dtype == np.float64
+    assert as_float_array(x32, np.float64).dtype == np.float64
+
+    print("✓ as_float_array test passed")
+
+
+def test_indicators_float32_within_tolerance():
+    """Test float32 indicators stay float32 and close to float64"""
+    bars = make_matrix(20, 300)
+    exact = technical_snapshot(*bars)
+    compact = technical_snapshot(*to_float32(bars))
+    for key, values in exact.items():
+        assert compact[key].dtype == np.float32, key
+    # Price-scale values: relative error; oscillators (0-100): absolute error
+    for key in ('close', 'Bollinger_Upper', 'Bollinger_Lower', 'Volume_Trend'):
+        np.testing.assert_allclose(compact[key], exact[key], rtol=1e-5, err_msg=key)
+    for key in ('RSI', 'KDJ_K', 'KDJ_D', 'KDJ_J'):
+        np.testing.assert_allclose(compact[key], exact[key], atol=1e-3, err_msg=key)
+    for key in ('MACD', 'MACD_Signal', 'MACD_Hist'):
+        np.testing.assert_allclose(compact[key], exact[key], atol=1e-4 * exact['close'].max(), err_msg=key)
+
+    print("✓ Float32 indicator tolerance test passed")
+
+
+def test_features_float32_within_tolerance():
+    """Test float32 window features and the recursive window against float64"""
+    bars = make_matrix(10, 200, seed=1)
+    exact = build_window_features(*bars, 60)
+    compact = build_window_features(*to_float32(bars), 60)
+    assert compact.dtype == np.float32 and compact.nbytes * 2 == exact.nbytes
+    np.testing.assert_allclose(compact[..., :5], exact[..., :5], rtol=1e-5)
+    np.testing.assert_allclose(compact[..., 5], exact[..., 5], atol=1e-5)
+
+    window = RecursiveWindow(*to_float32(bars), 60, 6)
+    closes = bars[0][:, -1]
+    for step in range(6):
+        row = window.features()
+        assert row.dtype == np.float32
+        np.testing.assert_allclose(row, build_window_features(*bars, 60)[:, -1, :], rtol=1e-5, atol=1e-5)
+        closes = closes * 1.01
+        window.push(closes)
+        bars = [np.column_stack([a, a[:, -1] if i else closes]) for i, a in enumerate(bars)]
+
+    print("✓ Float32 feature tolerance test passed")
+
+
+def test_feature_store_dtype():
+    """Test a float32 store returns float32 rows and rebuilds files of another dtype"""
+    import tempfile
+
+    close, high, low, volume = (a[0] for a in make_matrix(1, 80, seed=2))
+    with tempfile.TemporaryDirectory() as tmp:
+        FeatureStore(root_dir=tmp).features('000001', close, high, low, volume, 10)
+        store = FeatureStore(root_dir=tmp, dtype=np.float32)
+        rows = store.features('000001', close, high, low, volume, 10)
+        assert rows.dtype == np.float32 and store.rebuilds == 1
+        np.testing.assert_allclose(rows[:, :5], build_window_features(close, high, low, volume, 10)[:, :5], rtol=1e-5)
+
+    print("✓ Feature store dtype test passed")
+
+
+def test_predictor_float32_matches_float64():
+    """Test float32 predictions agree with float64 within tolerance"""
+    close, high, low, volume = (a[0] for a in make_matrix(1, 250, seed=3))
+    bars = pd.DataFrame({'close': close, 'high': high, 'low': low, 'volume': volume})
+    for backend, rtol in (('ridge', 1e-5), ('online', 1e-5), ('random_forest', 2e-2)):
+        for timeframe in ('1day', '30min'):
+            exact = MultiModelPredictor(enable_model_cache=False, ml_backend=backend).predict_multi_timeframe(
+                bars, timeframe, stock_code='000001'
+            )
+            compact = MultiModelPredictor(
+                enable_model_cache=False, ml_backend=backend, dtype='float32'
+            ).predict_multi_timeframe(bars, timeframe, stock_code='000001')
+            for model in ('technical', 'machine_learning', 'ensemble'):
+                np.testing.assert_allclose(compact[model]['prices'], exact[model]['prices'], rtol=rtol,
+                                           err_msg=f"{backend} {timeframe} {model}")
+            assert compact['support_resistance'] == exact['support_resistance']
+
+    try:
+        MultiModelPredictor(enable_model_cache=False, dtype='float16')
+        assert False, "float16 should be rejected"
+    except ValueError:
+        pass
+
+    print("✓ Float32 predictor test passed")
+
+
+def test_predict_many_float32():
+    """Test batched float32 predictions equal single float32 predictions"""
+    close, high, low, volume = make_matrix(3, 120, seed=4)
+    bars_by_code = {
+        f"00000{i}": pd.DataFrame({'close': close[i], 'high': high[i], 'low': low[i], 'volume': volume[i]})
+        for i in range(3)
+    }
+    batched = MultiModelPredictor(enable_model_cache=False, ml_backend='ridge', dtype='float32').predict_many(
+        bars_by_code
+    )
+    single = MultiModelPredictor(enable_model_cache=False, ml_backend='ridge', dtype='float32')
+    for code, bars in bars_by_code.items():
+        expected = single.predict_multi_timeframe(bars, '1day', stock_code=code)
+        np.testing.assert_allclose(batched[code]['ensemble']['prices'], expected['ensemble']['prices'], rtol=1e-6)
+        assert all(type(p) is float for p in batched[code]['price_change_pcts'])
+
+    print("✓ Float32 batch test passed")
+
+
+if __name__ == "__main__":
+    test_as_float_array()
+    test_indicators_float32_within_tolerance()
+    test_features_float32_within_tolerance()
+    test_feature_store_dtype()
+    test_predictor_float32_matches_float64()
+    test_predict_many_float32()
+    print("\n✓ All float32 tests passed!")
@@ -0,0 +1,137 @@
+"""
+Test incremental indicator engine against the predictor's full recomputation
+"""
+import sys
+import math
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.data_processing.incremental_indicators import IncrementalIndicators, IncrementalIndicatorEngine
+from src.prediction_models import MultiModelPredictor
+
+
+def make_bars(n, seed=0):
+    """Build a random-walk OHLCV frame"""
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        'close': close,
+        'high': close * (1 + rng.uniform(0, 0.02, n)),
+        'low': close * (1 - rng.uniform(0, 0.02, n)),
+        'volume': rng.uniform(1e5, 1e6, n),
+    })
+
+
+def assert_snapshots_close(actual, expected):
+    assert set(actual) == set(expected)
+    for key, value in expected.items():
+        if math.isnan(value):
+            assert math.isnan(actual[key]), key
+        else:
+            assert math.isclose(actual[key], value, rel_tol=1e-9, abs_tol=1e-9), (key, actual[key], value)
+
+
+def test_matches_full_recomputation_bar_by_bar():
+    """Test every prefix's snapshot equals the predictor's indicator values"""
+    predictor = MultiModelPredictor(enable_model_cache=False)
+    bars = make_bars(120)
+    state = IncrementalIndicators()
+
+    for i in range(len(bars)):
+        row = bars.iloc[i]
+        state.update(row['close'], row['high'], row['low'], row['volume'])
+        expected = predictor._compute_technical_indicators(bars.iloc[:i + 1])
+        assert_snapshots_close(state.snapshot(), expected)
+
+    print("✓ Incremental indicator parity test passed")
+
+
+def test_flat_market_is_neutral():
+    """Test zero price range gives the same neutral KDJ and NaN RSI as pandas"""
+    predictor = MultiModelPredictor(enable_model_cache=False)
+    bars = pd.DataFrame({'close': [10.0] * 30, 'high': [10.0] * 30, 'low': [10.0] * 30, 'volume': [100.0] * 30})
+    engine = IncrementalIndicatorEngine()
+    snapshot = engine.warm_up('000001', bars)
+
+    assert_snapshots_close(snapshot, predictor._compute_technical_indicators(bars))
+    assert snapshot['KDJ_K'] == 50.0
+
+    print("✓ Flat market test passed")
+
+
+def test_tick_revision_replaces_current_bar():
+    """Test revising with ticks equals having seen only the final tick"""
+    bars = make_bars(60, seed=3)
+    engine = IncrementalIndicatorEngine()
+    engine.warm_up('600000', bars.iloc[:-1])
+
+    last = bars.iloc[-1]
+    engine.update('600000', last['close'] * 0.97, last['high'], last['low'], last['volume'] * 0.3)
+    engine.revise('600000', last['close'] * 1.02, last['high'], last['low'], last['volume'] * 0.6)
+    revised = engine.revise('600000', last['close'], last['high'], last['low'], last['volume'])
+
+    reference = IncrementalIndicatorEngine().warm_up('600000', bars)
+    assert_snapshots_close(revised, reference)
+
+    print("✓ Tick revision test passed")
+
+
+def state_of(indicators):
+    """Comparable view of an IncrementalIndicators state"""
+    return (
+        [getattr(indicators, name) for name in IncrementalIndicators._SCALARS],
+        [getattr(indicators, name).value for name in IncrementalIndicators._EMAS],
+        [(list(window.values), window.mean, window.m2) for window in (indicators.gain, indicators.loss,
+                                                                       indicators.boll, indicators.volume_ma)],
+        [(list(window.candidates), window.index) for window in (indicators.high_max, indicators.low_min)],
+    )
+
+
+def test_revision_undoes_the_bar_exactly():
+    """Test revising restores the pre-bar state bit for bit, whether or not the windows are full"""
+    for n in (5, 60):
+        bars = make_bars(n, seed=7)
+        engine = IncrementalIndicatorEngine()
+        engine.warm_up('000001', bars.iloc[:-1])
+
+        last = bars.iloc[-1]
+        # An outlier tick drops every KDJ candidate, then the bar settles
+        engine.update('000001', last['close'] * 3, last['high'] * 3, last['low'] / 3, last['volume'] * 9)
+        engine.revise('000001', last['close'] * 0.9, last['high'], last['low'] * 0.9, last['volume'] * 0.5)
+        revised = engine.revise('000001', last['close'], last['high'], last['low'], last['volume'])
+
+        reference = IncrementalIndicatorEngine()
+        expected = reference.warm_up('000001', bars)
+        assert state_of(engine.states['000001']) == state_of(reference.states['000001'])
+        assert {k: v for k, v in revised.items() if not math.isnan(v)} == \
+            {k: v for k, v in expected.items() if not math.isnan(v)}
+
+    print("✓ Exact revision test passed")
+
+
+def test_snapshot_feeds_predictor():
+    """Test predictions from an injected snapshot equal recomputed ones"""
+    predictor = MultiModelPredictor(enable_model_cache=False)
+    bars = make_bars(80, seed=5)
+    snapshot = IncrementalIndicatorEngine().warm_up('000002', bars)
+
+    expected = predictor._technical_indicator_prediction(bars, 3, '1day')
+    actual = predictor._technical_indicator_prediction(bars, 3, '1day', indicators=snapshot)
+    np.testing.assert_allclose(actual['prices'], expected['prices'], rtol=1e-9)
+
+    print("✓ Snapshot injection test passed")
+
+
+if __name__ == "__main__":
+    test_matches_full_recomputation_bar_by_bar()
+    test_flat_market_is_neutral()
+    test_tick_revision_replaces_current_bar()
+    test_revision_undoes_the_bar_exactly()
+    test_snapshot_feeds_predictor()
+    print("\n✓ All incremental indicator tests passed!")
@@ -0,0 +1,224 @@
+"""
+Test the shared indicator library against reference formulas
+"""
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.data_processing import FeatureStore
+from src.data_processing.indicators import (
+    DISPLAY_KEYS, atr, compute_indicators, kdj, obv, rsi_wilder, technical_snapshot
+)
+from src.prediction_models import ModelCache, MultiModelPredictor
+from src.prediction_models.online_learner import OnlineLearnerStore
+from tests.test_prediction_cache import StubFetcher
+
+
+def make_bars(n, symbols=None, seed=0):
+    """Random-walk close/high/low/volume, 1-D or (symbols × n)"""
+    rng = np.random.default_rng(seed)
+    shape = (n,) if symbols is None else (symbols, n)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, shape), axis=-1))
+    high = close * (1 + rng.uniform(0, 0.02, shape))
+    low = close * (1 - rng.uniform(0, 0.02, shape))
+    return close, high, low, rng.uniform(1e5, 1e6, shape)
+
+
+def wilder_reference(values, period):
+    """Wilder's smoothing seeded with the mean of values[1:period+1]"""
+    out = np.full(len(values), np.nan)
+    if len(values) > period:
+        out[period] = np.mean(values[1:period + 1])
+        for t in range(period + 1, len(values)):
+            out[t] = (out[t - 1] * (period - 1) + values[t]) / period
+    return out
+
+
+def test_matches_reference_formulas():
+    """Test every indicator against pandas or a plain loop"""
+    close, high, low, volume = make_bars(120)
+    result = compute_indicators(close, high, low, volume)
+    series = pd.Series(close)
+
+    for window in (5, 10, 20):
+        np.testing.assert_allclose(result[f'MA{window}'], series.rolling(window).mean(), rtol=1e-12)
+    for span in (12, 26):
+        np.testing.assert_allclose(result[f'EMA{span}'], series.ewm(span=span, adjust=False).mean(), rtol=1e-12)
+    line = series.ewm(span=12, adjust=False).mean() - series.ewm(span=26, adjust=False).mean()
+    signal = line.ewm(span=9, adjust=False).mean()
+    np.testing.assert_allclose(result['MACD'], line, atol=1e-12)
+    np.testing.assert_allclose(result['MACD_Signal'], signal, atol=1e-12)
+    np.testing.assert_allclose(result['MACD_Hist'], line - signal, atol=1e-12)
+
+    delta = np.diff(close, prepend=close[0])
+    gain = wilder_reference(np.where(delta > 0, delta, 0.0), 14)
+    loss = wilder_reference(np.where(delta < 0, -delta, 0.0), 14)
+    np.testing.assert_allclose(result['RSI'], 100 - 100 / (1 + gain / loss), rtol=1e-10)
+    assert np.isnan(result['RSI'][:14]).all() and not np.isnan(result['RSI'][14:]).any()
+
+    std = series.rolling(20).std()
+    np.testing.assert_allclose(result['Bollinger_Middle'], series.rolling(20).mean(), rtol=1e-12)
+    np.testing.assert_allclose(result['Bollinger_Upper'], series.rolling(20).mean() + 2 * std, rtol=1e-12)
+    for key, expected in zip(('KDJ_K', 'KDJ_D', 'KDJ_J'), kdj(close, high, low)):
+        np.testing.assert_array_equal(result[key], expected)
+
+    previous = np.concatenate([[close[0]], close[:-1]])
+    true_range = np.maximum(high - low, np.maximum(np.abs(high - previous), np.abs(low - previous)))
+    true_range[0] = high[0] - low[0]
+    np.testing.assert_allclose(result['ATR'], wilder_reference(true_range, 14), rtol=1e-10)
+    np.testing.assert_allclose(atr(high, low, close), result['ATR'])
+    np.testing.assert_allclose(rsi_wilder(close), result['RSI'])
+
+    np.testing.assert_allclose(result['OBV'], (np.sign(series.diff().fillna(0)) * volume).cumsum(), rtol=1e-12)
+    np.testing.assert_allclose(result['Volume_Trend'], volume / pd.Series(volume).rolling(5).mean().fillna(
+        pd.Series(volume)), rtol=1e-12)
+
+    print("✓ Reference formula test passed")
+
+
+def test_matrix_rows_match_single_series():
+    """Test a (symbols × time) matrix gives each row's single-series result"""
+    bars = make_bars(90, symbols=4, seed=1)
+    stacked = compute_indicators(*bars)
+    for i in range(4):
+        single = compute_indicators(*(a[i] for a in bars))
+        assert set(single) == set(stacked)
+        for key, values in single.items():
+            np.testing.assert_allclose(stacked[key][i], values, rtol=1e-12, err_msg=key)
+
+    latest = stacked.latest()
+    assert latest['RSI'].shape == (4,)
+    np.testing.assert_array_equal(latest['KDJ_J'], stacked['KDJ_J'][:, -1])
+
+    print("✓ Matrix parity test passed")
+
+
+def test_subsets_parameters_and_dtype():
+    """Test requested names, parameter overrides, float32 and input validation"""
+    close, high, low, volume = make_bars(60)
+    only = compute_indicators(close, names=('ma', 'rsi'), params={'ma': (3,), 'rsi': 6})
+    assert set(only) == {'MA3', 'RSI'}
+    np.testing.assert_allclose(only['RSI'], rsi_wilder(close, 6))
+    assert np.isnan(rsi_wilder(close[:10], 14)).all()
+
+    compact = compute_indicators(*(a.astype(np.float32) for a in (close, high, low, volume)))
+    exact = compute_indicators(close, high, low, volume)
+    assert set(compact) == set(exact)
+    for key, values in compact.items():
+        assert values.dtype == np.float32, key
+    np.testing.assert_allclose(compact['RSI'], exact['RSI'], atol=1e-2)
+    np.testing.assert_allclose(obv(close, volume), exact['OBV'])
+
+    for bad in ({'names': ('foo',)}, {'names': ('atr',)}, {'names': ('obv',), 'high': high, 'low': low}):
+        try:
+            compute_indicators(close, **bad)
+            assert False, bad
+        except ValueError:
+            pass
+
+    print("✓ Subset and dtype test passed")
+
+
+def test_snapshot_display_indicators():
+    """Test display=True adds MA, ATR and OBV from the same pass without changing the model's values"""
+    close, high, low, volume = make_bars(60)
+    model = technical_snapshot(close, high, low, volume)
+    shown = technical_snapshot(close, high, low, volume, display=True)
+    full = compute_indicators(close, high, low, volume).latest()
+    assert set(shown) == set(model) | set(DISPLAY_KEYS)
+    for key, value in model.items():
+        assert shown[key] == value, key
+    for key in DISPLAY_KEYS:
+        assert shown[key] == full[key], key
+    assert 'OBV' not in technical_snapshot(close, high, low, None, display=True)
+
+    print("✓ Display indicator test passed")
+
+
+def test_predict_endpoint_uses_library():
+    """Test /api/predict reports indicators computed from the fetched bars"""
+    import run_web_ui
+
+    fetcher = StubFetcher()
+    with patch.object(run_web_ui, 'data_fetcher', fetcher), \
+            patch.object(run_web_ui, 'db_manager', None):
+        body = run_web_ui.app.test_client().get('/api/predict/000001').get_json()
+
+    bars = fetcher.fetch_historical_data('000001', None, None)
+    expected = technical_snapshot(bars['收盘'].to_numpy(), bars['最高'].to_numpy(), bars['最低'].to_numpy(),
+                                  bars['成交量'].to_numpy(), display=True)
+    indicators = body['technicalIndicators']
+    assert body['success']
+    assert indicators['MA5'] == round(float(expected['MA5']), 2)
+    # The technical model's RSI, as on /api/predict/multi
+    assert indicators['RSI'] == round(float(expected['RSI']), 1)
+    assert indicators['KDJ'] == round(float(expected['KDJ_K']), 1)
+    assert indicators['BOLL'] == f"{round(float(expected['Bollinger_Lower']), 2)}-" \
+                                 f"{round(float(expected['Bollinger_Upper']), 2)}"
+    assert set(body['indicatorSignals']) >= {'RSI', 'MACD', 'BOLL', 'KDJ', 'MA5'}
+
+    print("✓ Predict endpoint indicator test passed")
+
+
+def test_predict_endpoint_without_bars_has_no_indicators():
+    """Test /api/predict reports indicators as unavailable instead of computing them from demo prices"""
+    import run_web_ui
+
+    class NoHistoryFetcher(StubFetcher):
+        def fetch_historical_data(self, stock_code, start_date, end_date):
+            return pd.DataFrame()
+
+    with patch.object(run_web_ui, 'data_fetcher', NoHistoryFetcher()), \
+            patch.object(run_web_ui, 'db_manager', None):
+        body = run_web_ui.app.test_client().get('/api/predict/000001').get_json()
+
+    assert body['success'] and len(body['priceHistory']['data']) > 0
+    assert body['technicalIndicators'] is None
+    assert body['indicatorSignals'] == {}
+
+    print("✓ Predict endpoint without bars test passed")
+
+
+def test_multi_endpoint_reports_model_indicators():
+    """Test /api/predict/multi shows the technical model's own indicators without recomputing them"""
+    import run_web_ui
+
+    predictor = MultiModelPredictor(model_cache=ModelCache(cache_dir=None),
+                                    feature_store=FeatureStore(root_dir=None),
+                                    online_store=OnlineLearnerStore(root_dir=None))
+    with patch.object(run_web_ui, 'data_fetcher', StubFetcher()), \
+            patch.object(run_web_ui, 'db_manager', None), \
+            patch.object(run_web_ui, 'multi_predictor', predictor), \
+            patch.object(run_web_ui, 'prediction_cache', None), \
+            patch.object(run_web_ui, 'technical_snapshot', side_effect=AssertionError('recomputed')):
+        body = run_web_ui.app.test_client().get('/api/predict/multi/000001?timeframe=1day').get_json()
+
+    bars = StubFetcher().fetch_historical_data('000001', None, None)
+    expected = technical_snapshot(bars['收盘'].to_numpy(), bars['最高'].to_numpy(), bars['最低'].to_numpy(),
+                                  bars['成交量'].to_numpy(), display=True)
+    indicators = body['technicalIndicators']
+    assert body['success']
+    assert indicators['RSI'] == round(float(expected['RSI']), 1)
+    assert indicators['MACD'] == round(float(expected['MACD']), 3)
+    assert indicators['MA20'] == round(float(expected['MA20']), 2)
+    assert indicators['OBV'] == round(float(expected['OBV']), 0)
+
+    print("✓ Multi endpoint indicator test passed")
+
+
+if __name__ == "__main__":
+    test_matches_reference_formulas()
+    test_matrix_rows_match_single_series()
+    test_subsets_parameters_and_dtype()
+    test_snapshot_display_indicators()
+    test_predict_endpoint_uses_library()
+    test_predict_endpoint_without_bars_has_no_indicators()
+    test_multi_endpoint_reports_model_indicators()
+    print("\n✓ All indicator library tests passed!")
@@ -0,0 +1,140 @@
+"""
+Test the pluggable ML backend registry
+"""
+import pickle
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.data_processing import FeatureStore
+from src.data_processing.features import build_training_set
+from src.prediction_models import ML_BACKENDS, MLBackend, ModelCache, MultiModelPredictor, get_backend
+from src.prediction_models.ml_backends import RidgeBackend, SeasonalNaiveModel, register_backend
+from src.prediction_models.online_learner import OnlineLearnerStore
+
+
+def make_bars(n, seed=0):
+    """Build a random-walk OHLCV frame"""
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        'close': close,
+        'high': close * (1 + rng.uniform(0, 0.02, n)),
+        'low': close * (1 - rng.uniform(0, 0.02, n)),
+        'volume': rng.uniform(1e5, 1e6, n),
+    })
+
+
+def training_set(n=150, seed=1):
+    bars = make_bars(n, seed)
+    X, y, _ = build_training_set(bars['close'].values, bars['high'].values, bars['low'].values,
+                                 bars['volume'].values, 10)
+    return X, y
+
+
+def test_every_backend_fits_and_pickles():
+    """Test each registered backend yields a picklable model with predict(X)"""
+    X, y = training_set()
+    for name in ('random_forest', 'hist_gradient_boosting', 'ridge', 'seasonal_naive', 'online'):
+        model = get_backend(name).fit(X, y)
+        predictions = pickle.loads(pickle.dumps(model)).predict(X[-3:])
+        assert predictions.shape == (3,), name
+        assert np.isfinite(predictions).all(), name
+
+    print("✓ Backend fit/predict test passed")
+
+
+def test_ridge_matches_normal_equations():
+    """Test closed-form ridge equals the textbook solution on standardized features"""
+    X, y = training_set()
+    model = RidgeBackend().fit(X, y)
+
+    Z = (X - X.mean(axis=0)) / X.std(axis=0)
+    design = np.hstack([Z, np.ones((len(Z), 1))])
+    penalty = np.eye(design.shape[1])
+    penalty[-1, -1] = 0  # intercept is not penalized
+    solution = np.linalg.solve(design.T @ design + penalty, design.T @ y)
+    np.testing.assert_allclose(model.predict(X), design @ solution, rtol=1e-8)
+
+    print("✓ Ridge closed form test passed")
+
+
+def test_seasonal_naive_forecast():
+    """Test the seasonal baseline cycles through the last season"""
+    model = SeasonalNaiveModel([1.0, 2.0, 3.0])
+    assert model.forecast(7).tolist() == [1.0, 2.0, 3.0, 1.0, 2.0, 3.0, 1.0]
+
+    bars = make_bars(80, seed=2)
+    result = MultiModelPredictor(enable_model_cache=False)._machine_learning_prediction(
+        bars, 6, 10, ml_backend='seasonal_naive'
+    )
+    assert result['model'] == 'SeasonalNaive'
+    expected = np.resize(bars['close'].values[-5:], 6)
+    np.testing.assert_allclose(result['prices'], expected)
+
+    print("✓ Seasonal naive test passed")
+
+
+def test_backend_selection_and_cache_keys():
+    """Test per-request selection, config default and separate cached models"""
+    bars = make_bars(120, seed=3)
+    cache = ModelCache(cache_dir=None)
+    predictor = MultiModelPredictor(model_cache=cache,
+                                    feature_store=FeatureStore(root_dir=None),
+                                    online_store=OnlineLearnerStore(root_dir=None),
+                                    ml_backend='ridge')
+
+    default = predictor.predict_multi_timeframe(bars, timeframe='1day', stock_code='000001')
+    boosted = predictor.predict_multi_timeframe(bars, timeframe='1day', stock_code='000001',
+                                                ml_backend='hist_gradient_boosting')
+    assert default['machine_learning']['model'] == 'Ridge'
+    assert boosted['machine_learning']['model'] == 'HistGradientBoosting'
+    assert len(cache) == 2
+
+    batch = predictor.predict_many({'000001': bars}, timeframe='1day', ml_backend='hist_gradient_boosting')
+    assert batch['000001']['machine_learning']['prices'] == boosted['machine_learning']['prices']
+
+    try:
+        MultiModelPredictor(ml_backend='nope')
+    except ValueError as e:
+        assert 'random_forest' in str(e)
+    else:
+        raise AssertionError("unknown backend accepted")
+
+    print("✓ Backend selection test passed")
+
+
+def test_register_custom_backend():
+    """Test a registered backend is usable by name"""
+    class MeanBackend(MLBackend):
+        name = 'test_mean'
+        display_name = 'Mean'
+
+        def fit(self, X, y):
+            return SeasonalNaiveModel([float(np.mean(y))])
+
+    register_backend(MeanBackend())
+    try:
+        result = MultiModelPredictor(enable_model_cache=False, ml_backend='test_mean')._machine_learning_prediction(
+            make_bars(60), 2, 10
+        )
+        assert result['model'] == 'Mean'
+    finally:
+        ML_BACKENDS.pop('test_mean')
+
+    print("✓ Custom backend test passed")
+
+
+if __name__ == "__main__":
+    test_every_backend_fits_and_pickles()
+    test_ridge_matches_normal_equations()
+    test_seasonal_naive_forecast()
+    test_backend_selection_and_cache_keys()
+    test_register_custom_backend()
+    print("\n✓ All ML backend tests passed!")
@@ -0,0 +1,184 @@
+"""
+Test trained model cache and its use by MultiModelPredictor
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.prediction_models import MultiModelPredictor, ModelCache
+from src.prediction_models.flat_forest import FlatForestModel
+from src.prediction_models.ml_backends import RANDOM_FOREST_PARAMS, get_backend
+from src.prediction_models.model_cache import data_fingerprint, make_model_key
+from src.data_processing import FeatureStore
+from src.data_processing.features import build_training_set
+from src.prediction_models.online_learner import OnlineLearnerStore
+
+
+def make_bars(n, seed=0):
+    """Build a dated random-walk OHLCV frame"""
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        'date': pd.bdate_range('2024-01-02', periods=n),
+        'close': close,
+        'high': close * 1.01,
+        'low': close * 0.99,
+        'volume': rng.uniform(1e5, 1e6, n),
+    })
+
+
+def test_lru_respects_byte_budget():
+    """Test least recently used entries leave memory when over budget"""
+    cache = ModelCache(max_bytes=3000, cache_dir=None)
+    for name in 'abc':
+        cache.put(name, np.zeros(100))  # ~900 bytes pickled each
+    assert len(cache) == 3
+
+    cache.get('a')  # 'b' becomes least recently used
+    cache.put('d', np.zeros(100))
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.bytes_used <= 3000
+
+    print("✓ Model cache LRU test passed")
+
+
+def test_disk_backing_survives_memory_eviction():
+    """Test models evicted from memory are reloaded from disk"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = ModelCache(max_bytes=10_000, cache_dir=Path(tmp_dir))
+        cache.put('model', {'weights': [1, 2, 3]})
+        cache.clear()
+
+        assert cache.get('model') == {'weights': [1, 2, 3]}
+        assert cache.disk_hits == 1
+
+        # A fresh cache (e.g. another process) sees the same file
+        other = ModelCache(cache_dir=Path(tmp_dir))
+        assert other.get('model') == {'weights': [1, 2, 3]}
+
+    print("✓ Model cache disk backing test passed")
+
+
+def test_disk_budget_prunes_least_recently_used():
+    """Test model files beyond the disk budget are deleted oldest-used first"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model = {'weights': np.arange(1000.0)}
+        cache = ModelCache(cache_dir=Path(tmp_dir), max_disk_bytes=10 ** 9)
+        cache.put('000001_a', model)
+        size = (Path(tmp_dir) / '000001_a.joblib').stat().st_size
+
+        cache = ModelCache(cache_dir=Path(tmp_dir), max_disk_bytes=int(size * 3.5))
+        for i, key in enumerate(('000001_b', '000001_c')):
+            cache.put(key, model)
+            os.utime(Path(tmp_dir) / f'{key}.joblib', ns=(i + 2, i + 2))
+        os.utime(Path(tmp_dir) / '000001_a.joblib', ns=(1, 1))
+        # A disk hit makes the oldest file the most recently used
+        cache.clear()
+        assert cache.get('000001_a') is not None
+        for key in ('000001_d', '000001_e'):
+            cache.put(key, model)
+
+        assert sorted(p.stem for p in Path(tmp_dir).glob('*.joblib')) == ['000001_a', '000001_d', '000001_e']
+        assert cache.disk_evictions == 2
+
+    print("✓ Model cache disk budget test passed")
+
+
+def test_key_changes_with_inputs():
+    """Test keys differ by code, bar date, window, params and data"""
+    fp = data_fingerprint(np.arange(10.0))
+    base = make_model_key('000001', '2024-01-31', 10, {'n': 50}, fp)
+    assert base == make_model_key('000001', '2024-01-31', 10, {'n': 50}, fp)
+    assert base != make_model_key('000002', '2024-01-31', 10, {'n': 50}, fp)
+    assert base != make_model_key('000001', '2024-02-01', 10, {'n': 50}, fp)
+    assert base != make_model_key('000001', '2024-01-31', 60, {'n': 50}, fp)
+    assert base != make_model_key('000001', '2024-01-31', 10, {'n': 100}, fp)
+    assert base != make_model_key('000001', '2024-01-31', 10, {'n': 50}, data_fingerprint(np.arange(11.0)))
+
+    print("✓ Model cache key test passed")
+
+
+def test_repeat_prediction_skips_training():
+    """Test a second prediction on unchanged bars reuses the fitted model"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = ModelCache(cache_dir=Path(tmp_dir))
+        predictor = MultiModelPredictor(model_cache=cache,
+                                        feature_store=FeatureStore(root_dir=None),
+                                        online_store=OnlineLearnerStore(root_dir=None))
+        bars = make_bars(120)
+
+        first = predictor._machine_learning_prediction(bars, 1, 10, '000001')
+        second = predictor._machine_learning_prediction(bars, 1, 10, '000001')
+        assert first['model_cached'] is False
+        assert second['model_cached'] is True
+        assert first['prices'] == second['prices']
+
+        # A new bar means new training data
+        third = predictor._machine_learning_prediction(make_bars(121), 1, 10, '000001')
+        assert third['model_cached'] is False
+
+    print("✓ Predictor model reuse test passed")
+
+
+def test_flat_forest_matches_sklearn():
+    """Test the flattened forest predicts exactly what sklearn predicts"""
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.preprocessing import StandardScaler
+
+    bars = make_bars(300, seed=5)
+    X, y, _ = build_training_set(bars['close'].values, bars['high'].values, bars['low'].values,
+                                 bars['volume'].values, 10)
+    scaler = StandardScaler()
+    forest = RandomForestRegressor(**RANDOM_FOREST_PARAMS).fit(scaler.fit_transform(X), y)
+    flat = FlatForestModel.from_sklearn(scaler, forest)
+
+    assert flat.n_trees == RANDOM_FOREST_PARAMS['n_estimators']
+    np.testing.assert_array_equal(flat.predict(X), forest.predict(scaler.transform(X)))
+
+    print("✓ Flat forest test passed")
+
+
+def test_disk_models_are_memory_mapped():
+    """Test models loaded from disk share file pages (read-only memmaps) and predict the same"""
+    bars = make_bars(200, seed=6)
+    X, y, _ = build_training_set(bars['close'].values, bars['high'].values, bars['low'].values,
+                                 bars['volume'].values, 10)
+    model = get_backend('random_forest').fit(X, y)
+    with tempfile.TemporaryDirectory() as tmp:
+        ModelCache(cache_dir=tmp).put('000001_k', model)
+
+        mapped = ModelCache(cache_dir=tmp, mmap=True).get('000001_k')
+        assert isinstance(mapped.threshold, np.memmap) and not mapped.threshold.flags.writeable
+        np.testing.assert_array_equal(mapped.predict(X), model.predict(X))
+
+        private = ModelCache(cache_dir=tmp, mmap=False).get('000001_k')
+        assert not isinstance(private.threshold, np.memmap)
+        np.testing.assert_array_equal(private.predict(X), model.predict(X))
+
+        # Other backends round-trip through the same format
+        boosted = get_backend('hist_gradient_boosting').fit(X, y)
+        ModelCache(cache_dir=tmp).put('000001_h', boosted)
+        loaded = ModelCache(cache_dir=tmp).get('000001_h')
+        np.testing.assert_array_equal(loaded.predict(X), boosted.predict(X))
+
+    print("✓ Memory-mapped model test passed")
+
+
+if __name__ == "__main__":
+    test_lru_respects_byte_budget()
+    test_disk_backing_survives_memory_eviction()
+    test_disk_budget_prunes_least_recently_used()
+    test_key_changes_with_inputs()
+    test_repeat_prediction_skips_training()
+    test_flat_forest_matches_sklearn()
+    test_disk_models_are_memory_mapped()
+    print("\n✓ All model cache tests passed!")
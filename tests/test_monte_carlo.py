@@ -0,0 +1,108 @@
+"""
+Test vectorized Monte Carlo prediction bands
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.prediction_models import MultiModelPredictor
+from src.prediction_models.monte_carlo import (
+    MC_PERCENTILES, monte_carlo_bands, path_drift, realized_volatility, simulate_paths
+)
+
+
+def make_bars(n, seed=0):
+    """Build a random-walk OHLCV frame"""
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        'close': close,
+        'high': close * (1 + rng.uniform(0, 0.02, n)),
+        'low': close * (1 - rng.uniform(0, 0.02, n)),
+        'volume': rng.uniform(1e5, 1e6, n),
+    })
+
+
+def test_simulation_statistics():
+    """Test paths follow the drift and volatility they were given"""
+    drift = np.array([0.01, -0.005, 0.002, 0.0, 0.003, 0.001])
+    paths = simulate_paths(10.0, drift, 0.02, 20000, np.random.default_rng(1))
+
+    assert paths.shape == (20000, 6)
+    log_returns = np.diff(np.log(np.hstack([np.full((20000, 1), 10.0), paths])), axis=1)
+    np.testing.assert_allclose(log_returns.mean(axis=0), drift, atol=1e-3)
+    np.testing.assert_allclose(log_returns.std(axis=0), 0.02, rtol=0.03)
+
+    print("✓ Simulation statistics test passed")
+
+
+def test_bands_are_ordered_around_model_path():
+    """Test percentile bands widen with the horizon and centre on the path"""
+    bars = make_bars(120, seed=2)
+    model_path = bars['close'].iloc[-1] * np.array([1.01, 1.015, 1.02, 1.03, 1.025, 1.04])
+    drift = path_drift(bars['close'].iloc[-1], model_path)
+    result = monte_carlo_bands(bars['close'].iloc[-1], drift, bars['close'].values,
+                               n_paths=10000, rng=np.random.default_rng(3))
+
+    bands = np.array([result['bands'][f'p{q}'] for q in MC_PERCENTILES])
+    assert (np.diff(bands, axis=0) > 0).all()
+    width = bands[-1] - bands[0]
+    assert (np.diff(width) > 0).all()
+    np.testing.assert_allclose(bands[2], model_path, rtol=0.01)
+    assert result['volatility'] == realized_volatility(bars['close'].values)
+
+    print("✓ Band ordering test passed")
+
+
+def test_ten_thousand_paths_are_fast():
+    """Test 10k paths for a 6-step horizon take a few milliseconds"""
+    drift = np.full(6, 0.001)
+    close = make_bars(120)['close'].values
+    monte_carlo_bands(10.0, drift, close, n_paths=10000)  # warm up
+    started = time.perf_counter()
+    for _ in range(5):
+        monte_carlo_bands(10.0, drift, close, n_paths=10000)
+    per_call = (time.perf_counter() - started) / 5
+    assert per_call < 0.05, per_call
+
+    print(f"✓ Monte Carlo speed test passed ({per_call * 1000:.2f} ms per symbol)")
+
+
+def test_predictor_monte_carlo_mode():
+    """Test bands are opt-in, deterministic and identical in batch mode"""
+    bars = make_bars(100, seed=4)
+    predictor = MultiModelPredictor(enable_model_cache=False)
+
+    plain = predictor.predict_multi_timeframe(bars, timeframe='30min')
+    assert 'monte_carlo' not in plain
+
+    result = predictor.predict_multi_timeframe(bars, timeframe='30min', monte_carlo=True, n_paths=5000)
+    mc = result['monte_carlo']
+    assert mc['n_paths'] == 5000
+    assert set(mc['bands']) == {f'p{q}' for q in MC_PERCENTILES}
+    assert all(len(prices) == 6 for prices in mc['bands'].values())
+
+    fresh = MultiModelPredictor(enable_model_cache=False)
+    again = fresh.predict_multi_timeframe(bars, timeframe='30min', monte_carlo=True, n_paths=5000)
+    assert again['monte_carlo'] == mc
+    batch = MultiModelPredictor(enable_model_cache=False).predict_many(
+        {'000001': bars}, timeframe='30min', monte_carlo=True, n_paths=5000
+    )
+    np.testing.assert_allclose(batch['000001']['monte_carlo']['bands']['p50'], mc['bands']['p50'], rtol=1e-9)
+
+    print("✓ Predictor Monte Carlo mode test passed")
+
+
+if __name__ == "__main__":
+    test_simulation_statistics()
+    test_bands_are_ordered_around_model_path()
+    test_ten_thousand_paths_are_fast()
+    test_predictor_monte_carlo_mode()
+    print("\n✓ All Monte Carlo tests passed!")
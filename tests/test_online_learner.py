@@ -0,0 +1,134 @@
+"""
+Test the online (recursive least squares) learner and its per-symbol store
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.data_processing import FeatureStore
+from src.data_processing.features import build_training_set
+from src.prediction_models import ModelCache
+from src.prediction_models import MultiModelPredictor
+from src.prediction_models.online_learner import OnlineLearnerStore, RLSModel, transform_features
+
+
+def make_bars(n, seed=0):
+    """Build a random-walk OHLCV frame"""
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        'close': close,
+        'high': close * (1 + rng.uniform(0, 0.02, n)),
+        'low': close * (1 - rng.uniform(0, 0.02, n)),
+        'volume': rng.uniform(1e5, 1e6, n),
+    })
+
+
+def columns(bars):
+    return bars['close'].values, bars['high'].values, bars['low'].values, bars['volume'].values
+
+
+def test_rls_matches_ridge_solution():
+    """Test sequential RLS updates equal the batch ridge solution on the same inputs"""
+    X, y, _ = build_training_set(*columns(make_bars(200, seed=1)), 10)
+    model = RLSModel(forgetting=1.0, delta=1.0).fit(X, y)
+
+    Z = transform_features(X)
+    targets = y / X[:, 0] - 1
+    theta = np.linalg.solve(Z.T @ Z + np.eye(Z.shape[1]), Z.T @ targets)
+    np.testing.assert_allclose(model.theta, theta, rtol=1e-6, atol=1e-10)
+    np.testing.assert_allclose(model.predict(X[-5:]), X[-5:, 0] * (1 + Z[-5:] @ theta), rtol=1e-10)
+
+    print("✓ RLS/ridge equivalence test passed")
+
+
+def test_store_folds_only_new_bars():
+    """Test bar-by-bar updates match a fit on the whole history"""
+    bars = make_bars(300, seed=2)
+    close, high, low, volume = columns(bars)
+    store = OnlineLearnerStore(root_dir=None)
+
+    model, folded, refitted = store.update('000001', close[:200], high[:200], low[:200], volume[:200], 10)
+    assert refitted and folded == 190
+    for end in range(201, 301):
+        model, folded, refitted = store.update('000001', close[:end], high[:end], low[:end], volume[:end], 10)
+        assert not refitted and folded == 1
+
+    X, y, _ = build_training_set(close, high, low, volume, 10)
+    batch = RLSModel().fit(X, y)
+    np.testing.assert_allclose(model.theta, batch.theta, rtol=1e-8, atol=1e-12)
+    assert model.n_updates == len(y)
+
+    # A trailing window that dropped old bars still continues the state
+    _, folded, refitted = store.update('000001', close[50:], high[50:], low[50:], volume[50:], 10)
+    assert not refitted and folded == 0
+
+    # Revised history does not match the stored window: refit
+    _, _, refitted = store.update('000001', close[:250] * 1.01, high[:250], low[:250], volume[:250], 10)
+    assert refitted
+
+    print("✓ Online fold-in test passed")
+
+
+def test_state_persists_across_stores():
+    """Test a new store resumes from the saved .npz state"""
+    bars = make_bars(150, seed=3)
+    close, high, low, volume = columns(bars)
+    with tempfile.TemporaryDirectory() as tmp:
+        first, _, _ = OnlineLearnerStore(tmp).update('600000', close[:-1], high[:-1], low[:-1], volume[:-1], 10)
+        assert (Path(tmp) / '600000_w10.npz').exists()
+
+        model, folded, refitted = OnlineLearnerStore(tmp).update('600000', close, high, low, volume, 10)
+        assert not refitted and folded == 1
+        assert model.n_updates == first.n_updates + 1
+
+        store = OnlineLearnerStore(tmp)
+        store.clear(disk=True)
+        assert not list(Path(tmp).glob('*.npz'))
+
+    print("✓ Online persistence test passed")
+
+
+def test_predictor_online_backend():
+    """Test the predictor updates per-symbol state instead of refitting"""
+    bars = make_bars(200, seed=4)
+    predictor = MultiModelPredictor(ml_backend='online', model_cache=ModelCache(cache_dir=None),
+                                    feature_store=FeatureStore(root_dir=None),
+                                    online_store=OnlineLearnerStore(root_dir=None))
+
+    first = predictor.predict_multi_timeframe(bars.iloc[:-1], timeframe='1day', stock_code='000002')
+    second = predictor.predict_multi_timeframe(bars, timeframe='1day', stock_code='000002')
+    assert first['machine_learning']['model'] == 'OnlineRLS'
+    assert not first['machine_learning']['model_cached']
+    assert second['machine_learning']['model_cached']
+    assert np.isfinite(second['machine_learning']['prices']).all()
+
+    # Without a stock code the model is fitted from scratch and nothing is stored
+    stateless = MultiModelPredictor(enable_model_cache=False, ml_backend='online')
+    result = stateless._machine_learning_prediction(bars, 1, 10)
+    assert result['model'] == 'OnlineRLS' and not result['model_cached']
+    assert not stateless.online_store._states
+
+    batch = MultiModelPredictor(ml_backend='online', model_cache=ModelCache(cache_dir=None),
+                                feature_store=FeatureStore(root_dir=None),
+                                online_store=OnlineLearnerStore(root_dir=None))
+    many = batch.predict_many({'000002': bars}, timeframe='1day')
+    np.testing.assert_allclose(many['000002']['machine_learning']['prices'],
+                               second['machine_learning']['prices'])
+
+    print("✓ Predictor online backend test passed")
+
+
+if __name__ == "__main__":
+    test_rls_matches_ridge_solution()
+    test_store_folds_only_new_bars()
+    test_state_persists_across_stores()
+    test_predictor_online_backend()
+    print("\n✓ All online learner tests passed!")
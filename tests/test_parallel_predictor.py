@@ -0,0 +1,82 @@
+"""
+Test process-pool prediction over shared-memory bars
+"""
+import pickle
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.prediction_models import MultiModelPredictor, ParallelPredictor, SharedBars
+from src.prediction_models.parallel import frame_from_shared, _views
+
+
+def make_bars(n, seed):
+    """Build a random-walk OHLCV frame with business-day dates"""
+    rng = np.random.default_rng(seed)
+    close = (5 + seed * 3) * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        'date': pd.bdate_range('2023-01-02', periods=n),
+        'close': close,
+        'high': close * (1 + rng.uniform(0, 0.02, n)),
+        'low': close * (1 - rng.uniform(0, 0.02, n)),
+        'volume': rng.uniform(1e5, 1e6, n),
+    })
+
+
+def test_shared_bars_round_trip():
+    """Test frames rebuilt from shared memory equal the originals"""
+    bars = {'000001': make_bars(50, 1), '600000': make_bars(30, 2).drop(columns=['date'])}
+    with SharedBars(bars) as shared:
+        values, dates = _views(shared._shm, shared.rows)
+        for code, original in bars.items():
+            offset, length = shared.layout[code]
+            frame = frame_from_shared(values, dates, offset, length)
+            for column in ('close', 'high', 'low', 'volume'):
+                np.testing.assert_array_equal(frame[column].to_numpy(), original[column].to_numpy())
+            assert ('date' in frame.columns) == ('date' in original.columns)
+        assert (frame_from_shared(values, dates, *shared.layout['000001'])['date']
+                == bars['000001']['date']).all()
+
+    print("✓ Shared bars round trip test passed")
+
+
+def test_parallel_matches_serial():
+    """Test pooled predictions equal in-process ones and report throughput"""
+    bars = {f'{600000 + i}': make_bars(60 + i * 5, seed=i) for i in range(6)}
+    executor = ParallelPredictor(max_workers=2, chunk_size=2,
+                                 predictor_kwargs={'enable_model_cache': False})
+    outcome = executor.run(bars, timeframe='1day', current_prices={'600000': 5.5})
+
+    serial = MultiModelPredictor(enable_model_cache=False)
+    assert list(outcome['results']) == list(bars)
+    for code, frame in bars.items():
+        expected = serial.predict_multi_timeframe(
+            frame, timeframe='1day', current_price=5.5 if code == '600000' else None, stock_code=code
+        )
+        actual = outcome['results'][code]
+        assert actual['machine_learning']['prices'] == expected['machine_learning']['prices']
+        assert actual['support_resistance']['prices'] == expected['support_resistance']['prices']
+        assert actual['technical']['indicators']['RSI'] == expected['technical']['indicators']['RSI']
+
+    report = outcome['report']
+    assert report['symbols'] == len(bars)
+    assert sum(w['symbols'] for w in report['workers'].values()) == len(bars)
+    assert report['pickle_bytes_avoided'] > report['task_bytes']
+    # Array bytes: no more than pickling the frames would have sent
+    nbytes = sum(int(frame.memory_usage().sum()) for frame in bars.values())
+    assert report['pickle_bytes_avoided'] == nbytes
+    assert nbytes <= sum(len(pickle.dumps(frame)) for frame in bars.values())
+
+    print("✓ Parallel vs serial prediction test passed")
+
+
+if __name__ == "__main__":
+    test_shared_bars_round_trip()
+    test_parallel_matches_serial()
+    print("\n✓ All parallel predictor tests passed!")
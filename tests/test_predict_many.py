@@ -0,0 +1,98 @@
+"""
+Test batch predictions across many symbols match single-symbol predictions
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.data_processing.indicators import technical_snapshot
+from src.data_processing import FeatureStore
+from src.prediction_models import MultiModelPredictor, ModelCache
+from src.prediction_models.online_learner import OnlineLearnerStore
+
+
+def make_bars(n, seed):
+    """Build a random-walk OHLCV frame with a per-seed price level"""
+    rng = np.random.default_rng(seed)
+    close = (5 + seed * 3) * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        'close': close,
+        'high': close * (1 + rng.uniform(0, 0.02, n)),
+        'low': close * (1 - rng.uniform(0, 0.02, n)),
+        'volume': rng.uniform(1e5, 1e6, n),
+    })
+
+
+def assert_results_close(actual, expected):
+    for model in ('technical', 'machine_learning', 'support_resistance', 'ensemble'):
+        assert actual[model]['method'] == expected[model]['method'], model
+        np.testing.assert_allclose(actual[model]['prices'], expected[model]['prices'], rtol=1e-9)
+    np.testing.assert_allclose(actual['price_change_pcts'], expected['price_change_pcts'], rtol=1e-9, atol=1e-12)
+    assert abs(actual['confidence'] - expected['confidence']) < 1e-9
+    assert actual['trading_signal']['action'] == expected['trading_signal']['action']
+
+
+def test_snapshot_matches_pandas_indicators():
+    """Test the vectorized indicators equal the predictor's pandas path per row"""
+    predictor = MultiModelPredictor(enable_model_cache=False)
+    frames = [make_bars(70, seed) for seed in range(4)]
+    stacked = technical_snapshot(
+        *(np.vstack([f[col].to_numpy() for f in frames]) for col in ('close', 'high', 'low', 'volume'))
+    )
+
+    for i, frame in enumerate(frames):
+        expected = predictor._compute_technical_indicators(frame)
+        for key, value in expected.items():
+            np.testing.assert_allclose(stacked[key][i], value, rtol=1e-9, err_msg=key)
+
+    print("✓ Vectorized indicator parity test passed")
+
+
+def test_predict_many_matches_single():
+    """Test batch results equal one predict_multi_timeframe call per symbol"""
+    batch_predictor = MultiModelPredictor(enable_model_cache=False)
+    predictor = MultiModelPredictor(enable_model_cache=False)
+    # Two bar counts so the batch splits into two aligned groups
+    bars = {f'{600000 + i}': make_bars(80 if i % 2 else 95, seed=i) for i in range(6)}
+
+    for timeframe in ('1day', '30min'):
+        batch = batch_predictor.predict_many(bars, timeframe=timeframe)
+        assert list(batch) == list(bars)
+        for code, frame in bars.items():
+            single = predictor.predict_multi_timeframe(frame, timeframe=timeframe, stock_code=code)
+            assert_results_close(batch[code], single)
+
+    print("✓ Batch vs single prediction test passed")
+
+
+def test_predict_many_short_history_and_prices():
+    """Test short histories fall back and current prices set the base price"""
+    predictor = MultiModelPredictor(model_cache=ModelCache(cache_dir=None),
+                                    feature_store=FeatureStore(root_dir=None),
+                                    online_store=OnlineLearnerStore(root_dir=None))
+    bars = {'000001': make_bars(90, seed=1), '000002': make_bars(5, seed=2)}
+
+    results = predictor.predict_many(bars, timeframe='1day', current_prices={'000001': 12.5})
+
+    assert results['000002']['ensemble']['method'] == 'fallback'
+    expected_change = (results['000001']['ensemble']['prices'][0] - 12.5) / 12.5 * 100
+    assert abs(results['000001']['price_change_pcts'][0] - expected_change) < 1e-9
+
+    # A second batch on unchanged bars reuses the fitted model
+    again = predictor.predict_many(bars, timeframe='1day')
+    assert again['000001']['machine_learning']['model_cached']
+
+    print("✓ Short history and current price test passed")
+
+
+if __name__ == "__main__":
+    test_snapshot_matches_pandas_indicators()
+    test_predict_many_matches_single()
+    test_predict_many_short_history_and_prices()
+    print("\n✓ All batch prediction tests passed!")
@@ -0,0 +1,165 @@
+"""
+Test the bar-aligned web prediction cache
+"""
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.data_processing import FeatureStore
+from src.prediction_models import ModelCache, MultiModelPredictor
+from src.prediction_models.online_learner import OnlineLearnerStore
+from src.business_logic.prediction_cache import (
+    EXCHANGE_TZ, PredictionCache, last_bar_timestamp, next_bar_due, price_bucket
+)
+
+
+def test_next_bar_due():
+    """Test expiry at the next 30-minute boundary or daily close"""
+    wednesday = datetime(2024, 5, 15, 10, 12)
+    assert next_bar_due('30min', wednesday) == datetime(2024, 5, 15, 10, 30)
+    assert next_bar_due('30min', datetime(2024, 5, 15, 11, 30)) == datetime(2024, 5, 15, 13, 30)
+    assert next_bar_due('30min', datetime(2024, 5, 15, 15, 5)) == datetime(2024, 5, 16, 10, 0)
+    assert next_bar_due('1day', wednesday) == datetime(2024, 5, 15, 15, 0)
+    assert next_bar_due('1day', datetime(2024, 5, 15, 15, 0)) == datetime(2024, 5, 16, 15, 0)
+    # Friday evening and Saturday roll over to Monday
+    assert next_bar_due('1day', datetime(2024, 5, 17, 16, 0)) == datetime(2024, 5, 20, 15, 0)
+    assert next_bar_due('30min', datetime(2024, 5, 18, 9, 0)) == datetime(2024, 5, 20, 10, 0)
+    assert next_bar_due('1hour', wednesday) == datetime(2024, 5, 15, 10, 30)
+    assert next_bar_due('1hour', datetime(2024, 5, 15, 11, 30)) == datetime(2024, 5, 15, 14, 0)
+    assert next_bar_due('1hour', datetime(2024, 5, 15, 15, 0)) == datetime(2024, 5, 16, 10, 30)
+    for timeframe in ('3day', '5min'):
+        try:
+            next_bar_due(timeframe, wednesday)
+            assert False, timeframe
+        except ValueError:
+            pass
+
+    print("✓ Next bar test passed")
+
+
+def test_next_bar_due_uses_exchange_time():
+    """Test aware times are converted to exchange time whatever the host timezone"""
+    # 02:12 UTC is 10:12 in Shanghai; 07:00 UTC is the 15:00 close
+    due = next_bar_due('30min', datetime(2024, 5, 15, 2, 12, tzinfo=timezone.utc))
+    assert due == datetime(2024, 5, 15, 10, 30, tzinfo=EXCHANGE_TZ) and due.tzinfo is EXCHANGE_TZ
+    assert next_bar_due('1day', datetime(2024, 5, 15, 7, 0, tzinfo=timezone.utc)) == \
+        datetime(2024, 5, 16, 15, 0, tzinfo=EXCHANGE_TZ)
+    # Friday 20:00 UTC is already Saturday in Shanghai
+    assert next_bar_due('1day', datetime(2024, 5, 17, 20, 0, tzinfo=timezone.utc)) == \
+        datetime(2024, 5, 20, 15, 0, tzinfo=EXCHANGE_TZ)
+
+    cache = PredictionCache()
+    key = cache.make_key('000001', '30min', 'x', 10.0)
+    expires_at = cache.put(key, 1, datetime(2024, 5, 15, 2, 12, tzinfo=timezone.utc))
+    assert expires_at == datetime(2024, 5, 15, 10, 30, tzinfo=EXCHANGE_TZ)
+    # Naive times are exchange-local, aware ones compare by instant
+    assert cache.get(key, datetime(2024, 5, 15, 10, 29)) is not None
+    assert cache.get(key, datetime(2024, 5, 15, 2, 29, tzinfo=timezone.utc)) is not None
+    assert cache.get(key, datetime(2024, 5, 15, 2, 30, tzinfo=timezone.utc)) is None
+    # Default clock is timezone-aware
+    assert cache.put(key, 1).tzinfo is EXCHANGE_TZ
+
+    print("✓ Exchange time test passed")
+
+
+def test_price_bucket_and_last_bar():
+    """Test log price buckets and last bar detection"""
+    assert price_bucket(10.00, 0.5) == price_bucket(10.01, 0.5)
+    assert price_bucket(10.00, 0.5) != price_bucket(10.10, 0.5)
+    assert price_bucket(100.0, 0.5) - price_bucket(99.0, 0.5) == price_bucket(10.0, 0.5) - price_bucket(9.9, 0.5)
+    assert price_bucket(None) is None and price_bucket(0.0) is None
+
+    bars = pd.DataFrame({'日期': ['2024-05-14', '2024-05-15'], 'close': [1.0, 2.0]})
+    assert last_bar_timestamp(bars) == '2024-05-15 00:00:00'
+    indexed = pd.DataFrame({'close': [1.0]}, index=pd.DatetimeIndex(['2024-05-15 10:30']))
+    assert last_bar_timestamp(indexed) == '2024-05-15 10:30:00'
+    assert last_bar_timestamp(pd.DataFrame({'close': [1.0]})) is None
+
+    print("✓ Price bucket test passed")
+
+
+def test_get_put_expiry_and_lru():
+    """Test hits within a bar, expiry when the next bar is due and LRU eviction"""
+    cache = PredictionCache(max_entries=2)
+    now = datetime(2024, 5, 15, 10, 12)
+    key = cache.make_key('000001', '30min', '2024-05-15 10:00', 10.0, bands=False)
+
+    assert cache.get(key, now) is None
+    assert cache.put(key, {'ensemble': 1}, now) == datetime(2024, 5, 15, 10, 30, tzinfo=EXCHANGE_TZ)
+    result, age, expires_at = cache.get(key, datetime(2024, 5, 15, 10, 29))
+    assert result == {'ensemble': 1} and age >= 0
+    assert cache.get(key, datetime(2024, 5, 15, 10, 30)) is None
+    assert len(cache) == 0
+
+    # Option changes and price moves get their own entries
+    assert cache.make_key('000001', '30min', 'x', 10.0, bands=True) != cache.make_key('000001', '30min', 'x', 10.0, bands=False)
+    assert cache.make_key('000001', '30min', 'x', 10.0) != cache.make_key('000001', '30min', 'x', 10.2)
+
+    for i in range(3):
+        cache.put(cache.make_key(str(i), '1day', 'x', 10.0), i, now)
+    assert len(cache) == 2
+    assert cache.get(cache.make_key('0', '1day', 'x', 10.0), now) is None
+    assert cache.stats()['hits'] == 1
+
+    print("✓ Cache expiry test passed")
+
+
+class StubFetcher:
+    """Realtime and history source with fixed data"""
+
+    def __init__(self):
+        self.price = 20.0
+
+    def fetch_stock_realtime(self, stock_code):
+        return {'price': self.price, 'name': '测试'}
+
+    def fetch_historical_data(self, stock_code, start_date, end_date):
+        rng = np.random.default_rng(0)
+        close = 20 * np.exp(np.cumsum(rng.normal(0, 0.01, 30)))
+        return pd.DataFrame({
+            '日期': pd.bdate_range('2024-04-01', periods=30),
+            '收盘': close, '最高': close * 1.01, '最低': close * 0.99, '成交量': rng.uniform(1e5, 1e6, 30),
+        })
+
+
+def test_multi_endpoint_reports_cache():
+    """Test the endpoint reuses results and reports hit and age"""
+    import run_web_ui
+
+    fetcher = StubFetcher()
+    predictor = MultiModelPredictor(model_cache=ModelCache(cache_dir=None),
+                                    feature_store=FeatureStore(root_dir=None),
+                                    online_store=OnlineLearnerStore(root_dir=None))
+    with patch.object(run_web_ui, 'data_fetcher', fetcher), \
+            patch.object(run_web_ui, 'db_manager', None), \
+            patch.object(run_web_ui, 'multi_predictor', predictor), \
+            patch.object(run_web_ui, 'prediction_cache', PredictionCache()):
+        client = run_web_ui.app.test_client()
+        first = client.get('/api/predict/multi/000001?timeframe=1day').get_json()
+        second = client.get('/api/predict/multi/000001?timeframe=1day').get_json()
+        fetcher.price = 21.0
+        moved = client.get('/api/predict/multi/000001?timeframe=1day').get_json()
+
+    assert first['success'] and not first['cache']['hit']
+    assert second['cache']['hit'] and second['cache']['ageSeconds'] >= 0
+    assert second['prediction'] == first['prediction']
+    assert not moved['cache']['hit']
+
+    print("✓ Endpoint cache test passed")
+
+
+if __name__ == "__main__":
+    test_next_bar_due()
+    test_next_bar_due_uses_exchange_time()
+    test_price_bucket_and_last_bar()
+    test_get_put_expiry_and_lru()
+    test_multi_endpoint_reports_cache()
+    print("\n✓ All prediction cache tests passed!")
@@ -0,0 +1,109 @@
+"""
+Test MultiModelPredictor is safe to share across threads
+"""
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.data_processing import FeatureStore
+from src.prediction_models import MultiModelPredictor, ModelCache
+from src.prediction_models.online_learner import OnlineLearnerStore
+
+
+N_REQUESTS = 16
+
+
+def make_bars(n, seed):
+    """Build a random-walk OHLCV frame with a per-seed price level"""
+    rng = np.random.default_rng(seed)
+    close = (5 + seed * 3) * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        'close': close,
+        'high': close * (1 + rng.uniform(0, 0.02, n)),
+        'low': close * (1 - rng.uniform(0, 0.02, n)),
+        'volume': rng.uniform(1e5, 1e6, n),
+    })
+
+
+def deterministic_view(result):
+    """Parts of a prediction that must not depend on scheduling"""
+    return (
+        result['machine_learning']['prices'],
+        result['support_resistance']['prices'],
+        result['technical']['indicators']['RSI'],
+        result['technical']['indicators']['MACD'],
+        result['ensemble']['weights'],
+    )
+
+
+def run_requests(predictor, requests, parallel):
+    def predict(request):
+        bars, timeframe = request
+        return predictor.predict_multi_timeframe(bars, timeframe=timeframe)
+
+    if not parallel:
+        return [predict(r) for r in requests]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        return list(executor.map(predict, requests))
+
+
+def test_parallel_predictions_match_serial():
+    """Test N concurrent predictions on one shared instance equal N serial ones"""
+    requests = [
+        (make_bars(80 + i * 5, seed=i), '30min' if i % 2 else '1day')
+        for i in range(N_REQUESTS)
+    ]
+
+    serial = run_requests(MultiModelPredictor(enable_model_cache=False), requests, parallel=False)
+    shared = MultiModelPredictor(enable_model_cache=False)
+    parallel = run_requests(shared, requests, parallel=True)
+
+    for expected, actual in zip(serial, parallel):
+        assert deterministic_view(expected) == deterministic_view(actual)
+
+    print("✓ Parallel vs serial prediction test passed")
+
+
+def test_concurrent_cache_misses_train_once():
+    """Test identical concurrent requests share one fitted model"""
+    cache = ModelCache(cache_dir=None)
+    predictor = MultiModelPredictor(model_cache=cache,
+                                    feature_store=FeatureStore(root_dir=None),
+                                    online_store=OnlineLearnerStore(root_dir=None))
+    bars = make_bars(120, seed=7)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(
+            lambda _: predictor._machine_learning_prediction(bars, 1, 10, '000001'),
+            range(N_REQUESTS)
+        ))
+
+    assert len(cache) == 1
+    assert sum(not r['model_cached'] for r in results) == 1
+    assert len({tuple(r['prices']) for r in results}) == 1
+
+    print("✓ Concurrent cache miss test passed")
+
+
+def test_result_weights_are_not_shared():
+    """Test mutating a returned result cannot change the predictor"""
+    predictor = MultiModelPredictor(enable_model_cache=False)
+    result = predictor.predict_multi_timeframe(make_bars(60, seed=1), timeframe='1day')
+    result['ensemble']['weights']['ml'] = 0.0
+    assert predictor.weights['ml'] == 0.4
+
+    print("✓ Result isolation test passed")
+
+
+if __name__ == "__main__":
+    test_parallel_predictions_match_serial()
+    test_concurrent_cache_misses_train_once()
+    test_result_weights_are_not_shared()
+    print("\n✓ All predictor concurrency tests passed!")
@@ -0,0 +1,107 @@
+"""
+Test predictions are deterministic for identical inputs and memoized
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.prediction_models import MultiModelPredictor
+from src.prediction_models.model_cache import ResultCache
+
+
+def make_bars(n, seed=0, flat_tail=False):
+    """Build a random-walk OHLCV frame, optionally ending flat"""
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    if flat_tail:
+        close[-10:] = close[-10]
+    return pd.DataFrame({
+        'close': close,
+        'high': close * (1 + rng.uniform(0, 0.02, n)),
+        'low': close * (1 - rng.uniform(0, 0.02, n)),
+        'volume': rng.uniform(1e5, 1e6, n),
+    })
+
+
+PREDICT_SCRIPT = f"""
+import sys
+sys.path.insert(0, {str(ROOT_DIR)!r})
+sys.path.insert(0, {str(ROOT_DIR / 'tests')!r})
+from test_predictor_determinism import make_bars
+from src.prediction_models import MultiModelPredictor
+predictor = MultiModelPredictor(enable_model_cache=False)
+result = predictor.predict_multi_timeframe(make_bars(80, seed=2, flat_tail=True), timeframe='30min')
+print(repr((result['technical']['prices'], result['support_resistance']['prices'])))
+"""
+
+
+def test_fresh_predictors_agree():
+    """Test two independent predictors give identical results"""
+    bars = make_bars(90, seed=1)
+    first = MultiModelPredictor(enable_model_cache=False).predict_multi_timeframe(bars, timeframe='30min')
+    second = MultiModelPredictor(enable_model_cache=False).predict_multi_timeframe(bars, timeframe='30min')
+    assert first == second
+
+    print("✓ Fresh predictor determinism test passed")
+
+
+def test_identical_across_processes():
+    """Test results do not depend on the interpreter's string hash salt"""
+    outputs = set()
+    for hash_seed in ('1', '2'):
+        env = dict(os.environ, PYTHONHASHSEED=hash_seed)
+        completed = subprocess.run([sys.executable, '-c', PREDICT_SCRIPT], env=env,
+                                   capture_output=True, text=True, check=True)
+        outputs.add(completed.stdout.strip().splitlines()[-1])
+    assert len(outputs) == 1
+
+    print("✓ Cross-process determinism test passed")
+
+
+def test_seed_and_inputs_change_noise():
+    """Test the seed and the bars both feed the noise generator"""
+    bars = make_bars(90, seed=3)
+    base = MultiModelPredictor(enable_model_cache=False, seed=0)
+    other_seed = MultiModelPredictor(enable_model_cache=False, seed=1)
+    tech = base.predict_multi_timeframe(bars, timeframe='30min')['technical']['prices']
+    assert other_seed.predict_multi_timeframe(bars, timeframe='30min')['technical']['prices'] != tech
+
+    changed = bars.copy()
+    changed.loc[0, 'volume'] += 1
+    assert base.predict_multi_timeframe(changed, timeframe='30min')['technical']['prices'] != tech
+
+    print("✓ Seed sensitivity test passed")
+
+
+def test_repeated_input_is_memoized():
+    """Test repeats hit the result cache and return independent copies"""
+    cache = ResultCache(max_entries=8)
+    predictor = MultiModelPredictor(enable_model_cache=False, result_cache=cache)
+    bars = make_bars(90, seed=4)
+
+    first = predictor.predict_multi_timeframe(bars, timeframe='1day')
+    first['ensemble']['prices'][0] = -1.0
+    second = predictor.predict_multi_timeframe(bars, timeframe='1day')
+
+    assert cache.hits == 1 and cache.misses == 1
+    assert second['ensemble']['prices'][0] != -1.0
+    predictor.predict_multi_timeframe(bars, timeframe='1day', current_price=21.0)
+    assert cache.misses == 2
+
+    print("✓ Result memoization test passed")
+
+
+if __name__ == "__main__":
+    test_fresh_predictors_agree()
+    test_identical_across_processes()
+    test_seed_and_inputs_change_noise()
+    test_repeated_input_is_memoized()
+    print("\n✓ All predictor determinism tests passed!")
@@ -0,0 +1,221 @@
+"""
+Test the full-universe technical screener
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.business_logic.screener import Screener, snapshot_trade_date
+from src.data_acquisition.bar_store import BarStore
+from src.prediction_models import MultiModelPredictor
+
+# A Wednesday during the session, after the last stored bar
+NOW = datetime(2024, 6, 5, 10, 30)
+
+
+def make_store(tmp_dir, symbols=6, n=80, seed=0):
+    """Bar store with random-walk daily bars ending 2024-06-04"""
+    rng = np.random.default_rng(seed)
+    store = BarStore(Path(tmp_dir))
+    dates = pd.bdate_range(end='2024-06-04', periods=n)
+    for i in range(symbols):
+        close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+        store.write(f"00000{i}", pd.DataFrame({
+            'date': dates, 'open': close, 'high': close * 1.01, 'low': close * 0.99,
+            'close': close, 'volume': rng.uniform(1e5, 1e6, n),
+        }))
+    return store
+
+
+def technical_signal(bars):
+    """The technical model's combined signal for one symbol (1day weights)"""
+    predictor = MultiModelPredictor(enable_model_cache=False)
+    indicators = predictor._compute_technical_indicators(bars)
+    signals = predictor._technical_signals({k: np.atleast_1d(v) for k, v in indicators.items()})
+    paths, total = predictor._technical_price_paths(
+        np.atleast_1d(indicators['close']), signals, 1, '1day', np.zeros((1, 1))
+    )
+    return total[0], indicators
+
+
+def test_tail_values():
+    """Test the bar store tail matches a full read"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = make_store(tmp_dir, symbols=1, n=300)
+        full = store.read('000000')
+        dates, values = store.tail_values('000000', 50)
+        assert len(dates) == 50 and dates[-1] == np.datetime64('2024-06-04')
+        # pandas' default CSV float parser may differ from exact parsing in the last ulp
+        np.testing.assert_allclose(values[:, 3], full['close'].to_numpy()[-50:], rtol=1e-15)
+        assert np.isnan(values[:, 5]).all()
+        tail = store.tail('000000', 500)
+        assert len(tail) == 300 and abs(tail['close'].iloc[0] - full['close'].iloc[0]) < 1e-12
+        assert store.tail('999999', 5).empty
+
+    print("✓ Bar store tail test passed")
+
+
+def test_snapshot_trade_date():
+    """Test snapshots before the open and on weekends date to the previous weekday"""
+    assert snapshot_trade_date(datetime(2024, 6, 5, 10, 0)) == pd.Timestamp('2024-06-05')
+    assert snapshot_trade_date(datetime(2024, 6, 5, 9, 0)) == pd.Timestamp('2024-06-04')
+    assert snapshot_trade_date(datetime(2024, 6, 8, 12, 0)) == pd.Timestamp('2024-06-07')
+    assert snapshot_trade_date(datetime(2024, 6, 10, 8, 0)) == pd.Timestamp('2024-06-07')
+    # Aware times are converted to exchange time: 01:00 UTC is 09:00 in Shanghai
+    assert snapshot_trade_date(datetime(2024, 6, 5, 1, 0, tzinfo=timezone.utc)) == pd.Timestamp('2024-06-04')
+    assert snapshot_trade_date(datetime(2024, 6, 5, 2, 0, tzinfo=timezone.utc)) == pd.Timestamp('2024-06-05')
+
+    print("✓ Snapshot trade date test passed")
+
+
+def test_scores_match_technical_model():
+    """Test stored-bar scores equal the technical model's combined signal"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = make_store(tmp_dir)
+        screener = Screener(store, lookback=80, dtype='float64')
+        scores = screener.scores(live=False, now=NOW).set_index('code')
+        assert len(scores) == 6
+        for code in scores.index:
+            expected, indicators = technical_signal(store.read(code))
+            assert abs(scores.loc[code, 'score'] - expected) < 1e-9
+            assert abs(scores.loc[code, 'rsi'] - indicators['RSI']) < 1e-9
+
+    print("✓ Score equivalence test passed")
+
+
+def test_snapshot_folded_in_as_today():
+    """Test live quotes append today's bar, or replace it when already stored"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = make_store(tmp_dir)
+        snapshot = pd.DataFrame({
+            'code': ['000000', '000001'], 'name': ['甲', '乙'], 'price': [30.0, 10.0],
+            'change_pct': [3.5, float('nan')], 'open': [29.0, 10.0], 'high': [30.5, 10.2],
+            'low': [28.8, 9.9], 'volume': [8e5, 2e5],
+        })
+        screener = Screener(store, snapshot_fn=lambda: snapshot, lookback=80, dtype='float64')
+        scores = screener.scores(now=NOW).set_index('code')
+
+        today = pd.DataFrame({'date': [pd.Timestamp('2024-06-05')], 'open': [29.0], 'high': [30.5],
+                              'low': [28.8], 'close': [30.0], 'volume': [8e5]})
+        bars = pd.concat([store.read('000000'), today], ignore_index=True).iloc[1:]
+        expected, _ = technical_signal(bars)
+        assert abs(scores.loc['000000', 'score'] - expected) < 1e-9
+        assert scores.loc['000000', 'price'] == 30.0 and scores.loc['000000', 'change_pct'] == 3.5
+        assert scores.loc['000000', 'name'] == '甲'
+        # Missing quoted change: computed against the previous stored close
+        previous = store.read('000001')['close'].iloc[-1]
+        assert abs(scores.loc['000001', 'change_pct'] - (10.0 / previous - 1) * 100) < 1e-9
+        assert scores.loc['000002', 'name'] == ''
+
+        # Once today's bar is stored, the snapshot replaces it instead of appending
+        store.append('000000', today)
+        screener.refresh(force=True)
+        again = screener.scores(now=NOW).set_index('code')
+        assert abs(again.loc['000000', 'score'] - technical_signal(store.tail('000000', 80))[0]) < 1e-9
+
+    print("✓ Snapshot folding test passed")
+
+
+def test_screen_filters_sort_and_refresh():
+    """Test filters, sorting, limits and picking up changed files"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = make_store(tmp_dir, symbols=8)
+        screener = Screener(store, lookback=60, refresh_seconds=3600)
+        everything = screener.screen(limit=100, live=False, now=NOW)
+        assert everything['universe'] == 8 and everything['matched'] == 8
+        ranked = everything['results']['score'].to_numpy()
+        assert (np.diff(ranked) <= 0).all()
+
+        median = float(np.median(ranked))
+        screened = screener.screen({'min_score': median}, sort_by='rsi', descending=False, limit=2,
+                                   live=False, now=NOW)
+        assert screened['matched'] == int((ranked >= median).sum())
+        assert len(screened['results']) == 2
+        assert (screened['results']['score'] >= median).all()
+        assert screened['results']['rsi'].is_monotonic_increasing
+
+        for bad in ({'filters': {'min_foo': 1}}, {'sort_by': 'foo'}):
+            try:
+                screener.screen(live=False, now=NOW, **bad)
+                assert False, bad
+            except ValueError:
+                pass
+
+        # Symbols too short to score are skipped; new files appear after a forced refresh
+        store.write('000100', store.read('000000').tail(10))
+        make_store(tmp_dir + '/more', symbols=1)
+        os.replace(Path(tmp_dir) / 'more' / '000000.csv', Path(tmp_dir) / '000200.csv')
+        assert screener.screen(live=False, now=NOW)['universe'] == 8
+        screener.refresh(force=True)
+        assert screener.screen(live=False, now=NOW)['universe'] == 9
+
+    print("✓ Screen filter test passed")
+
+
+def test_warm_up_and_min_bars():
+    """Test the background warm-up starts once and one-bar symbols are never scored"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = make_store(tmp_dir, symbols=3, n=1)
+        make_store(tmp_dir + '/more', symbols=1, n=2)
+        os.replace(Path(tmp_dir) / 'more' / '000000.csv', Path(tmp_dir) / '000200.csv')
+        screener = Screener(store, min_bars=1)
+        assert screener.min_bars == 2
+
+        assert screener.warm_up() and not screener.warm_up()
+        for worker in threading.enumerate():
+            if worker.name == 'screener-warm-up':
+                worker.join(timeout=10)
+        assert len(screener._bars) == 4
+        scores = screener.scores(live=False, now=NOW)
+        assert list(scores['code']) == ['000200'] and np.isfinite(scores['change_pct']).all()
+
+    print("✓ Warm-up and minimum bars test passed")
+
+
+def test_screener_endpoint():
+    """Test /api/screener returns ranked rows quickly and validates parameters"""
+    import run_web_ui
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = make_store(tmp_dir, symbols=5)
+        with patch.object(run_web_ui, 'screener', Screener(store)):
+            client = run_web_ui.app.test_client()
+            started = time.perf_counter()
+            body = client.get('/api/screener?limit=3&live=false&max_rsi=100').get_json()
+            elapsed = time.perf_counter() - started
+            bad_sort = client.get('/api/screener?sort=foo')
+            bad_filter = client.get('/api/screener?min_rsi=abc')
+            warmed = run_web_ui.screener._warm_up_started
+
+    assert body['success'] and body['universe'] == 5 and len(body['results']) == 3
+    row = body['results'][0]
+    assert set(row['signals']) == {'macd', 'rsi', 'bollinger', 'kdj', 'volume'}
+    assert row['score'] >= body['results'][-1]['score']
+    assert elapsed < 1.0
+    assert bad_sort.status_code == 400 and bad_filter.status_code == 400
+    assert warmed
+
+    print("✓ Screener endpoint test passed")
+
+
+if __name__ == "__main__":
+    test_tail_values()
+    test_snapshot_trade_date()
+    test_scores_match_technical_model()
+    test_snapshot_folded_in_as_today()
+    test_screen_filters_sort_and_refresh()
+    test_warm_up_and_min_bars()
+    test_screener_endpoint()
+    print("\n✓ All screener tests passed!")
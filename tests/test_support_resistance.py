@@ -0,0 +1,105 @@
+"""
+Test vectorized support/resistance pivots and level clustering
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.data_processing.support_resistance import (
+    cluster_levels, find_pivots, nearest_levels, support_resistance_zones
+)
+from src.prediction_models import MultiModelPredictor
+
+
+def make_bars(n, seed=0):
+    """Build a random-walk OHLCV frame"""
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        'close': close,
+        'high': close * (1 + rng.uniform(0, 0.02, n)),
+        'low': close * (1 - rng.uniform(0, 0.02, n)),
+        'volume': rng.uniform(1e5, 1e6, n),
+    })
+
+
+def legacy_pivots(high, low):
+    """Previous per-bar loop"""
+    resistance, support = [], []
+    for i in range(2, len(high) - 2):
+        if high[i] == max(high[i-2:i+3]):
+            resistance.append(i)
+        if low[i] == min(low[i-2:i+3]):
+            support.append(i)
+    return resistance, support
+
+
+def test_pivots_match_loop():
+    """Test the sliding-window detector finds the loop's pivots, ties included"""
+    bars = make_bars(500, seed=1)
+    high = bars['high'].round(1).values  # rounding creates equal neighbours
+    low = bars['low'].round(1).values
+
+    resistance, support = find_pivots(high, low)
+    expected_resistance, expected_support = legacy_pivots(high, low)
+    assert np.flatnonzero(resistance).tolist() == expected_resistance
+    assert np.flatnonzero(support).tolist() == expected_support
+
+    short_resistance, short_support = find_pivots(high[:4], low[:4])
+    assert not short_resistance.any() and not short_support.any()
+
+    print("✓ Pivot parity test passed")
+
+
+def test_cluster_levels_merges_nearby_pivots():
+    """Test pivots within the tolerance become one weighted zone"""
+    zones = cluster_levels([10.0, 10.02, 10.04, 11.0, 12.0, 12.01, np.nan], tolerance=0.005,
+                           weights=[1, 1, 2, 1, 1, 1, 1])
+
+    np.testing.assert_allclose(zones['level'], [(10.0 + 10.02 + 2 * 10.04) / 4, 11.0, 12.005])
+    assert zones['touches'].tolist() == [3, 1, 2]
+    assert zones['weight'].tolist() == [4.0, 1.0, 2.0]
+    assert zones['low'].tolist() == [10.0, 11.0, 12.0]
+    assert zones['high'].tolist() == [10.04, 11.0, 12.01]
+
+    # A ladder of close prices does not chain into one wide zone
+    ladder = cluster_levels(10 * 1.004 ** np.arange(50), tolerance=0.005)
+    assert (ladder['high'] <= ladder['low'] * 1.005).all()
+    assert cluster_levels([])['level'].size == 0
+
+    print("✓ Level clustering test passed")
+
+
+def test_nearest_levels():
+    """Test the closest zone on each side is chosen, with range fallbacks"""
+    assert nearest_levels([9.0, 11.0, 12.0], [8.0, 9.5, 10.5], 10.0) == (11.0, 9.5)
+    assert nearest_levels([9.0], [11.0], 10.0) == (9.0, 11.0)
+
+    print("✓ Nearest level test passed")
+
+
+def test_predictor_uses_zones():
+    """Test the predictor's levels come from the clustered zones"""
+    bars = make_bars(300, seed=2)
+    result = MultiModelPredictor(enable_model_cache=False)._support_resistance_prediction(bars, 3)
+
+    resistance_zones, support_zones = support_resistance_zones(bars['high'], bars['low'])
+    expected = nearest_levels(resistance_zones['level'], support_zones['level'], bars['close'].iloc[-1])
+    assert (result['levels']['resistance'], result['levels']['support']) == expected
+    assert len(result['prices']) == 3
+
+    print("✓ Predictor zone test passed")
+
+
+if __name__ == "__main__":
+    test_pivots_match_loop()
+    test_cluster_levels_merges_nearby_pivots()
+    test_nearest_levels()
+    test_predictor_uses_zones()
+    print("\n✓ All support/resistance tests passed!")
@@ -0,0 +1,122 @@
+"""
+Test stage timing instrumentation and latency histograms
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.prediction_models import MultiModelPredictor
+from src.utils.timing import LatencyHistogram, StageTimer, reset_timings, stage_histogram, timing_snapshot
+
+
+def make_bars(n, seed=0):
+    """Build a random-walk OHLCV frame"""
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        'close': close,
+        'high': close * 1.01,
+        'low': close * 0.99,
+        'volume': rng.uniform(1e5, 1e6, n),
+    })
+
+
+def test_histogram_percentiles():
+    """Test bucketed percentiles err on the slow side and stay within the recorded range"""
+    histogram = LatencyHistogram()
+    for ms in range(1, 101):
+        histogram.record(float(ms))
+    p50 = histogram.percentile(50)
+    p99 = histogram.percentile(99)
+    assert 50 <= p50 <= 50 * 2 ** 0.5
+    assert 99 <= p99 <= 100
+    assert histogram.percentile(100) == 100.0
+
+    summary = histogram.snapshot()
+    assert summary['count'] == 100 and summary['mean_ms'] == 50.5
+    assert summary['min_ms'] == 1.0 and summary['max_ms'] == 100.0
+    assert LatencyHistogram().percentile(50) is None
+
+    print("✓ Histogram percentile test passed")
+
+
+def test_disabled_timer_is_noop():
+    """Test a disabled timer records nothing and costs little"""
+    reset_timings()
+    timer = StageTimer(enabled=False)
+    started = time.perf_counter()
+    for _ in range(10000):
+        with timer.stage('noop'):
+            pass
+    per_stage = (time.perf_counter() - started) / 10000
+    assert timer.finish() == {}
+    assert timing_snapshot() == {}
+    assert per_stage < 20e-6
+
+    timer = StageTimer(prefix='test.')
+    with timer.stage('sleep'):
+        time.sleep(0.002)
+    timings = timer.finish()
+    assert timings['sleep'] >= 2.0 and timings['total'] >= timings['sleep']
+    assert stage_histogram('test.sleep').count == 1
+
+    print("✓ Stage timer test passed")
+
+
+def test_predictor_timings_block():
+    """Test predictions carry stage timings only when asked and feed the histograms"""
+    reset_timings()
+    bars = make_bars(120)
+    predictor = MultiModelPredictor(enable_model_cache=False, ml_backend='ridge')
+
+    plain = predictor.predict_multi_timeframe(bars, timeframe='1day')
+    assert 'timings' not in plain
+    assert timing_snapshot() == {}
+
+    timed = predictor.predict_multi_timeframe(bars, timeframe='1day', monte_carlo=True, n_paths=100, timings=True)
+    stages = timed['timings']
+    for stage in ('technical', 'machine_learning', 'support_resistance', 'ensemble', 'monte_carlo', 'total'):
+        assert stages[stage] >= 0, stage
+    assert stages['total'] >= stages['machine_learning']
+
+    # Cache hit: this call's lookup time, not the cached computation's
+    again = predictor.predict_multi_timeframe(bars, timeframe='1day', monte_carlo=True, n_paths=100, timings=True)
+    assert set(again['timings']) == {'result_cache', 'total'}
+    assert again['ensemble'] == timed['ensemble']
+
+    snapshot = timing_snapshot()
+    assert snapshot['predict.machine_learning']['count'] == 1
+    assert snapshot['predict.total']['count'] == 2
+
+    print("✓ Predictor timings test passed")
+
+
+def test_timings_endpoint():
+    """Test the metrics endpoint exposes the stage histograms"""
+    import run_web_ui
+
+    reset_timings()
+    timer = StageTimer(prefix='predict.')
+    with timer.stage('technical'):
+        pass
+    timer.finish()
+    body = run_web_ui.app.test_client().get('/api/metrics/timings').get_json()
+    assert body['success']
+    assert body['stages']['predict.technical']['count'] == 1
+
+    print("✓ Timings endpoint test passed")
+
+
+if __name__ == "__main__":
+    test_histogram_percentiles()
+    test_disabled_timer_is_noop()
+    test_predictor_timings_block()
+    test_timings_endpoint()
+    print("\n✓ All timing tests passed!")
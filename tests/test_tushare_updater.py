@@ -0,0 +1,150 @@
+"""
+Test TuShare cross-sectional updater against a local stand-in
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.data_acquisition.bar_store import BarStore
+from src.data_acquisition.tushare_updater import TuShareDailyUpdater, tushare_daily_to_bars
+
+
+class FakeTuSharePro:
+    """Mimics the response shape of TuShare Pro `daily`, `adj_factor` and `trade_cal`"""
+
+    TS_CODES = ['000001.SZ', '600519.SH', '300750.SZ']
+    OPEN_DAYS = ['20240102', '20240103', '20240104', '20240105', '20240108']
+
+    def __init__(self, factors=None):
+        self.daily_calls = []
+        self.adj_factor_calls = []
+        # ts_code -> {trade_date: factor}, 1.0 where not given
+        self.factors = factors or {}
+
+    def trade_cal(self, exchange='', start_date='', end_date='', is_open=None, **kwargs):
+        days = pd.date_range(start_date, end_date).strftime('%Y%m%d')
+        return pd.DataFrame({
+            'exchange': exchange,
+            'cal_date': days,
+            'is_open': [1 if d in self.OPEN_DAYS else 0 for d in days],
+        })
+
+    def daily(self, trade_date='', fields=None, **kwargs):
+        self.daily_calls.append(trade_date)
+        day = self.OPEN_DAYS.index(trade_date)
+        rows = []
+        for i, ts_code in enumerate(self.TS_CODES):
+            close = 10.0 * (i + 1) + day
+            rows.append({
+                'ts_code': ts_code, 'trade_date': trade_date,
+                'open': close - 0.5, 'high': close + 0.5, 'low': close - 1.0, 'close': close,
+                'pre_close': close - 1.0, 'change': 1.0, 'pct_chg': 1.0,
+                'vol': 1000.0 + day, 'amount': 2000.0,
+            })
+        return pd.DataFrame(rows)
+
+    def adj_factor(self, trade_date='', fields=None, **kwargs):
+        self.adj_factor_calls.append(trade_date)
+        return pd.DataFrame({
+            'ts_code': self.TS_CODES,
+            'trade_date': trade_date,
+            'adj_factor': [self.factors.get(ts_code, {}).get(trade_date, 1.0) for ts_code in self.TS_CODES],
+        })
+
+
+def test_daily_response_conversion():
+    """Test TuShare codes, dates and amount units are converted"""
+    bars = tushare_daily_to_bars(FakeTuSharePro().daily(trade_date='20240102'))
+    assert bars['code'].tolist() == ['000001', '600519', '300750']
+    assert bars['date'].iloc[0] == pd.Timestamp('2024-01-02')
+    assert bars['amount'].iloc[0] == 2000.0 * 1000
+
+    print("✓ TuShare response conversion test passed")
+
+
+def test_update_range_appends_one_day_per_call():
+    """Test each trading day costs one call and lands in every symbol's file"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pro = FakeTuSharePro()
+        updater = TuShareDailyUpdater(pro=pro, store=BarStore(Path(tmp_dir)), rate_limit=0)
+
+        results = updater.update_range('2024-01-01', '2024-01-05')
+        assert pro.daily_calls == ['20240102', '20240103', '20240104', '20240105']
+        assert results == {d: 3 for d in pro.daily_calls}
+        assert updater.last_trade_date() == '20240105'
+
+        bars = updater.store.read('600519')
+        assert len(bars) == 4
+        assert bars['close'].tolist() == [20.0, 21.0, 22.0, 23.0]
+
+        # Resuming from the recorded state fetches only the new day
+        updater.update_range(end_date='2024-01-08')
+        assert pro.daily_calls[-1] == '20240108'
+        assert len(pro.daily_calls) == 5
+        assert len(updater.store.read('000001')) == 5
+
+    print("✓ TuShare update range test passed")
+
+
+def test_reapplying_a_day_replaces_bars():
+    """Test re-running a stored day merges instead of duplicating rows"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        updater = TuShareDailyUpdater(pro=FakeTuSharePro(), store=BarStore(Path(tmp_dir)), rate_limit=0)
+        updater.update_trade_date('20240102')
+        updater.update_trade_date('20240103')
+        updater.update_trade_date('20240102')
+
+        bars = updater.store.read('300750')
+        assert bars['date'].is_unique
+        assert len(bars) == 2
+        assert updater.last_trade_date() == '20240103'
+
+    print("✓ TuShare re-apply test passed")
+
+
+def test_update_across_ex_dividend_date_continues_backfill():
+    """Test unadjusted TuShare bars continue a forward-adjusted backfill across ex-dividend dates"""
+    factors = {'600519.SH': {'20240102': 1.0, '20240103': 1.0, '20240104': 1.1, '20240105': 1.2}}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pro = FakeTuSharePro(factors)
+        store = BarStore(Path(tmp_dir))
+        # Backfilled through 2024-01-03, forward-adjusted as of that day
+        history = pd.concat([tushare_daily_to_bars(pro.daily(trade_date=d)) for d in ('20240102', '20240103')])
+        store.write('600519', history[history['code'] == '600519'].drop(columns='code'))
+        updater = TuShareDailyUpdater(pro=pro, store=store, rate_limit=0)
+
+        updater.update_range('2024-01-04', '2024-01-05')
+        # The same series a full forward-adjusted download would give today
+        days = ['20240102', '20240103', '20240104', '20240105']
+        raw = pd.concat([tushare_daily_to_bars(pro.daily(trade_date=d)) for d in days])
+        raw = raw[raw['code'] == '600519'].reset_index(drop=True)
+        adjust = np.array([factors['600519.SH'][d] for d in days]) / 1.2
+        bars = store.read('600519')
+        for column in ('open', 'high', 'low', 'close'):
+            np.testing.assert_allclose(bars[column], raw[column] * adjust, rtol=1e-12, err_msg=column)
+        # Volume stays in lots, like the backfill
+        np.testing.assert_array_equal(bars['volume'], raw['volume'])
+        # Factors are fetched once per day (plus the day before the first)
+        assert pro.adj_factor_calls == ['20240104', '20240103', '20240105']
+
+        # Re-applying an earlier day uses the stored (later) adjustment
+        updater.update_trade_date('20240104')
+        np.testing.assert_allclose(store.read('600519')['close'], raw['close'] * adjust, rtol=1e-12)
+        np.testing.assert_array_equal(store.read('000001')['close'], [12.0, 13.0])
+
+    print("✓ TuShare ex-dividend continuation test passed")
+
+
+if __name__ == "__main__":
+    test_daily_response_conversion()
+    test_update_range_appends_one_day_per_call()
+    test_reapplying_a_day_replaces_bars()
+    test_update_across_ex_dividend_date_continues_backfill()
+    print("\n✓ All TuShare updater tests passed!")
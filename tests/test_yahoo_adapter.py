@@ -0,0 +1,122 @@
+"""
+Test Yahoo Finance adapter against a local stand-in for yfinance
+"""
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.data_acquisition.bar_store import BAR_COLUMNS
+from src.data_acquisition.yahoo_adapter import YahooAdapter, to_yahoo_symbol
+
+
+class FakeYFinance:
+    """Mimics yf.Tickers(...).tickers[sym].fast_info and multi-ticker yf.download"""
+
+    PRICES = {'600519.SS': 1500.0, '000001.SZ': 10.0}
+
+    def __init__(self):
+        self.download_calls = []
+
+    def Tickers(self, symbols):
+        tickers = {}
+        for symbol in symbols.split():
+            price = self.PRICES.get(symbol)
+            fast_info = SimpleNamespace(
+                last_price=price, previous_close=price * 0.98 if price else None,
+                open=price, day_high=price, day_low=price, last_volume=1000
+            )
+            tickers[symbol] = SimpleNamespace(fast_info=fast_info)
+        return SimpleNamespace(tickers=tickers)
+
+    def download(self, symbols, start=None, end=None, group_by='column', **kwargs):
+        self.download_calls.append((tuple(symbols), start, end))
+        dates = pd.DatetimeIndex(pd.bdate_range(start, end, inclusive='left'), name='Date')
+        frames = {}
+        for symbol in symbols:
+            if symbol not in self.PRICES:
+                # yfinance returns all-NaN columns for failed tickers
+                frames[symbol] = pd.DataFrame(float('nan'), index=dates,
+                                              columns=['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume'])
+                continue
+            price = self.PRICES[symbol]
+            frames[symbol] = pd.DataFrame({
+                'Open': price, 'High': price + 1, 'Low': price - 1,
+                'Close': price, 'Adj Close': price, 'Volume': 100
+            }, index=dates)
+        return pd.concat(frames, axis=1)
+
+
+def test_history_in_store_units():
+    """Test raw Yahoo prices are forward-adjusted and shares converted to lots"""
+    dates = pd.DatetimeIndex(pd.bdate_range('2024-01-01', periods=4), name='Date')
+    # Dividend before the third bar: earlier closes adjust down by 2%
+    download = pd.DataFrame({
+        'Open': [10.0, 10.2, 9.9, 10.1], 'High': [10.5, 10.4, 10.0, 10.3],
+        'Low': [9.8, 10.0, 9.7, 9.9], 'Close': [10.2, 10.3, 9.9, 10.2],
+        'Adj Close': [10.2 * 0.98, 10.3 * 0.98, 9.9, 10.2], 'Volume': [12300, 45600, 7800, 9900],
+    }, index=dates)
+    yf = SimpleNamespace(download=lambda *args, **kwargs: download)
+    bars = YahooAdapter(yf).fetch_history(['600519'], '2024-01-01', '2024-01-04')['600519']
+
+    scale = [0.98, 0.98, 1.0, 1.0]
+    for column in ('Open', 'High', 'Low', 'Close'):
+        np.testing.assert_allclose(bars[column.lower()], download[column] * scale, rtol=1e-12)
+    np.testing.assert_allclose(bars['close'], download['Adj Close'], rtol=1e-12)
+    np.testing.assert_allclose(bars['volume'], [123, 456, 78, 99])
+
+    print("✓ Yahoo store units test passed")
+
+
+def test_symbol_conversion():
+    """Test A-share codes map to Yahoo exchange suffixes"""
+    assert to_yahoo_symbol('600519') == '600519.SS'
+    assert to_yahoo_symbol('000001') == '000001.SZ'
+    print("✓ Yahoo symbol conversion test passed")
+
+
+def test_fetch_quotes_uses_fast_info():
+    """Test quotes are normalized into realtime records and misses are dropped"""
+    adapter = YahooAdapter(FakeYFinance())
+    quotes = adapter.fetch_quotes(['600519', '000001', '300750'])
+
+    assert set(quotes) == {'600519', '000001'}
+    quote = quotes['600519']
+    assert quote['source'] == 'yahoo'
+    assert quote['price'] == 1500.0
+    assert quote['change_pct'] == round(2 / 98 * 100, 2)
+    assert {'code', 'name', 'volume', 'high', 'low', 'open', 'yesterday_close', 'timestamp'} <= set(quote)
+
+    print("✓ Yahoo fast_info quote test passed")
+
+
+def test_fetch_history_bulk_download():
+    """Test one download call serves many symbols with normalized bars"""
+    yf = FakeYFinance()
+    adapter = YahooAdapter(yf)
+    history = adapter.fetch_history(['600519', '000001', '300750'], '2024-01-01', '2024-01-05')
+
+    assert len(yf.download_calls) == 1
+    # Inclusive end date becomes Yahoo's exclusive end
+    assert yf.download_calls[0][2] == '2024-01-06'
+    assert set(history) == {'600519', '000001'}
+    bars = history['000001']
+    assert list(bars.columns) == BAR_COLUMNS
+    assert len(bars) == 5
+    assert bars['close'].iloc[-1] == 10.0
+
+    print("✓ Yahoo bulk history test passed")
+
+
+if __name__ == "__main__":
+    test_symbol_conversion()
+    test_fetch_quotes_uses_fast_info()
+    test_fetch_history_bulk_download()
+    test_history_in_store_units()
+    print("\n✓ All Yahoo adapter tests passed!")
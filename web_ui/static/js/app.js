@@ -492,7 +492,8 @@ async function runPrediction() {
         const result = await response.json();
         
         if (result.success) {
-            // Transform API data to display format
+            // Transform API data to display format (indicators are null without real bars)
+            const indicators = result.technicalIndicators || {};
             const data = {
                 stockCode: result.stockCode,
                 stockName: result.stockName || '',
@@ -503,12 +504,12 @@ async function runPrediction() {
                 mediumTermPrediction: `¥${result.prediction.mediumTerm.targetPrice}`,
                 tradingAdvice: result.prediction.advice,
                 technicalIndicators: {
-                    rsi: result.technicalIndicators.RSI,
-                    macd: result.technicalIndicators.MACD,
-                    kdj: result.technicalIndicators.KDJ,
-                    ma5: result.technicalIndicators.MA5,
-                    ma20: result.technicalIndicators.MA20,
-                    boll: result.technicalIndicators.BOLL
+                    rsi: indicators.RSI ?? '--',
+                    macd: indicators.MACD ?? '--',
+                    kdj: indicators.KDJ ?? '--',
+                    ma5: indicators.MA5 ?? '--',
+                    ma20: indicators.MA20 ?? '--',
+                    boll: indicators.BOLL ?? '--'
                 },
                 indicatorSignals: result.indicatorSignals || {},
                 priceHistory: result.priceHistory || generatePriceHistory(result.currentPrice)